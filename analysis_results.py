@@ -0,0 +1,142 @@
+"""
+Materialized Analysis Results Module for Brazilian E-commerce Dataset
+
+This module persists the outputs of a batch analysis run (result tables plus
+JSON-serializable objects such as recommendations and insights) so dashboard
+pages can load them instead of recomputing the analysis after every restart.
+
+Results are stored as FeatureStore snapshots, one store per analysis:
+    data/analysis_results/
+    └── <analysis>/
+        ├── CURRENT
+        └── snapshots/<version_id>/<table>.csv
+
+Non-tabular objects are stored as JSON documents in a ``_objects`` table, and
+the versions of the inputs the results were computed from (feature snapshot,
+reference data, result schema) in a ``_sources`` table. Both are part of the
+snapshot's content hash. Readers pass the input versions they currently see;
+results computed from other inputs are reported as stale.
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_store import FeatureStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIR = "data/analysis_results"
+
+OBJECTS_TABLE = "_objects"
+SOURCES_TABLE = "_sources"
+
+
+def _to_json_compatible(value: Any) -> Any:
+    """Convert NumPy/pandas values in nested containers to plain JSON types."""
+    if isinstance(value, dict):
+        return {str(key): _to_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_compatible(item) for item in value]
+    if isinstance(value, pd.DataFrame):
+        return _to_json_compatible(value.to_dict('records'))
+    if isinstance(value, pd.Series):
+        return _to_json_compatible(value.to_dict())
+    if isinstance(value, np.ndarray):
+        return _to_json_compatible(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+
+def _source_table(source_versions: Dict[str, str]) -> pd.DataFrame:
+    return pd.DataFrame({'source': list(source_versions),
+                         'version': [str(version) for version in source_versions.values()]})
+
+
+def materialize_results(analysis: str, tables: Dict[str, pd.DataFrame], objects: Dict[str, Any],
+                        source_versions: Dict[str, str], results_dir: str = DEFAULT_RESULTS_DIR,
+                        keep_last: int = 3) -> str:
+    """
+    Persist the results of an analysis run and publish them atomically.
+
+    Args:
+        analysis (str): Analysis name (one store per analysis)
+        tables (Dict[str, pd.DataFrame]): Result tables
+        objects (Dict[str, Any]): JSON-serializable results (lists/dicts of scalars)
+        source_versions (Dict[str, str]): Versions of the inputs the results were computed from
+        results_dir (str): Root directory of materialized results
+        keep_last (int): Number of result snapshots retained
+
+    Returns:
+        str: Version id of the published results
+    """
+    datasets = dict(tables)
+    datasets[OBJECTS_TABLE] = pd.DataFrame({
+        'name': list(objects),
+        'json': [json.dumps(_to_json_compatible(value), sort_keys=True) for value in objects.values()]
+    })
+    datasets[SOURCES_TABLE] = _source_table(source_versions)
+
+    store = FeatureStore(os.path.join(results_dir, analysis))
+    version = store.write_snapshot(datasets, metadata={'analysis': analysis, 'sources': source_versions})
+    store.garbage_collect(keep_last=keep_last)
+
+    logger.info(f"Materialized {analysis} results {version} ({len(tables)} tables, {len(objects)} objects)")
+    return version
+
+
+def load_materialized_results(analysis: str, source_versions: Optional[Dict[str, str]] = None,
+                              results_dir: str = DEFAULT_RESULTS_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Load the published results of an analysis if they are up to date.
+
+    Args:
+        analysis (str): Analysis name
+        source_versions (Optional[Dict[str, str]]): Input versions the caller currently sees;
+            results computed from different inputs are treated as stale. None skips the check.
+        results_dir (str): Root directory of materialized results
+
+    Returns:
+        Optional[Dict[str, Any]]: Tables and objects keyed by name, or None if missing or stale
+    """
+    store = FeatureStore(os.path.join(results_dir, analysis))
+    version = store.current_version()
+    if version is None:
+        return None
+
+    stored_sources = store.load_dataset(SOURCES_TABLE, version, dtype=str, keep_default_na=False)
+    if stored_sources is None:
+        return None
+    if source_versions is not None:
+        expected = _source_table(source_versions).sort_values('source').reset_index(drop=True)
+        stored = stored_sources.sort_values('source').reset_index(drop=True)
+        if not expected.equals(stored):
+            logger.info(f"Materialized {analysis} results {version} are stale")
+            return None
+
+    results = {}
+    for name in store.read_manifest(version).get('datasets', {}):
+        if name in (OBJECTS_TABLE, SOURCES_TABLE):
+            continue
+        results[name] = store.load_dataset(name, version)
+
+    objects = store.load_dataset(OBJECTS_TABLE, version, keep_default_na=False)
+    if objects is not None:
+        for name, document in zip(objects['name'], objects['json']):
+            results[name] = json.loads(document)
+
+    logger.info(f"Loaded materialized {analysis} results {version}")
+    return results
@@ -0,0 +1,225 @@
+"""
+Single-Scan Column Profiler for Brazilian E-commerce Dataset
+
+This module profiles every column of the datasets in one pass per column,
+replacing the separate missing value, type and value range scans:
+
+- null counts and missing percentages
+- distinct value estimates from a HyperLogLog sketch over 64-bit value hashes
+  (about 0.8% standard error at the default precision, mergeable by taking the
+  register-wise maximum)
+- min/max, mean/std, quartiles and IQR outlier counts for numeric columns
+- sample values and type conversion suggestions
+
+Columns are independent, so they are profiled in a process pool across cores;
+with one worker everything runs in-process.
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_HLL_PRECISION = 14
+DATE_KEYWORDS = ['date', 'time', 'timestamp']
+CATEGORY_DISTINCT_RATIO = 0.1
+
+
+def _leading_zeros(words: np.ndarray) -> np.ndarray:
+    """Number of leading zero bits of non-zero uint64 words."""
+    # frexp gives the bit length as the exponent; float rounding only matters when
+    # the top 53 bits are all ones, which is negligible for rank estimation
+    _, bit_length = np.frexp(words.astype(np.float64))
+    return 64 - np.minimum(bit_length, 64)
+
+
+def _value_hashes(values: pd.Series) -> np.ndarray:
+    """64-bit hashes of non-null values; text is deduplicated first since repeats do not change the sketch."""
+    dtype = values.dtype
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        values = pd.Series(values.unique())
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter over 64-bit hashes.
+    """
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        """
+        Initialize an empty counter.
+
+        Args:
+            precision (int): Number of index bits; 2**precision registers
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        """Add uint64 value hashes to the counter."""
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        # The sentinel bit caps the rank at 64 - precision + 1 for all-zero remainders
+        remainder = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        # The smallest remainder per register has the most leading zeros, so ranks
+        # are only computed for the registers that were hit
+        smallest = np.full(len(self.registers), np.iinfo(np.uint64).max, dtype=np.uint64)
+        np.minimum.at(smallest, index, remainder)
+        hit = np.flatnonzero(np.bincount(index, minlength=len(self.registers)))
+        ranks = (_leading_zeros(smallest[hit]) + 1).astype(np.uint8)
+        self.registers[hit] = np.maximum(self.registers[hit], ranks)
+
+    def add(self, series: pd.Series):
+        """Add the non-null values of a Series."""
+        self.add_hashes(_value_hashes(series.dropna()))
+
+    def merge(self, other: 'HyperLogLog'):
+        """Merge another counter with the same precision."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog counters with different precisions")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """Estimated number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and empty:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+def suggest_type(column_name: str, dtype, distinct: int, rows: int) -> tuple:
+    """
+    Suggest a dtype for a column.
+
+    Args:
+        column_name (str): Column name
+        dtype: Current dtype
+        distinct (int): (Estimated) distinct non-null values
+        rows (int): Number of rows
+
+    Returns:
+        tuple: (needs conversion, suggested type)
+    """
+    if any(keyword in column_name.lower() for keyword in DATE_KEYWORDS):
+        return True, 'datetime64'
+    is_text = (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)) \
+        and not isinstance(dtype, pd.CategoricalDtype)
+    if is_text and distinct < rows * CATEGORY_DISTINCT_RATIO:
+        return True, 'category'
+    return False, str(dtype)
+
+
+def profile_column(series: pd.Series, name: Optional[str] = None,
+                   precision: int = DEFAULT_HLL_PRECISION) -> Dict:
+    """
+    Profile one column from a single conversion of its values.
+
+    Args:
+        series (pd.Series): Column values
+        name (Optional[str]): Column name, defaults to the Series name
+        precision (int): HyperLogLog precision for the distinct estimate
+
+    Returns:
+        Dict: Null, distinct, range, moment, quartile, outlier and type statistics;
+        numeric statistics are NaN for non-numeric columns
+    """
+    name = str(series.name if name is None else name)
+    rows = len(series)
+    nulls = series.isna().to_numpy()
+    null_count = int(nulls.sum())
+    valid_positions = np.flatnonzero(~nulls) if null_count else None
+    valid_count = rows - null_count
+
+    counter = HyperLogLog(precision)
+    non_null = series if valid_positions is None else series.iloc[valid_positions]
+    counter.add_hashes(_value_hashes(non_null))
+    distinct = min(counter.count(), valid_count)
+    sample_values = non_null.head(5).tolist()
+    sample_text = str(sample_values)
+    needs_conversion, suggested_type = suggest_type(name, series.dtype, distinct, rows)
+
+    profile = {
+        'Column': name,
+        'Current_Type': str(series.dtype),
+        'Rows': rows,
+        'Missing_Count': null_count,
+        'Missing_Percentage': null_count / rows * 100 if rows else 0.0,
+        'Unique_Values': distinct,
+        'Min': np.nan, 'Max': np.nan, 'Mean': np.nan, 'Std': np.nan,
+        'Q1': np.nan, 'Median': np.nan, 'Q3': np.nan,
+        'Outliers': 0, 'Outlier_Percentage': 0.0,
+        'Sample_Values': sample_text[:100] + '...' if len(sample_text) > 100 else sample_text,
+        'Needs_Conversion': needs_conversion,
+        'Suggested_Type': suggested_type
+    }
+
+    numeric = pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+    if numeric and valid_count:
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if valid_positions is not None:
+            values = values[valid_positions]
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        outliers = int(((values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)).sum())
+        profile.update({
+            'Min': float(values.min()),
+            'Max': float(values.max()),
+            'Mean': float(values.mean()),
+            'Std': float(values.std(ddof=1)) if len(values) > 1 else np.nan,
+            'Q1': float(q1), 'Median': float(median), 'Q3': float(q3),
+            'Outliers': outliers,
+            'Outlier_Percentage': outliers / len(values) * 100
+        })
+    elif pd.api.types.is_datetime64_any_dtype(series.dtype) and valid_count:
+        profile.update({'Min': series.min(), 'Max': series.max()})
+    return profile
+
+
+def _profile_task(dataset: str, series: pd.Series, precision: int) -> Dict:
+    """Process pool entry point: profile one column of a dataset."""
+    profile = profile_column(series, precision=precision)
+    profile['Dataset'] = dataset
+    return profile
+
+
+def profile_datasets(datasets: Dict[str, pd.DataFrame], max_workers: Optional[int] = None,
+                     precision: int = DEFAULT_HLL_PRECISION) -> pd.DataFrame:
+    """
+    Profile every column of every dataset, in parallel across columns.
+
+    Args:
+        datasets (Dict[str, pd.DataFrame]): Datasets by name
+        max_workers (Optional[int]): Worker processes, defaults to the CPU count; 1 profiles in-process
+        precision (int): HyperLogLog precision for distinct estimates
+
+    Returns:
+        pd.DataFrame: One row per (dataset, column), in dataset and column order
+    """
+    tasks = [(name, df[column]) for name, df in datasets.items() for column in df.columns]
+    workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_profile_task, name, series, precision) for name, series in tasks]
+            profiles = [future.result() for future in futures]
+    else:
+        profiles = [_profile_task(name, series, precision) for name, series in tasks]
+
+    columns = ['Dataset'] + [key for key in (profiles[0] if profiles else {}) if key != 'Dataset']
+    logger.info(f"Profiled {len(tasks)} columns of {len(datasets)} datasets with {max(workers, 1)} workers")
+    return pd.DataFrame(profiles, columns=columns or None)
@@ -13,10 +13,13 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix
+from high_value_model import CUSTOMER_DATASET, DEFAULT_MODEL_DIR, train_or_load
+from feature_store import read_feature_dataset
+from data_cache import load_cleaned_table
+from cohort_analysis import build_order_facts, compute_cohorts
+from clv_model import DEFAULT_HORIZONS, fit_probabilistic_clv
+from lookalike import LookalikeIndex, find_segment_lookalikes
+from segmentation import DEFAULT_MODEL_DIR as DEFAULT_SEGMENT_MODEL_DIR, attach_payment_features, fit_or_load_segments
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -26,25 +29,33 @@ class CustomerAnalytics:
     Handles RFM analysis, CLV calculation, and predictive modeling.
     """
     
-    def __init__(self, data_path='data/feature_engineered/customer_analytics.csv'):
+    def __init__(self, data_path=None):
         """
         Initialize CustomerAnalytics with feature-engineered data.
         
         Args:
-            data_path (str): Path to the customer analytics CSV file
+            data_path (str): Path to a customer analytics CSV file; defaults to the
+                customer_analytics dataset of the active feature store snapshot
         """
         self.data_path = data_path
         self.customer_data = None
         self.rfm_segments = None
         self.clv_analysis = None
         self.predictive_model = None
+        self.cohort_retention = None
+        self.probabilistic_clv = None
+        self.lookalike_index = None
+        self.clustering_segments = None
         self.insights = {}
         
     def load_data(self):
         """Load and prepare customer analytics data."""
         print("Loading customer analytics data...")
         
-        self.customer_data = pd.read_csv(self.data_path)
+        if self.data_path is None:
+            self.customer_data = read_feature_dataset(CUSTOMER_DATASET)
+        else:
+            self.customer_data = pd.read_csv(self.data_path)
         
         # Convert date columns
         date_columns = ['last_order_date', 'first_order_date']
@@ -244,82 +255,232 @@ class CustomerAnalytics:
         
         return self.insights['delivery_impact']
     
-    def build_high_value_customer_model(self):
+    def analyze_cohort_retention(self, max_periods=24, data_dir='data/cleaned'):
         """
-        Build a predictive model to identify high-value customers.
+        Compute monthly acquisition cohorts and retention by customer_unique_id.
+        
+        customer_id is issued per order in this dataset, so repeat purchases are
+        resolved through customer_unique_id from the cleaned orders and customers.
+        
+        Args:
+            max_periods (int): Months since first order to report
+            data_dir (str): Directory of the cleaned datasets
         
         Returns:
-            dict: Model performance and feature importance results
+            dict: Cohort sizes, retention/revenue matrices, retention curve and summary
         """
-        print("\n=== BUILDING HIGH-VALUE CUSTOMER PREDICTIVE MODEL ===")
+        print("\n=== COHORT RETENTION ANALYSIS (UNIQUE CUSTOMERS) ===")
+        
+        self.cohort_retention = compute_cohorts(self._load_order_facts(data_dir), max_periods=max_periods)
+        summary = self.cohort_retention['summary']
+        
+        print(f"Unique customers: {summary['total_customers']:,} ({summary['total_orders']:,} orders)")
+        print(f"Repeat customer rate: {summary['repeat_customer_rate']:.2f}%")
+        print(f"Cohorts: {summary['cohorts']} ({summary['first_cohort']} to {summary['last_cohort']})")
+        print("\nRetention Curve (first 6 months):")
+        print(self.cohort_retention['retention_curve'].head(7).round(4).to_string(index=False))
+        
+        self.insights['cohort_retention'] = summary
+        
+        return self.cohort_retention
+    
+    def fit_probabilistic_clv(self, horizons=DEFAULT_HORIZONS, discount_rate=0.0, data_dir='data/cleaned'):
+        """
+        Fit BG/NBD and Gamma-Gamma models and score every unique customer.
+        
+        Args:
+            horizons (tuple): CLV horizons in months
+            discount_rate (float): Monthly discount rate
+            data_dir (str): Directory of the cleaned datasets
+        
+        Returns:
+            dict: Scored customers, fitted model parameters and a CLV summary per horizon
+        """
+        print("\n=== PROBABILISTIC CLV (BG/NBD + GAMMA-GAMMA) ===")
+        
+        self.probabilistic_clv = fit_probabilistic_clv(self._load_order_facts(data_dir), horizons=horizons,
+                                                       discount_rate=discount_rate)
+        customers = self.probabilistic_clv['customers']
+        
+        print("BG/NBD parameters: " + ", ".join(f"{k}={v:.4f}" for k, v in self.probabilistic_clv['bgnbd_params'].items()))
+        if self.probabilistic_clv['purchase_model'] != 'bgnbd':
+            print("Warning: BG/NBD fit is degenerate; expected purchases use the empirical repeat rate")
+        print("Gamma-Gamma parameters: " + ", ".join(f"{k}={v:.4f}" for k, v in self.probabilistic_clv['gamma_gamma_params'].items()))
+        
+        clv_columns = [f'clv_{horizon}m' for horizon in sorted(set(horizons))]
+        clv_summary = customers[clv_columns].describe(percentiles=[0.5, 0.9, 0.99]).transpose()
+        print("\nPredicted CLV Distribution:")
+        print(clv_summary.round(2))
+        
+        self.probabilistic_clv['summary'] = clv_summary
+        self.insights['probabilistic_clv'] = {
+            'customers_scored': len(customers),
+            'purchase_model': self.probabilistic_clv['purchase_model'],
+            'mean_probability_alive': customers['probability_alive'].mean(),
+            **{f'mean_{col}': customers[col].mean() for col in clv_columns},
+            **{f'total_{col}': customers[col].sum() for col in clv_columns}
+        }
+        
+        return self.probabilistic_clv
+    
+    def find_lookalike_customers(self, segment='Champions', n_customers=1000, k_per_seed=10, approximate=False):
+        """
+        Find customers similar to an RFM segment with a nearest-neighbor index.
+        
+        The index over the standardized RFM and delivery features is built once
+        and reused for later queries.
+        
+        Args:
+            segment (str): Seed segment, e.g. 'Champions'
+            n_customers (int): Lookalikes to return
+            k_per_seed (int): Neighbors retrieved per seed customer
+            approximate (bool): Use approximate KD tree queries (large tables)
+        
+        Returns:
+            dict: Lookalike customers, profile comparison and current segment mix
+        """
+        print(f"\n=== LOOKALIKE CUSTOMERS: {segment.upper()} ===")
         
         if self.customer_data is None:
             self.load_data()
         
-        # Prepare features for modeling
-        model_data = self.customer_data.copy()
+        if self.lookalike_index is None or (self.lookalike_index.eps > 0) != approximate:
+            self.lookalike_index = (LookalikeIndex.approximate() if approximate else LookalikeIndex()).fit(self.customer_data)
         
-        # Create target variable (high-value customers)
-        # Since we don't have repeat purchases, we'll predict high CLV customers
-        model_data['is_high_value'] = (model_data['clv_category'].isin(['High Value', 'VIP'])).astype(int)
+        lookalike_results = find_segment_lookalikes(self.customer_data, segment=segment, n_customers=n_customers,
+                                                    k_per_seed=k_per_seed, index=self.lookalike_index)
         
-        # Select features for modeling
-        feature_columns = [
-            'recency_score', 'frequency_score', 'monetary_score',
-            'avg_delivery_experience', 'delivery_reliability',
-            'days_since_last_order', 'total_revenue'
-        ]
+        print(f"Seed customers: {lookalike_results['seed_count']:,}")
+        print(f"Lookalikes found: {len(lookalike_results['lookalikes']):,}")
+        print("\nLookalikes by Current Segment:")
+        print(lookalike_results['segment_mix'])
+        print("\nFeature Profile (mean):")
+        print(lookalike_results['profile'].round(2))
         
-        # Prepare features and target
-        X = model_data[feature_columns].copy()
-        y = model_data['is_high_value']
+        self.insights['lookalikes'] = {
+            'segment': segment,
+            'seed_count': lookalike_results['seed_count'],
+            'lookalike_count': len(lookalike_results['lookalikes']),
+            'segment_mix': lookalike_results['segment_mix'].to_dict()
+        }
         
-        # Handle any missing values
-        X = X.fillna(X.mean())
+        return lookalike_results
+    
+    def build_clustering_segments(self, method='kmeans', n_clusters=None, model_dir=DEFAULT_SEGMENT_MODEL_DIR,
+                                  force_retrain=False, data_dir='data/cleaned'):
+        """
+        Data-driven segmentation on RFM, delivery and payment features.
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
+        Complements the rule-based customer_segment with mini-batch k-means or a
+        Gaussian mixture. The fitted model is persisted and reused while the
+        features are unchanged.
+        
+        Args:
+            method (str): 'kmeans' or 'gmm'
+            n_clusters (int): Number of segments, None = choose by silhouette
+            model_dir (str): Directory of the persisted segmentation model
+            force_retrain (bool): Refit even if the data version is unchanged
+            data_dir (str): Directory of the cleaned datasets
+        
+        Returns:
+            dict: Segment profiles, segment sizes and a crosstab against the RFM segments
+        """
+        print("\n=== CLUSTERING-BASED SEGMENTATION ===")
         
-        # Scale features
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
+        if self.customer_data is None:
+            self.load_data()
         
-        # Train Random Forest model
-        rf_model = RandomForestClassifier(
-            n_estimators=100,
-            random_state=42,
-            class_weight='balanced'
+        orders = load_cleaned_table('orders', columns=['order_id', 'customer_id'], data_dir=data_dir)
+        order_payments = load_cleaned_table(
+            'order_payments', columns=['order_id', 'payment_type', 'payment_installments', 'payment_value'],
+            data_dir=data_dir
         )
+        segment_data = attach_payment_features(self.customer_data, orders, order_payments)
+        
+        segmenter = fit_or_load_segments(segment_data, model_dir=model_dir, force=force_retrain,
+                                         method=method, n_clusters=n_clusters)
+        self.customer_data['ml_segment'] = segmenter.assign_names(segment_data).to_numpy()
+        
+        profiles = segmenter.profiles_
+        rfm_crosstab = pd.crosstab(self.customer_data['ml_segment'], self.customer_data['customer_segment'])
+        
+        print(f"Method: {segmenter.method}, segments: {len(profiles)}")
+        if segmenter.metadata.get('sample_silhouette') is not None:
+            print(f"Sample silhouette: {segmenter.metadata['sample_silhouette']:.3f}")
+        print("\nSegment Profiles:")
+        print(profiles.round(2).transpose())
+        print("\nClustering Segments vs RFM Segments:")
+        print(rfm_crosstab)
+        
+        self.clustering_segments = {
+            'profiles': profiles,
+            'segment_sizes': self.customer_data['ml_segment'].value_counts().sort_index(),
+            'rfm_crosstab': rfm_crosstab,
+            'metadata': segmenter.metadata,
+            'data_version': segmenter.data_version
+        }
+        self.insights['clustering_segments'] = {
+            'method': segmenter.method,
+            'n_segments': len(profiles),
+            'sample_silhouette': segmenter.metadata.get('sample_silhouette'),
+            'segment_share': profiles['share'].round(2).to_dict()
+        }
+        
+        return self.clustering_segments
+    
+    def _load_order_facts(self, data_dir):
+        """Orders resolved to customer_unique_id with purchase time and revenue."""
+        orders = load_cleaned_table('orders', columns=['order_id', 'customer_id', 'order_purchase_timestamp'],
+                                    data_dir=data_dir)
+        customers = load_cleaned_table('customers', columns=['customer_id', 'customer_unique_id'], data_dir=data_dir)
+        order_items = load_cleaned_table('order_items', columns=['order_id', 'price', 'freight_value'],
+                                         data_dir=data_dir)
+        return build_order_facts(orders, customers, order_items)
+    
+    def build_high_value_customer_model(self, model_dir=DEFAULT_MODEL_DIR, force_retrain=False):
+        """
+        Build a predictive model to identify high-value customers.
+        
+        The model is trained on all cores and persisted; training is skipped when
+        a saved model was trained on the same data version.
+        
+        Args:
+            model_dir (str): Directory of the persisted model artifacts
+            force_retrain (bool): Retrain even if the data version is unchanged
         
-        rf_model.fit(X_train_scaled, y_train)
+        Returns:
+            dict: Model performance and feature importance results
+        """
+        print("\n=== BUILDING HIGH-VALUE CUSTOMER PREDICTIVE MODEL ===")
+        
+        if self.customer_data is None:
+            self.load_data()
         
-        # Make predictions
-        y_pred = rf_model.predict(X_test_scaled)
-        y_pred_proba = rf_model.predict_proba(X_test_scaled)[:, 1]
+        # Target: high CLV customers (High Value or VIP); since we don't have
+        # repeat purchases, we predict high CLV customers
+        high_value_model = train_or_load(self.customer_data, model_dir=model_dir, force=force_retrain)
         
-        # Model performance
+        # Model performance (held-out split of the training run)
+        performance = high_value_model.metadata['performance']
+        print(f"Model version: {high_value_model.data_version} (trained {high_value_model.metadata['trained_at']})")
         print("Model Performance:")
-        print(classification_report(y_test, y_pred))
+        print(pd.DataFrame({k: v for k, v in performance.items() if k != 'accuracy'}).transpose().round(2))
+        print(f"Accuracy: {performance['accuracy']:.3f}")
         
         # Feature importance
-        feature_importance = pd.DataFrame({
-            'feature': feature_columns,
-            'importance': rf_model.feature_importances_
-        }).sort_values('importance', ascending=False)
+        feature_importance = pd.DataFrame(high_value_model.metadata['feature_importance'])
         
         print("\nFeature Importance:")
         print(feature_importance)
         
         # Store model and results
         self.predictive_model = {
-            'model': rf_model,
-            'scaler': scaler,
-            'feature_columns': feature_columns,
+            'model': high_value_model.model,
+            'scaler': high_value_model.scaler,
+            'feature_columns': high_value_model.feature_columns,
             'feature_importance': feature_importance.to_dict('records'),
-            'performance': classification_report(y_test, y_pred, output_dict=True)
+            'performance': performance,
+            'data_version': high_value_model.data_version
         }
         
         return self.predictive_model
@@ -462,6 +623,10 @@ class CustomerAnalytics:
         rfm_results = self.perform_rfm_analysis()
         clv_results = self.calculate_customer_lifetime_value()
         delivery_results = self.analyze_delivery_experience_impact()
+        cohort_results = self.analyze_cohort_retention()
+        probabilistic_clv_results = self.fit_probabilistic_clv()
+        lookalike_results = self.find_lookalike_customers()
+        clustering_results = self.build_clustering_segments()
         model_results = self.build_high_value_customer_model()
         insights = self.generate_customer_insights()
         segment_report = self.create_customer_segments_report()
@@ -471,6 +636,10 @@ class CustomerAnalytics:
             'rfm_analysis': rfm_results,
             'clv_analysis': clv_results,
             'delivery_impact': delivery_results,
+            'cohort_retention': cohort_results,
+            'probabilistic_clv': probabilistic_clv_results,
+            'champion_lookalikes': lookalike_results,
+            'clustering_segments': clustering_results,
             'predictive_model': model_results,
             'customer_insights': insights,
             'segmentation_report': segment_report,
@@ -2,6 +2,7 @@
 Customer Analytics Dashboard Page
 """
 
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -14,12 +15,18 @@ from dashboard.components.ui_components import (
     create_section_divider, create_highlight_box
 )
 from dashboard.components.styling import get_theme_colors
+from feature_store import read_feature_dataset, get_feature_version
+from data_cache import load_cleaned_table, cleaned_data_version
+from cohort_analysis import build_order_facts, compute_cohorts
+from lookalike import LookalikeIndex, find_segment_lookalikes
+from segmentation import DEFAULT_MODEL_DIR as SEGMENT_MODEL_DIR, MODEL_FILE as SEGMENT_MODEL_FILE
+from segmentation import CustomerSegmenter, attach_payment_features
 
 def load_customer_analytics_data():
     """Load and prepare customer analytics data"""
     try:
         # Load customer analytics data
-        customer_data = pd.read_csv('data/feature_engineered/customer_analytics.csv')
+        customer_data = read_feature_dataset('customer_analytics')
         
         # Convert date columns
         customer_data['last_order_date'] = pd.to_datetime(customer_data['last_order_date'])
@@ -52,6 +59,209 @@ def load_customer_analytics_data():
         st.error(f"Error loading customer analytics data: {str(e)}")
         return None
 
+# Cleaned tables the cohorts are computed from
+COHORT_TABLES = ['orders', 'customers', 'order_items']
+
+@st.cache_data(ttl=3600)
+def load_cohort_retention_data(cleaned_version=None, max_periods=24):
+    """Compute monthly cohorts by customer_unique_id, keyed on the version of the cleaned tables"""
+    try:
+        orders = load_cleaned_table('orders', columns=['order_id', 'customer_id', 'order_purchase_timestamp'])
+        customers = load_cleaned_table('customers', columns=['customer_id', 'customer_unique_id'])
+        order_items = load_cleaned_table('order_items', columns=['order_id', 'price', 'freight_value'])
+        order_facts = build_order_facts(orders, customers, order_items)
+        if order_facts.empty:
+            st.info("No orders with a purchase date and known customer yet; cohort retention is not available")
+            return None
+        return compute_cohorts(order_facts, max_periods=max_periods)
+    except Exception as e:
+        st.error(f"Error computing cohort retention: {str(e)}")
+        return None
+
+@st.cache_resource(ttl=3600)
+def load_lookalike_index(feature_version=None):
+    """Build the lookalike nearest-neighbor index once per feature store version"""
+    try:
+        customer_data = read_feature_dataset('customer_analytics')
+        return customer_data, LookalikeIndex().fit(customer_data)
+    except Exception as e:
+        st.error(f"Error building lookalike index: {str(e)}")
+        return None
+
+@st.cache_data(ttl=3600)
+def load_clustering_segments(feature_version=None, model_mtime=None):
+    """Assign persisted clustering segments to customers, keyed on data and model versions"""
+    try:
+        segmenter = CustomerSegmenter.load(SEGMENT_MODEL_DIR)
+        if segmenter is None:
+            return None
+        customer_data = read_feature_dataset('customer_analytics')
+        orders = load_cleaned_table('orders', columns=['order_id', 'customer_id'])
+        order_payments = load_cleaned_table(
+            'order_payments', columns=['order_id', 'payment_type', 'payment_installments', 'payment_value']
+        )
+        segment_data = attach_payment_features(customer_data, orders, order_payments)
+        ml_segment = segmenter.assign_names(segment_data)
+        return {
+            'profiles': segmenter.profiles_,
+            'segment_sizes': ml_segment.value_counts().reindex(segmenter.segment_names(), fill_value=0),
+            'rfm_crosstab': pd.crosstab(ml_segment, customer_data['customer_segment']),
+            'metadata': segmenter.metadata
+        }
+    except Exception as e:
+        st.error(f"Error assigning clustering segments: {str(e)}")
+        return None
+
+def create_clustering_segment_chart(segments):
+    """Create clustering segment size and RFM composition chart"""
+    colors = get_theme_colors()
+    crosstab = segments['rfm_crosstab']
+    palette = [colors['accent_blue'], colors['accent_orange'], colors['accent_green'],
+               colors['text_secondary'], colors['border_color']]
+    
+    fig = go.Figure()
+    for position, rfm_segment in enumerate(crosstab.columns):
+        fig.add_trace(go.Bar(
+            x=crosstab.index, y=crosstab[rfm_segment], name=rfm_segment,
+            marker_color=palette[position % len(palette)]
+        ))
+    fig.update_layout(
+        title="Clustering Segments by RFM Segment",
+        barmode='stack',
+        xaxis_title="Clustering Segment",
+        yaxis_title="Customers",
+        height=400,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors['text_primary'])
+    )
+    
+    return fig
+
+def create_lookalike_segment_chart(lookalike_results):
+    """Create current-segment mix of the lookalike audience"""
+    colors = get_theme_colors()
+    segment_mix = lookalike_results['segment_mix'].sort_values()
+    
+    fig = go.Figure(go.Bar(
+        x=segment_mix.values, y=segment_mix.index, orientation='h',
+        marker_color=colors['accent_green'],
+        text=segment_mix.values, textposition='auto'
+    ))
+    fig.update_layout(
+        title=f"Lookalikes of {lookalike_results['segment']} by Current Segment",
+        xaxis_title="Customers",
+        height=350,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors['text_primary'])
+    )
+    
+    return fig
+
+def render_lookalike_widget():
+    """Render the lookalike audience search widget"""
+    loaded = load_lookalike_index(get_feature_version())
+    if loaded is None:
+        return
+    customer_data, index = loaded
+    
+    segments = customer_data['customer_segment'].value_counts().index.tolist()
+    col_seed, col_size = st.columns(2)
+    with col_seed:
+        segment = st.selectbox(
+            "Seed segment", segments,
+            index=segments.index('Champions') if 'Champions' in segments else 0,
+            key='lookalike_segment'
+        )
+    with col_size:
+        n_customers = st.slider("Audience size", min_value=100, max_value=5000, value=1000, step=100,
+                                key='lookalike_size')
+    
+    lookalike_results = find_segment_lookalikes(customer_data, segment=segment, n_customers=n_customers,
+                                                index=index)
+    lookalikes = lookalike_results['lookalikes']
+    
+    col_chart, col_profile = st.columns([1, 1])
+    with col_chart:
+        st.plotly_chart(create_lookalike_segment_chart(lookalike_results), use_container_width=True)
+    with col_profile:
+        st.subheader("Feature Profile")
+        st.metric("Seed Customers", f"{lookalike_results['seed_count']:,}",
+                  delta=f"{len(lookalikes):,} lookalikes")
+        st.dataframe(lookalike_results['profile'].round(2), use_container_width=True)
+    
+    st.dataframe(lookalikes.head(50).round({'distance': 3}), use_container_width=True, hide_index=True)
+
+def create_cohort_retention_heatmap(cohorts, max_months=12):
+    """Create cohort x months-since-first-order retention heatmap"""
+    colors = get_theme_colors()
+    
+    # Month 0 is always 100%; show repeat activity from month 1 on
+    retention = cohorts['retention'].iloc[:, 1:max_months + 1] * 100
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=retention.values,
+        x=[f"M{age}" for age in retention.columns],
+        y=retention.index.astype(str),
+        colorscale='Blues',
+        colorbar=dict(title="Retention %"),
+        hovertemplate='Cohort %{y}<br>%{x}: %{z:.2f}%<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title="Monthly Cohort Retention (unique customers)",
+        xaxis_title="Months Since First Order",
+        yaxis_title="Acquisition Cohort",
+        height=500,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors['text_primary'])
+    )
+    
+    return fig
+
+def create_cohort_revenue_chart(cohorts, max_months=12):
+    """Create retention curve and cumulative revenue per cohort customer chart"""
+    colors = get_theme_colors()
+    curve = cohorts['retention_curve'].iloc[1:max_months + 1]
+    revenue = cohorts['cumulative_revenue_per_customer'].iloc[:, :max_months + 1]
+    
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('Repeat Purchase Rate by Month', 'Cumulative Revenue per Customer'),
+        horizontal_spacing=0.12
+    )
+    
+    fig.add_trace(
+        go.Bar(x=curve['months_since_first_order'], y=curve['retention_rate'] * 100,
+               marker_color=colors['accent_blue'], name='Retention %'),
+        row=1, col=1
+    )
+    
+    # Weighted average across cohorts observed at each age
+    sizes = cohorts['cohort_sizes']
+    observed = revenue.notna()
+    avg_revenue = (revenue.fillna(0).mul(sizes, axis=0).sum() / observed.mul(sizes, axis=0).sum())
+    fig.add_trace(
+        go.Scatter(x=avg_revenue.index, y=avg_revenue.values, mode='lines+markers',
+                   line=dict(color=colors['accent_orange'], width=3), name='R$ per Customer'),
+        row=1, col=2
+    )
+    
+    fig.update_xaxes(title_text="Months Since First Order")
+    fig.update_yaxes(title_text="Active Customers (%)", row=1, col=1)
+    fig.update_yaxes(title_text="Revenue (R$)", row=1, col=2)
+    fig.update_layout(
+        height=400,
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors['text_primary'])
+    )
+    
+    return fig
+
 def create_rfm_segmentation_chart(customer_data):
     """Create RFM segmentation visualization with horizontal bar chart"""
     colors = get_theme_colors()
@@ -576,6 +786,28 @@ def render():
                 delta=f"{segment['percentage']:.1f}% of customers"
             )
     
+    # Data-driven segments from the persisted clustering model
+    create_section_divider("Clustering Segments")
+    
+    model_path = os.path.join(SEGMENT_MODEL_DIR, SEGMENT_MODEL_FILE)
+    model_mtime = os.path.getmtime(model_path) if os.path.exists(model_path) else None
+    segments = load_clustering_segments(get_feature_version(), model_mtime) if model_mtime else None
+    if segments is None:
+        st.info("No clustering segmentation model found. Run the customer analytics pipeline to train one.")
+    else:
+        col_seg_chart, col_seg_profile = st.columns([3, 2])
+        with col_seg_chart:
+            st.plotly_chart(create_clustering_segment_chart(segments), use_container_width=True)
+        with col_seg_profile:
+            st.subheader("Segment Profiles")
+            metadata = segments['metadata']
+            st.caption(f"{metadata['method']} · {metadata['n_clusters']} segments · trained {metadata['trained_at']}")
+            st.dataframe(segments['profiles'].round(2).transpose(), use_container_width=True)
+    
+    # Lookalike audience search
+    create_section_divider("Lookalike Audiences")
+    render_lookalike_widget()
+    
     # CLV Analysis
     create_section_divider("Customer Lifetime Value Analysis")
     
@@ -595,6 +827,23 @@ def render():
                 delta=f"R$ {clv_cat['avg_revenue']:.2f} avg"
             )
     
+    # Cohort Retention by unique customer
+    create_section_divider("Cohort Retention")
+    
+    cohorts = load_cohort_retention_data(cleaned_data_version(COHORT_TABLES))
+    if cohorts is not None:
+        cohort_summary = cohorts['summary']
+        col_c1, col_c2, col_c3 = st.columns(3)
+        with col_c1:
+            st.metric("Unique Customers", f"{cohort_summary['total_customers']:,}")
+        with col_c2:
+            st.metric("Repeat Customer Rate", f"{cohort_summary['repeat_customer_rate']:.2f}%")
+        with col_c3:
+            st.metric("Month-1 Retention", f"{cohort_summary['month_1_retention'] * 100:.2f}%")
+        
+        st.plotly_chart(create_cohort_retention_heatmap(cohorts), use_container_width=True)
+        st.plotly_chart(create_cohort_revenue_chart(cohorts), use_container_width=True)
+    
     # Customer Journey and Delivery Impact
     create_section_divider("Customer Journey & Delivery Impact")
     
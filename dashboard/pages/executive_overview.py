@@ -11,13 +11,14 @@ from plotly.subplots import make_subplots
 from dashboard.components.navigation import show_page_header
 from dashboard.components.ui_components import create_metric_card, create_info_card, show_loading_state, create_section_divider
 from dashboard.components.styling import get_theme_colors
+from feature_store import read_feature_dataset
 
 def load_executive_data():
     """Load and prepare data for executive overview"""
     try:
         # Load key datasets
-        market_data = pd.read_csv('data/feature_engineered/market_expansion.csv')
-        customer_data = pd.read_csv('data/feature_engineered/customer_analytics.csv')
+        market_data = read_feature_dataset('market_expansion')
+        customer_data = read_feature_dataset('customer_analytics')
         
         # Calculate key metrics
         total_revenue = customer_data['total_revenue'].sum()
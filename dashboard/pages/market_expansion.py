@@ -21,29 +21,37 @@ from dashboard.components.ui_components import (
     create_section_divider, create_highlight_box, create_progress_bar
 )
 from dashboard.components.styling import get_theme_colors
-from market_expansion import MarketExpansionAnalyzer
+from market_expansion import MarketExpansionAnalyzer, select_top_cities, load_expansion_results
+from feature_store import get_feature_version
 
 @st.cache_data(ttl=3600)
-def load_market_expansion_data():
-    """Load and analyze market expansion data with caching"""
+def load_market_expansion_data(feature_version=None):
+    """Load materialized market expansion results, recomputing them only when missing or stale"""
     try:
+        results = load_expansion_results()
+        if results is not None and 'city_opportunities' in results:
+            return results
+        
         analyzer = MarketExpansionAnalyzer()
         
         # Load data
         if not analyzer.load_data():
             return None
             
-        # Run all analyses
-        analyzer.analyze_market_penetration()
-        analyzer.calculate_untapped_potential()
-        analyzer.evaluate_seller_distribution()
-        analyzer.analyze_delivery_performance_by_geography()
-        expansion_opportunities, recommendations = analyzer.generate_expansion_opportunity_matrix()
+        # Run the same analyses as the full run, so the materialized results are complete
+        analyzer.run_analysis_steps()
+        
+        # Persist the fresh results so the next server start can skip the analysis
+        try:
+            analyzer.materialize_results()
+        except Exception as e:
+            st.warning(f"Could not save market expansion results: {str(e)}")
         
         return {
             'state_summary': analyzer.state_summary,
-            'expansion_opportunities': expansion_opportunities,
-            'recommendations': recommendations,
+            'city_opportunities': analyzer.city_opportunities,
+            'expansion_opportunities': analyzer.expansion_opportunities,
+            'recommendations': analyzer.recommendations,
             'insights': analyzer.insights
         }
     except Exception as e:
@@ -478,9 +486,41 @@ def create_expansion_recommendations_panel(recommendations):
                     st.metric("Untapped Customers", f"{metrics['untapped_customers']:,}")
                 if metrics['seller_gap'] > 0:
                     st.metric("Seller Gap", f"{metrics['seller_gap']:,}")
-                if metrics['avg_delivery_days'] > 0:
+                # Materialized results come back through JSON, where a missing delivery time is None
+                if pd.notna(metrics['avg_delivery_days']) and metrics['avg_delivery_days'] > 0:
                     st.metric("Avg Delivery", f"{metrics['avg_delivery_days']:.1f} days")
 
+def create_top_cities_panel(city_data):
+    """Create top expansion cities table filtered by state, using precomputed city ranks"""
+    st.markdown("### 🏙️ Top Expansion Cities")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        states = st.multiselect(
+            "States", sorted(city_data['state'].unique()), default=[],
+            help="Leave empty to show the best cities nationally"
+        )
+    with col2:
+        k = st.number_input("Cities per state", min_value=1, max_value=50, value=5)
+    
+    if states:
+        top_cities = select_top_cities(city_data, k=int(k), states=states)
+        rank_column = 'state_rank'
+    else:
+        top_cities = select_top_cities(city_data, k=int(k), per_state=False)
+        rank_column = 'national_rank'
+    
+    display = top_cities[[
+        rank_column, 'state', 'city', 'combined_opportunity_score', 'customer_count',
+        'seller_gap', 'untapped_customers', 'avg_delivery_days'
+    ]].rename(columns={
+        rank_column: 'Rank', 'state': 'State', 'city': 'City',
+        'combined_opportunity_score': 'Opportunity Score', 'customer_count': 'Customers',
+        'seller_gap': 'Seller Gap', 'untapped_customers': 'Untapped Customers',
+        'avg_delivery_days': 'Avg Delivery Days'
+    })
+    st.dataframe(display.round(3), use_container_width=True, hide_index=True)
+
 def render():
     """Render the Market Expansion page"""
     show_page_header(
@@ -491,7 +531,7 @@ def render():
     
     # Load data
     with st.spinner("Loading market expansion analysis..."):
-        data = load_market_expansion_data()
+        data = load_market_expansion_data(get_feature_version())
     
     if data is None:
         st.error("Unable to load market expansion data. Please check data files and analysis modules.")
@@ -631,6 +671,10 @@ def render():
     
     create_expansion_recommendations_panel(recommendations)
     
+    city_data = data.get('city_opportunities')
+    if city_data is not None and len(city_data) > 0:
+        create_top_cities_panel(city_data)
+    
     # Key Insights Summary
     create_section_divider("Key Market Insights")
     
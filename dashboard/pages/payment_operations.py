@@ -14,15 +14,18 @@ from dashboard.components.ui_components import (
     create_section_divider, create_highlight_box
 )
 from dashboard.components.styling import get_theme_colors
+from feature_store import read_feature_dataset
+from data_cache import load_cleaned_table
+from olap_cube import load_olap_cube
 
 def load_payment_operations_data():
     """Load and prepare payment operations data"""
     try:
         # Load payment operations data
-        payment_data = pd.read_csv('data/feature_engineered/payment_operations.csv')
+        payment_data = read_feature_dataset('payment_operations')
         
         # Load customer data for regional analysis
-        customer_data = pd.read_csv('data/cleaned/cleaned_customers.csv')
+        customer_data = load_cleaned_table('customers', columns=['customer_id', 'customer_state', 'customer_city'])
         
         # Convert datetime columns
         datetime_cols = ['order_purchase_timestamp', 'order_approved_at', 
@@ -50,6 +53,7 @@ def load_payment_operations_data():
         
         return {
             'payment_data': payment_data,
+            'cube': load_olap_cube(),  # None when missing or built from other cleaned data
             'total_orders': total_orders,
             'total_revenue': total_revenue,
             'avg_delivery_days': avg_delivery_days,
@@ -61,7 +65,36 @@ def load_payment_operations_data():
         st.error(f"Error loading payment operations data: {str(e)}")
         return None
 
-def create_payment_method_analysis(payment_data):
+def summarize_payments_by(payment_data, dimension, cube=None):
+    """Aggregate payment and delivery metrics by one dimension, from the OLAP cube when available"""
+    if cube is not None:
+        summary = cube.rollup([dimension]).set_index(dimension)
+        summary = pd.DataFrame({
+            'avg_payment_value': summary['avg_payment_value'],
+            'total_revenue': summary['payment_value_sum'],
+            'order_count': summary['order_count'],
+            'avg_installments': summary['avg_installments'],
+            'avg_satisfaction': summary['avg_review_score'],
+            'on_time_rate': summary['on_time_rate'] * 100,
+            'avg_delivery_days': summary['avg_delivery_days']
+        })
+        return summary.round(2)
+    
+    summary = payment_data.groupby(dimension).agg({
+        'payment_value': ['mean', 'sum', 'count'],
+        'payment_installments': 'mean',
+        'review_score': 'mean',
+        'on_time_delivery': lambda x: (x.sum() / len(x)) * 100,
+        'delivery_days': 'mean'
+    }).round(2)
+    
+    summary.columns = [
+        'avg_payment_value', 'total_revenue', 'order_count',
+        'avg_installments', 'avg_satisfaction', 'on_time_rate', 'avg_delivery_days'
+    ]
+    return summary
+
+def create_payment_method_analysis(payment_data, cube=None):
     """Create payment method distribution and analysis charts"""
     colors = get_theme_colors()
     
@@ -110,18 +143,9 @@ def create_payment_method_analysis(payment_data):
     )
     
     # Payment method performance analysis
-    payment_performance = payment_data.groupby('payment_type').agg({
-        'payment_value': ['mean', 'sum', 'count'],
-        'payment_installments': 'mean',
-        'review_score': 'mean',
-        'on_time_delivery': lambda x: (x.sum() / len(x)) * 100,
-        'delivery_days': 'mean'
-    }).round(2)
-    
-    payment_performance.columns = [
-        'avg_value', 'total_revenue', 'order_count',
-        'avg_installments', 'avg_satisfaction', 'on_time_rate', 'avg_delivery_days'
-    ]
+    payment_performance = summarize_payments_by(payment_data, 'payment_type', cube).rename(
+        columns={'avg_payment_value': 'avg_value'}
+    )
     
     # Create simplified bar charts
     payment_methods_clean = [method.replace('_', ' ').title() for method in payment_performance.index]
@@ -211,23 +235,12 @@ def create_payment_method_analysis(payment_data):
     
     return fig_pie, fig_value, fig_satisfaction, payment_performance
 
-def create_regional_payment_analysis(payment_data):
+def create_regional_payment_analysis(payment_data, cube=None):
     """Create regional payment behavior analysis"""
     colors = get_theme_colors()
     
     # Regional payment analysis
-    regional_analysis = payment_data.groupby('customer_state').agg({
-        'payment_value': ['mean', 'sum', 'count'],
-        'payment_installments': 'mean',
-        'review_score': 'mean',
-        'on_time_delivery': lambda x: (x.sum() / len(x)) * 100,
-        'delivery_days': 'mean'
-    }).round(2)
-    
-    regional_analysis.columns = [
-        'avg_payment_value', 'total_revenue', 'order_count',
-        'avg_installments', 'avg_satisfaction', 'on_time_rate', 'avg_delivery_days'
-    ]
+    regional_analysis = summarize_payments_by(payment_data, 'customer_state', cube)
     
     # Filter for states with significant order volume (>500 orders)
     regional_analysis = regional_analysis[regional_analysis['order_count'] >= 500]
@@ -646,7 +659,7 @@ def render():
     create_section_divider("Payment Method Analysis")
     
     # Payment method analysis
-    fig_pie, fig_value, fig_satisfaction, payment_performance = create_payment_method_analysis(payment_data)
+    fig_pie, fig_value, fig_satisfaction, payment_performance = create_payment_method_analysis(payment_data, data.get('cube'))
     
     col1, col2 = st.columns([1, 1])
     with col1:
@@ -675,7 +688,7 @@ def render():
     create_section_divider("Regional Payment Behavior")
     
     # Regional analysis
-    fig_revenue, fig_scatter, regional_analysis = create_regional_payment_analysis(payment_data)
+    fig_revenue, fig_scatter, regional_analysis = create_regional_payment_analysis(payment_data, data.get('cube'))
     
     # Display regional charts side by side
     col1, col2 = st.columns([1, 1])
@@ -11,17 +11,18 @@ from plotly.subplots import make_subplots
 from dashboard.components.navigation import show_page_header
 from dashboard.components.ui_components import create_metric_card, create_info_card, show_loading_state, create_section_divider, create_highlight_box
 from dashboard.components.styling import get_theme_colors
+from feature_store import read_feature_dataset
 
 def load_seasonal_data():
     """Load and prepare seasonal intelligence data"""
     try:
         # Load seasonal intelligence datasets
-        monthly_trends = pd.read_csv('data/feature_engineered/seasonal_intelligence_monthly_trends.csv')
-        forecasts = pd.read_csv('data/feature_engineered/seasonal_intelligence_forecasts.csv')
-        cultural_events = pd.read_csv('data/feature_engineered/seasonal_intelligence_cultural_events.csv')
-        category_patterns = pd.read_csv('data/feature_engineered/seasonal_intelligence_category_patterns.csv')
-        inventory_recommendations = pd.read_csv('data/feature_engineered/seasonal_intelligence_inventory_recommendations.csv')
-        seasonal_variance = pd.read_csv('data/feature_engineered/seasonal_intelligence_seasonal_variance.csv')
+        monthly_trends = read_feature_dataset('seasonal_intelligence_monthly_trends')
+        forecasts = read_feature_dataset('seasonal_intelligence_forecasts')
+        cultural_events = read_feature_dataset('seasonal_intelligence_cultural_events')
+        category_patterns = read_feature_dataset('seasonal_intelligence_category_patterns')
+        inventory_recommendations = read_feature_dataset('seasonal_intelligence_inventory_recommendations')
+        seasonal_variance = read_feature_dataset('seasonal_intelligence_seasonal_variance')
         
         # Calculate key metrics
         total_revenue = seasonal_variance['total_revenue'].sum()
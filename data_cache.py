@@ -0,0 +1,179 @@
+"""
+Process-level Table Cache for Brazilian E-commerce Dataset
+
+This module lets analyzers load only the columns they need from the cleaned CSV
+files and shares what has been loaded across analyzers in the same process
+(e.g. all dashboard pages served by one Streamlit server).
+
+Each file is cached once, keyed by path, and grows column by column: a request
+for columns that are not cached yet reads just those columns with ``usecols``
+and adds them to the cached frame. Entries are invalidated when the file's
+modification time or size changes. Callers receive a new frame and can modify
+it freely without affecting the cache.
+
+``cleaned_data_version`` fingerprints the contents of cleaned tables, so
+outputs derived from them (the OLAP cube, materialized results) can record
+which inputs they were built from and be detected as stale.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLEANED_DIR = "data/cleaned"
+
+_cache: Dict[str, Dict] = {}
+_digests: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+def _file_signature(file_path: str):
+    """Return (mtime_ns, size) used to detect changed files."""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def cached_read_csv(file_path: str, columns: Optional[Iterable[str]] = None,
+                    parse_dates: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Read selected columns of a CSV file through the process-level cache.
+
+    Args:
+        file_path (str): Path to the CSV file
+        columns (Optional[Iterable[str]]): Columns to return, defaults to all columns
+        parse_dates (Optional[Iterable[str]]): Columns to parse as datetimes (parsed once, then cached)
+
+    Returns:
+        pd.DataFrame: Requested columns, in the order requested
+    """
+    signature = _file_signature(file_path)
+    parse_dates = set(parse_dates or [])
+
+    with _lock:
+        entry = _cache.get(file_path)
+        if entry is None or entry['signature'] != signature:
+            header = pd.read_csv(file_path, nrows=0).columns.tolist()
+            entry = {'signature': signature, 'header': header, 'frame': None}
+            _cache[file_path] = entry
+
+        header = entry['header']
+        wanted = header if columns is None else list(columns)
+        unknown = [col for col in wanted if col not in header]
+        if unknown:
+            raise KeyError(f"Columns not found in {file_path}: {unknown}")
+
+        cached = entry['frame']
+        missing = [col for col in wanted if cached is None or col not in cached.columns]
+        if missing:
+            logger.info(f"Reading {len(missing)} column(s) from {file_path}")
+            loaded = pd.read_csv(file_path, usecols=missing)
+            cached = loaded if cached is None else pd.concat([cached, loaded], axis=1)
+            cached = cached[[col for col in header if col in cached.columns]]
+
+        # Columns cached earlier as text are parsed the first time a caller asks for dates
+        for col in parse_dates & set(wanted):
+            if not pd.api.types.is_datetime64_any_dtype(cached[col]):
+                cached = cached.assign(**{col: pd.to_datetime(cached[col], errors='coerce')})
+        entry['frame'] = cached
+
+        # Column selection returns a new frame, so callers cannot mutate the cache
+        return cached[wanted]
+
+
+def load_cleaned_table(name: str, columns: Optional[Iterable[str]] = None,
+                       parse_dates: Optional[Iterable[str]] = None,
+                       data_dir: str = DEFAULT_CLEANED_DIR) -> pd.DataFrame:
+    """
+    Load a cleaned dataset (``<data_dir>/cleaned_<name>.csv``) through the cache.
+
+    Args:
+        name (str): Dataset name, e.g. 'orders' or 'customers'
+        columns (Optional[Iterable[str]]): Columns to return, defaults to all columns
+        parse_dates (Optional[Iterable[str]]): Columns to parse as datetimes
+        data_dir (str): Directory of the cleaned datasets
+
+    Returns:
+        pd.DataFrame: Requested columns of the cleaned dataset
+    """
+    return cached_read_csv(os.path.join(data_dir, f"cleaned_{name}.csv"), columns, parse_dates)
+
+
+def _file_digest(file_path: str) -> str:
+    """SHA-256 of a file's contents, rehashed only when its signature changes."""
+    signature = _file_signature(file_path)
+    with _lock:
+        entry = _digests.get(file_path)
+        if entry is not None and entry['signature'] == signature:
+            return entry['digest']
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    with _lock:
+        _digests[file_path] = {'signature': signature, 'digest': digest.hexdigest()}
+    return digest.hexdigest()
+
+
+def cleaned_data_version(names: Optional[Iterable[str]] = None, data_dir: str = DEFAULT_CLEANED_DIR) -> str:
+    """
+    Content fingerprint of cleaned datasets.
+
+    Identical files give the same version wherever they are stored, so a copy of
+    the cleaned data matches outputs built from the original.
+
+    Args:
+        names (Optional[Iterable[str]]): Dataset names, defaults to every cleaned_*.csv in the directory
+        data_dir (str): Directory of the cleaned datasets
+
+    Returns:
+        str: Version id; missing datasets are part of the fingerprint
+    """
+    if names is None:
+        try:
+            names = [filename[len('cleaned_'):-len('.csv')] for filename in os.listdir(data_dir)
+                     if filename.startswith('cleaned_') and filename.endswith('.csv')]
+        except FileNotFoundError:
+            names = []
+
+    digest = hashlib.sha256()
+    for name in sorted(names):
+        file_path = os.path.join(data_dir, f"cleaned_{name}.csv")
+        file_digest = _file_digest(file_path) if os.path.isfile(file_path) else 'missing'
+        digest.update(f"{name}:{file_digest}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def clear_cache():
+    """Drop all cached tables."""
+    with _lock:
+        _cache.clear()
+        _digests.clear()
+
+
+def cache_info() -> pd.DataFrame:
+    """
+    Describe what is currently cached.
+
+    Returns:
+        pd.DataFrame: One row per cached file with cached column count and memory
+    """
+    with _lock:
+        rows = [{
+            'file': file_path,
+            'cached_columns': 0 if entry['frame'] is None else len(entry['frame'].columns),
+            'total_columns': len(entry['header']),
+            'rows': 0 if entry['frame'] is None else len(entry['frame']),
+            'memory_mb': 0.0 if entry['frame'] is None else round(
+                entry['frame'].memory_usage(deep=True).sum() / 1024 ** 2, 2
+            )
+        } for file_path, entry in _cache.items()]
+    return pd.DataFrame(rows, columns=['file', 'cached_columns', 'total_columns', 'rows', 'memory_mb'])
@@ -12,6 +12,8 @@ import logging
 from typing import Dict, List, Tuple, Optional
 import warnings
 from data_loader import load_brazilian_ecommerce_data
+from temporal_features import add_temporal_features
+from row_fingerprints import FingerprintStore, drop_duplicate_rows
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,16 +25,27 @@ class DataCleaner:
     Addresses missing values, duplicates, data type conversions, and foreign key issues.
     """
     
-    def __init__(self, datasets: Dict[str, pd.DataFrame]):
+    # Transactional tables that arrive in batches; lookup and dimension tables are full
+    # reference snapshots and are kept whole for cleaning and joins
+    FACT_TABLES = ['orders', 'order_items', 'order_payments', 'order_reviews']
+    
+    def __init__(self, datasets: Dict[str, pd.DataFrame], fingerprint_store: Optional[FingerprintStore] = None):
         """
         Initialize the DataCleaner with loaded datasets.
         
         Args:
             datasets (Dict[str, pd.DataFrame]): Dictionary of loaded DataFrames
+            fingerprint_store (Optional[FingerprintStore]): Fingerprints of previously loaded
+                batches; when given, raw fact table rows already loaded are removed as
+                cross-batch duplicates, and commit_loaded_rows() records the remaining raw rows
+                once the cleaned output is saved
         """
         self.datasets = datasets.copy()  # Work with a copy to preserve original
         self.cleaning_log = []
         self.validation_results = {}
+        self.fingerprint_store = fingerprint_store
+        self.row_fingerprints = {}  # Fingerprints of the deduplicated rows, by dataset
+        self.pending_fingerprints = {}  # Raw row fingerprints to record after the output is saved
         
     def log_cleaning_action(self, action: str, dataset: str, details: str):
         """Log cleaning actions for audit trail."""
@@ -215,6 +228,9 @@ class DataCleaner:
         """
         Remove duplicate records, especially from geolocation dataset.
         
+        Duplicates are found on 64-bit row fingerprints, computed once per dataset and
+        kept in ``self.row_fingerprints``; datasets without duplicates are not copied.
+        
         Returns:
             Dict[str, pd.DataFrame]: Datasets with duplicates removed
         """
@@ -222,16 +238,20 @@ class DataCleaner:
         
         # Handle geolocation duplicates (major issue - 26% duplicates)
         if 'geolocation' in self.datasets:
-            geo_df = self.datasets['geolocation'].copy()
+            geo_df = self.datasets['geolocation']
             original_count = len(geo_df)
             
             # Remove exact duplicates
-            geo_df = geo_df.drop_duplicates()
+            geo_df, fingerprints = drop_duplicate_rows(geo_df)
             duplicates_removed = original_count - len(geo_df)
             
             # For remaining near-duplicates (same zip code but slightly different coordinates),
             # keep the first occurrence for each zip code to maintain consistency
-            geo_df = geo_df.drop_duplicates(subset=['geolocation_zip_code_prefix'], keep='first')
+            near_duplicates = geo_df['geolocation_zip_code_prefix'].duplicated(keep='first').to_numpy()
+            if near_duplicates.any():
+                geo_df = geo_df[~near_duplicates]
+                fingerprints = fingerprints[~near_duplicates]
+            self.row_fingerprints['geolocation'] = fingerprints
             
             final_count = len(geo_df)
             total_removed = original_count - final_count
@@ -248,7 +268,8 @@ class DataCleaner:
         for dataset_name, df in self.datasets.items():
             if dataset_name != 'geolocation':  # Already handled
                 original_count = len(df)
-                df_clean = df.drop_duplicates()
+                df_clean, fingerprints = drop_duplicate_rows(df)
+                self.row_fingerprints[dataset_name] = fingerprints
                 duplicates_removed = original_count - len(df_clean)
                 
                 if duplicates_removed > 0:
@@ -262,6 +283,60 @@ class DataCleaner:
         logger.info("Duplicate removal completed")
         return self.datasets
     
+    def remove_loaded_rows(self) -> Dict[str, pd.DataFrame]:
+        """
+        Drop raw fact table rows already loaded in earlier batches.
+        
+        Runs on the raw rows, before imputation fills gaps with batch-specific values,
+        so a repeated row fingerprints the same in every batch. The fingerprints of the
+        remaining rows are only recorded by commit_loaded_rows(). Lookup tables are
+        left whole so the new facts still join to them.
+        
+        Returns:
+            Dict[str, pd.DataFrame]: Datasets with only new fact table rows
+        """
+        if self.fingerprint_store is None:
+            return self.datasets
+        
+        for dataset_name in self.FACT_TABLES:
+            if dataset_name not in self.datasets:
+                continue
+            df = self.datasets[dataset_name]
+            original_count = len(df)
+            df_new, fingerprints = self.fingerprint_store.filter_new(dataset_name, df)
+            self.pending_fingerprints[dataset_name] = fingerprints
+            
+            previously_loaded = original_count - len(df_new)
+            if previously_loaded > 0:
+                self.datasets[dataset_name] = df_new
+                self.log_cleaning_action(
+                    'REMOVE_LOADED_ROWS',
+                    dataset_name,
+                    f"Removed {previously_loaded:,} records already loaded in earlier batches"
+                )
+        return self.datasets
+    
+    def commit_loaded_rows(self) -> Dict[str, int]:
+        """
+        Record the raw rows of this batch as loaded.
+        
+        Call after the cleaned output has been saved, so a failed run does not cause
+        its rows to be dropped as already loaded on the next run.
+        
+        Returns:
+            Dict[str, int]: Stored fingerprint count per dataset
+        """
+        stored = {}
+        for dataset_name, fingerprints in self.pending_fingerprints.items():
+            stored[dataset_name] = self.fingerprint_store.add(dataset_name, fingerprints)
+            self.log_cleaning_action(
+                'RECORD_LOADED_ROWS',
+                dataset_name,
+                f"Recorded {len(fingerprints):,} loaded records ({stored[dataset_name]:,} in total)"
+            )
+        self.pending_fingerprints = {}
+        return stored
+    
     def convert_data_types(self) -> Dict[str, pd.DataFrame]:
         """
         Convert columns to appropriate data types for better performance and analysis.
@@ -500,10 +575,10 @@ class DataCleaner:
                 )
             
             # Add order timing features
-            orders_df['order_year'] = orders_df['order_purchase_timestamp'].dt.year
-            orders_df['order_month'] = orders_df['order_purchase_timestamp'].dt.month
-            orders_df['order_day_of_week'] = orders_df['order_purchase_timestamp'].dt.dayofweek
-            orders_df['order_hour'] = orders_df['order_purchase_timestamp'].dt.hour
+            add_temporal_features(
+                orders_df, 'order_purchase_timestamp', prefix='order_',
+                fields=['year', 'month', 'day_of_week', 'hour']
+            )
             
             self.log_cleaning_action(
                 'CREATE_TIME_FEATURES',
@@ -606,6 +681,7 @@ class DataCleaner:
         logger.info("Starting comprehensive data cleaning pipeline...")
         
         # Execute cleaning steps in order
+        self.remove_loaded_rows()
         self.clean_missing_values()
         self.remove_duplicates()
         self.convert_data_types()
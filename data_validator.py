@@ -2,36 +2,161 @@
 Data Validation Module for Cleaned Brazilian E-commerce Dataset
 
 This module provides validation functions to ensure data quality
-after the cleaning process and before analysis.
+after the cleaning process and before analysis. Column-level checks are
+declarative rules (see validation_rules) evaluated in one scan per table.
+With sample_size set, rules are checked on stratified samples with confidence
+intervals and only uncertain rules are re-checked in full (see sampled_validation).
 """
 
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from data_cleaner import clean_brazilian_ecommerce_data
+from validation_rules import Rule, RuleEngine, NotNullRule, DtypeRule, RangeRule, ComparisonRule, load_rules
+from sampled_validation import SampledValidator, DEFAULT_CONFIDENCE, DEFAULT_ESCALATION_THRESHOLD
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Declarative validation rules; each table is scanned once for all of its rules
+DEFAULT_VALIDATION_RULES = [
+    # Critical columns that should have minimal missing values after cleaning
+    *[NotNullRule(table, col, max_missing_percentage=1.0) for table, columns in {
+        'orders': ['order_id', 'customer_id', 'order_status', 'order_purchase_timestamp'],
+        'customers': ['customer_id', 'customer_state'],
+        'products': ['product_id', 'product_category_name'],
+        'order_items': ['order_id', 'product_id', 'seller_id', 'price'],
+        'order_payments': ['order_id', 'payment_type', 'payment_value']
+    }.items() for col in columns],
+    
+    # Expected data types after cleaning
+    *[DtypeRule(table, col, expected) for table, type_expectations in {
+        'orders': {
+            'order_purchase_timestamp': 'datetime64[ns]',
+            'order_approved_at': 'datetime64[ns]',
+            'order_delivered_carrier_date': 'datetime64[ns]',
+            'order_delivered_customer_date': 'datetime64[ns]',
+            'order_estimated_delivery_date': 'datetime64[ns]',
+            'order_status': 'category',
+            'delivery_days': ['int64', 'float64'],  # Can be either due to NaN handling
+            'order_year': ['int64', 'int32', 'int16', 'Int16'],
+            'order_month': ['int64', 'int32', 'int8', 'Int8']
+        },
+        'products': {
+            'product_category_name': 'category',
+            'product_weight_g': 'float64',
+            'product_length_cm': 'float64',
+            'product_height_cm': 'float64',
+            'product_width_cm': 'float64',
+            'product_volume_cm3': 'float64'
+        },
+        'customers': {
+            'customer_city': 'category',
+            'customer_state': 'category'
+        },
+        'order_payments': {
+            'payment_type': 'category'
+        }
+    }.items() for col, expected in type_expectations.items()],
+    
+    # Business rules
+    ComparisonRule('orders', 'order_delivered_customer_date', '>=', other='order_purchase_timestamp',
+                   name='delivery_after_purchase', description='Delivery date should be after purchase date'),
+    ComparisonRule('orders', 'delivery_days', '>=', 0, name='positive_delivery_days',
+                   description='Delivery days should be positive'),
+    *[ComparisonRule('products', col, '>', 0, name=f'positive_{col}',
+                     description='Product dimensions should be positive')
+      for col in ['product_weight_g', 'product_length_cm', 'product_height_cm', 'product_width_cm']],
+    ComparisonRule('order_payments', 'payment_value', '>', 0, name='positive_payment_value',
+                   description='Payment values should be positive'),
+    
+    # Reasonable ranges for key metrics (warnings, not failures)
+    RangeRule('orders', 'delivery_days', 0, 365),  # Delivery should be within a year
+    RangeRule('orders', 'order_year', 2016, 2019),  # Dataset time range
+    RangeRule('orders', 'order_month', 1, 12),
+    RangeRule('products', 'product_weight_g', 0, 50000),  # Up to 50kg seems reasonable
+    RangeRule('products', 'product_length_cm', 0, 200),  # Up to 2m
+    RangeRule('products', 'product_height_cm', 0, 200),
+    RangeRule('products', 'product_width_cm', 0, 200),
+    RangeRule('order_payments', 'payment_value', 0, 10000),  # Up to R$10,000
+    RangeRule('order_payments', 'payment_installments', 1, 24),  # Reasonable installment range
+    RangeRule('order_reviews', 'review_score', 1, 5)  # Standard 1-5 rating scale
+]
+
 class DataValidator:
     """
     Comprehensive data validator for cleaned Brazilian E-commerce dataset.
     Ensures data quality meets requirements for analysis.
     """
     
-    def __init__(self, datasets: Dict[str, pd.DataFrame]):
+    def __init__(self, datasets: Dict[str, pd.DataFrame], rules: Optional[Union[List[Rule], str]] = None,
+                 sample_size: Optional[int] = None, confidence: float = DEFAULT_CONFIDENCE,
+                 escalation_threshold: float = DEFAULT_ESCALATION_THRESHOLD):
         """
         Initialize the DataValidator with cleaned datasets.
         
         Args:
             datasets (Dict[str, pd.DataFrame]): Dictionary of cleaned DataFrames
+            rules (Optional[Union[List[Rule], str]]): Validation rules or a YAML/JSON rules file,
+                defaults to DEFAULT_VALIDATION_RULES
+            sample_size (Optional[int]): Validate stratified samples of this many rows per table
+                instead of full tables (None validates everything)
+            confidence (float): Confidence level of sampled violation rate intervals
+            escalation_threshold (float): Violation rate whose crossing by a sampled upper bound
+                triggers a full check of that rule
         """
         self.datasets = datasets
         self.validation_results = {}
         self.validation_passed = True
+        if isinstance(rules, str):
+            rules = load_rules(rules)
+        self.rule_engine = RuleEngine(DEFAULT_VALIDATION_RULES if rules is None else rules)
+        self.rule_results = None
+        self.sampler = None
+        if sample_size:
+            self.sampler = SampledValidator(datasets, self.rule_engine.rules, sample_size, confidence,
+                                            escalation_threshold)
+    
+    def evaluate_rules(self) -> Dict[str, Dict]:
+        """
+        Evaluate all declarative rules, scanning each table once.
+        
+        Returns:
+            Dict: Rule results by category, table and rule name
+        """
+        if self.rule_results is None:
+            logger.info(f"Evaluating {len(self.rule_engine.rules)} validation rules...")
+            if self.sampler is not None:
+                self.rule_results = self.sampler.evaluate()
+            else:
+                self.rule_results = self.rule_engine.evaluate(self.datasets)
+        return self.rule_results
+    
+    def _category_results(self, category: str) -> Dict[str, Dict]:
+        """Rule results of one category; failed rules fail validation, warnings are logged."""
+        category_results = self.evaluate_rules().get(category, {})
+        
+        for dataset_name, rules in category_results.items():
+            for rule_name, result in rules.items():
+                if result['status'] == 'PASS':
+                    continue
+                if result['status'] == 'FAIL':
+                    self.validation_passed = False
+                if 'actual_type' in result:
+                    logger.warning(f"Type mismatch in {dataset_name}.{rule_name}: expected {result['expected_type']}, got {result['actual_type']}")
+                elif result.get('mode') == 'sampled':
+                    logger.warning(f"{dataset_name}.{rule_name}: estimated violation rate {result['estimated_rate']:.4%} "
+                                   f"({result['confidence']:.0%} CI {result['rate_lower']:.4%}-{result['rate_upper']:.4%}, "
+                                   f"{result['description']}), e.g. rows {result['sample_indices'][:5]}")
+                else:
+                    logger.warning(f"{dataset_name}.{rule_name}: {result['violation_count']} violations "
+                                   f"({result['description']}), e.g. rows {result['sample_indices'][:5]}")
+        
+        self.validation_results[category] = category_results
+        return category_results
         
     def validate_data_completeness(self) -> Dict[str, any]:
         """
@@ -41,42 +166,7 @@ class DataValidator:
             Dict: Validation results for data completeness
         """
         logger.info("Validating data completeness...")
-        
-        completeness_results = {}
-        
-        # Critical columns that should have minimal missing values after cleaning
-        critical_columns = {
-            'orders': ['order_id', 'customer_id', 'order_status', 'order_purchase_timestamp'],
-            'customers': ['customer_id', 'customer_state'],
-            'products': ['product_id', 'product_category_name'],
-            'order_items': ['order_id', 'product_id', 'seller_id', 'price'],
-            'order_payments': ['order_id', 'payment_type', 'payment_value']
-        }
-        
-        for dataset_name, columns in critical_columns.items():
-            if dataset_name in self.datasets:
-                df = self.datasets[dataset_name]
-                dataset_results = {}
-                
-                for col in columns:
-                    if col in df.columns:
-                        missing_count = df[col].isnull().sum()
-                        missing_percentage = (missing_count / len(df)) * 100
-                        
-                        dataset_results[col] = {
-                            'missing_count': missing_count,
-                            'missing_percentage': round(missing_percentage, 2),
-                            'status': 'PASS' if missing_percentage < 1.0 else 'FAIL'
-                        }
-                        
-                        if missing_percentage >= 1.0:
-                            self.validation_passed = False
-                            logger.warning(f"Critical column {dataset_name}.{col} has {missing_percentage:.2f}% missing values")
-                
-                completeness_results[dataset_name] = dataset_results
-        
-        self.validation_results['completeness'] = completeness_results
-        return completeness_results
+        return self._category_results('completeness')
     
     def validate_data_types(self) -> Dict[str, any]:
         """
@@ -86,68 +176,7 @@ class DataValidator:
             Dict: Validation results for data types
         """
         logger.info("Validating data types...")
-        
-        type_results = {}
-        
-        # Expected data types after cleaning
-        expected_types = {
-            'orders': {
-                'order_purchase_timestamp': 'datetime64[ns]',
-                'order_approved_at': 'datetime64[ns]',
-                'order_delivered_carrier_date': 'datetime64[ns]',
-                'order_delivered_customer_date': 'datetime64[ns]',
-                'order_estimated_delivery_date': 'datetime64[ns]',
-                'order_status': 'category',
-                'delivery_days': ['int64', 'float64'],  # Can be either due to NaN handling
-                'order_year': ['int64', 'int32'],
-                'order_month': ['int64', 'int32']
-            },
-            'products': {
-                'product_category_name': 'category',
-                'product_weight_g': 'float64',
-                'product_length_cm': 'float64',
-                'product_height_cm': 'float64',
-                'product_width_cm': 'float64',
-                'product_volume_cm3': 'float64'
-            },
-            'customers': {
-                'customer_city': 'category',
-                'customer_state': 'category'
-            },
-            'order_payments': {
-                'payment_type': 'category'
-            }
-        }
-        
-        for dataset_name, type_expectations in expected_types.items():
-            if dataset_name in self.datasets:
-                df = self.datasets[dataset_name]
-                dataset_results = {}
-                
-                for col, expected_type in type_expectations.items():
-                    if col in df.columns:
-                        actual_type = str(df[col].dtype)
-                        
-                        # Handle multiple acceptable types
-                        if isinstance(expected_type, list):
-                            type_match = actual_type in expected_type
-                        else:
-                            type_match = actual_type == expected_type
-                        
-                        dataset_results[col] = {
-                            'expected_type': expected_type,
-                            'actual_type': actual_type,
-                            'status': 'PASS' if type_match else 'FAIL'
-                        }
-                        
-                        if not type_match:
-                            self.validation_passed = False
-                            logger.warning(f"Type mismatch in {dataset_name}.{col}: expected {expected_type}, got {actual_type}")
-                
-                type_results[dataset_name] = dataset_results
-        
-        self.validation_results['data_types'] = type_results
-        return type_results
+        return self._category_results('data_types')
     
     def validate_business_rules(self) -> Dict[str, any]:
         """
@@ -157,99 +186,7 @@ class DataValidator:
             Dict: Validation results for business rules
         """
         logger.info("Validating business rules...")
-        
-        business_results = {}
-        
-        # Validate orders dataset business rules
-        if 'orders' in self.datasets:
-            orders_df = self.datasets['orders']
-            orders_validation = {}
-            
-            # Rule 1: Delivery date should be after purchase date
-            if 'order_delivered_customer_date' in orders_df.columns and 'order_purchase_timestamp' in orders_df.columns:
-                valid_delivery_mask = (
-                    orders_df['order_delivered_customer_date'].notna() & 
-                    orders_df['order_purchase_timestamp'].notna()
-                )
-                
-                if valid_delivery_mask.sum() > 0:
-                    invalid_delivery_dates = (
-                        orders_df.loc[valid_delivery_mask, 'order_delivered_customer_date'] < 
-                        orders_df.loc[valid_delivery_mask, 'order_purchase_timestamp']
-                    ).sum()
-                    
-                    orders_validation['delivery_after_purchase'] = {
-                        'invalid_count': invalid_delivery_dates,
-                        'total_checked': valid_delivery_mask.sum(),
-                        'status': 'PASS' if invalid_delivery_dates == 0 else 'FAIL'
-                    }
-                    
-                    if invalid_delivery_dates > 0:
-                        self.validation_passed = False
-                        logger.warning(f"Found {invalid_delivery_dates} orders with delivery date before purchase date")
-            
-            # Rule 2: Delivery days should be positive
-            if 'delivery_days' in orders_df.columns:
-                negative_delivery_days = (orders_df['delivery_days'] < 0).sum()
-                
-                orders_validation['positive_delivery_days'] = {
-                    'invalid_count': negative_delivery_days,
-                    'total_rows': len(orders_df),
-                    'status': 'PASS' if negative_delivery_days == 0 else 'FAIL'
-                }
-                
-                if negative_delivery_days > 0:
-                    self.validation_passed = False
-                    logger.warning(f"Found {negative_delivery_days} orders with negative delivery days")
-            
-            business_results['orders'] = orders_validation
-        
-        # Validate products dataset business rules
-        if 'products' in self.datasets:
-            products_df = self.datasets['products']
-            products_validation = {}
-            
-            # Rule 1: Product dimensions should be positive
-            dimension_cols = ['product_weight_g', 'product_length_cm', 'product_height_cm', 'product_width_cm']
-            for col in dimension_cols:
-                if col in products_df.columns:
-                    negative_values = (products_df[col] <= 0).sum()
-                    
-                    products_validation[f'positive_{col}'] = {
-                        'invalid_count': negative_values,
-                        'total_rows': len(products_df),
-                        'status': 'PASS' if negative_values == 0 else 'FAIL'
-                    }
-                    
-                    if negative_values > 0:
-                        self.validation_passed = False
-                        logger.warning(f"Found {negative_values} products with non-positive {col}")
-            
-            business_results['products'] = products_validation
-        
-        # Validate order_payments dataset business rules
-        if 'order_payments' in self.datasets:
-            payments_df = self.datasets['order_payments']
-            payments_validation = {}
-            
-            # Rule 1: Payment values should be positive
-            if 'payment_value' in payments_df.columns:
-                negative_payments = (payments_df['payment_value'] <= 0).sum()
-                
-                payments_validation['positive_payment_value'] = {
-                    'invalid_count': negative_payments,
-                    'total_rows': len(payments_df),
-                    'status': 'PASS' if negative_payments == 0 else 'FAIL'
-                }
-                
-                if negative_payments > 0:
-                    self.validation_passed = False
-                    logger.warning(f"Found {negative_payments} payments with non-positive values")
-            
-            business_results['order_payments'] = payments_validation
-        
-        self.validation_results['business_rules'] = business_results
-        return business_results
+        return self._category_results('business_rules')
     
     def validate_referential_integrity(self) -> Dict[str, any]:
         """
@@ -277,13 +214,31 @@ class DataValidator:
                 parent_key in self.datasets[parent_table].columns and
                 child_key in self.datasets[child_table].columns):
                 
+                relationship_key = f"{parent_table}_{child_table}"
+                if self.sampler is not None:
+                    estimate = self.sampler.estimate_orphans(parent_table, parent_key, child_table, child_key)
+                    if not estimate.pop('escalate'):
+                        integrity_results[relationship_key] = {
+                            'parent_table': parent_table,
+                            'parent_key': parent_key,
+                            'child_table': child_table,
+                            'child_key': child_key,
+                            'mode': 'sampled',
+                            **estimate,
+                            'status': 'PASS' if estimate['sample_violations'] == 0 else 'FAIL'
+                        }
+                        if estimate['sample_violations'] > 0:
+                            self.validation_passed = False
+                            logger.warning(f"Referential integrity violation: about {estimate['estimated_rate']:.4%} "
+                                           f"of {child_table} rows reference missing {parent_table}")
+                        continue
+                
                 parent_keys = set(self.datasets[parent_table][parent_key].dropna())
                 child_keys = set(self.datasets[child_table][child_key].dropna())
                 
                 orphaned_records = child_keys - parent_keys
                 orphaned_count = len(orphaned_records)
                 
-                relationship_key = f"{parent_table}_{child_table}"
                 integrity_results[relationship_key] = {
                     'parent_table': parent_table,
                     'parent_key': parent_key,
@@ -309,63 +264,7 @@ class DataValidator:
             Dict: Validation results for data ranges
         """
         logger.info("Validating data ranges...")
-        
-        range_results = {}
-        
-        # Define reasonable ranges for key metrics
-        range_expectations = {
-            'orders': {
-                'delivery_days': {'min': 0, 'max': 365},  # Delivery should be within a year
-                'order_year': {'min': 2016, 'max': 2019},  # Dataset time range
-                'order_month': {'min': 1, 'max': 12}
-            },
-            'products': {
-                'product_weight_g': {'min': 0, 'max': 50000},  # Up to 50kg seems reasonable
-                'product_length_cm': {'min': 0, 'max': 200},   # Up to 2m
-                'product_height_cm': {'min': 0, 'max': 200},
-                'product_width_cm': {'min': 0, 'max': 200}
-            },
-            'order_payments': {
-                'payment_value': {'min': 0, 'max': 10000},  # Up to R$10,000
-                'payment_installments': {'min': 1, 'max': 24}  # Reasonable installment range
-            },
-            'order_reviews': {
-                'review_score': {'min': 1, 'max': 5}  # Standard 1-5 rating scale
-            }
-        }
-        
-        for dataset_name, column_ranges in range_expectations.items():
-            if dataset_name in self.datasets:
-                df = self.datasets[dataset_name]
-                dataset_results = {}
-                
-                for col, range_def in column_ranges.items():
-                    if col in df.columns:
-                        valid_data = df[col].dropna()
-                        
-                        if len(valid_data) > 0:
-                            out_of_range_count = (
-                                (valid_data < range_def['min']) | 
-                                (valid_data > range_def['max'])
-                            ).sum()
-                            
-                            dataset_results[col] = {
-                                'expected_min': range_def['min'],
-                                'expected_max': range_def['max'],
-                                'actual_min': valid_data.min(),
-                                'actual_max': valid_data.max(),
-                                'out_of_range_count': out_of_range_count,
-                                'total_values': len(valid_data),
-                                'status': 'PASS' if out_of_range_count == 0 else 'WARN'  # Warning, not failure
-                            }
-                            
-                            if out_of_range_count > 0:
-                                logger.warning(f"Found {out_of_range_count} values outside expected range in {dataset_name}.{col}")
-                
-                range_results[dataset_name] = dataset_results
-        
-        self.validation_results['data_ranges'] = range_results
-        return range_results
+        return self._category_results('data_ranges')
     
     def generate_validation_report(self) -> str:
         """
@@ -386,6 +285,15 @@ class DataValidator:
         report_lines.append(f"🎯 OVERALL VALIDATION STATUS: {overall_status}")
         report_lines.append("")
         
+        if self.sampler is not None:
+            rule_results = [result for tables in (self.rule_results or {}).values()
+                            for rules in tables.values() for result in rules.values() if 'mode' in result]
+            escalated = sum(result['mode'] == 'full' for result in rule_results)
+            report_lines.append(f"🎲 SAMPLED VALIDATION: up to {self.sampler.sample_size:,} rows per table, "
+                                f"{self.sampler.confidence:.0%} confidence intervals")
+            report_lines.append(f"   • {escalated} of {len(rule_results)} rules escalated to a full scan")
+            report_lines.append("")
+        
         # Dataset overview
         report_lines.append("📊 DATASET OVERVIEW:")
         for name, df in self.datasets.items():
@@ -483,17 +391,18 @@ class DataValidator:
         return self.validation_passed, validation_report
 
 
-def validate_cleaned_data(datasets: Dict[str, pd.DataFrame]) -> Tuple[bool, str]:
+def validate_cleaned_data(datasets: Dict[str, pd.DataFrame], sample_size: Optional[int] = None) -> Tuple[bool, str]:
     """
     Convenience function to validate cleaned datasets.
     
     Args:
         datasets (Dict[str, pd.DataFrame]): Cleaned datasets
+        sample_size (Optional[int]): Validate stratified samples of this many rows per table
         
     Returns:
         Tuple[bool, str]: Validation passed status and report
     """
-    validator = DataValidator(datasets)
+    validator = DataValidator(datasets, sample_size=sample_size)
     return validator.validate_all_data()
 
 
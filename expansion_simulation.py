@@ -0,0 +1,179 @@
+"""
+Monte Carlo Simulation Module for Brazilian E-commerce Dataset
+
+This module puts uncertainty bands on the state-level untapped revenue
+potential, market potential score and combined opportunity score computed by
+MarketExpansionAnalyzer. The point estimates rest on two uncertain inputs:
+
+- revenue per customer, which values every untapped customer
+- tier penetration benchmarks (customers per 1000 urban population)
+
+Both are resampled with a Bayesian bootstrap (Gamma(1, 1) weights, equivalent
+to Dirichlet resampling): revenue per customer per state over its cities, and
+tier benchmarks over the states in each tier. All draws are evaluated at once
+with NumPy array operations, in chunks of draws to bound memory, from one
+seeded generator so results are reproducible.
+"""
+
+import logging
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SIMULATED_METRICS = ['untapped_revenue_potential', 'market_potential_score', 'combined_opportunity_score']
+
+
+class UntappedPotentialSimulator:
+    """
+    Simulate state-level untapped potential and opportunity scores.
+    """
+
+    def __init__(self, summary: pd.DataFrame, city_data: pd.DataFrame,
+                 opportunity_weights: Dict[str, float], growth_untapped_weight: float):
+        """
+        Initialize the simulator.
+
+        Args:
+            summary (pd.DataFrame): Scored state summary (output of the expansion opportunity matrix)
+            city_data (pd.DataFrame): City-level rows with state, customer_count and total_revenue
+            opportunity_weights (Dict[str, float]): Component score -> weight of the combined score
+            growth_untapped_weight (float): Weight of the untapped revenue score within growth potential
+        """
+        self.summary = summary.reset_index(drop=True)
+        self.states = self.summary['state'].to_numpy()
+        self.opportunity_weights = opportunity_weights
+        self.growth_untapped_weight = growth_untapped_weight
+
+        # City -> state one-hot matrix for aggregating bootstrapped city totals per state
+        cities = city_data[city_data['state'].isin(self.states)]
+        state_index = pd.Index(self.states).get_indexer(cities['state'])
+        self.city_state = np.zeros((len(cities), len(self.states)))
+        self.city_state[np.arange(len(cities)), state_index] = 1.0
+        self.city_revenue = cities['total_revenue'].to_numpy(dtype=np.float64)
+        self.city_customers = cities['customer_count'].to_numpy(dtype=np.float64)
+
+        self.customers = self.summary['customer_count'].to_numpy(dtype=np.float64)
+        self.urban_population = self.summary['urban_population'].to_numpy(dtype=np.float64)
+        self.economic_factor = self.summary['economic_factor'].to_numpy(dtype=np.float64)
+        self.tier_codes, self.tiers = pd.factorize(self.summary['tier'])
+
+        # Only the untapped revenue part of growth potential varies between draws;
+        # the other components of the combined score are fixed
+        self.fixed_score = sum(
+            self.summary[col].fillna(0).to_numpy(dtype=np.float64) * weight
+            for col, weight in opportunity_weights.items() if col != 'growth_potential_score'
+        )
+        base_untapped = self.summary['untapped_revenue_potential'].to_numpy(dtype=np.float64)
+        base_max = np.nanmax(base_untapped)
+        base_untapped_score = base_untapped / base_max if base_max > 0 else np.zeros_like(base_untapped)
+        self.fixed_growth = (
+            self.summary['growth_potential_score'].to_numpy(dtype=np.float64)
+            - growth_untapped_weight * base_untapped_score
+        )
+
+    def sample_revenue_per_customer(self, rng: np.random.Generator, n_draws: int) -> np.ndarray:
+        """
+        Bootstrap revenue per customer for each state over its cities.
+
+        Args:
+            rng (np.random.Generator): Random generator
+            n_draws (int): Number of draws
+
+        Returns:
+            np.ndarray: Revenue per customer of shape (n_draws, n_states)
+        """
+        weights = rng.standard_exponential((n_draws, len(self.city_revenue)))
+        revenue = (weights * self.city_revenue) @ self.city_state
+        customers = (weights * self.city_customers) @ self.city_state
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(customers > 0, revenue / customers, 0.0)
+
+    def sample_tier_benchmarks(self, rng: np.random.Generator, n_draws: int) -> np.ndarray:
+        """
+        Bootstrap tier penetration benchmarks over the states in each tier.
+
+        Args:
+            rng (np.random.Generator): Random generator
+            n_draws (int): Number of draws
+
+        Returns:
+            np.ndarray: Benchmark penetration per 1000 urban population of shape (n_draws, n_states)
+        """
+        weights = rng.standard_exponential((n_draws, len(self.states)))
+        benchmarks = np.full((n_draws, len(self.states)), np.nan)
+        known_population = np.nan_to_num(self.urban_population)
+        for code in range(len(self.tiers)):
+            in_tier = self.tier_codes == code
+            tier_customers = weights[:, in_tier] @ self.customers[in_tier]
+            tier_population = weights[:, in_tier] @ known_population[in_tier]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                benchmarks[:, in_tier] = (tier_customers / tier_population * 1000)[:, None]
+        return benchmarks
+
+    def _simulate_chunk(self, rng: np.random.Generator, n_draws: int) -> Dict[str, np.ndarray]:
+        """Simulate one chunk of draws for all states."""
+        revenue_per_customer = self.sample_revenue_per_customer(rng, n_draws)
+        benchmarks = self.sample_tier_benchmarks(rng, n_draws)
+
+        # National average revenue per customer, weighted by observed state customers
+        national_revenue_per_customer = revenue_per_customer @ self.customers / self.customers.sum()
+
+        untapped_customers = np.maximum(0, benchmarks * self.urban_population / 1000 - self.customers)
+        untapped_revenue = (
+            untapped_customers * self.economic_factor * national_revenue_per_customer[:, None] * self.economic_factor
+        )
+
+        max_revenue = np.nanmax(untapped_revenue, axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            potential_score = np.where(max_revenue > 0, untapped_revenue / max_revenue, 0.0)
+
+        growth = self.fixed_growth + self.growth_untapped_weight * potential_score
+        combined = self.fixed_score + self.opportunity_weights['growth_potential_score'] * np.nan_to_num(growth)
+
+        return {
+            'untapped_revenue_potential': untapped_revenue,
+            'market_potential_score': potential_score,
+            'combined_opportunity_score': combined,
+            'national_revenue_per_customer': national_revenue_per_customer
+        }
+
+    def simulate(self, n_draws: int = 10000, seed: int = 42, percentiles: Iterable[float] = (5, 50, 95),
+                 chunk_size: int = 1000) -> Dict:
+        """
+        Run the simulation and summarize percentile bands.
+
+        Args:
+            n_draws (int): Number of Monte Carlo draws
+            seed (int): Random seed
+            percentiles (Iterable[float]): Percentiles reported for each metric
+            chunk_size (int): Draws simulated per array operation
+
+        Returns:
+            Dict: 'bands' (one row per state with point estimates and percentiles),
+                'total_untapped_revenue' (percentiles of the national total) and 'draws'
+                (raw simulated arrays of shape (n_draws, n_states))
+        """
+        rng = np.random.default_rng(seed)
+        percentiles = list(percentiles)
+
+        chunks = [self._simulate_chunk(rng, min(chunk_size, n_draws - start))
+                  for start in range(0, n_draws, chunk_size)]
+        draws = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+        bands = self.summary[['state'] + SIMULATED_METRICS].copy()
+        for metric in SIMULATED_METRICS:
+            values = np.nanpercentile(draws[metric], percentiles, axis=0)
+            for q, row in zip(percentiles, values):
+                bands[f'{metric}_p{q:g}'] = row
+            bands[f'{metric}_mean'] = np.nanmean(draws[metric], axis=0)
+
+        total_untapped = np.nansum(draws['untapped_revenue_potential'], axis=1)
+        total_bands = dict(zip([f'p{q:g}' for q in percentiles], np.percentile(total_untapped, percentiles)))
+
+        logger.info(f"Simulated {n_draws:,} draws of untapped potential for {len(bands)} states")
+        return {'bands': bands, 'total_untapped_revenue': total_bands, 'draws': draws}
@@ -12,6 +12,12 @@ import logging
 from typing import Dict, List, Tuple, Optional
 import warnings
 from save_cleaned_data import load_cleaned_datasets
+from feature_store import FeatureStore
+from temporal_features import add_temporal_features
+from holiday_calendar import add_event_proximity_features
+from olap_cube import CUBE_DATASET_NAME, CUBE_SOURCE_TABLES, build_olap_cube
+from data_cache import cleaned_data_version
+from logistics_features import build_logistics_features
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,14 +29,18 @@ class FeatureEngineer:
     Creates derived features and master datasets for business analysis.
     """
     
-    def __init__(self, datasets: Dict[str, pd.DataFrame]):
+    def __init__(self, datasets: Dict[str, pd.DataFrame], source_version: Optional[str] = None):
         """
         Initialize the FeatureEngineer with cleaned datasets.
         
         Args:
             datasets (Dict[str, pd.DataFrame]): Dictionary of cleaned DataFrames
+            source_version (Optional[str]): Version of the cleaned cube source tables the
+                datasets were loaded from (see data_cache.cleaned_data_version), recorded
+                with the OLAP cube
         """
         self.datasets = datasets.copy()
+        self.source_version = source_version
         self.feature_log = []
         self.master_datasets = {}
         self.feature_dictionary = {}
@@ -119,14 +129,16 @@ class FeatureEngineer:
                     orders_df.loc[shipping_mask, 'order_delivered_carrier_date']
                 ).dt.days
         
-        # Temporal features for seasonality analysis
-        orders_df['order_year'] = orders_df['order_purchase_timestamp'].dt.year
-        orders_df['order_month'] = orders_df['order_purchase_timestamp'].dt.month
-        orders_df['order_quarter'] = orders_df['order_purchase_timestamp'].dt.quarter
-        orders_df['order_day_of_week'] = orders_df['order_purchase_timestamp'].dt.dayofweek
-        orders_df['order_day_name'] = orders_df['order_purchase_timestamp'].dt.day_name()
-        orders_df['order_hour'] = orders_df['order_purchase_timestamp'].dt.hour
-        orders_df['order_week_of_year'] = orders_df['order_purchase_timestamp'].dt.isocalendar().week
+        # Seller-to-customer distance per order and the state origin-destination matrix
+        if all(name in self.datasets for name in ['geolocation', 'customers', 'sellers', 'order_items']):
+            self.logistics_data = build_logistics_features(self.datasets, orders=orders_df)
+            orders_df = orders_df.merge(self.logistics_data['order_features'], on='order_id', how='left')
+        
+        # Temporal features for seasonality analysis (single pass, compact dtypes)
+        add_temporal_features(
+            orders_df, 'order_purchase_timestamp', prefix='order_',
+            fields=['year', 'month', 'quarter', 'day_of_week', 'day_name', 'hour', 'week_of_year']
+        )
         
         # Brazilian holiday and seasonal indicators
         orders_df['is_weekend'] = orders_df['order_day_of_week'].isin([5, 6])
@@ -135,6 +147,12 @@ class FeatureEngineer:
         orders_df['is_mothers_day_season'] = orders_df['order_month'] == 5        # Mother's Day (May)
         orders_df['is_valentines_season'] = orders_df['order_month'] == 6         # Valentine's Day (June in Brazil)
         
+        # Day-level distance to exact event dates (Carnival, Mother's Day etc. move every year)
+        add_event_proximity_features(
+            orders_df, 'order_purchase_timestamp',
+            events=['carnival', 'mothers_day', 'black_friday', 'christmas']
+        )
+        
         self.log_feature_action(
             'CREATE_DELIVERY_FEATURES',
             'orders',
@@ -157,7 +175,15 @@ class FeatureEngineer:
             'is_holiday_season': 'Boolean flag for holiday season orders (Nov-Dec)',
             'is_carnival_season': 'Boolean flag for carnival season orders (Feb-Mar)',
             'is_mothers_day_season': 'Boolean flag for Mother\'s Day season orders (May)',
-            'is_valentines_season': 'Boolean flag for Valentine\'s Day season orders (June)'
+            'is_valentines_season': 'Boolean flag for Valentine\'s Day season orders (June)',
+            'days_to_next_event': 'Days until the next Brazilian holiday or commercial event',
+            'days_since_last_event': 'Days since the previous Brazilian holiday or commercial event',
+            'days_to_<event>': 'Days until the next occurrence of the event (carnival, mothers_day, black_friday, christmas)',
+            'days_since_<event>': 'Days since the previous occurrence of the event',
+            'seller_distance_km': 'Mean haversine distance between the order\'s sellers and the customer (km)',
+            'max_seller_distance_km': 'Distance to the farthest seller of the order (km)',
+            'is_same_state_delivery': 'Boolean flag for orders fulfilled entirely by sellers in the customer\'s state',
+            'freight_per_km': 'Order freight value per km of the farthest seller distance'
         })
         
         return orders_df
@@ -802,13 +828,21 @@ class FeatureEngineer:
             customers_df = self.datasets['customers'].copy()
             delivery_by_location = enhanced_orders.merge(customers_df, on='customer_id', how='left')
             
-            location_delivery = delivery_by_location.groupby(['customer_state', 'customer_city']).agg({
+            delivery_aggregations = {
                 'delivery_days': 'mean',
                 'on_time_delivery': 'mean',
                 'delivery_speed_category': lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else 'Unknown'
-            }).reset_index()
+            }
+            location_columns = ['state', 'city', 'avg_delivery_days', 'on_time_rate', 'typical_delivery_speed']
+            if 'seller_distance_km' in delivery_by_location.columns:
+                delivery_aggregations['seller_distance_km'] = 'mean'
+                location_columns.append('avg_seller_distance_km')
+            
+            location_delivery = delivery_by_location.groupby(['customer_state', 'customer_city']).agg(
+                delivery_aggregations
+            ).reset_index()
             
-            location_delivery.columns = ['state', 'city', 'avg_delivery_days', 'on_time_rate', 'typical_delivery_speed']
+            location_delivery.columns = location_columns
             
             market_expansion_data = market_expansion_data.merge(
                 location_delivery, on=['state', 'city'], how='left'
@@ -868,13 +902,35 @@ class FeatureEngineer:
         # Master Dataset 5: Product Performance Analysis
         product_performance_data = product_metrics.copy()
         
+        # Master Dataset 6: OLAP cube of additive measures for roll-up queries
+        olap_cube_data = pd.DataFrame()
+        if not enhanced_orders.empty and 'customers' in self.datasets:
+            olap_cube_data = build_olap_cube(self.datasets, enhanced_orders).cells
+            self.log_feature_action(
+                'CREATE_OLAP_CUBE',
+                'olap_cube',
+                f"Materialized {len(olap_cube_data)} cube cells across {len(olap_cube_data.columns)} columns"
+            )
+        
+        # Master Dataset 7: Seller state x customer state logistics matrix
+        logistics_od_data = pd.DataFrame()
+        if hasattr(self, 'logistics_data'):
+            logistics_od_data = self.logistics_data['od_matrix']
+            self.feature_dictionary.update({
+                'median_distance_km': 'Median seller-customer distance of a state route (km, 1 km resolution)',
+                'median_freight_value': 'Median item freight value of a state route (R$ 0.50 resolution)',
+                'median_delivery_days': 'Median delivery days of a state route'
+            })
+        
         # Store master datasets
         self.master_datasets = {
             'market_expansion': market_expansion_data,
             'customer_analytics': customer_analytics_data,
             'seasonal_intelligence': seasonal_intelligence_data,
             'payment_operations': payment_operations_data,
-            'product_performance': product_performance_data
+            'product_performance': product_performance_data,
+            'olap_cube': olap_cube_data,
+            'logistics_od_matrix': logistics_od_data
         }
         
         self.log_feature_action(
@@ -951,12 +1007,46 @@ class FeatureEngineer:
             f.write("- seasonal_intelligence_*.csv: Seasonal patterns and demand forecasting data\n")
             f.write("- payment_operations.csv: Payment behavior and operational metrics\n")
             f.write("- product_performance.csv: Product sales and performance analytics\n")
+            f.write("- olap_cube.csv: Additive measures by state, city, month, category, payment and delivery\n")
+            f.write("- logistics_od_matrix.csv: Distance, freight and delivery days by seller state x customer state\n")
         
         logger.info(f"Saved {len(saved_files)} feature-engineered datasets")
         logger.info(f"Dataset inventory saved to {inventory_path}")
         
         return saved_files
     
+    def publish_feature_snapshot(self, store_dir: str = 'data/feature_store', keep_last: int = 5) -> str:
+        """
+        Publish master analytical datasets as a versioned feature store snapshot.
+        
+        Readers keep seeing the previous snapshot until the new one is complete,
+        after which the CURRENT pointer is flipped atomically.
+        
+        Args:
+            store_dir (str): Root directory of the feature store
+            keep_last (int): Number of snapshots retained by garbage collection
+            
+        Returns:
+            str: Version id of the published snapshot
+        """
+        store = FeatureStore(store_dir)
+        # Readers of the cube check it was built from the cleaned data they analyse
+        cube_metadata = {CUBE_DATASET_NAME: {'source_version': self.source_version}} if self.source_version else None
+        version = store.write_snapshot(
+            self.master_datasets,
+            metadata={'features': len(self.feature_dictionary), 'source': 'data/cleaned'},
+            dataset_metadata=cube_metadata
+        )
+        store.garbage_collect(keep_last=keep_last)
+        
+        self.log_feature_action(
+            'PUBLISH_SNAPSHOT',
+            'all_datasets',
+            f"Published feature store snapshot {version}"
+        )
+        
+        return version
+    
     def get_feature_engineering_summary(self) -> Dict:
         """
         Get a summary of all feature engineering activities.
@@ -972,18 +1062,24 @@ class FeatureEngineer:
         }
 
 
-def load_feature_engineered_datasets(input_dir: str = "data/feature_engineered") -> Dict[str, pd.DataFrame]:
+def load_feature_engineered_datasets(input_dir: str = "data/feature_engineered",
+                                     store_dir: str = "data/feature_store") -> Dict[str, pd.DataFrame]:
     """
-    Load feature-engineered datasets from CSV files.
+    Load feature-engineered datasets, preferring the active feature store snapshot.
     
     Args:
-        input_dir (str): Directory containing feature-engineered datasets
+        input_dir (str): Directory containing legacy feature-engineered CSV files
+        store_dir (str): Root directory of the feature store
         
     Returns:
         Dict[str, pd.DataFrame]: Dictionary of feature-engineered datasets
     """
     import os
     
+    store = FeatureStore(store_dir)
+    if store.current_version() is not None:
+        return store.load_all()
+    
     if not os.path.exists(input_dir):
         logger.error(f"Feature-engineered data directory not found: {input_dir}")
         logger.info("Run create_enhanced_datasets_from_cleaned_data() first to create feature-engineered data files")
@@ -1024,6 +1120,7 @@ def create_enhanced_datasets_from_cleaned_data():
     logger.info("Starting feature engineering from cleaned datasets...")
     
     # Load cleaned datasets
+    source_version = cleaned_data_version(CUBE_SOURCE_TABLES, "data/cleaned")
     cleaned_datasets = load_cleaned_datasets("data/cleaned")
     
     if not cleaned_datasets:
@@ -1033,7 +1130,7 @@ def create_enhanced_datasets_from_cleaned_data():
     logger.info(f"Loaded {len(cleaned_datasets)} cleaned datasets")
     
     # Initialize feature engineer
-    feature_engineer = FeatureEngineer(cleaned_datasets)
+    feature_engineer = FeatureEngineer(cleaned_datasets, source_version=source_version)
     
     # Create master analytical datasets
     master_datasets = feature_engineer.create_master_analytical_datasets()
@@ -1044,6 +1141,9 @@ def create_enhanced_datasets_from_cleaned_data():
     # Save master datasets to files
     saved_files = feature_engineer.save_master_datasets()
     
+    # Publish an immutable snapshot so readers never see half-written files
+    feature_version = feature_engineer.publish_feature_snapshot()
+    
     # Generate summary report
     summary = feature_engineer.get_feature_engineering_summary()
     
@@ -1057,7 +1157,8 @@ def create_enhanced_datasets_from_cleaned_data():
         f.write(f"Total features created: {summary['total_features_created']}\n")
         f.write(f"Master datasets created: {summary['master_datasets_created']}\n")
         f.write(f"Datasets processed: {', '.join(summary['datasets_processed'])}\n")
-        f.write(f"Files saved: {len(saved_files)}\n\n")
+        f.write(f"Files saved: {len(saved_files)}\n")
+        f.write(f"Feature store version: {feature_version}\n\n")
         
         f.write("## Saved Dataset Files:\n")
         for filename in saved_files:
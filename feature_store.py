@@ -0,0 +1,410 @@
+"""
+Versioned Feature Store Module for Brazilian E-commerce Dataset
+
+This module persists feature-engineered datasets as immutable, content-addressed
+snapshots and atomically flips a "current" pointer once a snapshot is complete.
+Readers always resolve a complete snapshot, and the version id can be used as a
+cache key by analyzers and dashboard pages.
+
+Layout on disk:
+    data/feature_store/
+    ├── CURRENT                      # version id of the active snapshot
+    └── snapshots/
+        └── <version_id>/
+            ├── manifest.json        # datasets, file hashes, row counts, metadata
+            └── <dataset_name>.csv
+"""
+
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = "data/feature_store"
+LEGACY_FEATURE_DIR = "data/feature_engineered"
+
+CURRENT_POINTER = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+SNAPSHOTS_DIR = "snapshots"
+TEMP_PREFIX = ".tmp-"
+
+
+def _hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file, streamed in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """
+    Local feature store with content-addressed snapshots.
+    Snapshots are written to a temporary directory, hashed, renamed into place
+    and only then published by atomically replacing the CURRENT pointer.
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR):
+        """
+        Initialize the FeatureStore.
+
+        Args:
+            store_dir (str): Root directory of the feature store
+        """
+        self.store_dir = store_dir
+        self.snapshots_dir = os.path.join(store_dir, SNAPSHOTS_DIR)
+        self.pointer_path = os.path.join(store_dir, CURRENT_POINTER)
+
+    def _snapshot_path(self, version: str) -> str:
+        """Return the directory of a snapshot version."""
+        return os.path.join(self.snapshots_dir, version)
+
+    def current_version(self) -> Optional[str]:
+        """
+        Get the version id of the active snapshot.
+
+        Returns:
+            Optional[str]: Active version id, or None if nothing has been published
+        """
+        try:
+            with open(self.pointer_path, 'r', encoding='utf-8') as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+        if version and os.path.isdir(self._snapshot_path(version)):
+            return version
+
+        logger.warning(f"Feature store pointer references missing snapshot: {version}")
+        return None
+
+    def write_snapshot(self, datasets: Dict[str, pd.DataFrame], metadata: Optional[Dict] = None,
+                       publish: bool = True, base_version: Optional[str] = None,
+                       dataset_metadata: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        Write datasets as a new content-addressed snapshot.
+
+        Nested dictionaries of DataFrames (e.g. seasonal_intelligence) are flattened
+        to ``<parent>_<child>`` names, matching the legacy CSV naming.
+
+        Args:
+            datasets (Dict[str, pd.DataFrame]): Datasets to persist
+            metadata (Optional[Dict]): Extra information stored in the manifest
+            publish (bool): Flip the CURRENT pointer to the new snapshot
+            base_version (Optional[str]): Snapshot whose datasets are carried over
+                unless overridden by ``datasets``
+            dataset_metadata (Optional[Dict[str, Dict]]): Extra information stored in the
+                manifest entries of individual datasets; it is carried over with them
+
+        Returns:
+            str: Version id of the written snapshot
+        """
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        temp_dir = os.path.join(self.snapshots_dir, f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+        os.makedirs(temp_dir)
+
+        try:
+            files = {}
+            flat_datasets = self._flatten_datasets(datasets)
+
+            # Carry over untouched datasets from the base snapshot without re-serializing
+            base_manifest = self.read_manifest(base_version) if base_version else {}
+            for name, entry in base_manifest.get('datasets', {}).items():
+                if name not in flat_datasets:
+                    shutil.copy2(os.path.join(self._snapshot_path(base_version), entry['file']),
+                                 os.path.join(temp_dir, entry['file']))
+                    files[name] = entry
+
+            for name, df in flat_datasets.items():
+                filename = f"{name}.csv"
+                file_path = os.path.join(temp_dir, filename)
+                df.to_csv(file_path, index=False)
+                files[name] = {
+                    'file': filename,
+                    'sha256': _hash_file(file_path),
+                    'rows': int(len(df)),
+                    'columns': int(df.shape[1]),
+                    **(dataset_metadata or {}).get(name, {})
+                }
+
+            # The version id is derived from dataset names and file contents only,
+            # so re-publishing identical data yields the same version
+            version_digest = hashlib.sha256()
+            for name in sorted(files):
+                version_digest.update(f"{name}:{files[name]['sha256']}\n".encode('utf-8'))
+            version = version_digest.hexdigest()[:16]
+
+            manifest = {
+                'version': version,
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'),
+                'datasets': files,
+                'metadata': metadata or {}
+            }
+            with open(os.path.join(temp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, default=str)
+
+            snapshot_dir = self._snapshot_path(version)
+            if os.path.isdir(snapshot_dir):
+                logger.info(f"Snapshot {version} already exists, reusing it")
+                shutil.rmtree(temp_dir)
+            else:
+                os.rename(temp_dir, snapshot_dir)
+                logger.info(f"Wrote feature store snapshot {version} with {len(files)} datasets")
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        if publish:
+            self.publish(version)
+
+        return version
+
+    def publish(self, version: str):
+        """
+        Atomically point CURRENT at an existing snapshot.
+
+        Args:
+            version (str): Version id to activate
+        """
+        if not os.path.isdir(self._snapshot_path(version)):
+            raise ValueError(f"Unknown feature store snapshot: {version}")
+
+        temp_pointer = f"{self.pointer_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_pointer, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_pointer, self.pointer_path)
+
+        logger.info(f"Feature store CURRENT -> {version}")
+
+    def read_manifest(self, version: Optional[str] = None) -> Dict:
+        """
+        Read the manifest of a snapshot.
+
+        Args:
+            version (Optional[str]): Snapshot version, defaults to the active one
+
+        Returns:
+            Dict: Manifest contents, or an empty dict if unavailable
+        """
+        version = version or self.current_version()
+        if version is None:
+            return {}
+
+        manifest_path = os.path.join(self._snapshot_path(version), MANIFEST_FILE)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def dataset_path(self, name: str, version: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve the file path of a dataset inside a snapshot.
+
+        Args:
+            name (str): Dataset name
+            version (Optional[str]): Snapshot version, defaults to the active one
+
+        Returns:
+            Optional[str]: File path, or None if the dataset is not in the snapshot
+        """
+        version = version or self.current_version()
+        if version is None:
+            return None
+
+        file_path = os.path.join(self._snapshot_path(version), f"{name}.csv")
+        return file_path if os.path.exists(file_path) else None
+
+    def load_dataset(self, name: str, version: Optional[str] = None, **read_kwargs) -> Optional[pd.DataFrame]:
+        """
+        Load one dataset from a snapshot.
+
+        Args:
+            name (str): Dataset name
+            version (Optional[str]): Snapshot version, defaults to the active one
+            **read_kwargs: Extra arguments passed to pd.read_csv
+
+        Returns:
+            Optional[pd.DataFrame]: Loaded dataset or None if unavailable
+        """
+        file_path = self.dataset_path(name, version)
+        if file_path is None:
+            return None
+        return pd.read_csv(file_path, **read_kwargs)
+
+    def load_all(self, version: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Load every dataset of a snapshot.
+
+        Args:
+            version (Optional[str]): Snapshot version, defaults to the active one
+
+        Returns:
+            Dict[str, pd.DataFrame]: Datasets keyed by name
+        """
+        version = version or self.current_version()
+        manifest = self.read_manifest(version)
+
+        datasets = {}
+        for name in manifest.get('datasets', {}):
+            df = self.load_dataset(name, version)
+            if df is not None:
+                datasets[name] = df
+
+        logger.info(f"Loaded {len(datasets)} datasets from feature store snapshot {version}")
+        return datasets
+
+    def list_snapshots(self) -> pd.DataFrame:
+        """
+        List all complete snapshots, newest first.
+
+        Returns:
+            pd.DataFrame: One row per snapshot with creation time and size
+        """
+        if not os.path.isdir(self.snapshots_dir):
+            return pd.DataFrame(columns=['version', 'created_at', 'datasets', 'size_mb', 'is_current'])
+
+        current = self.current_version()
+        rows = []
+        for entry in os.listdir(self.snapshots_dir):
+            snapshot_dir = self._snapshot_path(entry)
+            if entry.startswith(TEMP_PREFIX) or not os.path.isdir(snapshot_dir):
+                continue
+
+            manifest = self.read_manifest(entry)
+            size_bytes = sum(
+                os.path.getsize(os.path.join(snapshot_dir, f)) for f in os.listdir(snapshot_dir)
+            )
+            rows.append({
+                'version': entry,
+                'created_at': pd.to_datetime(manifest.get('created_at'), errors='coerce'),
+                'datasets': len(manifest.get('datasets', {})),
+                'size_mb': round(size_bytes / 1024 / 1024, 2),
+                'is_current': entry == current
+            })
+
+        snapshots = pd.DataFrame(rows, columns=['version', 'created_at', 'datasets', 'size_mb', 'is_current'])
+        return snapshots.sort_values('created_at', ascending=False).reset_index(drop=True)
+
+    def garbage_collect(self, keep_last: int = 5, max_age_days: Optional[int] = None,
+                        temp_grace_hours: int = 6) -> List[str]:
+        """
+        Remove old snapshots according to the retention policy.
+
+        The active snapshot is never removed. A snapshot is kept if it is among the
+        ``keep_last`` newest ones, or younger than ``max_age_days`` when given.
+        Abandoned temporary directories older than ``temp_grace_hours`` are removed.
+
+        Args:
+            keep_last (int): Number of newest snapshots to always retain
+            max_age_days (Optional[int]): Also retain snapshots younger than this
+            temp_grace_hours (int): Age after which unfinished writes are discarded
+
+        Returns:
+            List[str]: Versions that were removed
+        """
+        removed = []
+        snapshots = self.list_snapshots()
+        now = datetime.now()
+
+        for position, row in snapshots.iterrows():
+            if row['is_current'] or position < keep_last:
+                continue
+            if (max_age_days is not None and pd.notna(row['created_at']) and
+                    now - row['created_at'] < timedelta(days=max_age_days)):
+                continue
+
+            shutil.rmtree(self._snapshot_path(row['version']), ignore_errors=True)
+            removed.append(row['version'])
+
+        if os.path.isdir(self.snapshots_dir):
+            for entry in os.listdir(self.snapshots_dir):
+                temp_dir = self._snapshot_path(entry)
+                if entry.startswith(TEMP_PREFIX):
+                    age = now - datetime.fromtimestamp(os.path.getmtime(temp_dir))
+                    if age > timedelta(hours=temp_grace_hours):
+                        shutil.rmtree(temp_dir, ignore_errors=True)
+
+        if removed:
+            logger.info(f"Garbage collected {len(removed)} feature store snapshots: {', '.join(removed)}")
+        return removed
+
+    @staticmethod
+    def _flatten_datasets(datasets: Dict) -> Dict[str, pd.DataFrame]:
+        """Flatten nested dataset dictionaries and drop empty frames."""
+        flat = {}
+        for name, dataset in datasets.items():
+            if isinstance(dataset, dict):
+                for sub_name, sub_dataset in dataset.items():
+                    if isinstance(sub_dataset, pd.DataFrame) and not sub_dataset.empty:
+                        flat[f"{name}_{sub_name}"] = sub_dataset
+            elif isinstance(dataset, pd.DataFrame) and not dataset.empty:
+                flat[name] = dataset
+        return flat
+
+
+def get_feature_version(store_dir: str = DEFAULT_STORE_DIR) -> str:
+    """
+    Get a cache key for the feature data currently visible to readers.
+
+    Falls back to a fingerprint of the legacy feature directory's file sizes and
+    modification times when no snapshot has been published yet.
+
+    Args:
+        store_dir (str): Root directory of the feature store
+
+    Returns:
+        str: Version id usable as a cache key
+    """
+    version = FeatureStore(store_dir).current_version()
+    if version is not None:
+        return version
+
+    if not os.path.isdir(LEGACY_FEATURE_DIR):
+        return 'empty'
+
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(LEGACY_FEATURE_DIR)):
+        stat = os.stat(os.path.join(LEGACY_FEATURE_DIR, filename))
+        digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    return f"legacy-{digest.hexdigest()[:12]}"
+
+
+def read_feature_dataset(name: str, store_dir: str = DEFAULT_STORE_DIR, **read_kwargs) -> pd.DataFrame:
+    """
+    Read a feature-engineered dataset from the active snapshot.
+
+    Falls back to ``data/feature_engineered/<name>.csv`` when no snapshot is
+    published or the snapshot does not contain the dataset.
+
+    Args:
+        name (str): Dataset name (file name without .csv)
+        store_dir (str): Root directory of the feature store
+        **read_kwargs: Extra arguments passed to pd.read_csv
+
+    Returns:
+        pd.DataFrame: Loaded dataset
+    """
+    file_path = FeatureStore(store_dir).dataset_path(name)
+    if file_path is None:
+        file_path = os.path.join(LEGACY_FEATURE_DIR, f"{name}.csv")
+    return pd.read_csv(file_path, **read_kwargs)
+
+
+if __name__ == "__main__":
+    store = FeatureStore()
+    print(f"Current feature store version: {store.current_version()}")
+    print(store.list_snapshots().to_string(index=False))
@@ -0,0 +1,351 @@
+"""
+High-Value Customer Model Module for Brazilian E-commerce Dataset
+
+This module manages the lifecycle of the high-value customer classifier used by
+CustomerAnalytics:
+
+- training a RandomForest on all CPU cores
+- persisting model, scaler, feature list and missing-value fills together with
+  a hash of the training data (features, target and hyperparameters)
+- skipping retraining when the data version has not changed
+- batch scoring of customer tables in chunks, streamed from CSV to CSV so the
+  table never has to fit in memory
+
+Layout on disk:
+    models/high_value_customer/
+    ├── model.joblib      # estimator, scaler, feature columns, fill values
+    └── metadata.json     # data version, training time, metrics
+
+Command line:
+    python high_value_model.py train [--data PATH] [--force]
+    python high_value_model.py score INPUT OUTPUT [--chunk-size N]
+"""
+
+import os
+import sys
+import json
+import uuid
+import pickle
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import classification_report
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from feature_store import read_feature_dataset
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_DIR = "models/high_value_customer"
+CUSTOMER_DATASET = "customer_analytics"
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+
+FEATURE_COLUMNS = [
+    'recency_score', 'frequency_score', 'monetary_score',
+    'avg_delivery_experience', 'delivery_reliability',
+    'days_since_last_order', 'total_revenue'
+]
+HIGH_VALUE_CATEGORIES = ['High Value', 'VIP']
+MODEL_PARAMS = {'n_estimators': 100, 'random_state': 42, 'class_weight': 'balanced'}
+
+
+def high_value_target(customer_data: pd.DataFrame) -> pd.Series:
+    """Binary target: customers in the High Value or VIP CLV categories."""
+    return customer_data['clv_category'].isin(HIGH_VALUE_CATEGORIES).astype(int)
+
+
+def compute_data_version(customer_data: pd.DataFrame, feature_columns: Optional[List[str]] = None,
+                         params: Optional[Dict] = None) -> str:
+    """
+    Hash everything a trained model depends on.
+
+    Args:
+        customer_data (pd.DataFrame): Training table with feature and clv_category columns
+        feature_columns (Optional[List[str]]): Model features, defaults to FEATURE_COLUMNS
+        params (Optional[Dict]): Model hyperparameters, defaults to MODEL_PARAMS
+
+    Returns:
+        str: Hex digest of features, target and hyperparameters
+    """
+    feature_columns = feature_columns or FEATURE_COLUMNS
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'features': feature_columns, 'params': params or MODEL_PARAMS},
+                             sort_keys=True).encode('utf-8'))
+    training_columns = customer_data[feature_columns].assign(is_high_value=high_value_target(customer_data))
+    digest.update(pd.util.hash_pandas_object(training_columns, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class HighValueCustomerModel:
+    """
+    Trained high-value customer classifier with everything needed to score new customers.
+    """
+
+    def __init__(self, model: RandomForestClassifier, scaler: StandardScaler, feature_columns: List[str],
+                 fill_values: Dict[str, float], data_version: str, metadata: Optional[Dict] = None):
+        """
+        Initialize the model wrapper.
+
+        Args:
+            model (RandomForestClassifier): Fitted classifier
+            scaler (StandardScaler): Fitted feature scaler
+            feature_columns (List[str]): Feature columns in model order
+            fill_values (Dict[str, float]): Training means used for missing feature values
+            data_version (str): Hash of the training data
+            metadata (Optional[Dict]): Training time, feature importance and performance
+        """
+        self.model = model
+        self.scaler = scaler
+        self.feature_columns = feature_columns
+        self.fill_values = fill_values
+        self.data_version = data_version
+        self.metadata = metadata or {}
+
+    @classmethod
+    def train(cls, customer_data: pd.DataFrame, n_jobs: int = -1,
+              feature_columns: Optional[List[str]] = None) -> 'HighValueCustomerModel':
+        """
+        Train the classifier on all cores.
+
+        Args:
+            customer_data (pd.DataFrame): Customer analytics table
+            n_jobs (int): Parallel tree builders (-1 = all cores); results do not depend on it
+            feature_columns (Optional[List[str]]): Model features, defaults to FEATURE_COLUMNS
+
+        Returns:
+            HighValueCustomerModel: Trained model with held-out performance in its metadata
+        """
+        feature_columns = feature_columns or FEATURE_COLUMNS
+        X = customer_data[feature_columns].copy()
+        y = high_value_target(customer_data)
+
+        # Handle any missing values
+        fill_values = X.mean()
+        X = X.fillna(fill_values)
+
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+        model = RandomForestClassifier(**MODEL_PARAMS, n_jobs=n_jobs)
+        model.fit(X_train_scaled, y_train)
+        y_pred = model.predict(X_test_scaled)
+
+        feature_importance = pd.DataFrame({
+            'feature': feature_columns,
+            'importance': model.feature_importances_
+        }).sort_values('importance', ascending=False)
+
+        metadata = {
+            'trained_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'training_rows': int(len(X)),
+            'params': MODEL_PARAMS,
+            'feature_importance': feature_importance.to_dict('records'),
+            'performance': classification_report(y_test, y_pred, output_dict=True)
+        }
+
+        logger.info(f"Trained high-value customer model on {len(X):,} customers")
+        return cls(model, scaler, feature_columns, fill_values.to_dict(),
+                   compute_data_version(customer_data, feature_columns), metadata)
+
+    def save(self, model_dir: str = DEFAULT_MODEL_DIR):
+        """
+        Persist the model and its metadata, replacing the previous files atomically.
+
+        Args:
+            model_dir (str): Directory of the model artifacts
+        """
+        os.makedirs(model_dir, exist_ok=True)
+        artifact = {
+            'model': self.model,
+            'scaler': self.scaler,
+            'feature_columns': self.feature_columns,
+            'fill_values': self.fill_values,
+            'data_version': self.data_version
+        }
+        metadata = dict(self.metadata, data_version=self.data_version, feature_columns=self.feature_columns)
+
+        model_path = os.path.join(model_dir, MODEL_FILE)
+        temp_model = f"{model_path}.{uuid.uuid4().hex}.tmp"
+        joblib.dump(artifact, temp_model)
+        os.replace(temp_model, model_path)
+
+        # Metadata is written last: its data version marks the artifact as complete
+        metadata_path = os.path.join(model_dir, METADATA_FILE)
+        temp_metadata = f"{metadata_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_metadata, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, default=str)
+        os.replace(temp_metadata, metadata_path)
+
+        logger.info(f"Saved high-value customer model {self.data_version} to {model_dir}")
+
+    @classmethod
+    def load(cls, model_dir: str = DEFAULT_MODEL_DIR) -> Optional['HighValueCustomerModel']:
+        """
+        Load a persisted model.
+
+        Args:
+            model_dir (str): Directory of the model artifacts
+
+        Returns:
+            Optional[HighValueCustomerModel]: Loaded model, or None if none is saved
+        """
+        try:
+            with open(os.path.join(model_dir, METADATA_FILE), 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            artifact = joblib.load(os.path.join(model_dir, MODEL_FILE))
+            consistent = artifact.get('data_version') == metadata.get('data_version')
+            model = cls(artifact['model'], artifact['scaler'], artifact['feature_columns'],
+                        artifact['fill_values'], artifact['data_version'], metadata)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, KeyError, TypeError) as e:
+            # Truncated or corrupt artifacts are treated like a missing model and retrained
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Could not load the model in {model_dir} ({type(e).__name__}: {e}); retrain the model")
+            return None
+
+        if not consistent:
+            logger.warning(f"Model files in {model_dir} are inconsistent; retrain the model")
+            return None
+
+        return model
+
+    def predict_proba(self, customers: pd.DataFrame) -> np.ndarray:
+        """
+        Probability of being a high-value customer.
+
+        Args:
+            customers (pd.DataFrame): Rows with the model's feature columns
+
+        Returns:
+            np.ndarray: Probability per row
+        """
+        X = customers[self.feature_columns].fillna(self.fill_values)
+        return self.model.predict_proba(self.scaler.transform(X))[:, 1]
+
+    def score_file(self, input_path: str, output_path: str, chunk_size: int = 100_000,
+                   id_column: str = 'customer_id', threshold: float = 0.5) -> int:
+        """
+        Score a customer CSV chunk by chunk and write probabilities to a CSV.
+
+        Only the id and feature columns are read. The output is written to a
+        temporary file and moved into place when complete.
+
+        Args:
+            input_path (str): Customer table with the id and feature columns
+            output_path (str): Destination CSV (id, high_value_probability, is_high_value_pred)
+            chunk_size (int): Rows read and scored per chunk
+            id_column (str): Customer identifier column
+            threshold (float): Probability above which a customer is flagged high-value
+
+        Returns:
+            int: Number of customers scored
+        """
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        temp_output = f"{output_path}.{uuid.uuid4().hex}.tmp"
+
+        scored = 0
+        try:
+            chunks = pd.read_csv(input_path, usecols=[id_column] + self.feature_columns, chunksize=chunk_size)
+            for chunk in chunks:
+                probability = self.predict_proba(chunk)
+                pd.DataFrame({
+                    id_column: chunk[id_column].to_numpy(),
+                    'high_value_probability': probability,
+                    'is_high_value_pred': (probability >= threshold).astype(int)
+                }).to_csv(temp_output, mode='a', header=scored == 0, index=False)
+                scored += len(chunk)
+            if scored == 0:
+                pd.DataFrame(columns=[id_column, 'high_value_probability', 'is_high_value_pred']).to_csv(
+                    temp_output, index=False
+                )
+            os.replace(temp_output, output_path)
+        except Exception:
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+            raise
+
+        logger.info(f"Scored {scored:,} customers from {input_path} into {output_path}")
+        return scored
+
+
+def train_or_load(customer_data: pd.DataFrame, model_dir: str = DEFAULT_MODEL_DIR,
+                  force: bool = False, n_jobs: int = -1) -> HighValueCustomerModel:
+    """
+    Return the persisted model if it was trained on the same data, otherwise retrain and save.
+
+    Args:
+        customer_data (pd.DataFrame): Customer analytics table
+        model_dir (str): Directory of the model artifacts
+        force (bool): Retrain even if the data version is unchanged
+        n_jobs (int): Parallel tree builders for training
+
+    Returns:
+        HighValueCustomerModel: Up-to-date model
+    """
+    if not force:
+        saved = HighValueCustomerModel.load(model_dir)
+        if saved is not None and saved.data_version == compute_data_version(customer_data, saved.feature_columns):
+            logger.info(f"High-value customer model {saved.data_version} is up to date, skipping training")
+            return saved
+
+    model = HighValueCustomerModel.train(customer_data, n_jobs=n_jobs)
+    model.save(model_dir)
+    return model
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for training and batch scoring."""
+    parser = argparse.ArgumentParser(description="Train and batch-score the high-value customer model")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directory of the model artifacts")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = commands.add_parser('train', help="Train the model unless the data version is unchanged")
+    train_parser.add_argument('--data', help="Customer analytics CSV, defaults to the active feature store snapshot")
+    train_parser.add_argument('--force', action='store_true', help="Retrain even if the data is unchanged")
+
+    score_parser = commands.add_parser('score', help="Score a customer CSV in chunks")
+    score_parser.add_argument('input', help="Customer CSV with customer_id and the feature columns")
+    score_parser.add_argument('output', help="Output CSV with probabilities")
+    score_parser.add_argument('--chunk-size', type=int, default=100_000, help="Rows scored per chunk")
+    score_parser.add_argument('--threshold', type=float, default=0.5, help="High-value probability threshold")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        columns = FEATURE_COLUMNS + ['clv_category']
+        if args.data is None:
+            customer_data = read_feature_dataset(CUSTOMER_DATASET, usecols=columns)
+        else:
+            customer_data = pd.read_csv(args.data, usecols=columns)
+        model = train_or_load(customer_data, args.model_dir, force=args.force)
+        print(f"High-value customer model version: {model.data_version}")
+        return 0
+
+    model = HighValueCustomerModel.load(args.model_dir)
+    if model is None:
+        print(f"No trained model found in {args.model_dir}; run 'train' first")
+        return 1
+    scored = model.score_file(args.input, args.output, chunk_size=args.chunk_size, threshold=args.threshold)
+    print(f"Scored {scored:,} customers into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Brazilian Holiday Calendar for Brazilian E-commerce Dataset
+
+This module computes exact dates of Brazilian holidays and commercial events per
+year, including movable feasts (Carnival, Easter, Corpus Christi) and
+rule-based dates (Mother's Day, Father's Day, Black Friday). Event dates are
+precomputed into a sorted day array, so day-level proximity features for every
+order are obtained with a single np.searchsorted call.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+# Event key -> display name, type and expected demand impact
+BRAZILIAN_EVENTS = {
+    'new_year': {'name': 'New Year', 'type': 'holiday', 'impact': 'medium'},
+    'carnival': {'name': 'Carnival', 'type': 'cultural', 'impact': 'high'},
+    'consumer_day': {'name': 'Consumer Day', 'type': 'commercial', 'impact': 'medium'},
+    'good_friday': {'name': 'Good Friday', 'type': 'holiday', 'impact': 'low'},
+    'easter': {'name': 'Easter', 'type': 'holiday', 'impact': 'low'},
+    'tiradentes': {'name': 'Tiradentes', 'type': 'holiday', 'impact': 'low'},
+    'labour_day': {'name': 'Labour Day', 'type': 'holiday', 'impact': 'low'},
+    'mothers_day': {'name': 'Mothers Day', 'type': 'commercial', 'impact': 'high'},
+    'corpus_christi': {'name': 'Corpus Christi', 'type': 'holiday', 'impact': 'low'},
+    'valentines_day': {'name': 'Valentines Day (Brazil)', 'type': 'commercial', 'impact': 'medium'},
+    'fathers_day': {'name': 'Fathers Day', 'type': 'commercial', 'impact': 'medium'},
+    'independence_day': {'name': 'Independence Day', 'type': 'holiday', 'impact': 'low'},
+    'childrens_day': {'name': 'Childrens Day', 'type': 'commercial', 'impact': 'medium'},
+    'all_souls_day': {'name': 'All Souls Day', 'type': 'holiday', 'impact': 'low'},
+    'republic_day': {'name': 'Republic Proclamation Day', 'type': 'holiday', 'impact': 'low'},
+    'black_friday': {'name': 'Black Friday', 'type': 'commercial', 'impact': 'very_high'},
+    'christmas': {'name': 'Christmas', 'type': 'holiday', 'impact': 'very_high'}
+}
+
+# Events used for day-level demand features in the feature datasets
+KEY_COMMERCIAL_EVENTS = ['carnival', 'mothers_day', 'valentines_day', 'fathers_day',
+                         'childrens_day', 'black_friday', 'christmas']
+
+
+def easter_sunday(year: int) -> date:
+    """
+    Compute Western (Gregorian) Easter Sunday.
+
+    Uses the anonymous Gregorian algorithm (Meeus/Jones/Butcher).
+
+    Args:
+        year (int): Calendar year
+
+    Returns:
+        date: Easter Sunday of the year
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """
+    Find the n-th given weekday of a month (weekday uses Monday=0 ... Sunday=6).
+
+    Args:
+        year (int): Calendar year
+        month (int): Calendar month
+        weekday (int): Day of the week, Monday=0
+        n (int): Occurrence within the month, starting at 1
+
+    Returns:
+        date: Date of the n-th weekday
+    """
+    first = date(year, month, 1)
+    offset = (weekday - first.weekday()) % 7
+    return first + timedelta(days=offset + 7 * (n - 1))
+
+
+def event_dates_for_year(year: int) -> Dict[str, date]:
+    """
+    Compute the dates of all Brazilian events for a year.
+
+    Args:
+        year (int): Calendar year
+
+    Returns:
+        Dict[str, date]: Event key to date
+    """
+    easter = easter_sunday(year)
+    return {
+        'new_year': date(year, 1, 1),
+        'carnival': easter - timedelta(days=47),                     # Carnival Tuesday
+        'consumer_day': date(year, 3, 15),
+        'good_friday': easter - timedelta(days=2),
+        'easter': easter,
+        'tiradentes': date(year, 4, 21),
+        'labour_day': date(year, 5, 1),
+        'mothers_day': nth_weekday(year, 5, 6, 2),                   # 2nd Sunday of May
+        'corpus_christi': easter + timedelta(days=60),
+        'valentines_day': date(year, 6, 12),                         # Dia dos Namorados
+        'fathers_day': nth_weekday(year, 8, 6, 2),                   # 2nd Sunday of August
+        'independence_day': date(year, 9, 7),
+        'childrens_day': date(year, 10, 12),
+        'all_souls_day': date(year, 11, 2),
+        'republic_day': date(year, 11, 15),
+        'black_friday': nth_weekday(year, 11, 3, 4) + timedelta(days=1),  # Day after 4th Thursday
+        'christmas': date(year, 12, 25)
+    }
+
+
+def build_holiday_calendar(years: Iterable[int]) -> pd.DataFrame:
+    """
+    Build the holiday calendar for a range of years.
+
+    Args:
+        years (Iterable[int]): Calendar years to include
+
+    Returns:
+        pd.DataFrame: One row per event occurrence, sorted by date
+    """
+    rows = []
+    for year in sorted(set(int(y) for y in years)):
+        for event_key, event_date in event_dates_for_year(year).items():
+            rows.append({
+                'date': pd.Timestamp(event_date),
+                'year': year,
+                'event_key': event_key,
+                'event_name': BRAZILIAN_EVENTS[event_key]['name'],
+                'event_type': BRAZILIAN_EVENTS[event_key]['type'],
+                'impact': BRAZILIAN_EVENTS[event_key]['impact']
+            })
+
+    calendar = pd.DataFrame(rows, columns=['date', 'year', 'event_key', 'event_name', 'event_type', 'impact'])
+    return calendar.sort_values(['date', 'event_key']).reset_index(drop=True)
+
+
+def _epoch_days(timestamps: pd.Series) -> np.ndarray:
+    """Convert a datetime series to int64 days since 1970-01-01."""
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps, errors='coerce')
+    if getattr(timestamps.dt, 'tz', None) is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    return timestamps.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+def event_proximity(timestamps: pd.Series, event_dates: Iterable) -> pd.DataFrame:
+    """
+    Compute days to the next event and days since the previous event.
+
+    Event dates are converted once to a sorted int64 day array and every
+    timestamp is located with np.searchsorted, so the cost is O(n log m)
+    with no per-row Python.
+
+    Args:
+        timestamps (pd.Series): Order timestamps
+        event_dates (Iterable): Event dates (any type accepted by pd.to_datetime)
+
+    Returns:
+        pd.DataFrame: days_to_next and days_since_prev (nullable Int16, 0 on event days)
+    """
+    event_days = np.unique(
+        pd.to_datetime(pd.Series(list(event_dates))).to_numpy(dtype='datetime64[D]').astype(np.int64)
+    )
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps, errors='coerce')
+    missing = timestamps.isna().to_numpy()
+    order_days = _epoch_days(timestamps)
+    if len(event_days) == 0:
+        empty = pd.array([pd.NA] * len(timestamps), dtype='Int16')
+        return pd.DataFrame({'days_to_next': empty, 'days_since_prev': empty.copy()}, index=timestamps.index)
+    # Park missing timestamps on an event day; they are masked out below
+    order_days = np.where(missing, event_days[0], order_days)
+
+    # Index of the first event on or after each order day
+    position = np.searchsorted(event_days, order_days, side='left')
+    has_next = (position < len(event_days)) & ~missing
+    next_days = event_days[np.minimum(position, len(event_days) - 1)] - order_days
+
+    # Last event on or before each order day
+    prev_position = np.searchsorted(event_days, order_days, side='right') - 1
+    has_prev = (prev_position >= 0) & ~missing
+    prev_days = order_days - event_days[np.maximum(prev_position, 0)]
+
+    days_to_next = pd.array(next_days, dtype='Int16')
+    days_to_next[~has_next] = pd.NA
+    days_since_prev = pd.array(prev_days, dtype='Int16')
+    days_since_prev[~has_prev] = pd.NA
+
+    return pd.DataFrame({'days_to_next': days_to_next, 'days_since_prev': days_since_prev},
+                        index=timestamps.index)
+
+
+def add_event_proximity_features(df: pd.DataFrame, timestamp_column: str = 'order_purchase_timestamp',
+                                 events: Optional[List[str]] = None,
+                                 calendar: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Add day-level event proximity features to a DataFrame in place.
+
+    Adds days_to_next_event / days_since_last_event over all events and
+    days_to_<event> / days_since_<event> for each requested event key.
+    The calendar spans one year either side of the data so that proximity
+    at the edges of the range is never truncated.
+
+    Args:
+        df (pd.DataFrame): Frame containing the timestamp column
+        timestamp_column (str): Name of the datetime column
+        events (Optional[List[str]]): Event keys for per-event features, defaults to KEY_COMMERCIAL_EVENTS
+        calendar (Optional[pd.DataFrame]): Precomputed holiday calendar, built from the data range if omitted
+
+    Returns:
+        pd.DataFrame: The same frame with proximity feature columns assigned
+    """
+    events = KEY_COMMERCIAL_EVENTS if events is None else events
+    unknown = set(events) - set(BRAZILIAN_EVENTS)
+    if unknown:
+        raise ValueError(f"Unknown events: {sorted(unknown)}")
+
+    timestamps = df[timestamp_column]
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps, errors='coerce')
+
+    if calendar is None:
+        if timestamps.notna().any():
+            years = range(timestamps.min().year - 1, timestamps.max().year + 2)
+        else:
+            years = []
+        calendar = build_holiday_calendar(years)
+
+    if calendar.empty:
+        return df
+
+    overall = event_proximity(timestamps, calendar['date'])
+    df['days_to_next_event'] = overall['days_to_next']
+    df['days_since_last_event'] = overall['days_since_prev']
+
+    for event_key in events:
+        proximity = event_proximity(timestamps, calendar.loc[calendar['event_key'] == event_key, 'date'])
+        df[f'days_to_{event_key}'] = proximity['days_to_next']
+        df[f'days_since_{event_key}'] = proximity['days_since_prev']
+
+    return df
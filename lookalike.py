@@ -0,0 +1,297 @@
+"""
+Lookalike Customer Search Module for Brazilian E-commerce Dataset
+
+Finds customers similar to a seed audience (e.g. the "Champions" RFM segment)
+using the RFM and delivery features in customer_analytics.csv:
+
+- features are median-imputed, log-scaled where heavily skewed and
+  standardized, so every dimension contributes on the same scale
+- an exact KD tree (scipy cKDTree) or Ball tree (scikit-learn) is built over
+  the standardized vectors
+- the KD tree also answers approximate queries: with ``eps > 0`` a returned
+  neighbor is at most (1 + eps) times further than the true k-th neighbor,
+  which prunes far more of the tree on large tables
+- queries run in fixed-size batches (KD tree queries use all cores), so
+  memory stays bounded for any number of query vectors
+
+Lookalikes for a seed set are the union of each seed's top-K neighbors,
+ranked by distance to the nearest seed, with the seeds themselves excluded.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from sklearn.neighbors import BallTree
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = [
+    'recency_score', 'frequency_score', 'monetary_score',
+    'days_since_last_order', 'total_revenue', 'avg_order_value',
+    'avg_delivery_experience', 'delivery_reliability'
+]
+# Long-tailed monetary columns are compared on a log scale
+LOG_COLUMNS = ['total_revenue', 'avg_order_value']
+INDEX_METHODS = ('kd_tree', 'ball_tree')
+APPROXIMATE_EPS = 0.5
+DEFAULT_BATCH_SIZE = 10000
+
+
+class LookalikeIndex:
+    """
+    Nearest-neighbor index over standardized customer feature vectors.
+    """
+
+    def __init__(self, feature_columns: Optional[List[str]] = None, method: str = 'kd_tree',
+                 eps: float = 0.0, leaf_size: int = 40):
+        """
+        Initialize the index.
+
+        Args:
+            feature_columns (Optional[List[str]]): Features to compare, defaults to FEATURE_COLUMNS
+            method (str): 'kd_tree' or 'ball_tree'
+            eps (float): Approximation factor for KD tree queries (0 = exact)
+            leaf_size (int): Tree leaf size
+        """
+        if method not in INDEX_METHODS:
+            raise ValueError(f"Unknown index method '{method}', expected one of {INDEX_METHODS}")
+        if eps < 0:
+            raise ValueError("eps must be non-negative")
+        if eps > 0 and method != 'kd_tree':
+            raise ValueError("Approximate queries (eps > 0) are only supported by the KD tree")
+
+        self.feature_columns = list(feature_columns or FEATURE_COLUMNS)
+        self.method = method
+        self.eps = eps
+        self.leaf_size = leaf_size
+        self.customer_ids = None
+        self.id_index_ = None
+        self.fill_values_ = None
+        self.mean_ = None
+        self.scale_ = None
+        self.tree_ = None
+
+    @classmethod
+    def approximate(cls, feature_columns: Optional[List[str]] = None, eps: float = APPROXIMATE_EPS,
+                    leaf_size: int = 40) -> 'LookalikeIndex':
+        """
+        Approximate KD tree index for large tables.
+
+        Args:
+            feature_columns (Optional[List[str]]): Features to compare
+            eps (float): Approximation factor
+            leaf_size (int): Tree leaf size
+
+        Returns:
+            LookalikeIndex: Unfitted index
+        """
+        return cls(feature_columns, method='kd_tree', eps=eps, leaf_size=leaf_size)
+
+    def _raw_features(self, customer_data: pd.DataFrame) -> np.ndarray:
+        missing = [col for col in self.feature_columns if col not in customer_data.columns]
+        if missing:
+            raise ValueError(f"Customer data is missing feature columns: {missing}")
+        values = customer_data[self.feature_columns].to_numpy(dtype=np.float64, copy=True)
+        for position, col in enumerate(self.feature_columns):
+            if col in LOG_COLUMNS:
+                values[:, position] = np.log1p(np.clip(values[:, position], 0, None))
+        return values
+
+    def _impute(self, values: np.ndarray) -> np.ndarray:
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = np.broadcast_to(self.fill_values_, values.shape)[missing]
+        return values
+
+    def transform(self, customer_data: pd.DataFrame) -> np.ndarray:
+        """
+        Standardize customer rows with the statistics learned in fit.
+
+        Args:
+            customer_data (pd.DataFrame): Rows with the feature columns
+
+        Returns:
+            np.ndarray: Standardized feature matrix (rows x features)
+        """
+        return (self._impute(self._raw_features(customer_data)) - self.mean_) / self.scale_
+
+    def fit(self, customer_data: pd.DataFrame, id_column: str = 'customer_id') -> 'LookalikeIndex':
+        """
+        Learn the scaling and build the tree.
+
+        Args:
+            customer_data (pd.DataFrame): One row per customer with the feature columns
+            id_column (str): Customer identifier column
+
+        Returns:
+            LookalikeIndex: The fitted index
+        """
+        values = self._raw_features(customer_data)
+        self.fill_values_ = np.nan_to_num(np.nanmedian(values, axis=0))
+        values = self._impute(values)
+
+        self.mean_ = values.mean(axis=0)
+        scale = values.std(axis=0)
+        # Constant features carry no similarity signal; keep them at zero
+        self.scale_ = np.where(scale > 0, scale, 1.0)
+        standardized = (values - self.mean_) / self.scale_
+
+        if self.method == 'kd_tree':
+            self.tree_ = cKDTree(standardized, leafsize=self.leaf_size, balanced_tree=False, compact_nodes=False)
+        else:
+            self.tree_ = BallTree(standardized, leaf_size=self.leaf_size)
+        self.customer_ids = customer_data[id_column].to_numpy()
+        self.id_index_ = pd.Index(self.customer_ids)
+
+        logger.info(f"Built {self.method} lookalike index over {len(standardized):,} customers "
+                    f"x {standardized.shape[1]} features")
+        return self
+
+    @property
+    def size(self) -> int:
+        return 0 if self.customer_ids is None else len(self.customer_ids)
+
+    def query(self, vectors: np.ndarray, k: int = 10,
+              batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-K nearest customers for each standardized query vector.
+
+        Args:
+            vectors (np.ndarray): Standardized query matrix (queries x features)
+            k (int): Neighbors per query
+            batch_size (int): Queries per tree call
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Distances and row positions, both (queries x k),
+                ordered nearest first
+        """
+        if self.tree_ is None:
+            raise ValueError("Index is not fitted")
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float64))
+        k = min(k, self.size)
+        distances = np.empty((len(vectors), k))
+        positions = np.empty((len(vectors), k), dtype=np.int64)
+
+        for start in range(0, len(vectors), batch_size):
+            batch = vectors[start:start + batch_size]
+            if self.method == 'kd_tree':
+                batch_distances, batch_positions = self.tree_.query(batch, k=k, eps=self.eps, workers=-1)
+            else:
+                batch_distances, batch_positions = self.tree_.query(batch, k=k)
+            distances[start:start + batch_size] = np.reshape(batch_distances, (len(batch), k))
+            positions[start:start + batch_size] = np.reshape(batch_positions, (len(batch), k))
+
+        return distances, positions
+
+    def query_customers(self, customer_data: pd.DataFrame, k: int = 10,
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-K nearest customers for each row of a customer table.
+
+        Args:
+            customer_data (pd.DataFrame): Query rows with the feature columns
+            k (int): Neighbors per query
+            batch_size (int): Queries per tree call
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Distances and row positions (queries x k)
+        """
+        return self.query(self.transform(customer_data), k=k, batch_size=batch_size)
+
+    def find_lookalikes(self, seed_ids: Iterable, n_customers: int = 1000, k_per_seed: int = 10,
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+        """
+        Customers most similar to a seed audience, excluding the seeds.
+
+        Seeds usually crowd each other's neighborhoods, so when the top-K lists
+        hold fewer than n_customers non-seed customers, K is widened and the
+        seeds are queried again.
+
+        Args:
+            seed_ids (Iterable): Identifiers of the seed customers (must be in the index)
+            n_customers (int): Lookalikes to return
+            k_per_seed (int): Initial neighbors retrieved per seed
+            batch_size (int): Queries per tree call
+
+        Returns:
+            pd.DataFrame: customer_id, distance (to the nearest seed), nearest_seed and
+                seed_matches (seeds listing the customer in their top-K), nearest first
+        """
+        seed_positions = self.id_index_.get_indexer(pd.unique(np.asarray(list(seed_ids))))
+        seed_positions = seed_positions[seed_positions >= 0]
+        if len(seed_positions) == 0:
+            raise ValueError("None of the seed customers are in the index")
+
+        seed_vectors = np.asarray(self.tree_.data)[seed_positions]
+        is_seed = np.zeros(self.size, dtype=bool)
+        is_seed[seed_positions] = True
+        available = min(n_customers, self.size - len(seed_positions))
+
+        k = min(k_per_seed, self.size)
+        while True:
+            distances, positions = self.query(seed_vectors, k=k, batch_size=batch_size)
+            candidates = pd.DataFrame({
+                'position': positions.ravel(),
+                'distance': distances.ravel(),
+                'seed': np.repeat(seed_positions, positions.shape[1])
+            })
+            candidates = candidates[~is_seed[candidates['position'].to_numpy()]]
+            if candidates['position'].nunique() >= available or k >= self.size:
+                break
+            k = min(k * 4, self.size)
+
+        nearest = candidates.sort_values('distance', kind='stable').drop_duplicates('position')
+        matches = candidates.groupby('position').size()
+        nearest = nearest.head(n_customers)
+
+        return pd.DataFrame({
+            'customer_id': self.customer_ids[nearest['position'].to_numpy()],
+            'distance': nearest['distance'].to_numpy(),
+            'nearest_seed': self.customer_ids[nearest['seed'].to_numpy()],
+            'seed_matches': matches.reindex(nearest['position']).to_numpy()
+        })
+
+
+def find_segment_lookalikes(customer_data: pd.DataFrame, segment: str = 'Champions', n_customers: int = 1000,
+                            k_per_seed: int = 10, index: Optional[LookalikeIndex] = None,
+                            segment_column: str = 'customer_segment') -> Dict:
+    """
+    Lookalikes of an RFM segment with a profile comparison.
+
+    Args:
+        customer_data (pd.DataFrame): Customer analytics table
+        segment (str): Seed segment name
+        n_customers (int): Lookalikes to return
+        k_per_seed (int): Neighbors retrieved per seed
+        index (Optional[LookalikeIndex]): Fitted index over customer_data, built if None
+        segment_column (str): Column holding the segment labels
+
+    Returns:
+        Dict: 'lookalikes' (with the lookalikes' segment), 'profile' (mean features of seeds,
+            lookalikes and all customers), 'segment_mix' (lookalike counts by current segment)
+    """
+    if index is None:
+        index = LookalikeIndex().fit(customer_data)
+    seeds = customer_data.loc[customer_data[segment_column] == segment, 'customer_id']
+    lookalikes = index.find_lookalikes(seeds, n_customers=n_customers, k_per_seed=k_per_seed)
+
+    by_id = customer_data.set_index('customer_id')
+    lookalikes[segment_column] = by_id[segment_column].reindex(lookalikes['customer_id']).to_numpy()
+    profile = pd.DataFrame({
+        'seed': by_id.loc[seeds, index.feature_columns].mean(),
+        'lookalike': by_id.loc[lookalikes['customer_id'], index.feature_columns].mean(),
+        'all_customers': customer_data[index.feature_columns].mean()
+    })
+
+    return {
+        'segment': segment,
+        'seed_count': len(seeds),
+        'lookalikes': lookalikes,
+        'profile': profile,
+        'segment_mix': lookalikes[segment_column].value_counts()
+    }
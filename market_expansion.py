@@ -17,8 +17,17 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import warnings
+import json
 from datetime import datetime
 import logging
+from feature_store import read_feature_dataset, get_feature_version
+from olap_cube import load_olap_cube, published_cube_version
+from data_cache import DEFAULT_CLEANED_DIR, load_cleaned_table, cleaned_data_version
+from reference_data import REFERENCE_DIR, load_reference_table, attach_reference_data, read_reference_manifest
+from expansion_scenarios import WeightScenarioEngine
+from expansion_simulation import UntappedPotentialSimulator
+from report_renderer import ReportFigureRenderer
+from analysis_results import DEFAULT_RESULTS_DIR, materialize_results, load_materialized_results
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -33,34 +42,75 @@ class MarketExpansionAnalyzer:
     Analyzes geographic opportunities, seller distribution, and delivery performance.
     """
     
+    # Cleaned-table columns each analysis reads; loaded lazily through the shared table cache
+    REQUIRED_COLUMNS = {
+        'delivery_performance': {
+            'orders': ['order_id', 'customer_id', 'delivery_days', 'on_time_delivery'],
+            'customers': ['customer_id', 'customer_state', 'customer_city']
+        },
+        'report': {
+            'orders': ['order_purchase_timestamp']
+        }
+    }
+    DATE_COLUMNS = ['order_purchase_timestamp', 'order_approved_at', 'order_delivered_carrier_date',
+                    'order_delivered_customer_date', 'order_estimated_delivery_date']
+    
+    # Industry benchmark of customers served per seller
+    OPTIMAL_CUSTOMERS_PER_SELLER = 30
+    
+    # Combined expansion opportunity score with business-realistic weights
+    OPPORTUNITY_WEIGHTS = {
+        'market_size_score': 0.35,             # Market size is crucial
+        'growth_potential_score': 0.30,        # Growth potential is key
+        'operational_feasibility_score': 0.20, # Operations must be feasible
+        'competitive_score': 0.15              # Competition matters but less
+    }
+    
+    # Growth potential blends untapped revenue with low current penetration
+    GROWTH_POTENTIAL_WEIGHTS = {'untapped_revenue': 0.7, 'penetration': 0.3}
+    
+    # Columns that cannot be computed without a population for the geography
+    POPULATION_DERIVED_COLUMNS = [
+        'urban_population', 'penetration_rate', 'benchmark_penetration', 'untapped_customers',
+        'adjusted_untapped_customers', 'untapped_revenue_potential', 'market_potential_score',
+        'market_size_score', 'growth_potential_score'
+    ]
+    
+    # Materialized results name; bump the schema version when result columns change
+    RESULTS_ANALYSIS = 'market_expansion'
+    RESULTS_SCHEMA_VERSION = 1
+    
     def __init__(self):
         """Initialize the Market Expansion Analyzer."""
         self.market_data = None
         self.state_summary = None
         self.expansion_opportunities = None
         self.delivery_analysis = None
+        self.city_opportunities = None
+        self.weight_sensitivity = None
+        self.potential_simulation = None
+        self.recommendations = []
+        self.cube = None
         self.insights = []
         
     def load_data(self):
-        """Load the required datasets for market expansion analysis."""
+        """
+        Load the required datasets for market expansion analysis.
+        
+        Only the state/city-level market expansion dataset and the OLAP cube are
+        read here. Cleaned order and customer tables are loaded on demand, column
+        by column, by the analyses that need them (see REQUIRED_COLUMNS).
+        """
         try:
             logger.info("Loading market expansion datasets...")
             
             # Load feature-engineered market expansion data
-            self.market_data = pd.read_csv('data/feature_engineered/market_expansion.csv')
+            self.market_data = read_feature_dataset('market_expansion')
             
-            # Load cleaned datasets for additional analysis
-            self.orders_df = pd.read_csv('data/cleaned/cleaned_orders.csv')
-            self.customers_df = pd.read_csv('data/cleaned/cleaned_customers.csv')
-            self.sellers_df = pd.read_csv('data/cleaned/cleaned_sellers.csv')
-            
-            # Convert date columns
-            self.orders_df['order_purchase_timestamp'] = pd.to_datetime(self.orders_df['order_purchase_timestamp'])
-            if 'order_delivered_customer_date' in self.orders_df.columns:
-                self.orders_df['order_delivered_customer_date'] = pd.to_datetime(self.orders_df['order_delivered_customer_date'])
+            # Pre-aggregated cube for additive roll-ups (None if not built yet, or built from other cleaned data)
+            self.cube = load_olap_cube()
             
             logger.info(f"Loaded market data with {len(self.market_data)} records")
-            logger.info(f"Loaded {len(self.orders_df)} orders, {len(self.customers_df)} customers, {len(self.sellers_df)} sellers")
             
             return True
             
@@ -68,6 +118,35 @@ class MarketExpansionAnalyzer:
             logger.error(f"Error loading data: {str(e)}")
             return False
     
+    def load_table(self, table, analysis=None):
+        """
+        Load a cleaned table projected to the columns an analysis needs.
+        
+        Args:
+            table (str): Cleaned dataset name ('orders', 'customers' or 'sellers')
+            analysis (str): Key of REQUIRED_COLUMNS, or None for all columns
+            
+        Returns:
+            pd.DataFrame: Cleaned table with only the required columns
+        """
+        columns = None if analysis is None else self.REQUIRED_COLUMNS[analysis][table]
+        return load_cleaned_table(table, columns=columns, parse_dates=self.DATE_COLUMNS if table == 'orders' else None)
+    
+    @property
+    def orders_df(self):
+        """Full cleaned orders table (prefer load_table with an analysis key)."""
+        return self.load_table('orders')
+    
+    @property
+    def customers_df(self):
+        """Full cleaned customers table (prefer load_table with an analysis key)."""
+        return self.load_table('customers')
+    
+    @property
+    def sellers_df(self):
+        """Full cleaned sellers table (prefer load_table with an analysis key)."""
+        return self.load_table('sellers')
+    
     def analyze_market_penetration(self):
         """
         Analyze market penetration by Brazilian state to identify underserved areas.
@@ -76,7 +155,7 @@ class MarketExpansionAnalyzer:
         logger.info("Analyzing market penetration by Brazilian state...")
         
         # Create state-level summary from market data
-        self.state_summary = self.market_data.groupby('state').agg({
+        state_aggregations = {
             'customer_count': 'sum',
             'seller_count': 'sum', 
             'total_orders': 'sum',
@@ -85,7 +164,10 @@ class MarketExpansionAnalyzer:
             'market_opportunity_score': 'mean',
             'avg_delivery_days': 'mean',
             'on_time_rate': 'mean'
-        }).reset_index()
+        }
+        if 'avg_seller_distance_km' in self.market_data.columns:
+            state_aggregations['avg_seller_distance_km'] = 'mean'
+        self.state_summary = self.market_data.groupby('state').agg(state_aggregations).reset_index()
         
         # Calculate additional penetration metrics
         self.state_summary['revenue_per_customer'] = np.where(
@@ -137,105 +219,76 @@ class MarketExpansionAnalyzer:
         logger.info(f"Analyzed market penetration for {len(self.state_summary)} states")
         return self.state_summary
     
-    def calculate_untapped_potential(self):
+    @staticmethod
+    def compute_untapped_potential(summary: pd.DataFrame) -> pd.DataFrame:
         """
-        Calculate untapped market potential using population data, economic context, and realistic penetration benchmarks.
-        Addresses Requirement 2.2
+        Compute penetration, tier benchmarks and untapped potential for any geography level.
+
+        Works on state or municipality summaries alike, as long as reference data
+        (population, gdp_per_capita, tier, urban_rate) has been attached.
+
+        Args:
+            summary (pd.DataFrame): Summary with customer_count, total_revenue and reference columns
+
+        Returns:
+            pd.DataFrame: Copy of the summary with potential columns added
         """
-        logger.info("Calculating untapped market potential with economic context...")
-        
-        # Brazilian state data (2020 census + economic data)
-        state_data = {
-            'SP': {'population': 46649132, 'gdp_per_capita': 56956, 'tier': 1, 'urban_rate': 0.96},
-            'RJ': {'population': 17463349, 'gdp_per_capita': 51929, 'tier': 1, 'urban_rate': 0.97},
-            'MG': {'population': 21411923, 'gdp_per_capita': 35219, 'tier': 1, 'urban_rate': 0.85},
-            'BA': {'population': 15203934, 'gdp_per_capita': 22045, 'tier': 2, 'urban_rate': 0.73},
-            'PR': {'population': 11597484, 'gdp_per_capita': 42791, 'tier': 2, 'urban_rate': 0.85},
-            'RS': {'population': 11466630, 'gdp_per_capita': 45180, 'tier': 2, 'urban_rate': 0.85},
-            'PE': {'population': 9674793, 'gdp_per_capita': 21077, 'tier': 2, 'urban_rate': 0.80},
-            'CE': {'population': 9240580, 'gdp_per_capita': 18320, 'tier': 2, 'urban_rate': 0.75},
-            'PA': {'population': 8777124, 'gdp_per_capita': 17179, 'tier': 3, 'urban_rate': 0.68},
-            'SC': {'population': 7338473, 'gdp_per_capita': 46016, 'tier': 2, 'urban_rate': 0.84},
-            'GO': {'population': 7206589, 'gdp_per_capita': 30544, 'tier': 2, 'urban_rate': 0.90},
-            'MA': {'population': 7153262, 'gdp_per_capita': 14748, 'tier': 3, 'urban_rate': 0.64},
-            'PB': {'population': 4059905, 'gdp_per_capita': 17687, 'tier': 3, 'urban_rate': 0.75},
-            'AM': {'population': 4269995, 'gdp_per_capita': 23894, 'tier': 3, 'urban_rate': 0.79},
-            'ES': {'population': 4108508, 'gdp_per_capita': 38177, 'tier': 2, 'urban_rate': 0.83},
-            'MT': {'population': 3567234, 'gdp_per_capita': 49265, 'tier': 2, 'urban_rate': 0.82},
-            'AL': {'population': 3365351, 'gdp_per_capita': 16463, 'tier': 3, 'urban_rate': 0.73},
-            'PI': {'population': 3289290, 'gdp_per_capita': 14454, 'tier': 3, 'urban_rate': 0.66},
-            'DF': {'population': 3094325, 'gdp_per_capita': 85830, 'tier': 1, 'urban_rate': 0.97},
-            'MS': {'population': 2839188, 'gdp_per_capita': 39265, 'tier': 2, 'urban_rate': 0.86},
-            'RN': {'population': 3560903, 'gdp_per_capita': 18690, 'tier': 3, 'urban_rate': 0.77},
-            'RO': {'population': 1815278, 'gdp_per_capita': 26157, 'tier': 3, 'urban_rate': 0.74},
-            'AC': {'population': 906876, 'gdp_per_capita': 18327, 'tier': 3, 'urban_rate': 0.73},
-            'AP': {'population': 877613, 'gdp_per_capita': 19952, 'tier': 3, 'urban_rate': 0.90},
-            'SE': {'population': 2338474, 'gdp_per_capita': 22942, 'tier': 3, 'urban_rate': 0.74},
-            'TO': {'population': 1607363, 'gdp_per_capita': 22555, 'tier': 3, 'urban_rate': 0.79},
-            'RR': {'population': 652713, 'gdp_per_capita': 22896, 'tier': 3, 'urban_rate': 0.76}
-        }
-        
-        # Add economic context to state summary
-        for state in self.state_summary['state']:
-            if state in state_data:
-                self.state_summary.loc[self.state_summary['state'] == state, 'population'] = state_data[state]['population']
-                self.state_summary.loc[self.state_summary['state'] == state, 'gdp_per_capita'] = state_data[state]['gdp_per_capita']
-                self.state_summary.loc[self.state_summary['state'] == state, 'tier'] = state_data[state]['tier']
-                self.state_summary.loc[self.state_summary['state'] == state, 'urban_rate'] = state_data[state]['urban_rate']
-        
+        summary = summary.copy()
+
         # Calculate realistic market penetration rate (customers per 1000 urban population)
-        self.state_summary['urban_population'] = self.state_summary['population'] * self.state_summary['urban_rate']
-        self.state_summary['penetration_rate'] = (
-            self.state_summary['customer_count'] / self.state_summary['urban_population'] * 1000
-        )
+        summary['urban_population'] = summary['population'] * summary['urban_rate']
+        summary['penetration_rate'] = summary['customer_count'] / summary['urban_population'] * 1000
         
-        # Calculate tier-specific penetration benchmarks (more realistic than national average)
-        tier_benchmarks = {}
-        for tier in [1, 2, 3]:
-            tier_states = self.state_summary[self.state_summary['tier'] == tier]
-            if len(tier_states) > 0:
-                tier_benchmarks[tier] = (
-                    tier_states['customer_count'].sum() / tier_states['urban_population'].sum() * 1000
-                )
-        
-        # Calculate untapped potential using tier-specific benchmarks
-        self.state_summary['benchmark_penetration'] = self.state_summary['tier'].map(tier_benchmarks)
+        # Tier-specific penetration benchmarks (more realistic than national average)
+        tier_totals = summary.groupby('tier')[['customer_count', 'urban_population']].transform('sum')
+        summary['benchmark_penetration'] = tier_totals['customer_count'] / tier_totals['urban_population'] * 1000
         
         # Only consider untapped potential where current penetration is below benchmark
-        self.state_summary['untapped_customers'] = np.maximum(
+        summary['untapped_customers'] = np.maximum(
             0,
-            (self.state_summary['benchmark_penetration'] * self.state_summary['urban_population'] / 1000) - 
-            self.state_summary['customer_count']
+            (summary['benchmark_penetration'] * summary['urban_population'] / 1000) - summary['customer_count']
         )
         
         # Adjust untapped potential by economic capacity (GDP per capita factor)
-        national_avg_gdp = self.state_summary['gdp_per_capita'].mean()
-        self.state_summary['economic_factor'] = np.minimum(
+        national_avg_gdp = summary['gdp_per_capita'].mean()
+        summary['economic_factor'] = np.minimum(
             2.0,  # Cap at 2x to avoid extreme values
-            self.state_summary['gdp_per_capita'] / national_avg_gdp
-        )
-        
-        self.state_summary['adjusted_untapped_customers'] = (
-            self.state_summary['untapped_customers'] * self.state_summary['economic_factor']
+            summary['gdp_per_capita'] / national_avg_gdp
         )
+        summary['adjusted_untapped_customers'] = summary['untapped_customers'] * summary['economic_factor']
         
         # Calculate potential revenue with economic adjustment
-        national_avg_revenue_per_customer = self.state_summary['total_revenue'].sum() / self.state_summary['customer_count'].sum()
-        
-        self.state_summary['untapped_revenue_potential'] = (
-            self.state_summary['adjusted_untapped_customers'] * 
-            national_avg_revenue_per_customer * 
-            self.state_summary['economic_factor']
+        national_avg_revenue_per_customer = summary['total_revenue'].sum() / summary['customer_count'].sum()
+        summary['untapped_revenue_potential'] = (
+            summary['adjusted_untapped_customers'] * national_avg_revenue_per_customer * summary['economic_factor']
         )
         
         # Market potential score based on absolute opportunity size and economic viability
-        max_revenue_potential = self.state_summary['untapped_revenue_potential'].max()
+        max_revenue_potential = summary['untapped_revenue_potential'].max()
         if max_revenue_potential > 0:
-            self.state_summary['market_potential_score'] = (
-                self.state_summary['untapped_revenue_potential'] / max_revenue_potential
-            )
+            summary['market_potential_score'] = summary['untapped_revenue_potential'] / max_revenue_potential
         else:
-            self.state_summary['market_potential_score'] = 0
+            summary['market_potential_score'] = 0
+        
+        return summary
+    
+    def calculate_untapped_potential(self, reference_version: str = None):
+        """
+        Calculate untapped market potential using population data, economic context, and realistic penetration benchmarks.
+        Addresses Requirement 2.2
+
+        Population, GDP per capita, market tier and urbanization rate come from the
+        versioned state reference table in data/reference (see reference_data.py).
+
+        Args:
+            reference_version (str): State reference data version, defaults to the current one
+        """
+        logger.info("Calculating untapped market potential with economic context...")
+        
+        # Add economic context to state summary with a single keyed join
+        reference = load_reference_table('state', version=reference_version)
+        self.state_summary = attach_reference_data(self.state_summary, level='state', reference=reference)
+        self.state_summary = self.compute_untapped_potential(self.state_summary)
         
         # Generate insights
         top_potential_states = self.state_summary.nlargest(5, 'untapped_customers')
@@ -256,6 +309,33 @@ class MarketExpansionAnalyzer:
         logger.info("Calculated untapped market potential for all states")
         return self.state_summary
     
+    @classmethod
+    def compute_seller_gap(cls, summary: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compare seller counts against the optimal count implied by customer demand.
+
+        Args:
+            summary (pd.DataFrame): State or city summary with customer_count and seller_count
+
+        Returns:
+            pd.DataFrame: Copy of the summary with seller gap and efficiency columns added
+        """
+        summary = summary.copy()
+        summary['optimal_seller_count'] = np.ceil(summary['customer_count'] / cls.OPTIMAL_CUSTOMERS_PER_SELLER)
+        
+        summary['seller_gap'] = np.maximum(0, summary['optimal_seller_count'] - summary['seller_count'])
+        
+        # Seller distribution efficiency score
+        summary['seller_efficiency_score'] = np.where(
+            summary['optimal_seller_count'] > 0,
+            np.minimum(1.0, summary['seller_count'] / summary['optimal_seller_count']),
+            1.0
+        )
+        
+        # Seller oversupply (too many sellers for demand)
+        summary['seller_oversupply'] = np.maximum(0, summary['seller_count'] - summary['optimal_seller_count'])
+        return summary
+    
     def evaluate_seller_distribution(self):
         """
         Evaluate seller distribution vs customer demand to identify optimization opportunities.
@@ -269,30 +349,8 @@ class MarketExpansionAnalyzer:
             True, False
         )
         
-        # Calculate optimal seller count based on customer demand
-        # Assume optimal ratio is 30 customers per seller (industry benchmark)
-        optimal_ratio = 30
-        self.state_summary['optimal_seller_count'] = np.ceil(
-            self.state_summary['customer_count'] / optimal_ratio
-        )
-        
-        self.state_summary['seller_gap'] = np.maximum(
-            0,
-            self.state_summary['optimal_seller_count'] - self.state_summary['seller_count']
-        )
-        
-        # Seller distribution efficiency score
-        self.state_summary['seller_efficiency_score'] = np.where(
-            self.state_summary['optimal_seller_count'] > 0,
-            np.minimum(1.0, self.state_summary['seller_count'] / self.state_summary['optimal_seller_count']),
-            1.0
-        )
-        
-        # Identify states with seller oversupply (too many sellers for demand)
-        self.state_summary['seller_oversupply'] = np.maximum(
-            0,
-            self.state_summary['seller_count'] - self.state_summary['optimal_seller_count']
-        )
+        # Calculate optimal seller count, seller gap and oversupply based on customer demand
+        self.state_summary = self.compute_seller_gap(self.state_summary)
         
         # Generate insights
         seller_shortage_states = self.state_summary[
@@ -335,24 +393,34 @@ class MarketExpansionAnalyzer:
         """
         logger.info("Analyzing delivery performance by geography...")
         
-        # Merge orders with customer and seller location data
-        orders_with_locations = self.orders_df.merge(
-            self.customers_df[['customer_id', 'customer_state', 'customer_city']], 
-            on='customer_id', how='left'
-        )
-        
-        # Calculate delivery performance by customer state
-        delivery_performance = orders_with_locations.groupby('customer_state').agg({
-            'delivery_days': ['mean', 'median', 'std', 'count'],
-            'on_time_delivery': 'mean',
-            'order_id': 'count'
-        }).reset_index()
-        
-        # Flatten column names
-        delivery_performance.columns = [
-            'state', 'avg_delivery_days', 'median_delivery_days', 'delivery_days_std',
-            'delivery_count', 'on_time_rate', 'total_orders'
-        ]
+        if self.cube is not None:
+            # Roll up additive delivery measures by customer state (medians are not additive)
+            delivery_performance = self.cube.rollup(['customer_state']).drop(columns='on_time_rate')
+            delivery_performance = delivery_performance.rename(columns={
+                'customer_state': 'state',
+                'delivery_days_count': 'delivery_count',
+                'delivered_on_time_rate': 'on_time_rate',
+                'order_count': 'total_orders'
+            })[['state', 'avg_delivery_days', 'delivery_days_std', 'delivery_count', 'on_time_rate', 'total_orders']]
+        else:
+            # Merge orders with customer and seller location data
+            orders_with_locations = self.load_table('orders', 'delivery_performance').merge(
+                self.load_table('customers', 'delivery_performance'), 
+                on='customer_id', how='left'
+            )
+            
+            # Calculate delivery performance by customer state
+            delivery_performance = orders_with_locations.groupby('customer_state').agg({
+                'delivery_days': ['mean', 'median', 'std', 'count'],
+                'on_time_delivery': 'mean',
+                'order_id': 'count'
+            }).reset_index()
+            
+            # Flatten column names
+            delivery_performance.columns = [
+                'state', 'avg_delivery_days', 'median_delivery_days', 'delivery_days_std',
+                'delivery_count', 'on_time_rate', 'total_orders'
+            ]
         
         # Delivery performance categories
         delivery_performance['delivery_performance_category'] = pd.cut(
@@ -362,9 +430,11 @@ class MarketExpansionAnalyzer:
         )
         
         # Merge with state summary
+        detail_columns = [col for col in ['state', 'avg_delivery_days', 'median_delivery_days', 
+                                          'on_time_rate', 'delivery_performance_category']
+                          if col in delivery_performance.columns]
         self.state_summary = self.state_summary.merge(
-            delivery_performance[['state', 'avg_delivery_days', 'median_delivery_days', 
-                                'on_time_rate', 'delivery_performance_category']], 
+            delivery_performance[detail_columns], 
             on='state', how='left', suffixes=('', '_detailed')
         )
         
@@ -413,73 +483,96 @@ class MarketExpansionAnalyzer:
         logger.info("Completed delivery performance analysis")
         return self.state_summary  
   
-    def generate_expansion_opportunity_matrix(self):
+    @classmethod
+    def compute_opportunity_scores(cls, summary: pd.DataFrame) -> pd.DataFrame:
         """
-        Generate comprehensive expansion opportunity matrix with business-realistic scoring.
-        Addresses Requirement 2.5
+        Score market size, growth potential, operational feasibility and competition.
+
+        Expects reference data, untapped potential, seller efficiency and delivery
+        columns; avg_seller_distance_km, when present, also enters operational
+        feasibility. Scores are normalized against the maxima of the given summary.
+
+        Args:
+            summary (pd.DataFrame): State or city summary
+
+        Returns:
+            pd.DataFrame: Copy of the summary with component and combined opportunity scores
         """
-        logger.info("Generating business-realistic expansion opportunity matrix...")
+        summary = summary.copy()
         
         # Calculate market size score (population + economic strength)
-        max_population = self.state_summary['population'].max()
-        max_gdp_per_capita = self.state_summary['gdp_per_capita'].max()
+        max_population = summary['population'].max()
+        max_gdp_per_capita = summary['gdp_per_capita'].max()
         
-        self.state_summary['market_size_score'] = (
-            (self.state_summary['population'] / max_population) * 0.6 +
-            (self.state_summary['gdp_per_capita'] / max_gdp_per_capita) * 0.4
+        summary['market_size_score'] = (
+            (summary['population'] / max_population) * 0.6 +
+            (summary['gdp_per_capita'] / max_gdp_per_capita) * 0.4
         )
         
         # Calculate growth potential score (untapped potential + low current penetration)
-        max_untapped_revenue = self.state_summary['untapped_revenue_potential'].max()
-        max_penetration = self.state_summary['penetration_rate'].max()
+        max_untapped_revenue = summary['untapped_revenue_potential'].max()
+        max_penetration = summary['penetration_rate'].max()
         
         if max_untapped_revenue > 0:
-            untapped_score = self.state_summary['untapped_revenue_potential'] / max_untapped_revenue
+            untapped_score = summary['untapped_revenue_potential'] / max_untapped_revenue
         else:
             untapped_score = 0
             
         if max_penetration > 0:
             # Invert penetration rate - lower penetration = higher growth potential
-            growth_potential_score = 1 - (self.state_summary['penetration_rate'] / max_penetration)
+            growth_potential_score = 1 - (summary['penetration_rate'] / max_penetration)
         else:
             growth_potential_score = 0
             
-        self.state_summary['growth_potential_score'] = (
-            untapped_score * 0.7 + growth_potential_score * 0.3
+        summary['growth_potential_score'] = (
+            untapped_score * cls.GROWTH_POTENTIAL_WEIGHTS['untapped_revenue'] +
+            growth_potential_score * cls.GROWTH_POTENTIAL_WEIGHTS['penetration']
         )
         
         # Calculate operational feasibility score (delivery performance + infrastructure)
-        max_delivery_days = self.state_summary['avg_delivery_days'].max()
+        max_delivery_days = summary['avg_delivery_days'].max()
         if max_delivery_days > 0:
-            delivery_score = 1 - (self.state_summary['avg_delivery_days'] / max_delivery_days)
+            delivery_score = 1 - (summary['avg_delivery_days'] / max_delivery_days)
         else:
             delivery_score = 1.0
             
         # Urban rate as infrastructure proxy
-        infrastructure_score = self.state_summary['urban_rate']
-        
-        self.state_summary['operational_feasibility_score'] = (
-            delivery_score * 0.6 + infrastructure_score * 0.4
-        )
+        infrastructure_score = summary['urban_rate']
+        
+        if 'avg_seller_distance_km' in summary.columns:
+            # Shorter seller-customer distances mean cheaper, more reliable fulfilment
+            max_distance = summary['avg_seller_distance_km'].max()
+            distance_score = 1 - (summary['avg_seller_distance_km'] / max_distance) if max_distance > 0 else 1.0
+            summary['operational_feasibility_score'] = (
+                delivery_score * 0.5 + infrastructure_score * 0.3 + distance_score * 0.2
+            )
+        else:
+            summary['operational_feasibility_score'] = (
+                delivery_score * 0.6 + infrastructure_score * 0.4
+            )
         
         # Calculate competitive landscape score (seller efficiency)
-        self.state_summary['competitive_score'] = self.state_summary['seller_efficiency_score'].fillna(0.5)
-        
-        # Combined expansion opportunity score with business-realistic weights
-        weights = {
-            'market_size_score': 0.35,           # Market size is crucial
-            'growth_potential_score': 0.30,      # Growth potential is key
-            'operational_feasibility_score': 0.20, # Operations must be feasible
-            'competitive_score': 0.15            # Competition matters but less
-        }
-        
-        self.state_summary['combined_opportunity_score'] = 0
-        for metric, weight in weights.items():
-            if metric in self.state_summary.columns:
-                self.state_summary['combined_opportunity_score'] += (
-                    self.state_summary[metric].fillna(0) * weight
+        summary['competitive_score'] = summary['seller_efficiency_score'].fillna(0.5)
+        
+        # Combined expansion opportunity score
+        summary['combined_opportunity_score'] = 0
+        for metric, weight in cls.OPPORTUNITY_WEIGHTS.items():
+            if metric in summary.columns:
+                summary['combined_opportunity_score'] += (
+                    summary[metric].fillna(0) * weight
                 )
         
+        return summary
+    
+    def generate_expansion_opportunity_matrix(self):
+        """
+        Generate comprehensive expansion opportunity matrix with business-realistic scoring.
+        Addresses Requirement 2.5
+        """
+        logger.info("Generating business-realistic expansion opportunity matrix...")
+        
+        self.state_summary = self.compute_opportunity_scores(self.state_summary)
+        
         # Expansion priority categories with business logic
         def categorize_expansion_priority(row):
             score = row['combined_opportunity_score']
@@ -555,9 +648,181 @@ class MarketExpansionAnalyzer:
             'data': dict(priority_distribution)
         })
         
+        self.recommendations = recommendations
         logger.info("Generated expansion opportunity matrix")
         return self.expansion_opportunities, recommendations
     
+    def score_city_opportunities(self, reference_version: str = None,
+                                 reference_dir: str = REFERENCE_DIR) -> pd.DataFrame:
+        """
+        Score expansion opportunities for every city in the market expansion features.
+
+        Applies the state-level penetration, untapped potential, seller gap, delivery
+        feasibility and combined opportunity scoring to each (state, city) row with
+        column operations only. Penetration and untapped potential need city
+        populations, which come from municipality reference data registered in
+        data/reference. Without it, GDP per capita, tier and urbanization are taken
+        from the state, the population-based columns and scores are left missing
+        (population_source 'unavailable'), and cities are ranked on operational
+        feasibility and competition only. Results are ranked once within each state
+        and nationally, so top_cities() is a cheap filter.
+
+        Args:
+            reference_version (str): Reference data version, defaults to the current one
+            reference_dir (str): Directory of the reference data manifest and tables
+
+        Returns:
+            pd.DataFrame: One row per city, sorted by state and state_rank
+        """
+        logger.info("Scoring city-level expansion opportunities...")
+        
+        delivery_columns = [col for col in ['avg_delivery_days', 'on_time_rate', 'avg_seller_distance_km']
+                            if col in self.market_data.columns]
+        cities = self.market_data[[
+            'state', 'city', 'customer_count', 'seller_count', 'total_orders', 'total_revenue'
+        ] + delivery_columns].copy()
+        
+        has_municipalities = 'municipality' in read_reference_manifest(reference_dir)
+        if has_municipalities:
+            reference = load_reference_table('municipality', version=reference_version, reference_dir=reference_dir)
+            cities = attach_reference_data(cities, level='municipality', reference=reference)
+            cities['population_source'] = 'municipality'
+        else:
+            # Splitting state population by any demand measure would make penetration constant
+            # within a state, so city penetration is not estimated at all
+            logger.warning("No municipality reference data registered; city penetration and untapped "
+                           "potential are unavailable and cities are ranked on operations and competition")
+            reference = load_reference_table('state', version=reference_version, reference_dir=reference_dir)
+            cities = attach_reference_data(cities, level='state', reference=reference)
+            cities['population'] = np.nan
+            cities['population_source'] = 'unavailable'
+        
+        # Cities without delivered orders take their state's average delivery performance
+        for column in delivery_columns:
+            cities[column] = cities[column].fillna(cities.groupby('state')[column].transform('mean'))
+        
+        cities = self.compute_untapped_potential(cities)
+        cities = self.compute_seller_gap(cities)
+        cities = self.compute_opportunity_scores(cities)
+        if not has_municipalities:
+            cities[self.POPULATION_DERIVED_COLUMNS] = np.nan
+        
+        cities['national_rank'] = cities['combined_opportunity_score'].rank(method='first', ascending=False).astype(int)
+        cities['state_rank'] = cities.groupby('state')['combined_opportunity_score'].rank(
+            method='first', ascending=False
+        ).astype(int)
+        self.city_opportunities = cities.sort_values(['state', 'state_rank']).reset_index(drop=True)
+        
+        top_cities = select_top_cities(self.city_opportunities, k=5, per_state=False)
+        self.insights.append({
+            'category': 'City Opportunities',
+            'insight': f"Top 5 expansion cities: {', '.join(top_cities['city'] + ' (' + top_cities['state'] + ')')}",
+            'data': top_cities[['state', 'city', 'combined_opportunity_score', 'untapped_customers', 'seller_gap']].to_dict('records')
+        })
+        
+        logger.info(f"Scored expansion opportunities for {len(self.city_opportunities):,} cities")
+        return self.city_opportunities
+    
+    def top_cities(self, k: int = 10, states=None, per_state: bool = True) -> pd.DataFrame:
+        """
+        Return the best-scoring cities from score_city_opportunities().
+
+        Args:
+            k (int): Number of cities per state (or overall when per_state is False)
+            states: State code or list of state codes to restrict to, defaults to all states
+            per_state (bool): Whether k applies within each state or nationally
+
+        Returns:
+            pd.DataFrame: Top cities ordered by state and rank
+        """
+        if self.city_opportunities is None:
+            self.score_city_opportunities()
+        return select_top_cities(self.city_opportunities, k=k, states=states, per_state=per_state)
+    
+    def analyze_weight_sensitivity(self, level: str = 'state', n_scenarios: int = 10000, top_n: int = 5,
+                                   concentration: float = 20.0, seed: int = 42):
+        """
+        Analyze how opportunity rankings change under alternative score weightings.
+
+        Samples weight vectors around OPPORTUNITY_WEIGHTS and scores them all with
+        WeightScenarioEngine (see expansion_scenarios.py).
+
+        Args:
+            level (str): 'state' (expansion opportunity matrix) or 'city' (city opportunities)
+            n_scenarios (int): Number of weight scenarios, including the base weighting
+            top_n (int): Size of the top group tracked for stability and weight regions
+            concentration (float): Dirichlet concentration around the base weights; None samples all weightings uniformly
+            seed (int): Random seed
+
+        Returns:
+            Dict: Per-entity stability, per-scenario results and an overall summary
+        """
+        logger.info(f"Analyzing {level}-level sensitivity to opportunity score weights...")
+        
+        if level == 'city':
+            if self.city_opportunities is None:
+                self.score_city_opportunities()
+            summary, id_columns = self.city_opportunities, ['state', 'city']
+        else:
+            if self.expansion_opportunities is None:
+                self.generate_expansion_opportunity_matrix()
+            summary, id_columns = self.expansion_opportunities, ['state']
+        
+        engine = WeightScenarioEngine(summary, self.OPPORTUNITY_WEIGHTS, id_columns)
+        self.weight_sensitivity = engine.run(n_scenarios=n_scenarios, top_n=top_n,
+                                             concentration=concentration, seed=seed)
+        
+        result = self.weight_sensitivity['summary']
+        stable = [' '.join(entity.values()) for entity in result['stable_top_n']]
+        self.insights.append({
+            'category': 'Weight Sensitivity',
+            'insight': f"Across {result['n_scenarios']:,} weightings, rankings correlate {result['mean_spearman']:.2f} "
+                       f"with the base ranking; stay in the top {result['top_n']} in 90%+ of scenarios: "
+                       f"{', '.join(stable) if stable else 'none'}",
+            'data': result
+        })
+        
+        logger.info("Completed weight sensitivity analysis")
+        return self.weight_sensitivity
+    
+    def simulate_untapped_potential(self, n_draws: int = 10000, seed: int = 42, percentiles=(5, 50, 95)):
+        """
+        Put Monte Carlo uncertainty bands on state untapped potential and opportunity scores.
+
+        Revenue per customer is bootstrapped per state over its cities and tier
+        benchmarks over the states in each tier (see expansion_simulation.py).
+
+        Args:
+            n_draws (int): Number of Monte Carlo draws
+            seed (int): Random seed
+            percentiles: Percentiles reported for each metric
+
+        Returns:
+            Dict: Per-state percentile bands, national total bands and raw draws
+        """
+        logger.info("Simulating uncertainty in untapped market potential...")
+        
+        if self.expansion_opportunities is None:
+            self.generate_expansion_opportunity_matrix()
+        
+        simulator = UntappedPotentialSimulator(
+            self.expansion_opportunities, self.market_data, self.OPPORTUNITY_WEIGHTS,
+            self.GROWTH_POTENTIAL_WEIGHTS['untapped_revenue']
+        )
+        self.potential_simulation = simulator.simulate(n_draws=n_draws, seed=seed, percentiles=percentiles)
+        
+        total = self.potential_simulation['total_untapped_revenue']
+        low, high = f'p{min(percentiles):g}', f'p{max(percentiles):g}'
+        self.insights.append({
+            'category': 'Untapped Potential',
+            'insight': f"Total untapped revenue potential {low}-{high} band: R$ {total[low]:,.2f} - R$ {total[high]:,.2f} "
+                       f"({n_draws:,} simulated draws)",
+            'data': total
+        })
+        
+        logger.info("Completed untapped potential simulation")
+        return self.potential_simulation
+    
     def _generate_state_recommendations(self, state_data):
         """Generate business-realistic recommendations for a state based on its metrics and tier."""
         recommendations = []
@@ -606,11 +871,22 @@ class MarketExpansionAnalyzer:
         
         return recommendations
     
-    def create_visualizations(self):
+    def create_visualizations(self, draft: bool = False, max_workers: int = None, force: bool = False):
         """
         Create comprehensive visualizations for market expansion analysis.
         Each chart is generated individually and saved as a separate high-quality image.
         Addresses Requirements 2.3, 7.1, 7.2
+
+        Charts are rendered in parallel by ReportFigureRenderer and skipped when
+        their input data is unchanged since the last run.
+
+        Args:
+            draft (bool): Render at draft resolution for quick iteration
+            max_workers (int): Rendering processes, defaults to the CPU count
+            force (bool): Redraw all charts even if their inputs are unchanged
+
+        Returns:
+            Dict[str, str]: Chart file name -> 'rendered', 'skipped' or 'failed'
         """
         logger.info("Creating individual market expansion visualizations...")
         
@@ -618,225 +894,41 @@ class MarketExpansionAnalyzer:
         plt.style.use('default')
         sns.set_palette("husl")
         
-        # Create reports directory if it doesn't exist
-        import os
-        os.makedirs('reports', exist_ok=True)
-        
-        # 1. Market Penetration by State (Top 15)
-        plt.figure(figsize=(14, 8))
-        top_states = self.state_summary.nlargest(15, 'customer_count')
-        bars = plt.bar(range(len(top_states)), top_states['customer_count'], 
-                      color='steelblue', alpha=0.8, edgecolor='navy', linewidth=1)
-        plt.title('Market Penetration by State (Top 15)', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('States', fontsize=12)
-        plt.ylabel('Number of Customers', fontsize=12)
-        plt.xticks(range(len(top_states)), top_states['state'], rotation=45, ha='right')
-        
-        # Add value labels on bars
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'{int(height):,}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-        
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('reports/01_market_penetration_by_state.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 2. Expansion Opportunity Score by State (Top 15)
-        plt.figure(figsize=(14, 8))
-        top_opportunities = self.expansion_opportunities.head(15)
-        bars = plt.bar(range(len(top_opportunities)), top_opportunities['combined_opportunity_score'], 
-                      color='orange', alpha=0.8, edgecolor='darkorange', linewidth=1)
-        plt.title('Expansion Opportunity Score (Top 15)', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('States', fontsize=12)
-        plt.ylabel('Combined Opportunity Score', fontsize=12)
-        plt.xticks(range(len(top_opportunities)), top_opportunities['state'], rotation=45, ha='right')
-        
-        # Add value labels
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'{height:.3f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-        
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('reports/02_expansion_opportunity_scores.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 3. Customer to Seller Ratio Analysis
-        plt.figure(figsize=(12, 8))
-        # Filter out extreme outliers for better visualization
-        ratio_data = self.state_summary[self.state_summary['customer_to_seller_ratio'] <= 200]
-        scatter = plt.scatter(ratio_data['customer_count'], ratio_data['customer_to_seller_ratio'], 
-                            c=ratio_data['combined_opportunity_score'], cmap='viridis', 
-                            alpha=0.7, s=80, edgecolors='black', linewidth=0.5)
-        plt.title('Customer-Seller Ratio vs Market Size', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Number of Customers', fontsize=12)
-        plt.ylabel('Customer to Seller Ratio', fontsize=12)
-        plt.axhline(y=50, color='red', linestyle='--', alpha=0.8, linewidth=2, label='Seller Shortage Threshold (50:1)')
-        plt.legend(fontsize=11)
-        
-        # Add colorbar
-        cbar = plt.colorbar(scatter)
-        cbar.set_label('Opportunity Score', fontsize=12)
-        
-        plt.grid(alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('reports/03_customer_seller_ratio_analysis.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 4. Delivery Performance vs Market Opportunity
-        plt.figure(figsize=(12, 8))
-        delivery_data = self.state_summary.dropna(subset=['avg_delivery_days'])
-        scatter = plt.scatter(delivery_data['avg_delivery_days'], delivery_data['combined_opportunity_score'],
-                            c=delivery_data['customer_count'], cmap='plasma', alpha=0.7, s=80, 
-                            edgecolors='black', linewidth=0.5)
-        plt.title('Delivery Performance vs Expansion Opportunity', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Average Delivery Days', fontsize=12)
-        plt.ylabel('Combined Opportunity Score', fontsize=12)
-        
-        # Add colorbar
-        cbar = plt.colorbar(scatter)
-        cbar.set_label('Customer Count', fontsize=12)
-        
-        plt.grid(alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('reports/04_delivery_vs_opportunity.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 5. Untapped Revenue Potential (Top 10)
+        renderer = ReportFigureRenderer('reports', draft=draft, max_workers=max_workers, force=force)
+        
+        renderer.add('01_market_penetration_by_state.png', _plot_market_penetration,
+                     self.state_summary.nlargest(15, 'customer_count')[['state', 'customer_count']])
+        renderer.add('02_expansion_opportunity_scores.png', _plot_opportunity_scores,
+                     self.expansion_opportunities.head(15)[['state', 'combined_opportunity_score']])
+        renderer.add('03_customer_seller_ratio_analysis.png', _plot_customer_seller_ratio,
+                     self.state_summary[self.state_summary['customer_to_seller_ratio'] <= 200][
+                         ['customer_count', 'customer_to_seller_ratio', 'combined_opportunity_score']])
+        renderer.add('04_delivery_vs_opportunity.png', _plot_delivery_vs_opportunity,
+                     self.state_summary.dropna(subset=['avg_delivery_days'])[
+                         ['avg_delivery_days', 'combined_opportunity_score', 'customer_count']])
         if 'untapped_revenue_potential' in self.state_summary.columns:
-            plt.figure(figsize=(12, 8))
-            top_potential = self.state_summary.nlargest(10, 'untapped_revenue_potential')
-            bars = plt.barh(range(len(top_potential)), top_potential['untapped_revenue_potential']/1000000, 
-                           color='green', alpha=0.8, edgecolor='darkgreen', linewidth=1)
-            plt.title('Untapped Revenue Potential (Top 10)', fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Potential Revenue (Millions R$)', fontsize=12)
-            plt.ylabel('States', fontsize=12)
-            plt.yticks(range(len(top_potential)), top_potential['state'])
-            
-            # Add value labels
-            for i, bar in enumerate(bars):
-                width = bar.get_width()
-                plt.text(width + width*0.01, bar.get_y() + bar.get_height()/2.,
-                        f'R${width:.1f}M', ha='left', va='center', fontsize=11, fontweight='bold')
-            
-            plt.grid(axis='x', alpha=0.3)
-            plt.tight_layout()
-            plt.savefig('reports/05_untapped_revenue_potential.png', dpi=300, bbox_inches='tight')
-            plt.close()
-        
-        # 6. Expansion Priority Distribution
-        plt.figure(figsize=(10, 8))
-        priority_counts = self.expansion_opportunities['expansion_priority'].value_counts()
-        colors = ['#ff4444', '#ff8800', '#ffdd00', '#88dd88']
-        wedges, texts, autotexts = plt.pie(priority_counts.values, labels=priority_counts.index, 
-                                          autopct='%1.1f%%', colors=colors, startangle=90,
-                                          textprops={'fontsize': 12})
-        plt.title('Expansion Priority Distribution', fontsize=16, fontweight='bold', pad=20)
-        
-        # Enhance text visibility
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-        
-        plt.tight_layout()
-        plt.savefig('reports/06_expansion_priority_distribution.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 7. Seller Gap Analysis (Top 10)
+            renderer.add('05_untapped_revenue_potential.png', _plot_untapped_revenue,
+                         self.state_summary.nlargest(10, 'untapped_revenue_potential')[['state', 'untapped_revenue_potential']])
+        renderer.add('06_expansion_priority_distribution.png', _plot_priority_distribution,
+                     self.expansion_opportunities['expansion_priority'].value_counts())
         if 'seller_gap' in self.state_summary.columns:
-            plt.figure(figsize=(12, 8))
-            top_gaps = self.state_summary.nlargest(10, 'seller_gap')
-            bars = plt.bar(range(len(top_gaps)), top_gaps['seller_gap'], 
-                          color='purple', alpha=0.8, edgecolor='darkviolet', linewidth=1)
-            plt.title('Seller Gap Analysis (Top 10)', fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('States', fontsize=12)
-            plt.ylabel('Additional Sellers Needed', fontsize=12)
-            plt.xticks(range(len(top_gaps)), top_gaps['state'], rotation=45, ha='right')
-            
-            # Add value labels
-            for i, bar in enumerate(bars):
-                height = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                        f'{int(height)}', ha='center', va='bottom', fontsize=11, fontweight='bold')
-            
-            plt.grid(axis='y', alpha=0.3)
-            plt.tight_layout()
-            plt.savefig('reports/07_seller_gap_analysis.png', dpi=300, bbox_inches='tight')
-            plt.close()
-        
-        # 8. Market Penetration Rate vs Population
+            renderer.add('07_seller_gap_analysis.png', _plot_seller_gap,
+                         self.state_summary.nlargest(10, 'seller_gap')[['state', 'seller_gap']])
         if 'penetration_rate' in self.state_summary.columns and 'population' in self.state_summary.columns:
-            plt.figure(figsize=(12, 8))
-            pop_data = self.state_summary.dropna(subset=['penetration_rate', 'population'])
-            scatter = plt.scatter(pop_data['population']/1000000, pop_data['penetration_rate'],
-                                c=pop_data['combined_opportunity_score'], cmap='coolwarm', 
-                                alpha=0.7, s=80, edgecolors='black', linewidth=0.5)
-            plt.title('Market Penetration Rate vs Population', fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Population (Millions)', fontsize=12)
-            plt.ylabel('Penetration Rate (customers per 1000)', fontsize=12)
-            
-            # Add colorbar
-            cbar = plt.colorbar(scatter)
-            cbar.set_label('Opportunity Score', fontsize=12)
-            
-            plt.grid(alpha=0.3)
-            plt.tight_layout()
-            plt.savefig('reports/08_penetration_vs_population.png', dpi=300, bbox_inches='tight')
-            plt.close()
-        
-        # 9. Revenue per Customer by State (Top 15)
-        plt.figure(figsize=(14, 8))
-        top_revenue_per_customer = self.state_summary.nlargest(15, 'revenue_per_customer')
-        bars = plt.bar(range(len(top_revenue_per_customer)), top_revenue_per_customer['revenue_per_customer'], 
-                      color='teal', alpha=0.8, edgecolor='darkcyan', linewidth=1)
-        plt.title('Revenue per Customer by State (Top 15)', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('States', fontsize=12)
-        plt.ylabel('Revenue per Customer (R$)', fontsize=12)
-        plt.xticks(range(len(top_revenue_per_customer)), top_revenue_per_customer['state'], rotation=45, ha='right')
-        
-        # Add value labels
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'R${height:.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-        
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('reports/09_revenue_per_customer_by_state.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 10. Comprehensive Opportunity Matrix Heatmap
-        plt.figure(figsize=(14, 10))
-        
-        # Select top 20 states for the heatmap
-        top_20_states = self.expansion_opportunities.head(20)
-        
-        # Create matrix data for heatmap
-        heatmap_data = top_20_states[['market_opportunity_score', 'market_potential_score', 
-                                     'seller_efficiency_score', 'delivery_efficiency_score']].fillna(0)
-        heatmap_data.index = top_20_states['state']
-        heatmap_data.columns = ['Market Opportunity', 'Market Potential', 'Seller Efficiency', 'Delivery Efficiency']
-        
-        # Create heatmap
-        sns.heatmap(heatmap_data, annot=True, cmap='RdYlGn', center=0.5, 
-                   fmt='.3f', cbar_kws={'label': 'Score'}, 
-                   linewidths=0.5, square=False)
-        plt.title('Market Expansion Opportunity Matrix (Top 20 States)', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Opportunity Dimensions', fontsize=12)
-        plt.ylabel('States', fontsize=12)
-        plt.xticks(rotation=45, ha='right')
-        plt.yticks(rotation=0)
-        
-        plt.tight_layout()
-        plt.savefig('reports/10_opportunity_matrix_heatmap.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info("Successfully created 10 individual market expansion visualizations")
-        
-        return True
+            renderer.add('08_penetration_vs_population.png', _plot_penetration_vs_population,
+                         self.state_summary.dropna(subset=['penetration_rate', 'population'])[
+                             ['population', 'penetration_rate', 'combined_opportunity_score']])
+        renderer.add('09_revenue_per_customer_by_state.png', _plot_revenue_per_customer,
+                     self.state_summary.nlargest(15, 'revenue_per_customer')[['state', 'revenue_per_customer']])
+        renderer.add('10_opportunity_matrix_heatmap.png', _plot_opportunity_heatmap,
+                     self.expansion_opportunities.head(20)[['state', 'market_opportunity_score', 'market_potential_score',
+                                                           'seller_efficiency_score', 'delivery_efficiency_score']])
+        
+        status = renderer.render()
+        
+        logger.info(f"Successfully created {len(status)} individual market expansion visualizations")
+        
+        return status
     
     def generate_report(self):
         """
@@ -845,6 +937,8 @@ class MarketExpansionAnalyzer:
         """
         logger.info("Generating market expansion analysis report...")
         
+        purchase_dates = self.load_table('orders', 'report')['order_purchase_timestamp']
+        
         report_content = f"""# Market Expansion Analysis Report
 Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
@@ -882,7 +976,15 @@ efficiency, and provides actionable recommendations for geographic expansion.
         for i, (_, row) in enumerate(top_10.iterrows(), 1):
             untapped = row.get('untapped_customers', 0)
             report_content += f"| {i} | {row['state']} | {row['combined_opportunity_score']:.3f} | {int(row['customer_count']):,} | {int(row['seller_count']):,} | {int(untapped):,} |\n"
-        
+
+        if self.city_opportunities is not None:
+            report_content += f"\n### Top 10 City Opportunities ({len(self.city_opportunities):,} cities scored)\n\n"
+            report_content += "| Rank | City | State | Opportunity Score | Customers | Seller Gap | Untapped Potential |\n"
+            report_content += "|------|------|-------|------------------|-----------|------------|-------------------|\n"
+
+            for _, row in select_top_cities(self.city_opportunities, k=10, per_state=False).iterrows():
+                report_content += f"| {row['national_rank']} | {row['city']} | {row['state']} | {row['combined_opportunity_score']:.3f} | {int(row['customer_count']):,} | {int(row['seller_gap']):,} | {int(row['untapped_customers']):,} |\n"
+
         report_content += f"""
 ### Delivery Performance Analysis
 
@@ -922,7 +1024,7 @@ Average delivery performance across states:
 
 This analysis used the following data sources and methods:
 - **Data Sources**: Brazilian e-commerce dataset with orders, customers, sellers, and geographic information
-- **Analysis Period**: {self.orders_df['order_purchase_timestamp'].min().strftime('%Y-%m-%d')} to {self.orders_df['order_purchase_timestamp'].max().strftime('%Y-%m-%d')}
+- **Analysis Period**: {purchase_dates.min().strftime('%Y-%m-%d')} to {purchase_dates.max().strftime('%Y-%m-%d')}
 - **Geographic Scope**: All Brazilian states and major cities
 - **Key Metrics**: Market penetration, seller distribution efficiency, delivery performance, untapped potential
 
@@ -948,6 +1050,68 @@ This analysis used the following data sources and methods:
         logger.info("Market expansion analysis report saved to reports/market_expansion_report.md")
         return report_content
     
+    @classmethod
+    def results_source_versions(cls, cleaned_dir: str = DEFAULT_CLEANED_DIR) -> dict:
+        """
+        Versions of the inputs the expansion results depend on.
+        
+        Args:
+            cleaned_dir (str): Directory of the cleaned tables read through load_table
+            
+        Returns:
+            dict: Feature snapshot, OLAP cube, cleaned tables, current reference data and
+                result schema versions
+        """
+        reference_versions = {level: entry.get('current') for level, entry in read_reference_manifest().items()}
+        cleaned_tables = {table for tables in cls.REQUIRED_COLUMNS.values() for table in tables}
+        return {
+            'features': get_feature_version(),
+            'cube': published_cube_version(),
+            'cleaned': cleaned_data_version(cleaned_tables, cleaned_dir),
+            'reference': json.dumps(reference_versions, sort_keys=True),
+            'schema': cls.RESULTS_SCHEMA_VERSION
+        }
+    
+    def materialize_results(self, results_dir: str = DEFAULT_RESULTS_DIR) -> str:
+        """
+        Persist state summary, opportunities, recommendations and insights for the dashboard.
+        
+        Args:
+            results_dir (str): Root directory of materialized results
+            
+        Returns:
+            str: Version id of the published results
+        """
+        if self.expansion_opportunities is None:
+            raise ValueError("Run generate_expansion_opportunity_matrix before materializing results")
+        
+        tables = {
+            'state_summary': self.state_summary,
+            'expansion_opportunities': self.expansion_opportunities
+        }
+        if self.city_opportunities is not None:
+            tables['city_opportunities'] = self.city_opportunities
+        
+        return materialize_results(
+            self.RESULTS_ANALYSIS, tables,
+            objects={'recommendations': self.recommendations, 'insights': self.insights},
+            source_versions=self.results_source_versions(),
+            results_dir=results_dir
+        )
+    
+    def run_analysis_steps(self):
+        """
+        Run every analysis step whose results are materialized, without charts or report.
+        """
+        self.analyze_market_penetration()
+        self.calculate_untapped_potential()
+        self.evaluate_seller_distribution()
+        self.analyze_delivery_performance_by_geography()
+        self.generate_expansion_opportunity_matrix()
+        self.score_city_opportunities()
+        self.analyze_weight_sensitivity()
+        self.simulate_untapped_potential()
+    
     def run_complete_analysis(self):
         """
         Run the complete market expansion analysis pipeline.
@@ -961,11 +1125,7 @@ This analysis used the following data sources and methods:
         
         # Run analysis steps
         try:
-            self.analyze_market_penetration()
-            self.calculate_untapped_potential()
-            self.evaluate_seller_distribution()
-            self.analyze_delivery_performance_by_geography()
-            self.generate_expansion_opportunity_matrix()
+            self.run_analysis_steps()
             
             # Create visualizations
             self.create_visualizations()
@@ -973,6 +1133,9 @@ This analysis used the following data sources and methods:
             # Generate report
             self.generate_report()
             
+            # Persist results for the dashboard
+            self.materialize_results()
+            
             logger.info("Market expansion analysis completed successfully!")
             return True
             
@@ -980,6 +1143,235 @@ This analysis used the following data sources and methods:
             logger.error(f"Error during analysis: {str(e)}")
             return False
 
+def _plot_market_penetration(top_states):
+    """Market Penetration by State (Top 15)."""
+    plt.figure(figsize=(14, 8))
+    bars = plt.bar(range(len(top_states)), top_states['customer_count'], 
+                  color='steelblue', alpha=0.8, edgecolor='navy', linewidth=1)
+    plt.title('Market Penetration by State (Top 15)', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('States', fontsize=12)
+    plt.ylabel('Number of Customers', fontsize=12)
+    plt.xticks(range(len(top_states)), top_states['state'], rotation=45, ha='right')
+    
+    # Add value labels on bars
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
+                f'{int(height):,}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    
+    plt.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+
+def _plot_opportunity_scores(top_opportunities):
+    """Expansion Opportunity Score by State (Top 15)."""
+    plt.figure(figsize=(14, 8))
+    bars = plt.bar(range(len(top_opportunities)), top_opportunities['combined_opportunity_score'], 
+                  color='orange', alpha=0.8, edgecolor='darkorange', linewidth=1)
+    plt.title('Expansion Opportunity Score (Top 15)', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('States', fontsize=12)
+    plt.ylabel('Combined Opportunity Score', fontsize=12)
+    plt.xticks(range(len(top_opportunities)), top_opportunities['state'], rotation=45, ha='right')
+    
+    # Add value labels
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
+                f'{height:.3f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    
+    plt.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+
+def _plot_customer_seller_ratio(ratio_data):
+    """Customer to Seller Ratio Analysis (extreme outliers filtered out)."""
+    plt.figure(figsize=(12, 8))
+    scatter = plt.scatter(ratio_data['customer_count'], ratio_data['customer_to_seller_ratio'], 
+                        c=ratio_data['combined_opportunity_score'], cmap='viridis', 
+                        alpha=0.7, s=80, edgecolors='black', linewidth=0.5)
+    plt.title('Customer-Seller Ratio vs Market Size', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('Number of Customers', fontsize=12)
+    plt.ylabel('Customer to Seller Ratio', fontsize=12)
+    plt.axhline(y=50, color='red', linestyle='--', alpha=0.8, linewidth=2, label='Seller Shortage Threshold (50:1)')
+    plt.legend(fontsize=11)
+    
+    # Add colorbar
+    cbar = plt.colorbar(scatter)
+    cbar.set_label('Opportunity Score', fontsize=12)
+    
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+
+def _plot_delivery_vs_opportunity(delivery_data):
+    """Delivery Performance vs Market Opportunity."""
+    plt.figure(figsize=(12, 8))
+    scatter = plt.scatter(delivery_data['avg_delivery_days'], delivery_data['combined_opportunity_score'],
+                        c=delivery_data['customer_count'], cmap='plasma', alpha=0.7, s=80, 
+                        edgecolors='black', linewidth=0.5)
+    plt.title('Delivery Performance vs Expansion Opportunity', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('Average Delivery Days', fontsize=12)
+    plt.ylabel('Combined Opportunity Score', fontsize=12)
+    
+    # Add colorbar
+    cbar = plt.colorbar(scatter)
+    cbar.set_label('Customer Count', fontsize=12)
+    
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+
+def _plot_untapped_revenue(top_potential):
+    """Untapped Revenue Potential (Top 10)."""
+    plt.figure(figsize=(12, 8))
+    bars = plt.barh(range(len(top_potential)), top_potential['untapped_revenue_potential']/1000000, 
+                   color='green', alpha=0.8, edgecolor='darkgreen', linewidth=1)
+    plt.title('Untapped Revenue Potential (Top 10)', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('Potential Revenue (Millions R$)', fontsize=12)
+    plt.ylabel('States', fontsize=12)
+    plt.yticks(range(len(top_potential)), top_potential['state'])
+    
+    # Add value labels
+    for i, bar in enumerate(bars):
+        width = bar.get_width()
+        plt.text(width + width*0.01, bar.get_y() + bar.get_height()/2.,
+                f'R${width:.1f}M', ha='left', va='center', fontsize=11, fontweight='bold')
+    
+    plt.grid(axis='x', alpha=0.3)
+    plt.tight_layout()
+
+def _plot_priority_distribution(priority_counts):
+    """Expansion Priority Distribution."""
+    plt.figure(figsize=(10, 8))
+    colors = ['#ff4444', '#ff8800', '#ffdd00', '#88dd88']
+    wedges, texts, autotexts = plt.pie(priority_counts.values, labels=priority_counts.index, 
+                                      autopct='%1.1f%%', colors=colors, startangle=90,
+                                      textprops={'fontsize': 12})
+    plt.title('Expansion Priority Distribution', fontsize=16, fontweight='bold', pad=20)
+    
+    # Enhance text visibility
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    
+    plt.tight_layout()
+
+def _plot_seller_gap(top_gaps):
+    """Seller Gap Analysis (Top 10)."""
+    plt.figure(figsize=(12, 8))
+    bars = plt.bar(range(len(top_gaps)), top_gaps['seller_gap'], 
+                  color='purple', alpha=0.8, edgecolor='darkviolet', linewidth=1)
+    plt.title('Seller Gap Analysis (Top 10)', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('States', fontsize=12)
+    plt.ylabel('Additional Sellers Needed', fontsize=12)
+    plt.xticks(range(len(top_gaps)), top_gaps['state'], rotation=45, ha='right')
+    
+    # Add value labels
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
+                f'{int(height)}', ha='center', va='bottom', fontsize=11, fontweight='bold')
+    
+    plt.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+
+def _plot_penetration_vs_population(pop_data):
+    """Market Penetration Rate vs Population."""
+    plt.figure(figsize=(12, 8))
+    scatter = plt.scatter(pop_data['population']/1000000, pop_data['penetration_rate'],
+                        c=pop_data['combined_opportunity_score'], cmap='coolwarm', 
+                        alpha=0.7, s=80, edgecolors='black', linewidth=0.5)
+    plt.title('Market Penetration Rate vs Population', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('Population (Millions)', fontsize=12)
+    plt.ylabel('Penetration Rate (customers per 1000)', fontsize=12)
+    
+    # Add colorbar
+    cbar = plt.colorbar(scatter)
+    cbar.set_label('Opportunity Score', fontsize=12)
+    
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+
+def _plot_revenue_per_customer(top_revenue_per_customer):
+    """Revenue per Customer by State (Top 15)."""
+    plt.figure(figsize=(14, 8))
+    bars = plt.bar(range(len(top_revenue_per_customer)), top_revenue_per_customer['revenue_per_customer'], 
+                  color='teal', alpha=0.8, edgecolor='darkcyan', linewidth=1)
+    plt.title('Revenue per Customer by State (Top 15)', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('States', fontsize=12)
+    plt.ylabel('Revenue per Customer (R$)', fontsize=12)
+    plt.xticks(range(len(top_revenue_per_customer)), top_revenue_per_customer['state'], rotation=45, ha='right')
+    
+    # Add value labels
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
+                f'R${height:.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    
+    plt.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+
+def _plot_opportunity_heatmap(top_20_states):
+    """Comprehensive Opportunity Matrix Heatmap (Top 20 States)."""
+    plt.figure(figsize=(14, 10))
+    
+    # Create matrix data for heatmap
+    heatmap_data = top_20_states[['market_opportunity_score', 'market_potential_score', 
+                                 'seller_efficiency_score', 'delivery_efficiency_score']].fillna(0)
+    heatmap_data.index = top_20_states['state']
+    heatmap_data.columns = ['Market Opportunity', 'Market Potential', 'Seller Efficiency', 'Delivery Efficiency']
+    
+    # Create heatmap
+    sns.heatmap(heatmap_data, annot=True, cmap='RdYlGn', center=0.5, 
+               fmt='.3f', cbar_kws={'label': 'Score'}, 
+               linewidths=0.5, square=False)
+    plt.title('Market Expansion Opportunity Matrix (Top 20 States)', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('Opportunity Dimensions', fontsize=12)
+    plt.ylabel('States', fontsize=12)
+    plt.xticks(rotation=45, ha='right')
+    plt.yticks(rotation=0)
+    
+    plt.tight_layout()
+
+def select_top_cities(city_opportunities: pd.DataFrame, k: int = 10, states=None,
+                      per_state: bool = True) -> pd.DataFrame:
+    """
+    Select top cities from precomputed city opportunity scores.
+
+    Uses the state_rank / national_rank columns computed by
+    MarketExpansionAnalyzer.score_city_opportunities, so no scores are recomputed.
+
+    Args:
+        city_opportunities (pd.DataFrame): Output of score_city_opportunities()
+        k (int): Number of cities per state (or overall when per_state is False)
+        states: State code or list of state codes to restrict to, defaults to all states
+        per_state (bool): Whether k applies within each state or nationally
+
+    Returns:
+        pd.DataFrame: Top cities, ordered by state and state_rank (per state) or national_rank
+    """
+    selected = city_opportunities
+    if states is not None:
+        states = [states] if isinstance(states, str) else list(states)
+        selected = selected[selected['state'].isin(states)]
+    
+    if per_state:
+        return selected[selected['state_rank'] <= k]
+    return selected.nsmallest(k, 'national_rank')
+
+def load_expansion_results(results_dir: str = DEFAULT_RESULTS_DIR):
+    """
+    Load materialized market expansion results if they match the current inputs.
+    
+    Args:
+        results_dir (str): Root directory of materialized results
+        
+    Returns:
+        dict: state_summary, expansion_opportunities, city_opportunities (DataFrames),
+            recommendations and insights, or None if missing or stale
+    """
+    return load_materialized_results(
+        MarketExpansionAnalyzer.RESULTS_ANALYSIS,
+        source_versions=MarketExpansionAnalyzer.results_source_versions(),
+        results_dir=results_dir
+    )
+
 def main():
     """Main function to run market expansion analysis."""
     analyzer = MarketExpansionAnalyzer()
@@ -0,0 +1,345 @@
+"""
+OLAP Cube Module for Brazilian E-commerce Dataset
+
+This module materializes additive order measures at the finest useful grain
+(state, city, year, month, product category, payment type, installment bucket
+and delivery accuracy) once after feature engineering. Analyzers and dashboard
+pages roll the cube up to the dimensions they need instead of re-aggregating
+raw order rows.
+
+Only additive measures are stored (sums and counts), so any roll-up is exact.
+Averages and rates are derived from them after aggregation. Distinct counts
+(e.g. unique customers) and medians are not additive and stay on row data.
+
+Attribution rules:
+    - Item measures (revenue, freight, item_count) go to each item's own category.
+    - Order measures (orders, payments, reviews, delivery) go to the order's
+      primary category, i.e. the category with the highest item revenue.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_store import DEFAULT_STORE_DIR, FeatureStore, read_feature_dataset
+from data_cache import DEFAULT_CLEANED_DIR, cleaned_data_version
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CUBE_DATASET_NAME = 'olap_cube'
+
+# Cleaned tables the cube is built from; their version is recorded with the published cube
+CUBE_SOURCE_TABLES = ['orders', 'order_items', 'customers', 'products', 'order_payments', 'order_reviews']
+
+CUBE_DIMENSIONS = [
+    'customer_state', 'customer_city', 'order_year', 'order_month', 'product_category',
+    'payment_type', 'installment_bucket', 'delivery_accuracy'
+]
+
+ORDER_MEASURES = [
+    'order_count', 'payment_count', 'payment_value_sum', 'installments_sum',
+    'review_score_sum', 'review_count', 'on_time_count', 'on_time_known_count',
+    'delivery_days_count', 'delivery_days_sum', 'delivery_days_sq_sum'
+]
+ITEM_MEASURES = ['revenue', 'freight', 'item_count']
+CUBE_MEASURES = ORDER_MEASURES + ITEM_MEASURES
+
+# Same buckets as the installment/satisfaction analysis
+INSTALLMENT_BINS = [0, 1, 3, 6, 12, float('inf')]
+INSTALLMENT_LABELS = ['Single Payment', '2-3 Installments', '4-6 Installments',
+                      '7-12 Installments', '12+ Installments']
+
+
+def _primary_by_weight(df: pd.DataFrame, key: str, label: str, weight: str) -> pd.DataFrame:
+    """Pick the label with the largest weight per key (ties broken alphabetically)."""
+    ranked = df.sort_values([key, weight, label], ascending=[True, False, True])
+    return ranked.drop_duplicates(key)[[key, label]]
+
+
+class OLAPCube:
+    """
+    Pre-aggregated cube of additive order measures with a roll-up API.
+    """
+
+    def __init__(self, cells: pd.DataFrame):
+        """
+        Initialize the cube from materialized cells.
+
+        Args:
+            cells (pd.DataFrame): One row per dimension combination with CUBE_MEASURES columns
+        """
+        missing = [col for col in CUBE_DIMENSIONS + CUBE_MEASURES if col not in cells.columns]
+        if missing:
+            raise ValueError(f"Cube cells are missing columns: {missing}")
+        self.cells = cells
+
+    @classmethod
+    def build(cls, orders: pd.DataFrame, order_items: pd.DataFrame, customers: pd.DataFrame,
+              products: Optional[pd.DataFrame] = None, payments: Optional[pd.DataFrame] = None,
+              reviews: Optional[pd.DataFrame] = None) -> 'OLAPCube':
+        """
+        Build the cube from order-level and item-level tables.
+
+        Args:
+            orders (pd.DataFrame): Orders with order_year, order_month and delivery features
+            order_items (pd.DataFrame): Order items with price and freight_value
+            customers (pd.DataFrame): Customers with state and city
+            products (Optional[pd.DataFrame]): Products with product_category_name_english
+            payments (Optional[pd.DataFrame]): Order payments
+            reviews (Optional[pd.DataFrame]): Order reviews
+
+        Returns:
+            OLAPCube: Cube materialized at the finest grain
+        """
+        logger.info("Building OLAP cube...")
+
+        # Order dimensions
+        order_cols = ['order_id', 'customer_id', 'order_year', 'order_month', 'delivery_accuracy',
+                      'delivery_days', 'on_time_delivery']
+        facts = orders[[col for col in order_cols if col in orders.columns]].copy()
+        for col in order_cols:
+            if col not in facts.columns:
+                facts[col] = np.nan
+        facts = facts.merge(customers[['customer_id', 'customer_state', 'customer_city']],
+                            on='customer_id', how='left')
+
+        # Payments: dominant type, max installments, total value per order
+        if payments is not None and not payments.empty:
+            type_counts = payments.groupby(['order_id', 'payment_type']).size().reset_index(name='n')
+            payment_orders = _primary_by_weight(type_counts, 'order_id', 'payment_type', 'n')
+            payment_totals = payments.groupby('order_id').agg(
+                payment_installments=('payment_installments', 'max'),
+                payment_value=('payment_value', 'sum')
+            ).reset_index()
+            facts = facts.merge(payment_orders.merge(payment_totals, on='order_id'), on='order_id', how='left')
+        else:
+            facts['payment_type'] = np.nan
+            facts['payment_installments'] = np.nan
+            facts['payment_value'] = np.nan
+
+        facts['installment_bucket'] = pd.cut(
+            facts['payment_installments'], bins=INSTALLMENT_BINS, labels=INSTALLMENT_LABELS,
+            include_lowest=True
+        ).astype(object)
+
+        # Reviews: additive sum and count per order
+        if reviews is not None and not reviews.empty:
+            review_totals = reviews.groupby('order_id')['review_score'].agg(['sum', 'count']).reset_index()
+            review_totals.columns = ['order_id', 'review_score_sum', 'review_count']
+            facts = facts.merge(review_totals, on='order_id', how='left')
+        else:
+            facts['review_score_sum'] = 0.0
+            facts['review_count'] = 0
+
+        # Item lines by category
+        items = order_items[['order_id', 'product_id', 'price', 'freight_value']]
+        if products is not None and 'product_category_name_english' in products.columns:
+            items = items.merge(products[['product_id', 'product_category_name_english']],
+                                on='product_id', how='left')
+            items = items.rename(columns={'product_category_name_english': 'product_category'})
+        else:
+            items = items.assign(product_category=np.nan)
+
+        item_lines = items.groupby(['order_id', 'product_category'], dropna=False).agg(
+            revenue=('price', 'sum'),
+            freight=('freight_value', 'sum'),
+            item_count=('price', 'size')
+        ).reset_index()
+        primary_category = _primary_by_weight(
+            item_lines.dropna(subset=['product_category']), 'order_id', 'product_category', 'revenue'
+        )
+        facts = facts.merge(primary_category, on='order_id', how='left')
+
+        # Order-level measures
+        delivery_days = pd.to_numeric(facts['delivery_days'], errors='coerce')
+        on_time = facts['on_time_delivery'].map({True: 1, False: 0, 'True': 1, 'False': 0})
+        order_measures = pd.DataFrame({
+            'order_count': 1,
+            'payment_count': facts['payment_value'].notna().astype(int),
+            'payment_value_sum': facts['payment_value'].fillna(0.0),
+            'installments_sum': facts['payment_installments'].where(facts['payment_value'].notna()).fillna(0),
+            'review_score_sum': facts['review_score_sum'].fillna(0.0),
+            'review_count': facts['review_count'].fillna(0).astype(int),
+            'on_time_count': on_time.fillna(0).astype(int),
+            'on_time_known_count': on_time.notna().astype(int),
+            'delivery_days_count': delivery_days.notna().astype(int),
+            'delivery_days_sum': delivery_days.fillna(0.0),
+            'delivery_days_sq_sum': (delivery_days ** 2).fillna(0.0)
+        }, index=facts.index)
+
+        dimension_cols = [dim for dim in CUBE_DIMENSIONS if dim != 'product_category']
+        order_facts = pd.concat([facts[dimension_cols + ['product_category']], order_measures], axis=1)
+
+        # Item-level measures carry the dimensions of their order and their own category
+        item_facts = item_lines.merge(facts[['order_id'] + dimension_cols], on='order_id', how='inner')
+        item_facts = item_facts.drop(columns='order_id')
+
+        combined = pd.concat([order_facts, item_facts], ignore_index=True, sort=False)
+        combined[CUBE_MEASURES] = combined[CUBE_MEASURES].fillna(0)
+
+        cells = combined.groupby(CUBE_DIMENSIONS, dropna=False, observed=True)[CUBE_MEASURES].sum().reset_index()
+        count_measures = [col for col in CUBE_MEASURES if col.endswith('_count')]
+        cells[count_measures] = cells[count_measures].astype('int64')
+        logger.info(f"Built OLAP cube with {len(cells):,} cells from {len(facts):,} orders")
+        return cls(cells)
+
+    @classmethod
+    def load(cls, source_version: Optional[str] = None, store_dir: str = DEFAULT_STORE_DIR,
+             **read_kwargs) -> Optional['OLAPCube']:
+        """
+        Load the cube from the active feature store snapshot.
+
+        Args:
+            source_version (Optional[str]): Version of the cleaned cube source tables the
+                caller analyses; a cube built from other (or unrecorded) inputs is not loaded
+            store_dir (str): Root directory of the feature store
+
+        Returns:
+            Optional[OLAPCube]: Loaded cube, or None if no matching cube has been published
+        """
+        if source_version is not None:
+            entry = FeatureStore(store_dir).read_manifest().get('datasets', {}).get(CUBE_DATASET_NAME, {})
+            if entry.get('source_version') != source_version:
+                logger.warning(f"Published OLAP cube was built from other cleaned data "
+                               f"({entry.get('source_version')} != {source_version}); not using it")
+                return None
+        try:
+            cells = read_feature_dataset(CUBE_DATASET_NAME, store_dir=store_dir, **read_kwargs)
+        except FileNotFoundError:
+            logger.warning("OLAP cube not found; run feature engineering to build it")
+            return None
+        missing = [col for col in CUBE_DIMENSIONS + CUBE_MEASURES if col not in cells.columns]
+        if missing:
+            logger.warning(f"Published OLAP cube is outdated (missing {missing}); rebuild it with feature engineering")
+            return None
+        return cls(cells)
+
+    def rollup(self, dimensions: Optional[List[str]] = None, measures: Optional[List[str]] = None,
+               filters: Optional[Dict] = None, derived: bool = True, dropna: bool = True) -> pd.DataFrame:
+        """
+        Aggregate the cube to a subset of its dimensions.
+
+        Args:
+            dimensions (Optional[List[str]]): Dimensions to keep, an empty list gives grand totals
+            measures (Optional[List[str]]): Additive measures to sum, defaults to all
+            filters (Optional[Dict]): Dimension -> value or list of values to keep
+            derived (bool): Whether to add averages and rates computed from the sums
+            dropna (bool): Whether to drop groups with a missing dimension value
+
+        Returns:
+            pd.DataFrame: One row per combination of the requested dimensions
+        """
+        dimensions = list(dimensions or [])
+        measures = list(measures or CUBE_MEASURES)
+        unknown = set(dimensions) - set(CUBE_DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions: {sorted(unknown)}")
+        unknown = set(measures) - set(CUBE_MEASURES)
+        if unknown:
+            raise ValueError(f"Unknown cube measures: {sorted(unknown)}")
+
+        cells = self.cells
+        for dimension, value in (filters or {}).items():
+            if dimension not in CUBE_DIMENSIONS:
+                raise ValueError(f"Unknown cube dimension: {dimension}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            cells = cells[cells[dimension].isin(values)]
+
+        if dimensions:
+            result = cells.groupby(dimensions, dropna=dropna, observed=True)[measures].sum().reset_index()
+        else:
+            result = cells[measures].sum().to_frame().T
+
+        return self.add_derived_measures(result) if derived else result
+
+    @staticmethod
+    def add_derived_measures(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add averages and rates computed from additive measures.
+
+        Args:
+            df (pd.DataFrame): Rolled-up cube
+
+        Returns:
+            pd.DataFrame: Same frame with derived columns where their inputs are present
+        """
+        def ratio(numerator, denominator):
+            return df[numerator] / df[denominator].replace(0, np.nan)
+
+        if {'revenue', 'freight', 'order_count'} <= set(df.columns):
+            df['avg_order_value'] = (df['revenue'] + df['freight']) / df['order_count'].replace(0, np.nan)
+        if {'payment_value_sum', 'payment_count'} <= set(df.columns):
+            df['avg_payment_value'] = ratio('payment_value_sum', 'payment_count')
+        if {'installments_sum', 'payment_count'} <= set(df.columns):
+            df['avg_installments'] = ratio('installments_sum', 'payment_count')
+        if {'review_score_sum', 'review_count'} <= set(df.columns):
+            df['avg_review_score'] = ratio('review_score_sum', 'review_count')
+        if {'on_time_count', 'order_count'} <= set(df.columns):
+            df['on_time_rate'] = ratio('on_time_count', 'order_count')
+        if {'on_time_count', 'on_time_known_count'} <= set(df.columns):
+            df['delivered_on_time_rate'] = ratio('on_time_count', 'on_time_known_count')
+        if {'delivery_days_sum', 'delivery_days_count'} <= set(df.columns):
+            df['avg_delivery_days'] = ratio('delivery_days_sum', 'delivery_days_count')
+        if {'delivery_days_sum', 'delivery_days_sq_sum', 'delivery_days_count'} <= set(df.columns):
+            n = df['delivery_days_count']
+            variance = (df['delivery_days_sq_sum'] - df['delivery_days_sum'] ** 2 / n.replace(0, np.nan)) / (n - 1).where(n > 1)
+            df['delivery_days_std'] = np.sqrt(variance.clip(lower=0))
+        return df
+
+
+def build_olap_cube(datasets: Dict[str, pd.DataFrame], enhanced_orders: Optional[pd.DataFrame] = None) -> OLAPCube:
+    """
+    Build the cube from cleaned datasets.
+
+    Args:
+        datasets (Dict[str, pd.DataFrame]): Cleaned datasets keyed by name
+        enhanced_orders (Optional[pd.DataFrame]): Orders with delivery features, defaults to datasets['orders']
+
+    Returns:
+        OLAPCube: Materialized cube
+    """
+    orders = enhanced_orders if enhanced_orders is not None else datasets['orders']
+    return OLAPCube.build(
+        orders=orders,
+        order_items=datasets['order_items'],
+        customers=datasets['customers'],
+        products=datasets.get('products'),
+        payments=datasets.get('order_payments'),
+        reviews=datasets.get('order_reviews')
+    )
+
+
+def load_olap_cube(source_version: Optional[str] = None, cleaned_dir: str = DEFAULT_CLEANED_DIR,
+                   **read_kwargs) -> Optional[OLAPCube]:
+    """
+    Load the published cube, or None if it is not available or stale.
+
+    Args:
+        source_version (Optional[str]): Expected version of the cleaned cube source tables,
+            defaults to the current version of the tables in ``cleaned_dir``
+        cleaned_dir (str): Directory of the cleaned tables the caller analyses
+
+    Returns:
+        Optional[OLAPCube]: Cube from the active feature store snapshot
+    """
+    if source_version is None:
+        source_version = cleaned_data_version(CUBE_SOURCE_TABLES, cleaned_dir)
+    return OLAPCube.load(source_version, **read_kwargs)
+
+
+def published_cube_version(store_dir: str = DEFAULT_STORE_DIR) -> str:
+    """
+    Content hash of the cube in the active feature store snapshot.
+
+    Args:
+        store_dir (str): Root directory of the feature store
+
+    Returns:
+        str: SHA-256 of the published cube file, or 'none' if no cube is published
+    """
+    entry = FeatureStore(store_dir).read_manifest().get('datasets', {}).get(CUBE_DATASET_NAME)
+    return entry['sha256'] if entry else 'none'
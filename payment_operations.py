@@ -15,6 +15,10 @@ from plotly.subplots import make_subplots
 import warnings
 from datetime import datetime
 import logging
+from feature_store import read_feature_dataset
+from data_cache import load_cleaned_table
+from olap_cube import OLAPCube, load_olap_cube
+from report_renderer import ReportFigureRenderer
 
 # Configure logging and warnings
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -34,6 +38,7 @@ class PaymentOperationsAnalyzer:
         """Initialize the analyzer and load datasets."""
         self.payment_data = None
         self.customer_data = None
+        self.cube = None
         self.analysis_results = {}
         self.insights = []
         
@@ -46,7 +51,7 @@ class PaymentOperationsAnalyzer:
             logger.info("Loading payment operations and customer datasets...")
             
             # Load payment operations data (feature-engineered)
-            self.payment_data = pd.read_csv('data/feature_engineered/payment_operations.csv')
+            self.payment_data = read_feature_dataset('payment_operations')
             
             # Convert datetime columns
             datetime_cols = ['order_purchase_timestamp', 'order_approved_at', 
@@ -58,7 +63,7 @@ class PaymentOperationsAnalyzer:
                     self.payment_data[col] = pd.to_datetime(self.payment_data[col], errors='coerce')
             
             # Load customer data for regional analysis
-            self.customer_data = pd.read_csv('data/cleaned/cleaned_customers.csv')
+            self.customer_data = load_cleaned_table('customers', columns=['customer_id', 'customer_state', 'customer_city'])
             
             # Merge customer location data with payment data
             self.payment_data = self.payment_data.merge(
@@ -67,6 +72,9 @@ class PaymentOperationsAnalyzer:
                 how='left'
             )
             
+            # Pre-aggregated cube for additive roll-ups (None if not built yet, or built from other cleaned data)
+            self.cube = load_olap_cube()
+            
             logger.info(f"Loaded payment data: {len(self.payment_data):,} records")
             logger.info(f"Payment methods available: {self.payment_data['payment_type'].unique()}")
             logger.info(f"States covered: {self.payment_data['customer_state'].nunique()}")
@@ -364,19 +372,30 @@ class PaymentOperationsAnalyzer:
             labels=['Lower Economic Segment', 'Middle Economic Segment', 'Higher Economic Segment']
         )
         
-        # Seasonal payment behavior
-        seasonal_payment = self.payment_data.groupby(['order_month', 'payment_type']).agg({
-            'payment_value': 'mean',
-            'payment_installments': 'mean',
-            'order_id': 'count'
-        }).reset_index()
-        
-        # Holiday season analysis
-        holiday_payment = self.payment_data.groupby(['is_holiday_season', 'payment_type']).agg({
-            'payment_value': 'mean',
-            'payment_installments': 'mean',
-            'order_id': 'count'
-        }).reset_index()
+        # Seasonal and holiday payment behavior
+        if self.cube is not None:
+            monthly = self.cube.rollup(
+                ['order_month', 'payment_type'],
+                measures=['payment_value_sum', 'installments_sum', 'payment_count', 'order_count'],
+                derived=False
+            )
+            seasonal_payment = self._payment_means(OLAPCube.add_derived_measures(monthly.copy()), 'order_month')
+            
+            monthly['is_holiday_season'] = monthly['order_month'].isin([11, 12])
+            holiday_totals = monthly.groupby(['is_holiday_season', 'payment_type']).sum(numeric_only=True).reset_index()
+            holiday_payment = self._payment_means(OLAPCube.add_derived_measures(holiday_totals), 'is_holiday_season')
+        else:
+            seasonal_payment = self.payment_data.groupby(['order_month', 'payment_type']).agg({
+                'payment_value': 'mean',
+                'payment_installments': 'mean',
+                'order_id': 'count'
+            }).reset_index()
+            
+            holiday_payment = self.payment_data.groupby(['is_holiday_season', 'payment_type']).agg({
+                'payment_value': 'mean',
+                'payment_installments': 'mean',
+                'order_id': 'count'
+            }).reset_index()
         
         self.analysis_results['regional_analysis'] = regional_analysis
         self.analysis_results['regional_payment_mix'] = regional_payment_mix
@@ -404,6 +423,15 @@ class PaymentOperationsAnalyzer:
             'holiday_patterns': holiday_payment
         }    
 
+    @staticmethod
+    def _payment_means(rollup, period_column):
+        """Shape a cube roll-up like the row-level payment groupby (means and order count)."""
+        return rollup.rename(columns={
+            'avg_payment_value': 'payment_value',
+            'avg_installments': 'payment_installments',
+            'order_count': 'order_id'
+        })[[period_column, 'payment_type', 'payment_value', 'payment_installments', 'order_id']]
+    
     def generate_operational_recommendations(self):
         """Generate actionable operational improvement recommendations."""
         logger.info("Generating operational improvement recommendations...")
@@ -483,118 +511,44 @@ class PaymentOperationsAnalyzer:
         
         return recommendations    
 
-    def create_visualizations(self):
-        """Create comprehensive visualizations for payment and operations analysis."""
+    def create_visualizations(self, draft: bool = False, max_workers: int = None, force: bool = False):
+        """
+        Create comprehensive visualizations for payment and operations analysis.
+
+        Charts are rendered in parallel by ReportFigureRenderer and skipped when
+        their input data is unchanged since the last run.
+
+        Args:
+            draft (bool): Render at draft resolution for quick iteration
+            max_workers (int): Rendering processes, defaults to the CPU count
+            force (bool): Redraw all charts even if their inputs are unchanged
+
+        Returns:
+            Dict[str, str]: Chart file name -> 'rendered', 'skipped' or 'failed'
+        """
         logger.info("Creating payment and operations visualizations...")
         
-        # Set up the plotting style
-        plt.rcParams['figure.figsize'] = (12, 8)
-        plt.rcParams['font.size'] = 10
+        renderer = ReportFigureRenderer('reports', draft=draft, max_workers=max_workers, force=force,
+                                        rc_params={'figure.figsize': (12, 8), 'font.size': 10})
         
-        visualizations = {}
-        
-        # 1. Payment Method Distribution
         if 'payment_distribution' in self.analysis_results:
-            fig, ax = plt.subplots(figsize=(10, 6))
-            payment_dist = self.analysis_results['payment_distribution']
-            
-            colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
-            bars = ax.bar(payment_dist.index, payment_dist.values, color=colors[:len(payment_dist)])
-            
-            ax.set_title('Payment Method Distribution', fontsize=16, fontweight='bold')
-            ax.set_ylabel('Percentage of Orders (%)')
-            ax.set_xlabel('Payment Method')
-            
-            # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                       f'{height:.1f}%', ha='center', va='bottom')
-            
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.savefig('reports/payment_method_distribution.png', dpi=300, bbox_inches='tight')
-            visualizations['payment_distribution'] = fig
+            renderer.add('payment_method_distribution.png', _plot_payment_distribution,
+                         self.analysis_results['payment_distribution'])
         
-        # 2. Satisfaction by Payment Method
         if 'payment_satisfaction' in self.analysis_results:
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-            payment_sat = self.analysis_results['payment_satisfaction']
-            
-            # Satisfaction scores
-            bars1 = ax1.bar(payment_sat.index, payment_sat['avg_satisfaction'], 
-                           color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'][:len(payment_sat)])
-            ax1.set_title('Average Satisfaction by Payment Method')
-            ax1.set_ylabel('Average Review Score')
-            ax1.set_ylim(0, 5)
-            
-            for bar in bars1:
-                height = bar.get_height()
-                ax1.text(bar.get_x() + bar.get_width()/2., height + 0.05,
-                        f'{height:.2f}', ha='center', va='bottom')
-            
-            # On-time delivery rates
-            bars2 = ax2.bar(payment_sat.index, payment_sat['on_time_delivery_rate'],
-                           color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'][:len(payment_sat)])
-            ax2.set_title('On-Time Delivery Rate by Payment Method')
-            ax2.set_ylabel('On-Time Delivery Rate (%)')
-            
-            for bar in bars2:
-                height = bar.get_height()
-                ax2.text(bar.get_x() + bar.get_width()/2., height + 1,
-                        f'{height:.1f}%', ha='center', va='bottom')
-            
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.savefig('reports/payment_satisfaction_analysis.png', dpi=300, bbox_inches='tight')
-            visualizations['payment_satisfaction'] = fig
+            renderer.add('payment_satisfaction_analysis.png', _plot_payment_satisfaction,
+                         self.analysis_results['payment_satisfaction'][['avg_satisfaction', 'on_time_delivery_rate']])
         
-        # 3. Regional Performance Heatmap
         if 'state_performance' in self.analysis_results:
-            fig, ax = plt.subplots(figsize=(12, 8))
-            state_perf = self.analysis_results['state_performance'].head(15)  # Top 15 states
-            
-            # Create heatmap data
-            heatmap_data = state_perf[['on_time_rate', 'avg_satisfaction', 'avg_delivery_days']].T
-            
-            sns.heatmap(heatmap_data, annot=True, fmt='.1f', cmap='RdYlGn', 
-                       ax=ax, cbar_kws={'label': 'Performance Score'})
-            ax.set_title('Regional Performance Heatmap (Top 15 States)', fontsize=16, fontweight='bold')
-            ax.set_xlabel('States')
-            ax.set_ylabel('Performance Metrics')
-            
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.savefig('reports/regional_performance_heatmap.png', dpi=300, bbox_inches='tight')
-            visualizations['regional_performance'] = fig
+            renderer.add('regional_performance_heatmap.png', _plot_regional_performance,
+                         self.analysis_results['state_performance'].head(15)[
+                             ['on_time_rate', 'avg_satisfaction', 'avg_delivery_days']])
         
-        # 4. Installment vs Satisfaction Analysis
         if 'installment_satisfaction' in self.analysis_results:
-            fig, ax = plt.subplots(figsize=(12, 6))
-            installment_sat = self.analysis_results['installment_satisfaction']
-            
-            x_pos = range(len(installment_sat))
-            bars = ax.bar(x_pos, installment_sat['avg_satisfaction'], 
-                         color='#45B7D1', alpha=0.7)
-            
-            ax.set_title('Customer Satisfaction by Installment Category', fontsize=16, fontweight='bold')
-            ax.set_ylabel('Average Satisfaction Score')
-            ax.set_xlabel('Installment Category')
-            ax.set_xticks(x_pos)
-            ax.set_xticklabels(installment_sat.index, rotation=45)
-            ax.set_ylim(0, 5)
-            
-            # Add value labels
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.05,
-                       f'{height:.2f}', ha='center', va='bottom')
-            
-            plt.tight_layout()
-            plt.savefig('reports/installment_satisfaction_analysis.png', dpi=300, bbox_inches='tight')
-            visualizations['installment_satisfaction'] = fig
+            renderer.add('installment_satisfaction_analysis.png', _plot_installment_satisfaction,
+                         self.analysis_results['installment_satisfaction'][['avg_satisfaction']])
         
-        return visualizations    
+        return renderer.render()
 
     def generate_comprehensive_report(self):
         """Generate a comprehensive payment and operations analysis report."""
@@ -719,6 +673,99 @@ class PaymentOperationsAnalyzer:
             raise
 
 
+def _plot_payment_distribution(payment_dist):
+    """Payment Method Distribution."""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+    bars = ax.bar(payment_dist.index, payment_dist.values, color=colors[:len(payment_dist)])
+    
+    ax.set_title('Payment Method Distribution', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Percentage of Orders (%)')
+    ax.set_xlabel('Payment Method')
+    
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+               f'{height:.1f}%', ha='center', va='bottom')
+    
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+def _plot_payment_satisfaction(payment_sat):
+    """Satisfaction and on-time delivery by Payment Method."""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    
+    # Satisfaction scores
+    bars1 = ax1.bar(payment_sat.index, payment_sat['avg_satisfaction'], 
+                   color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'][:len(payment_sat)])
+    ax1.set_title('Average Satisfaction by Payment Method')
+    ax1.set_ylabel('Average Review Score')
+    ax1.set_ylim(0, 5)
+    
+    for bar in bars1:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height + 0.05,
+                f'{height:.2f}', ha='center', va='bottom')
+    
+    # On-time delivery rates
+    bars2 = ax2.bar(payment_sat.index, payment_sat['on_time_delivery_rate'],
+                   color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'][:len(payment_sat)])
+    ax2.set_title('On-Time Delivery Rate by Payment Method')
+    ax2.set_ylabel('On-Time Delivery Rate (%)')
+    
+    for bar in bars2:
+        height = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., height + 1,
+                f'{height:.1f}%', ha='center', va='bottom')
+    
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+def _plot_regional_performance(state_perf):
+    """Regional Performance Heatmap (Top 15 States)."""
+    fig, ax = plt.subplots(figsize=(12, 8))
+    
+    # Create heatmap data
+    heatmap_data = state_perf[['on_time_rate', 'avg_satisfaction', 'avg_delivery_days']].T
+    
+    sns.heatmap(heatmap_data, annot=True, fmt='.1f', cmap='RdYlGn', 
+               ax=ax, cbar_kws={'label': 'Performance Score'})
+    ax.set_title('Regional Performance Heatmap (Top 15 States)', fontsize=16, fontweight='bold')
+    ax.set_xlabel('States')
+    ax.set_ylabel('Performance Metrics')
+    
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+def _plot_installment_satisfaction(installment_sat):
+    """Installment vs Satisfaction Analysis."""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    x_pos = range(len(installment_sat))
+    bars = ax.bar(x_pos, installment_sat['avg_satisfaction'], 
+                 color='#45B7D1', alpha=0.7)
+    
+    ax.set_title('Customer Satisfaction by Installment Category', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Average Satisfaction Score')
+    ax.set_xlabel('Installment Category')
+    ax.set_xticks(x_pos)
+    ax.set_xticklabels(installment_sat.index, rotation=45)
+    ax.set_ylim(0, 5)
+    
+    # Add value labels
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.05,
+               f'{height:.2f}', ha='center', va='bottom')
+    
+    plt.tight_layout()
+
+
 def main():
     """Main function to run the payment behavior and operations analysis."""
     print("🔄 Starting Payment Behavior and Operations Analysis...")
@@ -0,0 +1,579 @@
+"""
+Partition-Incremental Data Quality Statistics for Brazilian E-commerce Dataset
+
+Profiling every numeric column of every table on each run is wasteful when
+only the newest partition (e.g. the latest order month) has changed. This
+module keeps mergeable per-partition column statistics on disk:
+
+- row, value and null counts, min/max
+- mean and sum of squared deviations, merged with Chan's parallel formula
+- a quantile sketch with relative accuracy (logarithmic buckets, DDSketch
+  style) whose bucket counts simply add up when partitions are merged
+
+A new partition is profiled alone and merged into the table's global
+profile, so reports that only need these statistics render from a few small
+JSON files. Each partition's content signature (row count plus the sum of its
+row fingerprints) is stored with it, so a partition whose rows changed since it
+was profiled, e.g. a month that was still partial, is profiled again. The
+drift report compares a partition against the merged history of the other
+partitions.
+
+Layout on disk:
+    data/quality_stats/
+    └── <table>/
+        ├── global.json              # merged profile of all partitions
+        └── partitions/
+            └── <partition>.json     # profile of one partition
+"""
+
+import os
+import re
+import json
+import uuid
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from row_fingerprints import row_fingerprints
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_DIR = "data/quality_stats"
+GLOBAL_FILE = "global.json"
+PARTITIONS_DIR = "partitions"
+DEFAULT_RELATIVE_ACCURACY = 0.01
+MIN_INDEXABLE_VALUE = 1e-9
+
+# Timestamp used to split each table into monthly partitions
+DEFAULT_PARTITION_COLUMNS = {
+    'orders': 'order_purchase_timestamp',
+    'order_items': 'shipping_limit_date',
+    'order_reviews': 'review_creation_date'
+}
+
+# Population stability index thresholds and null rate change (percentage points) for drift
+PSI_WATCH = 0.1
+PSI_DRIFT = 0.25
+NULL_RATE_DRIFT = 5.0
+
+
+def partition_signature(df: pd.DataFrame) -> str:
+    """
+    Content signature of a partition, independent of row order.
+
+    Args:
+        df (pd.DataFrame): Partition rows
+
+    Returns:
+        str: Row count, column names hash and wrapped sum of the row fingerprints
+    """
+    columns = hashlib.sha256(repr(list(df.columns)).encode('utf-8')).hexdigest()[:8]
+    total = int(row_fingerprints(df).sum(dtype=np.uint64)) if len(df) else 0
+    return f"{len(df)}-{columns}-{total:016x}"
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch: values are counted in logarithmic buckets, so every
+    quantile is returned within ``relative_accuracy`` of a true value.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            relative_accuracy (float): Relative error bound of returned quantiles
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.positive.values()) + sum(self.negative.values())
+
+    def update(self, values: np.ndarray):
+        """Add finite values to the sketch."""
+        magnitude = np.abs(values)
+        self.zero_count += int((magnitude < MIN_INDEXABLE_VALUE).sum())
+        for buckets, part in ((self.positive, values[values >= MIN_INDEXABLE_VALUE]),
+                              (self.negative, -values[values <= -MIN_INDEXABLE_VALUE])):
+            keys, counts = np.unique(np.ceil(np.log(part) / self.log_gamma).astype(np.int64), return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                buckets[key] = buckets.get(key, 0) + count
+
+    def merge(self, other: 'QuantileSketch'):
+        """Add the counts of another sketch with the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches with different accuracies")
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+
+    def _buckets(self):
+        """Bucket representative values in ascending order with their counts."""
+        negative_keys = np.array(sorted(self.negative, reverse=True), dtype=np.float64)
+        positive_keys = np.array(sorted(self.positive), dtype=np.float64)
+        scale = 2 / (self.gamma + 1)
+        values = np.concatenate([-scale * self.gamma ** negative_keys, [0.0], scale * self.gamma ** positive_keys])
+        counts = np.concatenate([[self.negative[int(key)] for key in negative_keys], [self.zero_count],
+                                 [self.positive[int(key)] for key in positive_keys]])
+        return values, counts
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s).
+
+        Args:
+            q (float or array-like): Quantile level(s) in [0, 1]
+
+        Returns:
+            float or np.ndarray: Quantile value(s), NaN for an empty sketch
+        """
+        q_array = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        total = self.count
+        if total == 0:
+            result = np.full(len(q_array), np.nan)
+        else:
+            values, counts = self._buckets()
+            positions = np.searchsorted(np.cumsum(counts), q_array * (total - 1), side='right')
+            result = values[np.minimum(positions, len(values) - 1)]
+        return float(result[0]) if np.ndim(q) == 0 else result
+
+    def cdf(self, x):
+        """Approximate share of values at or below x (scalar or array)."""
+        total = self.count
+        values, counts = self._buckets()
+        cumulative = np.concatenate([[0], np.cumsum(counts)])
+        shares = cumulative[np.searchsorted(values, np.atleast_1d(x), side='right')] / max(total, 1)
+        return float(shares[0]) if np.ndim(x) == 0 else shares
+
+    def to_dict(self) -> Dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': {str(key): count for key, count in self.positive.items()},
+            'negative': {str(key): count for key, count in self.negative.items()},
+            'zero_count': self.zero_count
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'QuantileSketch':
+        sketch = cls(state['relative_accuracy'])
+        sketch.positive = {int(key): count for key, count in state['positive'].items()}
+        sketch.negative = {int(key): count for key, count in state['negative'].items()}
+        sketch.zero_count = state['zero_count']
+        return sketch
+
+
+class ColumnStats:
+    """
+    Mergeable statistics of one column: counts, extremes, moments and (for numeric
+    columns) a quantile sketch.
+    """
+
+    def __init__(self, dtype: str, numeric: bool, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Initialize empty statistics.
+
+        Args:
+            dtype (str): Column dtype
+            numeric (bool): Whether moments and quantiles are tracked
+            relative_accuracy (float): Relative accuracy of the quantile sketch
+        """
+        self.dtype = dtype
+        self.numeric = numeric
+        self.rows = 0
+        self.nulls = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch(relative_accuracy) if numeric else None
+
+    @classmethod
+    def from_series(cls, series: pd.Series, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> 'ColumnStats':
+        """
+        Profile a column.
+
+        Args:
+            series (pd.Series): Column values
+            relative_accuracy (float): Relative accuracy of the quantile sketch
+
+        Returns:
+            ColumnStats: Statistics of the column
+        """
+        numeric = pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+        stats = cls(str(series.dtype), numeric, relative_accuracy)
+        stats.rows = len(series)
+        stats.nulls = int(series.isna().sum())
+        if numeric:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[np.isfinite(values)]
+            stats.count = len(values)
+            if stats.count:
+                stats.min, stats.max = float(values.min()), float(values.max())
+                stats.mean = float(values.mean())
+                stats.m2 = float(((values - stats.mean) ** 2).sum())
+                stats.sketch.update(values)
+        else:
+            stats.count = stats.rows - stats.nulls
+        return stats
+
+    def merge(self, other: 'ColumnStats'):
+        """Merge the statistics of another partition into this one."""
+        if self.numeric and other.numeric and other.count:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+            self.mean += delta * other.count / total
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+            self.sketch.merge(other.sketch)
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.count += other.count
+
+    @property
+    def missing_percentage(self) -> float:
+        return self.nulls / self.rows * 100 if self.rows else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+    def quantile(self, q):
+        """Approximate quantile(s) of a numeric column."""
+        return self.sketch.quantile(q)
+
+    def to_dict(self) -> Dict:
+        state = {key: getattr(self, key) for key in ('dtype', 'numeric', 'rows', 'nulls', 'count',
+                                                     'min', 'max', 'mean', 'm2')}
+        state['sketch'] = self.sketch.to_dict() if self.sketch is not None else None
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'ColumnStats':
+        stats = cls(state['dtype'], state['numeric'])
+        for key in ('rows', 'nulls', 'count', 'min', 'max', 'mean', 'm2'):
+            setattr(stats, key, state[key])
+        stats.sketch = QuantileSketch.from_dict(state['sketch']) if state['sketch'] else None
+        return stats
+
+
+class TableProfile:
+    """
+    Column statistics of a table (or of one partition of it).
+    """
+
+    def __init__(self, rows: int = 0, columns: Optional[Dict[str, ColumnStats]] = None,
+                 partitions: Optional[List[str]] = None, signatures: Optional[Dict[str, str]] = None):
+        self.rows = rows
+        self.columns = columns or {}
+        self.partitions = partitions or []
+        self.signatures = signatures or {}
+        self.updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, partition: Optional[str] = None,
+                   relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                   signature: Optional[str] = None) -> 'TableProfile':
+        """
+        Profile every column of a DataFrame.
+
+        Args:
+            df (pd.DataFrame): Table or partition
+            partition (Optional[str]): Partition name
+            relative_accuracy (float): Relative accuracy of quantile sketches
+            signature (Optional[str]): Precomputed partition_signature of the frame
+
+        Returns:
+            TableProfile: Profile of the frame
+        """
+        columns = {col: ColumnStats.from_series(df[col], relative_accuracy) for col in df.columns}
+        if not partition:
+            return cls(len(df), columns)
+        return cls(len(df), columns, [partition], {partition: signature or partition_signature(df)})
+
+    def merge(self, other: 'TableProfile'):
+        """Merge another partition's profile into this one."""
+        for col, stats in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(stats)
+            else:
+                self.columns[col] = ColumnStats.from_dict(stats.to_dict())
+        self.rows += other.rows
+        self.partitions = sorted(set(self.partitions) | set(other.partitions))
+        self.signatures = {**self.signatures, **other.signatures}
+        self.updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def to_dict(self) -> Dict:
+        return {
+            'rows': self.rows,
+            'partitions': self.partitions,
+            'signatures': self.signatures,
+            'updated_at': self.updated_at,
+            'columns': {col: stats.to_dict() for col, stats in self.columns.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'TableProfile':
+        profile = cls(state['rows'], {col: ColumnStats.from_dict(stats) for col, stats in state['columns'].items()},
+                      state['partitions'], state.get('signatures'))
+        profile.updated_at = state['updated_at']
+        return profile
+
+
+def partition_frame(df: pd.DataFrame, column: str, freq: str = 'M') -> Dict[str, pd.DataFrame]:
+    """
+    Split a table into partitions by the period of a timestamp column.
+
+    Args:
+        df (pd.DataFrame): Table to split
+        column (str): Timestamp column (parsed or raw text)
+        freq (str): Period frequency, monthly by default
+
+    Returns:
+        Dict[str, pd.DataFrame]: Partition name (e.g. '2018-01') -> rows; rows without
+        a timestamp go to 'unknown'
+    """
+    periods = pd.to_datetime(df[column], errors='coerce').dt.to_period(freq)
+    partitions = {str(period): part for period, part in df.groupby(periods, sort=True)}
+    missing = periods.isna().to_numpy()
+    if missing.any():
+        partitions['unknown'] = df[missing]
+    return partitions
+
+
+class QualityStatsStore:
+    """
+    On-disk store of per-partition and merged column statistics.
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_STATS_DIR, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Initialize the store.
+
+        Args:
+            store_dir (str): Root directory of the statistics
+            relative_accuracy (float): Relative accuracy of new quantile sketches
+        """
+        self.store_dir = store_dir
+        self.relative_accuracy = relative_accuracy
+
+    def _table_dir(self, table: str) -> str:
+        return os.path.join(self.store_dir, table)
+
+    def _partition_path(self, table: str, partition: str) -> str:
+        filename = re.sub(r'[^A-Za-z0-9_.-]', '_', partition)
+        return os.path.join(self._table_dir(table), PARTITIONS_DIR, f"{filename}.json")
+
+    @staticmethod
+    def _write(path: str, profile: TableProfile):
+        """Write a profile atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(profile.to_dict(), f, default=str)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _read(path: str) -> Optional[TableProfile]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return TableProfile.from_dict(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def tables(self) -> List[str]:
+        """Tables with a global profile."""
+        if not os.path.isdir(self.store_dir):
+            return []
+        return sorted(name for name in os.listdir(self.store_dir)
+                      if os.path.isfile(os.path.join(self.store_dir, name, GLOBAL_FILE)))
+
+    def global_profile(self, table: str) -> Optional[TableProfile]:
+        """Merged profile of all partitions of a table."""
+        return self._read(os.path.join(self._table_dir(table), GLOBAL_FILE))
+
+    def partitions(self, table: str) -> List[str]:
+        """Partitions profiled for a table."""
+        profile = self.global_profile(table)
+        return profile.partitions if profile is not None else []
+
+    def load_partition(self, table: str, partition: str) -> Optional[TableProfile]:
+        """Profile of one partition."""
+        return self._read(self._partition_path(table, partition))
+
+    def add_partitions(self, table: str, partitions: Dict[str, pd.DataFrame],
+                       signatures: Optional[Dict[str, str]] = None) -> TableProfile:
+        """
+        Profile new partitions and merge them into the table's global profile.
+
+        Re-profiled partitions replace their previous statistics; since statistics
+        cannot be subtracted, the global profile is then rebuilt from all partitions.
+
+        Args:
+            table (str): Table name
+            partitions (Dict[str, pd.DataFrame]): Partition name -> rows
+            signatures (Optional[Dict[str, str]]): Precomputed partition signatures
+
+        Returns:
+            TableProfile: Updated global profile
+        """
+        existing = set(self.partitions(table))
+        global_profile = self.global_profile(table) or TableProfile()
+        signatures = signatures or {}
+        for partition, df in partitions.items():
+            profile = TableProfile.from_frame(df, partition, self.relative_accuracy, signatures.get(partition))
+            self._write(self._partition_path(table, partition), profile)
+            if partition not in existing:
+                global_profile.merge(profile)
+
+        replaced = existing & set(partitions)
+        if replaced:
+            logger.info(f"Rebuilding {table} statistics after re-profiling {len(replaced)} partitions")
+            global_profile = TableProfile()
+            for partition in sorted(existing | set(partitions)):
+                global_profile.merge(self.load_partition(table, partition))
+
+        self._write(os.path.join(self._table_dir(table), GLOBAL_FILE), global_profile)
+        logger.info(f"Profiled {len(partitions)} {table} partitions ({len(global_profile.partitions)} in total)")
+        return global_profile
+
+    def add_table(self, table: str, df: pd.DataFrame, partition_column: Optional[str] = None,
+                  freq: str = 'M', partition: str = 'all', refresh: bool = False) -> List[str]:
+        """
+        Profile the partitions of a table that are new or whose rows changed.
+
+        Args:
+            table (str): Table name
+            df (pd.DataFrame): Table rows
+            partition_column (Optional[str]): Timestamp column splitting the table into periods;
+                without it the whole frame is stored as ``partition``
+            freq (str): Period frequency of the partitions
+            partition (str): Partition name when no partition column is given
+            refresh (bool): Re-profile partitions even when their contents are unchanged
+
+        Returns:
+            List[str]: Partitions that were profiled
+        """
+        if partition_column and partition_column in df.columns:
+            partitions = partition_frame(df, partition_column, freq)
+        else:
+            partitions = {partition: df}
+        signatures = {name: partition_signature(part) for name, part in partitions.items()}
+        if not refresh:
+            stored = self.global_profile(table)
+            stored = stored.signatures if stored is not None else {}
+            partitions = {name: part for name, part in partitions.items() if stored.get(name) != signatures[name]}
+            changed = set(partitions) & set(stored)
+            if changed:
+                logger.info(f"Re-profiling {len(changed)} {table} partitions whose rows changed: {sorted(changed)}")
+        if partitions:
+            self.add_partitions(table, partitions, signatures)
+        return sorted(partitions)
+
+    def drift_report(self, table: str, partition: str, baseline: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Compare a partition's column statistics with its history.
+
+        Args:
+            table (str): Table name
+            partition (str): Partition to check
+            baseline (Optional[Iterable[str]]): Partitions forming the history, defaults to
+                every other stored partition
+
+        Returns:
+            pd.DataFrame: Per column null rates, means, medians, population stability
+            index (PSI over baseline deciles) and a STABLE/WATCH/DRIFT status
+        """
+        current = self.load_partition(table, partition)
+        if current is None:
+            raise ValueError(f"No statistics for {table} partition '{partition}'")
+        history = TableProfile()
+        for name in (baseline if baseline is not None else self.partitions(table)):
+            if name != partition:
+                profile = self.load_partition(table, name)
+                if profile is not None:
+                    history.merge(profile)
+
+        rows = []
+        for col, stats in current.columns.items():
+            reference = history.columns.get(col)
+            if reference is None:
+                continue
+            null_change = stats.missing_percentage - reference.missing_percentage
+            row = {
+                'Column': col,
+                'Rows': stats.rows,
+                'Null_Rate': round(stats.missing_percentage, 2),
+                'Baseline_Null_Rate': round(reference.missing_percentage, 2),
+                'Mean': np.nan, 'Baseline_Mean': np.nan, 'Mean_Shift_Std': np.nan,
+                'Median': np.nan, 'Baseline_Median': np.nan, 'PSI': np.nan
+            }
+            if stats.numeric and reference.numeric and stats.count and reference.count:
+                row.update({
+                    'Mean': round(stats.mean, 4),
+                    'Baseline_Mean': round(reference.mean, 4),
+                    'Mean_Shift_Std': round((stats.mean - reference.mean) / reference.std, 3)
+                    if reference.std and reference.std > 0 else np.nan,
+                    'Median': stats.quantile(0.5),
+                    'Baseline_Median': reference.quantile(0.5),
+                    'PSI': round(_population_stability(stats.sketch, reference.sketch), 4)
+                })
+            psi = 0.0 if np.isnan(row['PSI']) else row['PSI']
+            if psi >= PSI_DRIFT or abs(null_change) >= NULL_RATE_DRIFT:
+                row['Status'] = 'DRIFT'
+            elif psi >= PSI_WATCH:
+                row['Status'] = 'WATCH'
+            else:
+                row['Status'] = 'STABLE'
+            rows.append(row)
+
+        return pd.DataFrame(rows, columns=['Column', 'Rows', 'Null_Rate', 'Baseline_Null_Rate', 'Mean', 'Baseline_Mean',
+                                           'Mean_Shift_Std', 'Median', 'Baseline_Median', 'PSI', 'Status'])
+
+
+def _population_stability(current: QuantileSketch, baseline: QuantileSketch, bins: int = 10) -> float:
+    """Population stability index of two sketches over the baseline's quantile bins."""
+    edges = np.unique(baseline.quantile(np.linspace(0, 1, bins + 1)[1:-1]))
+    expected = np.diff(np.concatenate([[0.0], baseline.cdf(edges), [1.0]]))
+    actual = np.diff(np.concatenate([[0.0], current.cdf(edges), [1.0]]))
+    expected, actual = np.maximum(expected, 1e-4), np.maximum(actual, 1e-4)
+    return float(((actual - expected) * np.log(actual / expected)).sum())
+
+
+def update_quality_stats(datasets: Dict[str, pd.DataFrame], store: Optional[QualityStatsStore] = None,
+                         refresh: bool = False) -> QualityStatsStore:
+    """
+    Profile new and changed partitions of all datasets into the statistics store.
+
+    Tables with a timestamp in DEFAULT_PARTITION_COLUMNS are split by month; other
+    tables are stored as a single 'all' partition. Partitions whose content
+    signature matches the stored one are not profiled again.
+
+    Args:
+        datasets (Dict[str, pd.DataFrame]): Datasets by name
+        store (Optional[QualityStatsStore]): Target store, defaults to DEFAULT_STATS_DIR
+        refresh (bool): Re-profile all partitions, changed or not
+
+    Returns:
+        QualityStatsStore: The updated store
+    """
+    store = store or QualityStatsStore()
+    for name, df in datasets.items():
+        partition_column = DEFAULT_PARTITION_COLUMNS.get(name)
+        store.add_table(name, df, partition_column, refresh=refresh)
+    return store
@@ -0,0 +1,163 @@
+"""
+Geographic Reference Data Module for Brazilian E-commerce Dataset
+
+This module loads versioned reference tables (population, GDP per capita,
+market tier and urbanization rate) from ``data/reference`` and attaches them
+to state- or municipality-level summaries with a single keyed join.
+
+Tables are registered in ``data/reference/manifest.json``:
+
+    {
+      "state": {
+        "current": "2020.1",
+        "key": ["state"],
+        "versions": {"2020.1": {"file": "brazil_states_2020.1.csv", "source": "..."}}
+      },
+      "municipality": {
+        "current": "2022.1",
+        "key": ["state", "city"],
+        "versions": {"2022.1": {"file": "brazil_municipalities_2022.1.csv", "source": "..."}}
+      }
+    }
+
+A new release is added as a new file and version entry, and ``current`` is
+pointed at it; earlier versions stay loadable via the ``version`` argument.
+Municipality names are matched on a normalized key (lower case, accents and
+punctuation removed) because city spellings differ between sources.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REFERENCE_DIR = "data/reference"
+MANIFEST_FILE = "manifest.json"
+
+REFERENCE_COLUMNS = ['population', 'gdp_per_capita', 'tier', 'urban_rate']
+CITY_KEY_COLUMN = 'city_key'
+
+
+def normalize_city_name(cities: pd.Series) -> pd.Series:
+    """
+    Normalize municipality names for joining (e.g. 'São Paulo' -> 'sao paulo').
+
+    Args:
+        cities (pd.Series): City names
+
+    Returns:
+        pd.Series: Lower-case names without accents, punctuation or repeated spaces
+    """
+    return (
+        cities.astype('string')
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .str.replace(r"[^a-z0-9 ]", ' ', regex=True)
+        .str.replace(r"\s+", ' ', regex=True)
+        .str.strip()
+    )
+
+
+def read_reference_manifest(reference_dir: str = REFERENCE_DIR) -> Dict:
+    """
+    Read the reference table manifest.
+
+    Args:
+        reference_dir (str): Directory containing manifest.json and the table files
+
+    Returns:
+        Dict: Level name -> table entry
+    """
+    with open(os.path.join(reference_dir, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def load_reference_table(level: str = 'state', version: Optional[str] = None,
+                         reference_dir: str = REFERENCE_DIR) -> pd.DataFrame:
+    """
+    Load a reference table registered in the manifest.
+
+    Args:
+        level (str): 'state' or 'municipality'
+        version (Optional[str]): Table version, defaults to the version in the manifest
+        reference_dir (str): Directory containing manifest.json and the table files
+
+    Returns:
+        pd.DataFrame: Reference table with a reference_version column
+    """
+    manifest = read_reference_manifest(reference_dir)
+    if level not in manifest:
+        raise ValueError(
+            f"No '{level}' reference table registered in {os.path.join(reference_dir, MANIFEST_FILE)}"
+        )
+
+    entry = manifest[level]
+    version = version or entry['current']
+    if version not in entry['versions']:
+        raise ValueError(f"Unknown {level} reference version {version}; available: {sorted(entry['versions'])}")
+    file_name = entry['versions'][version]['file']
+
+    table = pd.read_csv(os.path.join(reference_dir, file_name))
+    required = entry['key'] + REFERENCE_COLUMNS
+    missing = [col for col in required if col not in table.columns]
+    if missing:
+        raise ValueError(f"Reference table {file_name} is missing columns: {missing}")
+
+    if 'city' in entry['key']:
+        table[CITY_KEY_COLUMN] = normalize_city_name(table['city'])
+        join_key = [col if col != 'city' else CITY_KEY_COLUMN for col in entry['key']]
+    else:
+        join_key = entry['key']
+
+    duplicated = table.duplicated(subset=join_key)
+    if duplicated.any():
+        raise ValueError(f"Reference table {file_name} has {duplicated.sum()} duplicate keys")
+
+    table['reference_version'] = version
+    logger.info(f"Loaded {level} reference data v{version} ({len(table):,} rows)")
+    return table
+
+
+def attach_reference_data(summary: pd.DataFrame, level: str = 'state',
+                          reference: Optional[pd.DataFrame] = None,
+                          columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Attach reference columns to a summary with one keyed left join.
+
+    Args:
+        summary (pd.DataFrame): State-level (state) or municipality-level (state, city) summary
+        level (str): 'state' or 'municipality'
+        reference (Optional[pd.DataFrame]): Preloaded reference table, loaded from the manifest if omitted
+        columns (Optional[List[str]]): Reference columns to attach, defaults to REFERENCE_COLUMNS
+
+    Returns:
+        pd.DataFrame: Summary with reference columns (existing columns of the same name are replaced)
+    """
+    reference = load_reference_table(level) if reference is None else reference
+    columns = REFERENCE_COLUMNS if columns is None else columns
+
+    if level == 'municipality':
+        left = summary.assign(**{CITY_KEY_COLUMN: normalize_city_name(summary['city'])})
+        join_key = ['state', CITY_KEY_COLUMN]
+    else:
+        left = summary
+        join_key = ['state']
+
+    left = left.drop(columns=[col for col in columns if col in left.columns])
+    result = left.merge(reference[join_key + columns], on=join_key, how='left', validate='many_to_one')
+
+    unmatched = result[columns[0]].isna().sum()
+    if unmatched:
+        logger.warning(f"{unmatched:,} of {len(result):,} rows have no {level} reference data")
+
+    if level == 'municipality':
+        result = result.drop(columns=CITY_KEY_COLUMN)
+    return result
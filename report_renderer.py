@@ -0,0 +1,236 @@
+"""
+Report Figure Renderer for Brazilian E-commerce Dataset
+
+This module renders the static matplotlib figures of the analysis reports.
+Figures are registered as (file name, draw function, input data) and rendered
+in a process pool with the non-interactive Agg backend. Each figure is skipped
+when its output file exists and the hash of its inputs (data, draw function
+source and DPI) matches the hash recorded at the last render, so re-running an
+analysis only redraws figures whose data changed. A draft mode renders at a
+lower DPI for quick iteration.
+
+Draw functions must be module-level functions taking the input data as their
+only argument; they draw on new pyplot figures and leave saving to the renderer.
+Figures are drawn with the caller's rcParams (e.g. a seaborn palette set before
+rendering), in worker processes as well as in-process.
+"""
+
+import os
+import json
+import hashlib
+import inspect
+import logging
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+HASH_MANIFEST = '.figure_hashes.json'
+FULL_DPI = 300
+DRAFT_DPI = 100
+
+
+def _update_hash(digest, value: Any):
+    """Feed a value (frames, arrays, containers or scalars) into a hash."""
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), [str(dtype) for dtype in value.dtypes])).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.shape, str(value.dtype))).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            _update_hash(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _update_hash(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def figure_hash(draw: Callable, data: Any, dpi: int) -> str:
+    """
+    Hash everything that determines a rendered figure.
+
+    Args:
+        draw (Callable): Draw function (its source is included, so edits trigger a redraw)
+        data (Any): Input data passed to the draw function
+        dpi (int): Output resolution
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    try:
+        source = inspect.getsource(draw)
+    except (OSError, TypeError):
+        source = ''
+    digest.update(f'{draw.__module__}.{draw.__qualname__}:{dpi}\n{source}'.encode())
+    _update_hash(digest, data)
+    return digest.hexdigest()
+
+
+def _init_worker():
+    """Switch rendering worker processes to the non-interactive Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+
+
+def _caller_rc_params() -> Dict:
+    """rcParams the caller changed from matplotlib's defaults, e.g. a seaborn palette."""
+    import matplotlib
+    defaults = matplotlib.rcParamsDefault
+    return {key: value for key, value in matplotlib.rcParams.items()
+            if key != 'backend' and (key not in defaults or value != defaults[key])}
+
+
+def _render_figure(draw: Callable, data: Any, path: str, dpi: int, style: Optional[str],
+                   rc_params: Optional[Dict]) -> str:
+    """Draw and save one figure under the given style and rcParams."""
+    import matplotlib.pyplot as plt
+
+    with plt.style.context(style) if style else nullcontext(), plt.rc_context(rc_params or {}):
+        try:
+            draw(data)
+            plt.savefig(path, dpi=dpi, bbox_inches='tight')
+        finally:
+            plt.close('all')
+    return path
+
+
+class ReportFigureRenderer:
+    """
+    Render report figures in parallel, skipping figures whose inputs are unchanged.
+    """
+
+    def __init__(self, output_dir: str = 'reports', draft: bool = False, max_workers: Optional[int] = None,
+                 force: bool = False, dpi: int = FULL_DPI, draft_dpi: int = DRAFT_DPI,
+                 style: Optional[str] = None, rc_params: Optional[Dict] = None):
+        """
+        Initialize the renderer.
+
+        Args:
+            output_dir (str): Directory the PNG files are written to
+            draft (bool): Render at draft_dpi instead of dpi
+            max_workers (Optional[int]): Worker processes, defaults to the CPU count; 1 renders in-process
+            force (bool): Redraw every figure even if its inputs are unchanged
+            dpi (int): Resolution of final figures
+            draft_dpi (int): Resolution of draft figures
+            style (Optional[str]): Matplotlib style applied over the caller's rcParams, none by default
+            rc_params (Optional[Dict]): Matplotlib rcParams applied on top of the style
+        """
+        self.output_dir = output_dir
+        self.dpi = draft_dpi if draft else dpi
+        self.max_workers = max_workers
+        self.force = force
+        self.style = style
+        self.rc_params = rc_params or {}
+        self.figures: List[Dict] = []
+
+    def add(self, filename: str, draw: Callable, data: Any):
+        """
+        Register a figure.
+
+        Args:
+            filename (str): Output file name inside output_dir
+            draw (Callable): Module-level function drawing the figure from data
+            data (Any): Picklable input data (DataFrames, Series, dicts, scalars)
+        """
+        self.figures.append({'filename': filename, 'draw': draw, 'data': data})
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.output_dir, HASH_MANIFEST)
+
+    def _read_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def render(self) -> Dict[str, str]:
+        """
+        Render all registered figures whose inputs changed.
+
+        Returns:
+            Dict[str, str]: File name -> 'rendered', 'skipped' or 'failed'
+        """
+        import matplotlib.pyplot as plt
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = self._read_manifest()
+        status = {}
+        pending = []
+        # Workers may not inherit the caller's rcParams, so they are passed along explicitly
+        rc_params = {**_caller_rc_params(), **self.rc_params}
+
+        for figure in self.figures:
+            path = os.path.join(self.output_dir, figure['filename'])
+            figure['path'] = path
+            figure['hash'] = figure_hash(figure['draw'], (figure['data'], self.style, rc_params), self.dpi)
+            if not self.force and os.path.exists(path) and manifest.get(figure['filename']) == figure['hash']:
+                status[figure['filename']] = 'skipped'
+            else:
+                pending.append(figure)
+
+        workers = min(len(pending), self.max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                futures = [
+                    (figure, executor.submit(_render_figure, figure['draw'], figure['data'], figure['path'],
+                                             self.dpi, self.style, rc_params))
+                    for figure in pending
+                ]
+                results = []
+                for figure, future in futures:
+                    try:
+                        future.result()
+                        results.append((figure, None))
+                    except Exception as e:
+                        results.append((figure, e))
+        else:
+            results = []
+            previous_backend = plt.get_backend()
+            if pending and previous_backend.lower() != 'agg':
+                plt.switch_backend('Agg')
+            try:
+                for figure in pending:
+                    try:
+                        _render_figure(figure['draw'], figure['data'], figure['path'], self.dpi,
+                                       self.style, rc_params)
+                        results.append((figure, None))
+                    except Exception as e:
+                        results.append((figure, e))
+            finally:
+                if plt.get_backend() != previous_backend:
+                    plt.switch_backend(previous_backend)
+
+        for figure, error in results:
+            if error is None:
+                manifest[figure['filename']] = figure['hash']
+                status[figure['filename']] = 'rendered'
+            else:
+                manifest.pop(figure['filename'], None)
+                status[figure['filename']] = 'failed'
+                logger.error(f"Failed to render {figure['filename']}: {error}")
+
+        with open(self._manifest_path(), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        status = {figure['filename']: status[figure['filename']] for figure in self.figures}
+        counts = pd.Series(status, dtype='object').value_counts().to_dict()
+        logger.info(f"Report figures in {self.output_dir} at {self.dpi} DPI: {counts}")
+        return status
@@ -0,0 +1,378 @@
+"""
+Sampled Fast Validation for Brazilian E-commerce Dataset
+
+Validating every row of a large export on each incremental load is slow.
+This module validates a stratified random sample instead and reports, for
+every rule, the estimated violation rate with a confidence interval:
+
+- rows are stratified by order month and customer state (tables keyed by
+  order_id inherit the strata of their order), and each stratum gets a share
+  of the sample proportional to its size
+- rates are stratified ratio estimates (violations / rows checked) with a
+  linearized variance; the interval is a Wilson score interval on the
+  effective sample size, so rules without sampled violations still get an
+  informative upper bound
+- only rules whose upper bound reaches the escalation threshold are evaluated
+  again on the full table, one scan per table for all escalated rules
+
+A violation found in the sample is a real violating row, so sampled rules
+still fail when the sample contains violations; the interval bounds how many
+more there may be.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from validation_rules import Rule, RuleEngine, ColumnChunk, NotNullRule
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_SIZE = 20_000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_ESCALATION_THRESHOLD = 0.001
+
+
+def _order_month(orders: pd.DataFrame) -> Optional[pd.Series]:
+    """Purchase month of each order as yyyymm (raw text or parsed timestamps)."""
+    if 'order_year' in orders.columns and 'order_month' in orders.columns:
+        # Compact int16/int8 parts would overflow yyyymm
+        return orders['order_year'].astype('Int32') * 100 + orders['order_month'].astype('Int32')
+    if 'order_purchase_timestamp' not in orders.columns:
+        return None
+    timestamps = orders['order_purchase_timestamp']
+    if pd.api.types.is_datetime64_any_dtype(timestamps.dtype):
+        return timestamps.dt.year * 100 + timestamps.dt.month
+    # Raw exports keep 'YYYY-MM-DD hh:mm:ss' text
+    return timestamps.astype(str).str[:7]
+
+
+def _lookup(keys: pd.Series, parent_keys: pd.Series, parent_codes: np.ndarray) -> np.ndarray:
+    """
+    Integer code of the parent row each key refers to (-1 when the key is unknown).
+
+    Both key columns are factorized together once, which is cheaper than building
+    a unique index over the parent keys and probing it.
+    """
+    codes, uniques = pd.factorize(pd.concat([parent_keys, keys], ignore_index=True))
+    lookup = np.full(len(uniques) + 1, -1, dtype=np.int64)
+    lookup[codes[:len(parent_keys)]] = parent_codes
+    # Missing keys are factorized as -1 and hit the trailing sentinel
+    return lookup[codes[len(parent_keys):]]
+
+
+def derive_strata(datasets: Dict[str, pd.DataFrame], table: str,
+                  order_strata: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """
+    Stratum of every row of a table: order month and customer state where known.
+
+    Orders are stratified by purchase month and customer state, tables with an
+    order_id by the stratum of their order, customers and sellers by state.
+
+    Args:
+        datasets (Dict[str, pd.DataFrame]): Datasets by name
+        table (str): Table to stratify
+        order_strata (Optional[np.ndarray]): Strata of the orders table, if already derived
+
+    Returns:
+        Optional[np.ndarray]: Integer stratum codes per row (-1 for rows whose order is
+        unknown), None if the table has no stratification keys
+    """
+    df = datasets[table]
+    orders = datasets.get('orders')
+    customers = datasets.get('customers')
+    keys = []
+
+    if table == 'orders':
+        month = _order_month(df)
+        if month is not None:
+            keys.append(pd.factorize(month)[0])
+        if customers is not None and {'customer_id', 'customer_state'} <= set(customers.columns) \
+                and 'customer_id' in df.columns:
+            states = pd.factorize(customers['customer_state'])[0]
+            keys.append(_lookup(df['customer_id'], customers['customer_id'], states))
+    elif 'order_id' in df.columns and orders is not None and 'order_id' in orders.columns:
+        if order_strata is None:
+            order_strata = derive_strata(datasets, 'orders')
+        if order_strata is not None:
+            return _lookup(df['order_id'], orders['order_id'], order_strata)
+    elif 'customer_state' in df.columns:
+        keys.append(pd.factorize(df['customer_state'])[0])
+    elif 'seller_state' in df.columns:
+        keys.append(pd.factorize(df['seller_state'])[0])
+
+    if not keys:
+        return None
+    # Unknown months or states (code -1) form their own stratum
+    combined = np.zeros(len(df), dtype=np.int64)
+    for codes in keys:
+        combined = combined * (codes.max(initial=0) + 2) + codes + 1
+    return pd.factorize(combined)[0]
+
+
+def wilson_interval(rate: float, n_effective: float, confidence: float = DEFAULT_CONFIDENCE) -> tuple:
+    """
+    Wilson score interval of a proportion.
+
+    Args:
+        rate (float): Estimated proportion
+        n_effective (float): Effective sample size
+        confidence (float): Confidence level
+
+    Returns:
+        tuple: (lower, upper) bounds
+    """
+    if n_effective <= 0:
+        return 0.0, 1.0
+    z = norm.ppf(0.5 + confidence / 2)
+    denominator = 1 + z ** 2 / n_effective
+    center = (rate + z ** 2 / (2 * n_effective)) / denominator
+    half_width = z * np.sqrt(rate * (1 - rate) / n_effective + z ** 2 / (4 * n_effective ** 2)) / denominator
+    return max(0.0, float(center - half_width)), min(1.0, float(center + half_width))
+
+
+class StratifiedSample:
+    """
+    Stratified random sample of a table with proportional allocation.
+    """
+
+    def __init__(self, df: pd.DataFrame, strata: Optional[np.ndarray] = None,
+                 sample_size: int = DEFAULT_SAMPLE_SIZE, min_per_stratum: int = 2, random_state: int = 0):
+        """
+        Draw the sample.
+
+        Args:
+            df (pd.DataFrame): Table to sample
+            strata (Optional[np.ndarray]): Stratum codes per row (None for one stratum)
+            sample_size (int): Target number of sampled rows
+            min_per_stratum (int): Minimum rows per stratum, so every stratum has a variance estimate
+            random_state (int): Seed for sampling
+        """
+        rng = np.random.default_rng(random_state)
+        codes = np.zeros(len(df), dtype=np.int64) if strata is None else np.asarray(strata, dtype=np.int64) + 1
+        self.population_sizes = np.bincount(codes) if len(codes) else np.zeros(0, dtype=np.int64)
+        self.total_rows = len(df)
+
+        share = self.population_sizes * min(1.0, sample_size / max(self.total_rows, 1))
+        self.sample_sizes = np.minimum(self.population_sizes,
+                                       np.maximum(np.round(share).astype(np.int64), min_per_stratum))
+
+        if self.sample_sizes.sum() >= self.total_rows:
+            positions = np.arange(self.total_rows)
+            self.sample_sizes = self.population_sizes.copy()
+        else:
+            order = np.argsort(codes, kind='stable')
+            bounds = np.concatenate([[0], np.cumsum(self.population_sizes)])
+            positions = np.concatenate([
+                order[bounds[h] + rng.choice(size, n, replace=False)]
+                for h, (size, n) in enumerate(zip(self.population_sizes, self.sample_sizes)) if n
+            ] or [np.empty(0, dtype=np.int64)])
+            positions.sort()
+        self.rows = df.iloc[positions]
+        self.strata = codes[positions]
+
+    @property
+    def is_census(self) -> bool:
+        """Whether every row was sampled."""
+        return bool(self.sample_sizes.sum() == self.total_rows)
+
+    def estimate(self, violations: np.ndarray, checked: Optional[np.ndarray] = None,
+                 confidence: float = DEFAULT_CONFIDENCE) -> Dict:
+        """
+        Estimate the population violation rate among checked rows.
+
+        Args:
+            violations (np.ndarray): Violation indicator per sampled row
+            checked (Optional[np.ndarray]): Rows the rule applies to (all rows when None)
+            confidence (float): Confidence level of the interval
+
+        Returns:
+            Dict: Estimated rate, interval, and estimated violation and checked counts
+        """
+        y = np.asarray(violations, dtype=np.float64)
+        x = np.ones_like(y) if checked is None else np.asarray(checked, dtype=np.float64)
+        n_strata = len(self.population_sizes)
+        n_h = np.maximum(self.sample_sizes, 1)
+        weights = self.population_sizes / n_h
+
+        y_total = np.bincount(self.strata, weights=y, minlength=n_strata)
+        x_total = np.bincount(self.strata, weights=x, minlength=n_strata)
+        estimated_violations = float((weights * y_total).sum())
+        estimated_checked = float((weights * x_total).sum())
+        rate = estimated_violations / estimated_checked if estimated_checked else 0.0
+
+        if self.is_census:
+            lower = upper = rate
+        else:
+            # Linearized variance of the stratified ratio estimator
+            d = y - rate * x
+            d_sum = np.bincount(self.strata, weights=d, minlength=n_strata)
+            d_squares = np.bincount(self.strata, weights=d ** 2, minlength=n_strata)
+            s2 = np.where(self.sample_sizes > 1,
+                          (d_squares - d_sum ** 2 / n_h) / np.maximum(self.sample_sizes - 1, 1), 0.0)
+            fpc = 1 - self.sample_sizes / np.maximum(self.population_sizes, 1)
+            variance = float((self.population_sizes ** 2 * fpc * s2 / n_h).sum()) / max(estimated_checked, 1) ** 2
+            checked_sampled = float(x.sum())
+            n_effective = rate * (1 - rate) / variance if variance > 0 else checked_sampled
+            lower, upper = wilson_interval(rate, min(n_effective, max(estimated_checked, 1)), confidence)
+
+        return {
+            'estimated_rate': rate,
+            'rate_lower': lower,
+            'rate_upper': upper,
+            'estimated_violations': int(round(estimated_violations)),
+            'estimated_checked': int(round(estimated_checked)),
+            'sample_violations': int(y.sum()),
+            'sample_rows': len(y)
+        }
+
+
+class SampledValidator:
+    """
+    Evaluates validation rules on stratified samples and escalates uncertain rules to full scans.
+    """
+
+    def __init__(self, datasets: Dict[str, pd.DataFrame], rules: Iterable[Rule],
+                 sample_size: int = DEFAULT_SAMPLE_SIZE, confidence: float = DEFAULT_CONFIDENCE,
+                 escalation_threshold: float = DEFAULT_ESCALATION_THRESHOLD, random_state: int = 0):
+        """
+        Initialize the sampled validator.
+
+        Args:
+            datasets (Dict[str, pd.DataFrame]): Datasets by name
+            rules (Iterable[Rule]): Validation rules
+            sample_size (int): Target sampled rows per table
+            confidence (float): Confidence level of the reported intervals
+            escalation_threshold (float): Violation rate whose crossing by the upper bound triggers
+                a full scan (not-null rules use their own missing percentage limit)
+            random_state (int): Seed for sampling
+        """
+        self.datasets = datasets
+        self.engine = RuleEngine(rules)
+        self.sample_size = sample_size
+        self.confidence = confidence
+        self.escalation_threshold = escalation_threshold
+        self.random_state = random_state
+        self.samples = {}
+        self.table_strata = {}
+
+    def sample(self, table: str) -> StratifiedSample:
+        """Stratified sample of a table, drawn once and reused."""
+        if table not in self.samples:
+            self.samples[table] = StratifiedSample(self.datasets[table], self.strata(table),
+                                                   self.sample_size, random_state=self.random_state)
+        return self.samples[table]
+
+    def strata(self, table: str) -> Optional[np.ndarray]:
+        """Strata of a table, derived once; order-keyed tables reuse the orders strata."""
+        if table not in self.table_strata:
+            order_strata = None
+            if table != 'orders' and 'orders' in self.datasets:
+                order_strata = self.strata('orders')
+            self.table_strata[table] = derive_strata(self.datasets, table, order_strata)
+        return self.table_strata[table]
+
+    def threshold(self, rule: Rule) -> float:
+        """Violation rate above which a rule is re-checked on the full table."""
+        if isinstance(rule, NotNullRule):
+            return rule.max_missing_percentage / 100
+        return self.escalation_threshold
+
+    def evaluate_table(self, table: str) -> tuple:
+        """
+        Evaluate the rules of one table on its sample.
+
+        Args:
+            table (str): Dataset name
+
+        Returns:
+            tuple: (list of (rule, result) pairs, rules to escalate)
+        """
+        df = self.datasets[table]
+        schema_rules, scan_rules, columns, value_columns = self.engine.plan_table(table, df)
+        results = [(rule, self.engine.check_schema(rule, df)) for rule in schema_rules]
+        if not scan_rules:
+            return results, []
+
+        sample = self.sample(table)
+        arrays = {col: ColumnChunk(sample.rows[col], col in value_columns) for col in columns}
+        escalate = []
+        for rule in scan_rules:
+            violation_mask, checked_mask = rule.evaluate(arrays)
+            stats = {}
+            rule.update_stats(stats, arrays, checked_mask)
+            estimate = sample.estimate(violation_mask, checked_mask, self.confidence)
+            violations, checked = estimate['estimated_violations'], estimate['estimated_checked']
+            if estimate['sample_violations'] and not violations:
+                violations = 1  # a sampled violation is a real one
+            result = {
+                'violation_count': violations,
+                'checked_count': checked,
+                'total_rows': len(df),
+                'sample_indices': sample.rows.index[violation_mask][:self.engine.sample_size].tolist(),
+                'status': rule.status(violations, checked, len(df)),
+                'mode': 'sampled',
+                'confidence': self.confidence
+            }
+            result.update(estimate)
+            result.update(rule.summarize(stats, violations, checked, len(df)))
+            results.append((rule, result))
+            if not sample.is_census and estimate['rate_upper'] >= self.threshold(rule):
+                escalate.append(rule)
+        return results, escalate
+
+    def evaluate(self) -> Dict[str, Dict[str, Dict[str, Dict]]]:
+        """
+        Evaluate all rules on samples, re-running escalated rules on the full tables.
+
+        Returns:
+            Dict: category -> table -> rule name -> result, as RuleEngine.evaluate; escalated
+            results are exact ('mode': 'full') and keep the sampled estimate fields
+        """
+        results = {}
+        for table in self.engine.table_rules:
+            if table not in self.datasets:
+                continue
+            sampled, escalate = self.evaluate_table(table)
+            exact = {}
+            if escalate:
+                logger.info(f"Escalating {len(escalate)} {table} rules to a full scan")
+                exact = {id(rule): result for rule, result in RuleEngine(escalate).evaluate_table(table, self.datasets[table])}
+            for rule, result in sampled:
+                if id(rule) in exact:
+                    estimate = {key: result[key] for key in ('estimated_rate', 'rate_lower', 'rate_upper',
+                                                              'sample_rows', 'sample_violations', 'confidence')}
+                    result = dict(exact[id(rule)], mode='full', **estimate)
+                result.update({'severity': rule.severity, 'description': rule.description})
+                results.setdefault(rule.category, {}).setdefault(table, {})[rule.name] = result
+        return results
+
+    def estimate_orphans(self, parent_table: str, parent_key: str, child_table: str, child_key: str) -> Dict:
+        """
+        Estimate the share of child rows whose key is missing from the parent table.
+
+        Args:
+            parent_table (str): Referenced table
+            parent_key (str): Referenced key column
+            child_table (str): Referencing table
+            child_key (str): Referencing key column
+
+        Returns:
+            Dict: Orphan rate estimate and whether the relationship needs a full check
+        """
+        sample = self.sample(child_table)
+        keys = sample.rows[child_key]
+        checked = keys.notna().to_numpy()
+        # Look the few sampled keys up in the parent column rather than hashing the whole parent
+        parent_keys = self.datasets[parent_table][parent_key]
+        sample_keys = keys.dropna().unique()
+        found = parent_keys[parent_keys.isin(sample_keys)].unique()
+        orphaned = checked & ~keys.isin(found).to_numpy()
+        estimate = sample.estimate(orphaned, checked, self.confidence)
+        estimate['escalate'] = not sample.is_census and estimate['rate_upper'] >= self.escalation_threshold
+        return estimate
@@ -5,26 +5,63 @@ This script saves the cleaned datasets to CSV files for easy access
 in subsequent analysis tasks.
 """
 
+import io
 import os
+import uuid
 import pandas as pd
-from data_cleaner import clean_brazilian_ecommerce_data
+from typing import Optional
+from data_loader import load_brazilian_ecommerce_data
+from data_cleaner import DataCleaner
+from row_fingerprints import FingerprintStore, drop_duplicate_rows
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def save_cleaned_datasets(output_dir: str = "data/cleaned"):
+def merge_cleaned_output(output_file: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge a batch of cleaned rows into an existing cleaned CSV file.
+    
+    Both parts are compared as they read back from CSV, so rows written by an earlier
+    run (e.g. one that failed before recording its fingerprints) are not duplicated.
+    
+    Args:
+        output_file (str): Existing cleaned CSV file
+        df (pd.DataFrame): Cleaned rows of this batch
+        
+    Returns:
+        pd.DataFrame: Union of the existing and new rows, without duplicate rows
+    """
+    existing = pd.read_csv(output_file)
+    increment = pd.read_csv(io.StringIO(df.to_csv(index=False)))
+    merged, _ = drop_duplicate_rows(pd.concat([existing, increment], ignore_index=True))
+    return merged
+
+
+def save_cleaned_datasets(output_dir: str = "data/cleaned", data_dir: str = "data",
+                          fingerprint_store: Optional[FingerprintStore] = None):
     """
     Save cleaned datasets to CSV files.
     
     Args:
         output_dir (str): Directory to save cleaned datasets
+        data_dir (str): Directory of the raw datasets
+        fingerprint_store (Optional[FingerprintStore]): Fingerprints of earlier batches; fact
+            table rows already loaded are skipped, new ones are merged into the existing cleaned
+            files, and this batch's rows are recorded once they are saved
+    
+    Returns:
+        Dict[str, pd.DataFrame]: Cleaned datasets of this batch
     """
     logger.info("Loading and cleaning datasets...")
     
     # Load and clean data
-    cleaned_datasets, cleaning_report = clean_brazilian_ecommerce_data()
+    datasets, _ = load_brazilian_ecommerce_data(data_dir)
+    if not datasets:
+        raise ValueError("No datasets loaded. Please check data directory and files.")
+    cleaner = DataCleaner(datasets, fingerprint_store=fingerprint_store)
+    cleaned_datasets, cleaning_report = cleaner.clean_all_data()
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
@@ -32,12 +69,24 @@ def save_cleaned_datasets(output_dir: str = "data/cleaned"):
     # Save each cleaned dataset
     logger.info(f"Saving cleaned datasets to {output_dir}/...")
     
+    saved_datasets = {}
     for dataset_name, df in cleaned_datasets.items():
         output_file = os.path.join(output_dir, f"cleaned_{dataset_name}.csv")
-        df.to_csv(output_file, index=False)
+        if fingerprint_store is not None and dataset_name in DataCleaner.FACT_TABLES \
+                and os.path.exists(output_file):
+            # Incremental batch: keep the rows of earlier batches
+            df = merge_cleaned_output(output_file, df)
+        temp_file = f"{output_file}.{uuid.uuid4().hex}.tmp"
+        df.to_csv(temp_file, index=False)
+        os.replace(temp_file, output_file)
+        saved_datasets[dataset_name] = df
         
         logger.info(f"Saved {dataset_name}: {len(df):,} rows, {len(df.columns)} columns -> {output_file}")
     
+    # Rows only count as loaded once the cleaned output is on disk
+    if fingerprint_store is not None:
+        cleaner.commit_loaded_rows()
+    
     # Save cleaning report
     report_file = os.path.join(output_dir, "cleaning_report.txt")
     with open(report_file, 'w', encoding='utf-8') as f:
@@ -52,7 +101,7 @@ def save_cleaned_datasets(output_dir: str = "data/cleaned"):
     summary_lines.append("")
     
     total_size_mb = 0
-    for dataset_name, df in cleaned_datasets.items():
+    for dataset_name, df in saved_datasets.items():
         size_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
         total_size_mb += size_mb
         summary_lines.append(f"{dataset_name}:")
@@ -63,7 +112,7 @@ def save_cleaned_datasets(output_dir: str = "data/cleaned"):
         summary_lines.append("")
     
     summary_lines.append(f"Total Memory Usage: {total_size_mb:.1f} MB")
-    summary_lines.append(f"Total Datasets: {len(cleaned_datasets)}")
+    summary_lines.append(f"Total Datasets: {len(saved_datasets)}")
     
     summary_file = os.path.join(output_dir, "datasets_summary.txt")
     with open(summary_file, 'w', encoding='utf-8') as f:
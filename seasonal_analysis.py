@@ -14,29 +14,57 @@ from datetime import datetime, timedelta
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.preprocessing import StandardScaler
+from feature_store import FeatureStore
+from temporal_features import add_temporal_features
+from holiday_calendar import build_holiday_calendar, add_event_proximity_features
+from olap_cube import CUBE_SOURCE_TABLES, load_olap_cube
+from data_cache import cleaned_data_version
+from demand_forecasting import (
+    IMPACT_SCORES, FEATURE_COLUMNS, MIN_TRAINING_ROWS, MonthlyDemandForecaster, monthly_features, backtest_forecaster,
+    forecast_series_batch, trim_incomplete_months
+)
 import warnings
 warnings.filterwarnings('ignore')
 
+# Ordinal encoding of event impact, stored as an int8 level on order rows
+IMPACT_LEVELS = ['none', 'low', 'medium', 'high', 'very_high']
+
+# Southern hemisphere seasons, stored as an int8 season code on order rows
+BRAZILIAN_SEASONS = {
+    'summer': [12, 1, 2],   # Dec-Feb
+    'autumn': [3, 4, 5],    # Mar-May
+    'winter': [6, 7, 8],    # Jun-Aug
+    'spring': [9, 10, 11]   # Sep-Nov
+}
+
 class SeasonalAnalysis:
     """
     Comprehensive seasonal demand intelligence for Brazilian E-commerce dataset.
     Analyzes seasonal patterns, holiday impacts, and provides demand forecasting.
     """
     
-    def __init__(self, data_dir='data/cleaned'):
+    def __init__(self, data_dir='data/cleaned', use_cube=True, max_workers=None):
         """
         Initialize SeasonalAnalysis with cleaned datasets.
         
         Args:
             data_dir (str): Path to the cleaned data directory
+            use_cube (bool): Roll up category metrics from the published OLAP cube when it was
+                built from the cleaned data in data_dir
+            max_workers (int, optional): Processes fitting forecast backtest folds, defaults to the
+                CPU count; 1 fits in-process
         """
         self.data_dir = data_dir
+        self.use_cube = use_cube
+        self.max_workers = max_workers
+        self.cube = None
         self.datasets = {}
         self.seasonal_data = {}
         self.forecasting_models = {}
         self.insights = {}
+        self.holiday_calendar = pd.DataFrame()
         
-        # Brazilian holidays and cultural events
+        # Brazilian holidays and cultural events (month level, see holiday_calendar for exact dates)
         self.brazilian_events = {
             1: {'name': 'New Year', 'type': 'holiday', 'impact': 'medium'},
             2: {'name': 'Carnival', 'type': 'cultural', 'impact': 'high'},
@@ -52,6 +80,38 @@ class SeasonalAnalysis:
             12: {'name': 'Christmas', 'type': 'holiday', 'impact': 'very_high'}
         }
         
+        # Event dimension table referenced by the int8 event codes on order rows
+        self.event_dimension = self._build_event_dimension()
+        
+    def _build_event_dimension(self):
+        """
+        Build the event dimension table from the Brazilian events calendar.
+        
+        Code 0 is reserved for orders without a known event (missing purchase date).
+        
+        Returns:
+            pd.DataFrame: One row per event code with name, type and impact level
+        """
+        rows = [{
+            'event_code': 0, 'event_key': 'none', 'event_name': 'No Event',
+            'event_type': 'none', 'impact': 'none', 'impact_level': 0, 'month': 0
+        }]
+        for code, (month, event_info) in enumerate(sorted(self.brazilian_events.items()), start=1):
+            rows.append({
+                'event_code': code,
+                'event_key': event_info['name'].lower().replace(' ', '_'),
+                'event_name': event_info['name'],
+                'event_type': event_info['type'],
+                'impact': event_info['impact'],
+                'impact_level': IMPACT_LEVELS.index(event_info['impact']),
+                'month': month
+            })
+        
+        dimension = pd.DataFrame(rows)
+        for col in ['event_code', 'impact_level', 'month']:
+            dimension[col] = dimension[col].astype('int8')
+        return dimension
+    
     def load_data(self):
         """Load cleaned datasets for seasonal analysis."""
         print("Loading cleaned datasets for seasonal analysis...")
@@ -76,6 +136,10 @@ class SeasonalAnalysis:
                 if col in self.datasets['orders'].columns:
                     self.datasets['orders'][col] = pd.to_datetime(self.datasets['orders'][col])
         
+        if self.use_cube:
+            # Only a cube built from the cleaned data analysed here is used
+            self.cube = load_olap_cube(source_version=cleaned_data_version(CUBE_SOURCE_TABLES, self.data_dir))
+        
         print(f"Successfully loaded {len(self.datasets)} datasets")
         return self.datasets
     
@@ -103,35 +167,294 @@ class SeasonalAnalysis:
         seasonal_data = orders_df.merge(order_values, on='order_id', how='left')
         
         # Add temporal features
-        seasonal_data['year'] = seasonal_data['order_purchase_timestamp'].dt.year
-        seasonal_data['month'] = seasonal_data['order_purchase_timestamp'].dt.month
-        seasonal_data['quarter'] = seasonal_data['order_purchase_timestamp'].dt.quarter
-        seasonal_data['day_of_week'] = seasonal_data['order_purchase_timestamp'].dt.dayofweek
-        seasonal_data['week_of_year'] = seasonal_data['order_purchase_timestamp'].dt.isocalendar().week
-        seasonal_data['day_of_month'] = seasonal_data['order_purchase_timestamp'].dt.day
-        
-        # Add Brazilian seasonal indicators
-        seasonal_data['is_summer'] = seasonal_data['month'].isin([12, 1, 2])  # Dec-Feb
-        seasonal_data['is_autumn'] = seasonal_data['month'].isin([3, 4, 5])   # Mar-May
-        seasonal_data['is_winter'] = seasonal_data['month'].isin([6, 7, 8])   # Jun-Aug
-        seasonal_data['is_spring'] = seasonal_data['month'].isin([9, 10, 11]) # Sep-Nov
-        
-        # Add cultural event indicators
-        for month, event_info in self.brazilian_events.items():
-            seasonal_data[f'is_{event_info["name"].lower().replace(" ", "_")}'] = (
-                seasonal_data['month'] == month
-            )
-        
-        # Add event impact levels
-        seasonal_data['event_impact_level'] = seasonal_data['month'].map(
-            {month: info['impact'] for month, info in self.brazilian_events.items()}
+        add_temporal_features(
+            seasonal_data, 'order_purchase_timestamp', prefix='',
+            fields=['year', 'month', 'quarter', 'day_of_week', 'week_of_year', 'day_of_month']
         )
         
+        # Encode season, event and impact as int8 codes via month lookup tables
+        months = seasonal_data['month'].to_numpy(dtype='int64', na_value=0)
+        
+        season_by_month = np.full(13, -1, dtype='int8')
+        for season_code, season_months in enumerate(BRAZILIAN_SEASONS.values()):
+            season_by_month[season_months] = season_code
+        
+        event_by_month = np.zeros(13, dtype='int8')
+        impact_by_month = np.zeros(13, dtype='int8')
+        events = self.event_dimension[self.event_dimension['event_code'] > 0]
+        event_by_month[events['month'].to_numpy()] = events['event_code'].to_numpy()
+        impact_by_month[events['month'].to_numpy()] = events['impact_level'].to_numpy()
+        
+        seasonal_data['season_code'] = season_by_month[months]
+        seasonal_data['event_code'] = event_by_month[months]
+        seasonal_data['event_impact_code'] = impact_by_month[months]
+        
+        # Exact-date holiday calendar; day-level proximity is computed on demand
+        purchase_years = seasonal_data['year'].dropna()
+        if len(purchase_years) > 0:
+            self.holiday_calendar = build_holiday_calendar(
+                range(int(purchase_years.min()) - 1, int(purchase_years.max()) + 2)
+            )
+        
         self.seasonal_data = seasonal_data
         print(f"Prepared seasonal data: {len(seasonal_data):,} orders with temporal features")
+        encoding_kb = seasonal_data[['season_code', 'event_code', 'event_impact_code']].memory_usage(index=False).sum() / 1024
+        print(f"Event encoding: 3 int8 columns ({encoding_kb:,.1f} KB), see event_dimension for labels")
         
         return seasonal_data
     
+    def _resolve_seasonal_frame(self, data):
+        """Return the given frame or the prepared seasonal data."""
+        if data is not None:
+            return data
+        if self.seasonal_data is None or len(self.seasonal_data) == 0:
+            self.prepare_seasonal_data()
+        return self.seasonal_data
+    
+    def event_proximity_features(self, events=('black_friday', 'christmas'), data=None):
+        """
+        Day-level distance of orders to exact-date events from the holiday calendar.
+        
+        Args:
+            events (Iterable[str]): Event keys for per-event features
+            data (pd.DataFrame): Frame with order_purchase_timestamp, defaults to the seasonal data
+            
+        Returns:
+            pd.DataFrame: Int16 proximity columns aligned with the data's index
+        """
+        data = self._resolve_seasonal_frame(data)
+        features = data[['order_purchase_timestamp']].copy()
+        add_event_proximity_features(
+            features, 'order_purchase_timestamp', events=list(events),
+            calendar=self.holiday_calendar if not self.holiday_calendar.empty else None
+        )
+        return features.drop(columns='order_purchase_timestamp')
+    
+    def event_flag(self, event, data=None):
+        """
+        Boolean indicator for orders placed during an event.
+        
+        Args:
+            event (str): Event key (e.g. 'black_friday') or display name (e.g. 'Black Friday')
+            data (pd.DataFrame): Frame with an event_code column, defaults to the seasonal data
+            
+        Returns:
+            pd.Series: True for orders whose event code matches the event
+        """
+        data = self._resolve_seasonal_frame(data)
+        match = self.event_dimension[
+            (self.event_dimension['event_key'] == event) | (self.event_dimension['event_name'] == event)
+        ]
+        if match.empty:
+            raise ValueError(f"Unknown event: {event}")
+        return data['event_code'] == match['event_code'].iloc[0]
+    
+    def season_flag(self, season, data=None):
+        """
+        Boolean indicator for orders placed in a Brazilian season.
+        
+        Args:
+            season (str): One of 'summer', 'autumn', 'winter', 'spring'
+            data (pd.DataFrame): Frame with a season_code column, defaults to the seasonal data
+            
+        Returns:
+            pd.Series: True for orders in the season
+        """
+        data = self._resolve_seasonal_frame(data)
+        if season not in BRAZILIAN_SEASONS:
+            raise ValueError(f"Unknown season: {season}")
+        return data['season_code'] == list(BRAZILIAN_SEASONS).index(season)
+    
+    def event_impact_labels(self, data=None):
+        """
+        Decode the int8 impact level into its label.
+        
+        Args:
+            data (pd.DataFrame): Frame with an event_impact_code column, defaults to the seasonal data
+            
+        Returns:
+            pd.Series: Ordered categorical of impact labels ('none' ... 'very_high')
+        """
+        data = self._resolve_seasonal_frame(data)
+        labels = pd.Categorical.from_codes(
+            data['event_impact_code'].to_numpy(), categories=IMPACT_LEVELS, ordered=True
+        )
+        return pd.Series(labels, index=data.index, name='event_impact_level')
+    
+    def decode_events(self, data=None):
+        """
+        Join the event dimension onto order rows for reporting.
+        
+        Args:
+            data (pd.DataFrame): Frame with an event_code column, defaults to the seasonal data
+            
+        Returns:
+            pd.DataFrame: Input frame with event_name, event_type and impact columns
+        """
+        data = self._resolve_seasonal_frame(data)
+        dimension = self.event_dimension[['event_code', 'event_name', 'event_type', 'impact']]
+        return data.merge(dimension, on='event_code', how='left')
+    
+    def measure_event_encoding_memory(self, data=None):
+        """
+        Compare the compact event encoding with the former per-event boolean columns.
+        
+        The legacy columns (four season flags, one flag per event and a string
+        event_impact_level) are rebuilt one at a time so that only a single
+        column is materialized while measuring.
+        
+        Args:
+            data (pd.DataFrame): Prepared seasonal frame, defaults to the seasonal data
+            
+        Returns:
+            dict: Legacy and compact byte counts and the bytes saved
+        """
+        data = self._resolve_seasonal_frame(data)
+        
+        legacy_bytes = 0
+        for season in BRAZILIAN_SEASONS:
+            legacy_bytes += self.season_flag(season, data).memory_usage(index=False)
+        for event_key in self.event_dimension['event_key'].iloc[1:]:
+            legacy_bytes += self.event_flag(event_key, data).memory_usage(index=False)
+        legacy_bytes += data['month'].map(
+            {month: info['impact'] for month, info in self.brazilian_events.items()}
+        ).astype(object).memory_usage(index=False, deep=True)
+        
+        compact_bytes = (
+            data[['season_code', 'event_code', 'event_impact_code']].memory_usage(index=False).sum()
+            + self.event_dimension.memory_usage(index=False, deep=True).sum()
+        )
+        
+        return {
+            'rows': len(data),
+            'legacy_bytes': int(legacy_bytes),
+            'compact_bytes': int(compact_bytes),
+            'saved_bytes': int(legacy_bytes - compact_bytes),
+            'reduction_pct': float(round((1 - compact_bytes / legacy_bytes) * 100, 1)) if legacy_bytes else 0.0
+        }
+    
+    def _category_monthly_totals(self):
+        """
+        Item count and item revenue per product category and month.
+        
+        Rolled up from the OLAP cube when it is loaded, otherwise aggregated
+        from order items joined to the seasonal data.
+        
+        Returns:
+            pd.DataFrame: category, month, item_count, item_revenue
+        """
+        if self.cube is not None:
+            totals = self.cube.rollup(['product_category', 'order_month'], measures=['item_count', 'revenue'], derived=False)
+            totals.columns = ['category', 'month', 'item_count', 'item_revenue']
+            totals['month'] = totals['month'].astype(int)
+            return totals
+        
+        items_with_products = self.datasets['order_items'].merge(
+            self.datasets['products'][['product_id', 'product_category_name_english']], 
+            on='product_id', how='left'
+        )
+        category_seasonal = self.seasonal_data[['order_id', 'month']].merge(
+            items_with_products[['order_id', 'product_category_name_english', 'price']], 
+            on='order_id', how='inner'
+        )
+        totals = category_seasonal.groupby(['product_category_name_english', 'month']).agg({
+            'order_id': 'count',
+            'price': 'sum'
+        }).reset_index()
+        totals.columns = ['category', 'month', 'item_count', 'item_revenue']
+        return totals
+    
+    def _category_state_monthly_totals(self):
+        """
+        Item count and item revenue per product category, customer state and calendar month.
+        
+        Rolled up from the OLAP cube when it is loaded, otherwise aggregated
+        from order items in a single groupby over the order facts.
+        
+        Returns:
+            pd.DataFrame: category, state, year, month, item_count, item_revenue
+        """
+        if self.cube is not None:
+            totals = self.cube.rollup(['product_category', 'customer_state', 'order_year', 'order_month'],
+                                      measures=['item_count', 'revenue'], derived=False)
+            totals.columns = ['category', 'state', 'year', 'month', 'item_count', 'item_revenue']
+            totals[['year', 'month']] = totals[['year', 'month']].astype(int)
+            return totals
+        
+        order_facts = self.seasonal_data[['order_id', 'customer_id', 'year', 'month']].dropna(subset=['year', 'month'])
+        if 'customers' in self.datasets:
+            order_facts = order_facts.merge(
+                self.datasets['customers'][['customer_id', 'customer_state']], on='customer_id', how='left'
+            )
+        else:
+            order_facts = order_facts.assign(customer_state=np.nan)
+        item_facts = self.datasets['order_items'][['order_id', 'product_id', 'price']].merge(
+            self.datasets['products'][['product_id', 'product_category_name_english']], on='product_id', how='left'
+        ).merge(order_facts, on='order_id', how='inner')
+        
+        totals = item_facts.groupby(
+            ['product_category_name_english', 'customer_state', 'year', 'month'], dropna=False
+        ).agg(item_count=('price', 'size'), item_revenue=('price', 'sum')).reset_index()
+        totals.columns = ['category', 'state', 'year', 'month', 'item_count', 'item_revenue']
+        totals[['year', 'month']] = totals[['year', 'month']].astype(int)
+        return totals
+    
+    def build_category_forecasts(self, horizons=3):
+        """
+        Forecast item revenue and units for every category and every category x state pair.
+        
+        All series come from one aggregation of the order facts and are fitted in
+        batch (see demand_forecasting.forecast_series_batch).
+        
+        Args:
+            horizons (int): Months to forecast
+            
+        Returns:
+            dict: 'category' and 'category_state' forecast DataFrames with intervals
+        """
+        print("\n=== BUILDING CATEGORY DEMAND FORECASTS ===")
+        
+        if self.seasonal_data is None or len(self.seasonal_data) == 0:
+            self.prepare_seasonal_data()
+        
+        # Series end at the last complete month, so a partial last month is not read as a demand drop
+        monthly_orders = self.seasonal_data.groupby(['year', 'month']).size().rename('orders').reset_index()
+        last_month = trim_incomplete_months(monthly_orders).iloc[-1]
+        cutoff = int(last_month['year']) * 12 + int(last_month['month'])
+        totals = self._category_state_monthly_totals()
+        totals = totals[totals['year'] * 12 + totals['month'] <= cutoff]
+        category_totals = totals.groupby(['category', 'year', 'month'], as_index=False)[['item_count', 'item_revenue']].sum()
+        
+        def batch(data, keys, value, label):
+            forecasts = forecast_series_batch(data, keys, value, horizons=horizons, max_workers=self.max_workers)
+            return forecasts.rename(columns={
+                'predicted': f'predicted_{label}', 'lower': f'{label}_lower', 'upper': f'{label}_upper'
+            })
+        
+        category = batch(category_totals, ['category'], 'item_revenue', 'revenue')
+        units = batch(category_totals, ['category'], 'item_count', 'units')
+        category = category.merge(
+            units[['category', 'horizon', 'predicted_units', 'units_lower', 'units_upper']],
+            on=['category', 'horizon'], how='left'
+        )
+        
+        # Average monthly revenue over the trailing year (or the active months, if fewer), months
+        # without sales included, on the same months the forecasts were fitted on: forecasts above
+        # it mean rising demand, below it falling demand
+        periods = category_totals['year'] * 12 + category_totals['month']
+        trailing = category_totals[periods > periods.max() - 12]
+        trailing_revenue = category['category'].map(trailing.groupby('category')['item_revenue'].sum()).fillna(0.0)
+        category['baseline_monthly_revenue'] = trailing_revenue / category['active_months'].clip(lower=1, upper=12)
+        
+        category_state = batch(totals, ['category', 'state'], 'item_revenue', 'revenue')
+        
+        print(f"Forecast {category['category'].nunique():,} categories and "
+              f"{len(category_state[['category', 'state']].drop_duplicates()):,} category x state series "
+              f"for {horizons} months")
+        
+        self.insights['category_forecasts'] = {'category': category, 'category_state': category_state}
+        return self.insights['category_forecasts']
+    
     def analyze_monthly_seasonal_patterns(self):
         """
         Analyze monthly and seasonal sales patterns by category.
@@ -193,24 +516,8 @@ class SeasonalAnalysis:
         
         # Category-wise seasonal analysis
         if 'products' in self.datasets:
-            # Merge with product categories
-            items_with_products = self.datasets['order_items'].merge(
-                self.datasets['products'][['product_id', 'product_category_name_english']], 
-                on='product_id', how='left'
-            )
-            
-            # Merge with seasonal data
-            category_seasonal = self.seasonal_data.merge(
-                items_with_products[['order_id', 'product_category_name_english', 'price']], 
-                on='order_id', how='left'
-            )
-            
             # Category seasonal patterns
-            category_patterns = category_seasonal.groupby(['product_category_name_english', 'month']).agg({
-                'order_id': 'count',
-                'price': 'sum'
-            }).reset_index()
-            
+            category_patterns = self._category_monthly_totals()
             category_patterns.columns = ['category', 'month', 'category_orders', 'category_revenue']
             
             # Calculate seasonal variance for each category
@@ -369,6 +676,9 @@ class SeasonalAnalysis:
         """
         Build demand forecasting model for 3-month predictions.
         
+        Forecast accuracy is measured per horizon with a rolling-origin backtest
+        (see demand_forecasting), whose error quantiles give the confidence intervals.
+        
         Returns:
             dict: Forecasting model results and predictions
         """
@@ -387,37 +697,34 @@ class SeasonalAnalysis:
         
         monthly_data.columns = ['year', 'month', 'orders', 'revenue', 'customers', 'items']
         
-        # Create time-based features for modeling
-        monthly_data['month_sin'] = np.sin(2 * np.pi * monthly_data['month'] / 12)
-        monthly_data['month_cos'] = np.cos(2 * np.pi * monthly_data['month'] / 12)
-        monthly_data['quarter'] = ((monthly_data['month'] - 1) // 3) + 1
-        
-        # Add holiday impact features
-        impact_scores = {'low': 1, 'medium': 2, 'high': 3, 'very_high': 4}
-        monthly_data['holiday_impact'] = monthly_data['month'].map(
-            {month: impact_scores[info['impact']] for month, info in self.brazilian_events.items()}
-        )
+        # A partial last month would read as a demand collapse; forecast from the last complete one
+        monthly_data = trim_incomplete_months(monthly_data)
         
-        # Add lag features (previous months)
-        monthly_data = monthly_data.sort_values(['year', 'month'])
-        for lag in [1, 2, 3]:
-            monthly_data[f'revenue_lag_{lag}'] = monthly_data['revenue'].shift(lag)
-            monthly_data[f'orders_lag_{lag}'] = monthly_data['orders'].shift(lag)
+        holiday_impact = {month: IMPACT_SCORES[info['impact']] for month, info in self.brazilian_events.items()}
         
-        # Remove rows with NaN values (due to lag features)
-        model_data = monthly_data.dropna().copy()
+        # Time-based, holiday impact and lag features (rows without all lags are dropped)
+        model_data = monthly_features(monthly_data, holiday_impact).dropna(subset=FEATURE_COLUMNS)
         
-        if len(model_data) < 10:
+        if len(model_data) < MIN_TRAINING_ROWS:
             print("Warning: Insufficient data for reliable forecasting")
             return {'error': 'Insufficient data for forecasting'}
         
-        # Prepare features and targets
-        feature_columns = [
-            'month', 'quarter', 'month_sin', 'month_cos', 'holiday_impact',
-            'revenue_lag_1', 'revenue_lag_2', 'revenue_lag_3',
-            'orders_lag_1', 'orders_lag_2', 'orders_lag_3'
-        ]
-        
+        feature_columns = FEATURE_COLUMNS
+        
+        # Rolling-origin backtest: accuracy per horizon and empirical prediction intervals
+        backtest = None
+        try:
+            backtest = backtest_forecaster(monthly_data, holiday_impact, horizons=3, max_workers=self.max_workers)
+            backtest_metrics = backtest.metrics()
+            print(f"Model Performance - Rolling-Origin Backtest ({backtest.folds} cutoffs):")
+            for _, row in backtest_metrics.iterrows():
+                print(f"{row['target'].title()} +{row['horizon']} month(s) - MAE: {row['MAE']:,.2f}, "
+                      f"RMSE: {row['RMSE']:,.2f}, MAPE: {row['MAPE']:.1f}%")
+        except ValueError as e:
+            print(f"Warning: Backtest skipped ({e})")
+        
+        # Legacy single 80/20 holdout, kept for comparison with earlier reports and as the
+        # interval fallback where the backtest has too few errors
         X = model_data[feature_columns].copy()
         y_revenue = model_data['revenue'].copy()
         y_orders = model_data['orders'].copy()
@@ -436,7 +743,6 @@ class SeasonalAnalysis:
         # Train models
         revenue_model = RandomForestRegressor(n_estimators=100, random_state=42)
         orders_model = RandomForestRegressor(n_estimators=100, random_state=42)
-        
         revenue_model.fit(X_train_scaled, y_revenue_train)
         orders_model.fit(X_train_scaled, y_orders_train)
         
@@ -444,7 +750,7 @@ class SeasonalAnalysis:
         revenue_pred = revenue_model.predict(X_test_scaled)
         orders_pred = orders_model.predict(X_test_scaled)
         
-        # Calculate model performance
+        # Calculate holdout performance
         revenue_mae = mean_absolute_error(y_revenue_test, revenue_pred)
         revenue_rmse = np.sqrt(mean_squared_error(y_revenue_test, revenue_pred))
         revenue_r2 = r2_score(y_revenue_test, revenue_pred)
@@ -453,72 +759,49 @@ class SeasonalAnalysis:
         orders_rmse = np.sqrt(mean_squared_error(y_orders_test, orders_pred))
         orders_r2 = r2_score(y_orders_test, orders_pred)
         
-        print("Model Performance:")
+        print(f"\nLegacy Holdout (last {len(X_test)} months, single split):")
         print(f"Revenue Model - MAE: ${revenue_mae:,.2f}, RMSE: ${revenue_rmse:,.2f}, R²: {revenue_r2:.3f}")
         print(f"Orders Model - MAE: {orders_mae:.0f}, RMSE: {orders_rmse:.0f}, R²: {orders_r2:.3f}")
         
-        # Generate 3-month forecasts
-        last_data = model_data.iloc[-1].copy()
+        # Generate 3-month forecasts from models fitted on the full history
+        forecaster = MonthlyDemandForecaster(holiday_impact).fit(monthly_data)
+        future = forecaster.predict(3)
+        if backtest is not None:
+            future = backtest.prediction_intervals(future)
+        
+        # Fall back to the holdout residual spread where the backtest has too few errors
+        revenue_std = np.std(revenue_pred - y_revenue_test)
+        orders_std = np.std(orders_pred - y_orders_test)
         forecasts = []
         
-        for i in range(1, 4):  # Next 3 months
-            # Calculate next month
-            next_month = (last_data['month'] + i - 1) % 12 + 1
-            next_year = last_data['year'] + ((last_data['month'] + i - 1) // 12)
-            
-            # Create features for next month
-            next_features = {
-                'month': next_month,
-                'quarter': ((next_month - 1) // 3) + 1,
-                'month_sin': np.sin(2 * np.pi * next_month / 12),
-                'month_cos': np.cos(2 * np.pi * next_month / 12),
-                'holiday_impact': {'low': 1, 'medium': 2, 'high': 3, 'very_high': 4}[self.brazilian_events[next_month]['impact']] if next_month in self.brazilian_events else 2
-            }
-            
-            # Use recent data for lag features
-            if i == 1:
-                next_features.update({
-                    'revenue_lag_1': last_data['revenue'],
-                    'revenue_lag_2': model_data.iloc[-2]['revenue'] if len(model_data) > 1 else last_data['revenue'],
-                    'revenue_lag_3': model_data.iloc[-3]['revenue'] if len(model_data) > 2 else last_data['revenue'],
-                    'orders_lag_1': last_data['orders'],
-                    'orders_lag_2': model_data.iloc[-2]['orders'] if len(model_data) > 1 else last_data['orders'],
-                    'orders_lag_3': model_data.iloc[-3]['orders'] if len(model_data) > 2 else last_data['orders']
-                })
-            else:
-                # Use previous forecasts for lag features
-                prev_forecast = forecasts[i-2]
-                next_features.update({
-                    'revenue_lag_1': prev_forecast['predicted_revenue'],
-                    'revenue_lag_2': forecasts[i-3]['predicted_revenue'] if i > 2 else last_data['revenue'],
-                    'revenue_lag_3': last_data['revenue'],
-                    'orders_lag_1': prev_forecast['predicted_orders'],
-                    'orders_lag_2': forecasts[i-3]['predicted_orders'] if i > 2 else last_data['orders'],
-                    'orders_lag_3': last_data['orders']
-                })
+        for _, row in future.iterrows():
+            next_month = int(row['month'])
+            next_year = int(row['year'])
+            pred_revenue = row['predicted_revenue']
+            pred_orders = int(row['predicted_orders'])
             
-            # Convert to array and scale
-            X_next = np.array([next_features[col] for col in feature_columns]).reshape(1, -1)
-            X_next_scaled = scaler.transform(X_next)
-            
-            # Make predictions
-            pred_revenue = revenue_model.predict(X_next_scaled)[0]
-            pred_orders = orders_model.predict(X_next_scaled)[0]
-            
-            # Calculate confidence intervals (simple approach using model variance)
-            revenue_std = np.std(revenue_pred - y_revenue_test)
-            orders_std = np.std(orders_pred - y_orders_test)
+            revenue_lower = row.get('revenue_lower', np.nan)
+            revenue_upper = row.get('revenue_upper', np.nan)
+            orders_lower = row.get('orders_lower', np.nan)
+            orders_upper = row.get('orders_upper', np.nan)
+            if pd.isna(revenue_lower) or pd.isna(revenue_upper):
+                revenue_lower, revenue_upper = pred_revenue - 1.96 * revenue_std, pred_revenue + 1.96 * revenue_std
+            if pd.isna(orders_lower) or pd.isna(orders_upper):
+                orders_lower, orders_upper = max(0, pred_orders - 1.96 * orders_std), pred_orders + 1.96 * orders_std
+            # Biased backtest errors can shift the interval past the prediction; keep it inside
+            revenue_lower, revenue_upper = min(revenue_lower, pred_revenue), max(revenue_upper, pred_revenue)
+            orders_lower, orders_upper = min(orders_lower, pred_orders), max(orders_upper, pred_orders)
             
             forecast = {
-                'year': int(next_year),
-                'month': int(next_month),
-                'month_name': pd.to_datetime(f'{int(next_year)}-{int(next_month):02d}-01').strftime('%B'),
+                'year': next_year,
+                'month': next_month,
+                'month_name': pd.to_datetime(f'{next_year}-{next_month:02d}-01').strftime('%B'),
                 'predicted_revenue': float(pred_revenue),
-                'predicted_orders': int(pred_orders),
-                'revenue_lower_ci': float(pred_revenue - 1.96 * revenue_std),
-                'revenue_upper_ci': float(pred_revenue + 1.96 * revenue_std),
-                'orders_lower_ci': int(max(0, pred_orders - 1.96 * orders_std)),
-                'orders_upper_ci': int(pred_orders + 1.96 * orders_std),
+                'predicted_orders': pred_orders,
+                'revenue_lower_ci': float(revenue_lower),
+                'revenue_upper_ci': float(revenue_upper),
+                'orders_lower_ci': int(orders_lower),
+                'orders_upper_ci': int(orders_upper),
                 'event_name': self.brazilian_events[next_month]['name'],
                 'expected_impact': self.brazilian_events[next_month]['impact']
             }
@@ -533,21 +816,23 @@ class SeasonalAnalysis:
                   f"({forecast['event_name']})")
         
         # Feature importance
-        revenue_importance = pd.DataFrame({
-            'feature': feature_columns,
-            'importance': revenue_model.feature_importances_
-        }).sort_values('importance', ascending=False)
+        revenue_importance = forecaster.feature_importance('revenue')
         
         print(f"\nTop Revenue Forecasting Features:")
         print(revenue_importance.head())
         
         # Store results
         self.forecasting_models = {
-            'revenue_model': revenue_model,
-            'orders_model': orders_model,
-            'scaler': scaler,
+            'revenue_model': forecaster.models['revenue'],
+            'orders_model': forecaster.models['orders'],
+            'scaler': forecaster.scaler,
             'feature_columns': feature_columns,
-            'performance': {
+            'backtest': {
+                'folds': backtest.folds,
+                'interval': backtest.interval,
+                'metrics': backtest.metrics().to_dict('records')
+            } if backtest is not None else None,
+            'legacy_holdout': {
                 'revenue_mae': revenue_mae,
                 'revenue_rmse': revenue_rmse,
                 'revenue_r2': revenue_r2,
@@ -614,23 +899,8 @@ class SeasonalAnalysis:
         
         # Category-specific variance analysis
         if 'products' in self.datasets:
-            # Merge with product categories
-            items_with_products = self.datasets['order_items'].merge(
-                self.datasets['products'][['product_id', 'product_category_name_english']], 
-                on='product_id', how='left'
-            )
-            
-            category_seasonal_data = self.seasonal_data.merge(
-                items_with_products[['order_id', 'product_category_name_english', 'price']], 
-                on='order_id', how='left'
-            )
-            
             # Calculate category seasonal metrics
-            category_monthly = category_seasonal_data.groupby(['product_category_name_english', 'month']).agg({
-                'price': 'sum',
-                'order_id': 'count'
-            }).reset_index()
-            
+            category_monthly = self._category_monthly_totals()[['category', 'month', 'item_revenue', 'item_count']]
             category_monthly.columns = ['category', 'month', 'monthly_revenue', 'monthly_orders']
             
             # Calculate variance for each category
@@ -731,6 +1001,9 @@ class SeasonalAnalysis:
         if not self.forecasting_models:
             self.build_demand_forecasting_model()
         
+        if 'category_forecasts' not in self.insights and 'products' in self.datasets:
+            self.build_category_forecasts()
+        
         recommendations = {}
         
         # Overall inventory strategy
@@ -794,6 +1067,8 @@ class SeasonalAnalysis:
         
         if 'category_variance' in self.insights['seasonal_variance']:
             category_data = self.insights['seasonal_variance']['category_variance']
+            category_forecasts = self._category_forecast_summary()
+            state_shares = self._category_state_shares()
             
             for category in category_data:
                 cat_name = category['category']
@@ -819,7 +1094,7 @@ class SeasonalAnalysis:
                     risk_level = 'Low'
                     buffer_stock = 'High (25-30%)'
                 
-                category_recommendations.append({
+                recommendation = {
                     'category': cat_name,
                     'seasonality_level': seasonality_level,
                     'seasonality_score': round(seasonality_score, 3),
@@ -828,10 +1103,37 @@ class SeasonalAnalysis:
                     'risk_level': risk_level,
                     'buffer_stock_recommendation': buffer_stock,
                     'avg_monthly_revenue': category['avg_monthly_revenue']
-                })
+                }
+                
+                # Forecast demand adjusts the seasonality-based strategy
+                forecast = category_forecasts.get(cat_name)
+                if forecast is not None:
+                    change = forecast['forecast_change_pct']
+                    if change >= 15:
+                        demand_trend = 'Rising'
+                        recommendation['inventory_strategy'] = f"{strategy}; build stock ahead of forecast growth"
+                    elif change <= -15:
+                        demand_trend = 'Falling'
+                        recommendation['inventory_strategy'] = f"{strategy}; scale back replenishment"
+                    else:
+                        demand_trend = 'Stable'
+                    if forecast['forecast_uncertainty'] > 1.0 and risk_level in ('Low', 'Medium'):
+                        recommendation['risk_level'] = 'Medium-High'
+                    recommendation.update({
+                        'forecast_monthly_revenue': round(forecast['forecast_monthly_revenue'], 2),
+                        'forecast_revenue_interval': f"${forecast['revenue_lower']:,.0f} - ${forecast['revenue_upper']:,.0f}",
+                        'forecast_change_pct': round(change, 1),
+                        'demand_trend': demand_trend,
+                        'recommended_stock_units': forecast['recommended_stock_units'],
+                        'top_states': state_shares.get(cat_name, '')
+                    })
+                
+                category_recommendations.append(recommendation)
             
-            # Sort by revenue impact
-            category_recommendations.sort(key=lambda x: x['avg_monthly_revenue'], reverse=True)
+            # Sort by revenue impact, forecast where available
+            category_recommendations.sort(
+                key=lambda x: x.get('forecast_monthly_revenue', x['avg_monthly_revenue']), reverse=True
+            )
             
             print(f"\nTop 5 Categories by Revenue - Inventory Recommendations:")
             for i, cat in enumerate(category_recommendations[:5]):
@@ -924,6 +1226,43 @@ class SeasonalAnalysis:
         self.insights['inventory_recommendations'] = recommendations
         return recommendations
     
+    def _category_forecast_summary(self):
+        """Next-period demand per category from the batch forecasts, keyed by category."""
+        forecasts = self.insights.get('category_forecasts', {}).get('category')
+        if forecasts is None or forecasts.empty:
+            return {}
+        
+        summary = {}
+        for cat_name, group in forecasts.groupby('category'):
+            first = group.loc[group['horizon'].idxmin()]
+            monthly_revenue = group['predicted_revenue'].mean()
+            baseline = first['baseline_monthly_revenue']
+            summary[cat_name] = {
+                'forecast_monthly_revenue': float(monthly_revenue),
+                'revenue_lower': float(first['revenue_lower']),
+                'revenue_upper': float(first['revenue_upper']),
+                'forecast_change_pct': float((monthly_revenue / baseline - 1) * 100) if baseline > 0 else 0.0,
+                'forecast_uncertainty': float((first['revenue_upper'] - first['revenue_lower']) / first['predicted_revenue'])
+                if first['predicted_revenue'] > 0 else np.inf,
+                # Stocking to the upper bound covers next month's demand at the interval's confidence
+                'recommended_stock_units': int(np.ceil(first['units_upper'])) if pd.notna(first['units_upper']) else 0
+            }
+        return summary
+    
+    def _category_state_shares(self, top_n=3):
+        """Largest states by forecast revenue share per category, as display strings."""
+        forecasts = self.insights.get('category_forecasts', {}).get('category_state')
+        if forecasts is None or forecasts.empty:
+            return {}
+        
+        next_month = forecasts[forecasts['horizon'] == 1]
+        shares = next_month['predicted_revenue'] / next_month.groupby('category')['predicted_revenue'].transform('sum')
+        ranked = next_month.assign(share=shares).sort_values(['category', 'share'], ascending=[True, False])
+        return {
+            cat_name: ', '.join(f"{row.state} {row.share:.0%}" for row in group.head(top_n).itertuples())
+            for cat_name, group in ranked.groupby('category')
+        }
+    
     def create_seasonal_intelligence_report(self):
         """
         Create a comprehensive seasonal intelligence report.
@@ -1008,8 +1347,13 @@ class SeasonalAnalysis:
         report_lines.append("-" * 30)
         
         if 'forecasts' in self.forecasting_models:
-            model_performance = self.forecasting_models['performance']
-            report_lines.append(f"Model Performance (R²): Revenue {model_performance['revenue_r2']:.3f}, Orders {model_performance['orders_r2']:.3f}")
+            backtest = self.forecasting_models.get('backtest')
+            if backtest:
+                revenue_mape = [f"+{row['horizon']}m {row['MAPE']:.1f}%" for row in backtest['metrics'] if row['target'] == 'revenue']
+                report_lines.append(f"Model Performance - Backtest Revenue MAPE ({backtest['folds']} cutoffs): {', '.join(revenue_mape)}")
+                report_lines.append(f"Confidence Intervals: empirical {backtest['interval']:.0%} backtest error quantiles")
+            holdout = self.forecasting_models['legacy_holdout']
+            report_lines.append(f"Legacy Holdout R² (single 80/20 split): Revenue {holdout['revenue_r2']:.3f}, Orders {holdout['orders_r2']:.3f}")
             report_lines.append("")
             
             for forecast in self.forecasting_models['forecasts']:
@@ -1037,6 +1381,18 @@ class SeasonalAnalysis:
         
         report_lines.append("")
         
+        # Category demand forecasts
+        category_recs = [rec for rec in self.insights['inventory_recommendations']['category_recommendations']
+                         if 'forecast_monthly_revenue' in rec]
+        if category_recs:
+            report_lines.append("CATEGORY DEMAND FORECAST (Top 10)")
+            report_lines.append("-" * 35)
+            for i, rec in enumerate(category_recs[:10]):
+                report_lines.append(f"{i+1:2d}. {rec['category'][:40]:40s} - ${rec['forecast_monthly_revenue']:,.0f}/month "
+                                    f"({rec['forecast_change_pct']:+.1f}%, {rec['demand_trend']}), "
+                                    f"stock {rec['recommended_stock_units']:,} units")
+            report_lines.append("")
+        
         # Inventory Recommendations
         report_lines.append("INVENTORY OPTIMIZATION RECOMMENDATIONS")
         report_lines.append("-" * 45)
@@ -1105,6 +1461,7 @@ class SeasonalAnalysis:
             'forecasting_models': forecasting_results,
             'seasonal_variance': variance_metrics,
             'inventory_recommendations': inventory_recommendations,
+            'category_forecasts': self.insights.get('category_forecasts', {}),
             'report_content': report_content,
             'data_summary': {
                 'total_orders': len(self.seasonal_data),
@@ -1175,6 +1532,23 @@ def main():
         inventory_df.to_csv(f'{output_dir}/seasonal_intelligence_inventory_recommendations.csv', index=False)
         print(f"📋 Inventory recommendations saved")
     
+    # Save category and category x state forecasts
+    for level, forecast_df in results.get('category_forecasts', {}).items():
+        forecast_df.to_csv(f'{output_dir}/seasonal_intelligence_{level}_forecasts.csv', index=False)
+        print(f"🔮 {level.replace('_', ' x ').capitalize()} forecasts saved ({len(forecast_df):,} rows)")
+    
+    # Publish the saved results as a new feature store snapshot on top of the current one
+    seasonal_outputs = {
+        filename.replace('.csv', ''): pd.read_csv(os.path.join(output_dir, filename))
+        for filename in os.listdir(output_dir)
+        if filename.startswith('seasonal_intelligence_') and filename.endswith('.csv')
+    }
+    store = FeatureStore()
+    feature_version = store.write_snapshot(
+        seasonal_outputs, metadata={'source': 'seasonal_analysis'}, base_version=store.current_version()
+    )
+    print(f"🗄️  Published feature store snapshot {feature_version}")
+    
     # Create summary file
     summary_file = 'seasonal_intelligence_summary.txt'
     with open(summary_file, 'w') as f:
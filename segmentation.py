@@ -0,0 +1,602 @@
+"""
+Clustering-Based Customer Segmentation Module for Brazilian E-commerce Dataset
+
+A data-driven alternative to the rule-based RFM segments from feature
+engineering. Customers are clustered on scaled RFM, delivery and payment
+features with either:
+
+- mini-batch k-means, trained by streaming chunks through partial_fit
+- a Gaussian mixture, fitted on a bounded uniform sample
+
+Memory is bounded by ``memory_budget_mb``: it sets the chunk size used for
+every pass over the data and caps the training sample, so the full scaled
+feature matrix is never materialized. Input can be a DataFrame or a CSV path
+(read in chunks). The number of segments is either given or chosen by the
+silhouette score on a sample.
+
+Segments are numbered by mean revenue (Segment 1 = highest value). The fitted
+model is persisted as JSON (scaling, centroids or mixture parameters, segment
+profiles), so the dashboard assigns segments without retraining. New customers
+can be assigned at any time; with k-means, ``update`` also moves the centroids
+with the same per-cluster learning rate as mini-batch k-means.
+
+Layout on disk:
+    models/customer_segments/
+    └── segments.json
+"""
+
+import os
+import json
+import uuid
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sklearn import config_context
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.mixture import GaussianMixture
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_DIR = "models/customer_segments"
+MODEL_FILE = "segments.json"
+
+RFM_DELIVERY_COLUMNS = [
+    'days_since_last_order', 'total_orders', 'total_revenue', 'avg_order_value',
+    'avg_delivery_experience', 'delivery_reliability'
+]
+PAYMENT_COLUMNS = ['avg_payment_installments', 'credit_card_share', 'voucher_share']
+FEATURE_COLUMNS = RFM_DELIVERY_COLUMNS + PAYMENT_COLUMNS
+# Long-tailed columns are clustered on a log scale
+LOG_COLUMNS = ['total_orders', 'total_revenue', 'avg_order_value', 'avg_payment_installments']
+SEGMENT_METHODS = ('kmeans', 'gmm')
+
+DataSource = Union[pd.DataFrame, str]
+
+
+def build_payment_features(orders: pd.DataFrame, order_payments: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-customer payment behavior.
+
+    Args:
+        orders (pd.DataFrame): order_id, customer_id
+        order_payments (pd.DataFrame): order_id, payment_type, payment_installments, payment_value
+
+    Returns:
+        pd.DataFrame: customer_id with avg_payment_installments, credit_card_share and
+            voucher_share (share of paid value)
+    """
+    payments = order_payments.merge(orders[['order_id', 'customer_id']], on='order_id', how='inner')
+    value = payments['payment_value'].fillna(0).clip(lower=0)
+    payments = payments.assign(
+        credit_card_value=value.where(payments['payment_type'] == 'credit_card', 0.0),
+        voucher_value=value.where(payments['payment_type'] == 'voucher', 0.0),
+        paid_value=value
+    )
+
+    per_customer = payments.groupby('customer_id').agg(
+        avg_payment_installments=('payment_installments', 'mean'),
+        credit_card_value=('credit_card_value', 'sum'),
+        voucher_value=('voucher_value', 'sum'),
+        paid_value=('paid_value', 'sum')
+    )
+    paid = per_customer['paid_value'].where(per_customer['paid_value'] > 0)
+    return pd.DataFrame({
+        'customer_id': per_customer.index,
+        'avg_payment_installments': per_customer['avg_payment_installments'].to_numpy(),
+        'credit_card_share': (per_customer['credit_card_value'] / paid).to_numpy(),
+        'voucher_share': (per_customer['voucher_value'] / paid).to_numpy()
+    })
+
+
+def attach_payment_features(customer_data: pd.DataFrame, orders: pd.DataFrame,
+                            order_payments: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the payment feature columns to a customer table (missing where no payment is recorded).
+
+    Args:
+        customer_data (pd.DataFrame): Customer table keyed by customer_id
+        orders (pd.DataFrame): order_id, customer_id
+        order_payments (pd.DataFrame): Cleaned order payments
+
+    Returns:
+        pd.DataFrame: Customer table with PAYMENT_COLUMNS
+    """
+    payment_features = build_payment_features(orders, order_payments)
+    return customer_data.drop(columns=PAYMENT_COLUMNS, errors='ignore').merge(
+        payment_features, on='customer_id', how='left'
+    )
+
+
+def compute_data_version(customer_data: pd.DataFrame, feature_columns: List[str], params: Dict) -> str:
+    """
+    Hash the features and parameters a segmentation depends on.
+
+    Args:
+        customer_data (pd.DataFrame): Customer table with the feature columns
+        feature_columns (List[str]): Segmentation features
+        params (Dict): Segmentation parameters
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'features': feature_columns, 'params': params}, sort_keys=True).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(customer_data[feature_columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _iter_chunks(source: DataSource, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield column subsets of a DataFrame or CSV file in chunks."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size][columns]
+    else:
+        yield from pd.read_csv(source, usecols=columns, chunksize=chunk_size)
+
+
+class CustomerSegmenter:
+    """
+    Clustering model over scaled customer features.
+    """
+
+    def __init__(self, n_clusters: Optional[int] = None, method: str = 'kmeans',
+                 k_range: Tuple[int, int] = (3, 8), memory_budget_mb: float = 256,
+                 sample_size: int = 100_000, silhouette_sample_size: int = 10_000,
+                 feature_columns: Optional[List[str]] = None, random_state: int = 42):
+        """
+        Initialize the segmenter.
+
+        Args:
+            n_clusters (Optional[int]): Number of segments, None = choose by silhouette
+            method (str): 'kmeans' (mini-batch) or 'gmm'
+            k_range (Tuple[int, int]): Inclusive range of k tried when n_clusters is None
+            memory_budget_mb (float): Working memory for chunks and the training sample
+            sample_size (int): Maximum rows in the sample used for k selection and the GMM
+            silhouette_sample_size (int): Rows used to score each candidate k
+            feature_columns (Optional[List[str]]): Features, defaults to FEATURE_COLUMNS
+            random_state (int): Seed for sampling and clustering
+        """
+        if method not in SEGMENT_METHODS:
+            raise ValueError(f"Unknown segmentation method '{method}', expected one of {SEGMENT_METHODS}")
+        self.n_clusters = n_clusters
+        self.method = method
+        self.k_range = k_range
+        self.memory_budget_mb = memory_budget_mb
+        self.sample_size = sample_size
+        self.silhouette_sample_size = silhouette_sample_size
+        self.feature_columns = list(feature_columns or FEATURE_COLUMNS)
+        self.random_state = random_state
+
+        self.data_version = None
+        self.mean_ = None
+        self.scale_ = None
+        self.fill_values_ = None
+        self.centroids_ = None
+        self.counts_ = None
+        self.mixture_ = None
+        self.profiles_ = None
+        self.metadata = {}
+
+    @property
+    def params(self) -> Dict:
+        return {'n_clusters': self.n_clusters, 'method': self.method, 'k_range': list(self.k_range),
+                'random_state': self.random_state}
+
+    @property
+    def chunk_size(self) -> int:
+        """Rows per chunk so that features plus per-cluster distances fit the memory budget."""
+        max_k = max(self.n_clusters or self.k_range[1], 1)
+        # Raw, scaled and distance matrices plus temporaries, 8 bytes per value
+        bytes_per_row = 8 * (3 * len(self.feature_columns) + 2 * max_k)
+        return max(1000, int(self.memory_budget_mb * 1024 ** 2 / bytes_per_row))
+
+    def _prepare(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Log-transform long-tailed columns; missing values stay NaN."""
+        values = chunk[self.feature_columns].to_numpy(dtype=np.float64, copy=True)
+        for position, col in enumerate(self.feature_columns):
+            if col in LOG_COLUMNS:
+                values[:, position] = np.log1p(np.clip(values[:, position], 0, None))
+        return values
+
+    def transform(self, customers: pd.DataFrame) -> np.ndarray:
+        """
+        Scale customer rows with the statistics learned in fit.
+
+        Args:
+            customers (pd.DataFrame): Rows with the feature columns
+
+        Returns:
+            np.ndarray: Scaled feature matrix (rows x features)
+        """
+        values = self._prepare(customers)
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = np.broadcast_to(self.fill_values_, values.shape)[missing]
+        return (values - self.mean_) / self.scale_
+
+    def _scan(self, source: DataSource) -> Tuple[int, pd.DataFrame]:
+        """
+        First pass: streaming moments for scaling and a uniform bottom-k sample.
+
+        Returns:
+            Tuple[int, pd.DataFrame]: Row count and the sampled rows
+        """
+        n_features = len(self.feature_columns)
+        count = np.zeros(n_features)
+        total = np.zeros(n_features)
+        total_squares = np.zeros(n_features)
+        rng = np.random.default_rng(self.random_state)
+        sample_budget = min(self.sample_size, self.chunk_size)
+        sample, sample_keys = None, np.empty(0)
+        rows = 0
+
+        for chunk in _iter_chunks(source, self.feature_columns, self.chunk_size):
+            values = self._prepare(chunk)
+            observed = ~np.isnan(values)
+            count += observed.sum(axis=0)
+            total += np.where(observed, values, 0).sum(axis=0)
+            total_squares += np.where(observed, values ** 2, 0).sum(axis=0)
+            rows += len(chunk)
+
+            # Keeping the rows with the smallest random keys gives a uniform sample of any stream
+            keys = rng.random(len(chunk))
+            combined = chunk.reset_index(drop=True) if sample is None else pd.concat(
+                [sample, chunk], ignore_index=True)
+            combined_keys = np.concatenate([sample_keys, keys])
+            keep = np.sort(np.argsort(combined_keys, kind='stable')[:sample_budget])
+            sample, sample_keys = combined.iloc[keep].reset_index(drop=True), combined_keys[keep]
+
+        if rows == 0:
+            raise ValueError("No customers to segment")
+        mean = total / np.maximum(count, 1)
+        variance = total_squares / np.maximum(count, 1) - mean ** 2
+        std = np.sqrt(np.clip(variance, 0, None))
+        # Missing values are imputed with the mean, i.e. zero after scaling
+        self.fill_values_ = mean
+        self.mean_ = mean
+        self.scale_ = np.where(std > 0, std, 1.0)
+        return rows, sample
+
+    def _cluster_sample(self, sample: np.ndarray, k: int):
+        if self.method == 'kmeans':
+            model = MiniBatchKMeans(n_clusters=k, batch_size=min(4096, len(sample)), n_init=3,
+                                    random_state=self.random_state)
+        else:
+            model = GaussianMixture(n_components=k, covariance_type='full', random_state=self.random_state)
+        return model.fit(sample)
+
+    def _silhouette(self, sample: np.ndarray, labels: np.ndarray) -> float:
+        # Pairwise distances are computed in blocks that fit the memory budget
+        with config_context(working_memory=self.memory_budget_mb):
+            return float(silhouette_score(sample, labels, sample_size=min(self.silhouette_sample_size, len(sample)),
+                                          random_state=self.random_state))
+
+    def _select_k(self, sample: np.ndarray) -> Tuple[int, Dict[int, float]]:
+        """Choose k by silhouette score on the sample."""
+        low, high = self.k_range
+        scores = {}
+        for k in range(low, min(high, len(sample) - 1) + 1):
+            labels = self._cluster_sample(sample, k).predict(sample)
+            if len(np.unique(labels)) < 2:
+                continue
+            scores[k] = self._silhouette(sample, labels)
+        if not scores:
+            raise ValueError("Could not score any k: too few distinct customers in the sample")
+        best_k = max(scores, key=scores.get)
+        logger.info("Silhouette by k: " + ", ".join(f"{k}={s:.3f}" for k, s in scores.items())
+                    + f" -> k={best_k}")
+        return best_k, scores
+
+    def fit(self, source: DataSource, passes: int = 1) -> 'CustomerSegmenter':
+        """
+        Fit the segmentation within the memory budget.
+
+        Args:
+            source (DataSource): Customer table or path to a customer CSV with the feature columns
+            passes (int): Mini-batch k-means passes over the data after initialization
+
+        Returns:
+            CustomerSegmenter: The fitted segmenter
+        """
+        rows, sample_rows = self._scan(source)
+        sample = self.transform(sample_rows)
+
+        silhouette_scores = {}
+        k = self.n_clusters
+        if k is None:
+            k, silhouette_scores = self._select_k(sample)
+
+        initial = self._cluster_sample(sample, k)
+        if self.method == 'kmeans':
+            # Centroids from the sample seed the streaming mini-batch passes over all customers
+            model = MiniBatchKMeans(n_clusters=k, init=initial.cluster_centers_, n_init=1,
+                                    batch_size=min(4096, self.chunk_size), random_state=self.random_state)
+            for _ in range(passes):
+                for chunk in _iter_chunks(source, self.feature_columns, self.chunk_size):
+                    model.partial_fit(self.transform(chunk))
+            self.centroids_ = model.cluster_centers_
+        else:
+            self.mixture_ = initial
+            self.centroids_ = initial.means_
+
+        self._build_profiles(source, k)
+        sample_labels = self._predict_scaled(sample)
+        if isinstance(source, pd.DataFrame):
+            self.data_version = compute_data_version(source, self.feature_columns, self.params)
+        self.metadata = {
+            'trained_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'training_rows': int(rows),
+            'sample_rows': int(len(sample)),
+            'method': self.method,
+            'n_clusters': int(k),
+            'silhouette_scores': silhouette_scores,
+            'sample_silhouette': self._silhouette(sample, sample_labels) if len(np.unique(sample_labels)) > 1 else None
+        }
+        logger.info(f"Fitted {self.method} segmentation with {k} segments on {rows:,} customers")
+        return self
+
+    def _build_profiles(self, source: DataSource, k: int):
+        """Assign all customers, number segments by mean revenue and store segment profiles."""
+        n_features = len(self.feature_columns)
+        counts = np.zeros(k)
+        sums = np.zeros((k, n_features))
+        observed_counts = np.zeros((k, n_features))
+        for chunk in _iter_chunks(source, self.feature_columns, self.chunk_size):
+            labels = self._predict_scaled(self.transform(chunk))
+            raw = chunk[self.feature_columns].to_numpy(dtype=np.float64)
+            observed = ~np.isnan(raw)
+            counts += np.bincount(labels, minlength=k)
+            for position in range(n_features):
+                sums[:, position] += np.bincount(labels, weights=np.where(observed[:, position], raw[:, position], 0),
+                                                 minlength=k)
+                observed_counts[:, position] += np.bincount(labels, weights=observed[:, position], minlength=k)
+
+        # Profiles are in original units, averaged over the customers where each feature is known
+        means = sums / np.maximum(observed_counts, 1)
+        rank_column = 'total_revenue' if 'total_revenue' in self.feature_columns else None
+        order = (np.argsort(-means[:, self.feature_columns.index(rank_column)], kind='stable')
+                 if rank_column else np.argsort(-counts, kind='stable'))
+        self._reorder(order)
+
+        profiles = pd.DataFrame(means[order], columns=self.feature_columns)
+        profiles.insert(0, 'customers', counts[order].astype(np.int64))
+        profiles.insert(1, 'share', profiles['customers'] / max(counts.sum(), 1) * 100)
+        profiles.index = pd.Index(self.segment_names(), name='segment')
+        self.counts_ = counts[order]
+        self.profiles_ = profiles
+
+    def _reorder(self, order: np.ndarray):
+        self.centroids_ = self.centroids_[order]
+        if self.mixture_ is not None:
+            self.mixture_.weights_ = self.mixture_.weights_[order]
+            self.mixture_.means_ = self.mixture_.means_[order]
+            self.mixture_.covariances_ = self.mixture_.covariances_[order]
+            self.mixture_.precisions_cholesky_ = self.mixture_.precisions_cholesky_[order]
+            self.mixture_.precisions_ = self.mixture_.precisions_[order]
+
+    def segment_names(self) -> List[str]:
+        return [f"Segment {i + 1}" for i in range(len(self.centroids_))]
+
+    def _predict_scaled(self, scaled: np.ndarray) -> np.ndarray:
+        if self.mixture_ is not None:
+            return self.mixture_.predict(scaled)
+        squared_distance = (
+            (scaled ** 2).sum(axis=1)[:, None] - 2 * scaled @ self.centroids_.T + (self.centroids_ ** 2).sum(axis=1)
+        )
+        return np.argmin(squared_distance, axis=1)
+
+    def assign(self, customers: pd.DataFrame) -> np.ndarray:
+        """
+        Segment index (0 = Segment 1) for each customer, without changing the model.
+
+        Args:
+            customers (pd.DataFrame): Rows with the feature columns
+
+        Returns:
+            np.ndarray: Segment index per row
+        """
+        if self.centroids_ is None:
+            raise ValueError("Segmenter is not fitted")
+        labels = np.empty(len(customers), dtype=np.int64)
+        for start in range(0, len(customers), self.chunk_size):
+            chunk = customers.iloc[start:start + self.chunk_size]
+            labels[start:start + len(chunk)] = self._predict_scaled(self.transform(chunk))
+        return labels
+
+    def assign_names(self, customers: pd.DataFrame) -> pd.Series:
+        """
+        Segment names for each customer.
+
+        Args:
+            customers (pd.DataFrame): Rows with the feature columns
+
+        Returns:
+            pd.Series: Segment name per row, aligned to the customers' index
+        """
+        return pd.Series(np.asarray(self.segment_names())[self.assign(customers)], index=customers.index,
+                         name='ml_segment')
+
+    def update(self, new_customers: pd.DataFrame) -> np.ndarray:
+        """
+        Assign new customers and move the k-means centroids towards them.
+
+        Each customer moves its centroid by 1 / (customers assigned to it so far),
+        the mini-batch k-means learning rate, so earlier training is not forgotten.
+        Segment numbering is kept; profiles are not recomputed.
+
+        Args:
+            new_customers (pd.DataFrame): Rows with the feature columns
+
+        Returns:
+            np.ndarray: Segment index per new customer
+        """
+        if self.method != 'kmeans':
+            raise ValueError("Incremental centroid updates are only supported for k-means; use assign()")
+        labels = self.assign(new_customers)
+        scaled = self.transform(new_customers)
+        k = len(self.centroids_)
+        batch_counts = np.bincount(labels, minlength=k)
+        batch_sums = np.column_stack([np.bincount(labels, weights=scaled[:, position], minlength=k)
+                                      for position in range(scaled.shape[1])])
+
+        updated = batch_counts > 0
+        new_counts = self.counts_ + batch_counts
+        self.centroids_[updated] += (
+            batch_sums[updated] - batch_counts[updated, None] * self.centroids_[updated]
+        ) / new_counts[updated, None]
+        self.counts_ = new_counts
+        self.metadata['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.metadata['update_rows'] = int(self.metadata.get('update_rows', 0) + len(new_customers))
+        return labels
+
+    def assign_file(self, input_path: str, output_path: str, id_column: str = 'customer_id') -> int:
+        """
+        Assign segments to a customer CSV chunk by chunk.
+
+        Args:
+            input_path (str): Customer table with the id and feature columns
+            output_path (str): Destination CSV (id, ml_segment)
+            id_column (str): Customer identifier column
+
+        Returns:
+            int: Number of customers assigned
+        """
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        temp_output = f"{output_path}.{uuid.uuid4().hex}.tmp"
+
+        assigned = 0
+        try:
+            for chunk in _iter_chunks(input_path, [id_column] + self.feature_columns, self.chunk_size):
+                pd.DataFrame({
+                    id_column: chunk[id_column].to_numpy(),
+                    'ml_segment': self.assign_names(chunk).to_numpy()
+                }).to_csv(temp_output, mode='a', header=assigned == 0, index=False)
+                assigned += len(chunk)
+            if assigned == 0:
+                pd.DataFrame(columns=[id_column, 'ml_segment']).to_csv(temp_output, index=False)
+            os.replace(temp_output, output_path)
+        except Exception:
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+            raise
+
+        logger.info(f"Assigned segments to {assigned:,} customers from {input_path} into {output_path}")
+        return assigned
+
+    def save(self, model_dir: str = DEFAULT_MODEL_DIR):
+        """
+        Persist scaling, centroids (or mixture parameters) and profiles as JSON, atomically.
+
+        Args:
+            model_dir (str): Directory of the segmentation model
+        """
+        os.makedirs(model_dir, exist_ok=True)
+        state = {
+            'method': self.method,
+            'params': self.params,
+            'data_version': self.data_version,
+            'feature_columns': self.feature_columns,
+            'memory_budget_mb': self.memory_budget_mb,
+            'mean': self.mean_.tolist(),
+            'scale': self.scale_.tolist(),
+            'fill_values': self.fill_values_.tolist(),
+            'centroids': self.centroids_.tolist(),
+            'counts': self.counts_.tolist(),
+            'profiles': self.profiles_.reset_index().to_dict('records'),
+            'metadata': self.metadata
+        }
+        if self.mixture_ is not None:
+            state['mixture'] = {
+                'weights': self.mixture_.weights_.tolist(),
+                'covariances': self.mixture_.covariances_.tolist(),
+                'precisions_cholesky': self.mixture_.precisions_cholesky_.tolist()
+            }
+
+        model_path = os.path.join(model_dir, MODEL_FILE)
+        temp_path = f"{model_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, default=str)
+        os.replace(temp_path, model_path)
+        logger.info(f"Saved {len(self.centroids_)}-segment {self.method} model to {model_dir}")
+
+    @classmethod
+    def load(cls, model_dir: str = DEFAULT_MODEL_DIR) -> Optional['CustomerSegmenter']:
+        """
+        Load a persisted segmentation model.
+
+        Args:
+            model_dir (str): Directory of the segmentation model
+
+        Returns:
+            Optional[CustomerSegmenter]: Loaded segmenter, or None if none is saved
+        """
+        try:
+            with open(os.path.join(model_dir, MODEL_FILE), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+            centroids = np.asarray(state['centroids'], dtype=np.float64)
+            params = state['params']
+            segmenter = cls(n_clusters=params['n_clusters'], method=params['method'],
+                            k_range=tuple(params['k_range']), memory_budget_mb=state['memory_budget_mb'], feature_columns=state['feature_columns'],
+                            random_state=params['random_state'])
+            segmenter.data_version = state['data_version']
+            segmenter.mean_ = np.asarray(state['mean'])
+            segmenter.scale_ = np.asarray(state['scale'])
+            segmenter.fill_values_ = np.asarray(state['fill_values'])
+            segmenter.centroids_ = centroids
+            segmenter.counts_ = np.asarray(state['counts'])
+            segmenter.profiles_ = pd.DataFrame(state['profiles']).set_index('segment')
+            segmenter.metadata = state['metadata']
+
+            if 'mixture' in state:
+                mixture = GaussianMixture(n_components=len(centroids), covariance_type='full')
+                mixture.weights_ = np.asarray(state['mixture']['weights'])
+                mixture.means_ = centroids
+                mixture.covariances_ = np.asarray(state['mixture']['covariances'])
+                mixture.precisions_cholesky_ = np.asarray(state['mixture']['precisions_cholesky'])
+                segmenter.mixture_ = mixture
+        except (OSError, ValueError, EOFError, AttributeError, KeyError, TypeError) as e:
+            # Truncated or corrupt state files are treated like a missing model and refitted
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Could not load the segmentation model in {model_dir} "
+                               f"({type(e).__name__}: {e}); refit the model")
+            return None
+
+        return segmenter
+
+
+def fit_or_load_segments(customer_data: pd.DataFrame, model_dir: str = DEFAULT_MODEL_DIR, force: bool = False,
+                         **params) -> CustomerSegmenter:
+    """
+    Return the persisted segmentation if it was fitted on the same data and parameters,
+    otherwise fit and save a new one.
+
+    Args:
+        customer_data (pd.DataFrame): Customer table with the feature columns
+        model_dir (str): Directory of the segmentation model
+        force (bool): Refit even if the data version is unchanged
+        **params: CustomerSegmenter parameters
+
+    Returns:
+        CustomerSegmenter: Up-to-date segmenter
+    """
+    segmenter = CustomerSegmenter(**params)
+    if not force:
+        saved = CustomerSegmenter.load(model_dir)
+        if saved is not None and saved.data_version == compute_data_version(
+                customer_data, segmenter.feature_columns, segmenter.params):
+            logger.info(f"Customer segmentation {saved.data_version} is up to date, skipping training")
+            return saved
+
+    segmenter.fit(customer_data)
+    segmenter.save(model_dir)
+    return segmenter
@@ -0,0 +1,173 @@
+"""
+Temporal Feature Kernel for Brazilian E-commerce Dataset
+
+This module derives all calendar fields of a timestamp column in one vectorized
+pass over int64 epochs, instead of calling several ``.dt`` accessors (each of
+which re-decomposes the timestamps). Results are stored in compact integer
+dtypes, and day names are returned as an ordered categorical.
+
+It is shared by DataCleaner.create_derived_features,
+FeatureEngineer.create_delivery_performance_features and
+SeasonalAnalysis.prepare_seasonal_data.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+NS_PER_HOUR = 3_600_000_000_000
+NS_PER_DAY = 24 * NS_PER_HOUR
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Field name -> compact dtype (nullable variant is used when timestamps are missing)
+TEMPORAL_FIELDS = {
+    'year': 'int16',
+    'month': 'int8',
+    'quarter': 'int8',
+    'day_of_month': 'int8',
+    'day_of_week': 'int8',
+    'day_name': 'category',
+    'hour': 'int8',
+    'week_of_year': 'int8',
+    'day_of_year': 'int16'
+}
+
+
+def _civil_from_days(days: np.ndarray):
+    """
+    Convert days since 1970-01-01 to (year, month, day) in the proleptic Gregorian calendar.
+
+    Uses Howard Hinnant's era-based algorithm, which only needs integer arithmetic
+    and therefore vectorizes over the whole array.
+    """
+    z = days + 719468
+    era = np.floor_divide(z, 146097)
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def _days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Inverse of _civil_from_days: convert (year, month, day) to days since 1970-01-01."""
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    yoe = year - era * 400
+    mp = np.where(month > 2, month - 3, month + 9)
+    doy = (153 * mp + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def compute_calendar_fields(epoch_ns: np.ndarray, fields: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute calendar fields from int64 nanosecond epochs.
+
+    Args:
+        epoch_ns (np.ndarray): Timestamps as int64 nanoseconds since the Unix epoch
+        fields (Optional[Iterable[str]]): Subset of TEMPORAL_FIELDS to compute
+
+    Returns:
+        Dict[str, np.ndarray]: int64 arrays keyed by field name (day_name as day index)
+    """
+    fields = list(TEMPORAL_FIELDS) if fields is None else list(fields)
+    unknown = set(fields) - set(TEMPORAL_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown temporal fields: {sorted(unknown)}")
+
+    days = np.floor_divide(epoch_ns, NS_PER_DAY)
+    year, month, day = _civil_from_days(days)
+    # 1970-01-01 was a Thursday; shift so that Monday=0 like pandas dayofweek
+    day_of_week = (days + 3) % 7
+
+    results = {}
+    if 'year' in fields:
+        results['year'] = year
+    if 'month' in fields:
+        results['month'] = month
+    if 'quarter' in fields:
+        results['quarter'] = (month - 1) // 3 + 1
+    if 'day_of_month' in fields:
+        results['day_of_month'] = day
+    if 'day_of_week' in fields or 'day_name' in fields:
+        results['day_of_week'] = day_of_week
+    if 'hour' in fields:
+        results['hour'] = np.floor_divide(epoch_ns - days * NS_PER_DAY, NS_PER_HOUR)
+    if 'day_of_year' in fields:
+        results['day_of_year'] = days - _days_from_civil(year, np.ones_like(year), np.ones_like(year)) + 1
+    if 'week_of_year' in fields:
+        # ISO week: the week belongs to the ISO year of its Thursday
+        thursday = days - day_of_week + 3
+        iso_year, _, _ = _civil_from_days(thursday)
+        iso_jan1 = _days_from_civil(iso_year, np.ones_like(iso_year), np.ones_like(iso_year))
+        results['week_of_year'] = (thursday - iso_jan1) // 7 + 1
+
+    return results
+
+
+def extract_temporal_features(timestamps: pd.Series, prefix: str = 'order_',
+                              fields: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Extract calendar features from a datetime column in a single vectorized pass.
+
+    Args:
+        timestamps (pd.Series): Datetime series (strings are parsed with pd.to_datetime)
+        prefix (str): Prefix for the output column names (e.g. 'order_')
+        fields (Optional[Iterable[str]]): Subset of TEMPORAL_FIELDS, defaults to all
+
+    Returns:
+        pd.DataFrame: Compact calendar features aligned to the input index
+    """
+    fields = list(TEMPORAL_FIELDS) if fields is None else list(fields)
+
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps, errors='coerce')
+    if getattr(timestamps.dt, 'tz', None) is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+
+    missing = timestamps.isna().to_numpy()
+    epoch_ns = timestamps.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    if missing.any():
+        epoch_ns = np.where(missing, 0, epoch_ns)
+
+    calendar = compute_calendar_fields(epoch_ns, fields)
+
+    features = {}
+    for field in fields:
+        column = f"{prefix}{field}"
+        if field == 'day_name':
+            codes = np.where(missing, -1, calendar['day_of_week']).astype(np.int8)
+            features[column] = pd.Categorical.from_codes(codes, categories=DAY_NAMES, ordered=True)
+        elif missing.any():
+            values = pd.array(calendar[field], dtype=TEMPORAL_FIELDS[field].capitalize())
+            values[missing] = pd.NA
+            features[column] = values
+        else:
+            features[column] = calendar[field].astype(TEMPORAL_FIELDS[field])
+
+    return pd.DataFrame(features, index=timestamps.index)
+
+
+def add_temporal_features(df: pd.DataFrame, timestamp_column: str = 'order_purchase_timestamp',
+                          prefix: str = 'order_', fields: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Add calendar features for a timestamp column to a DataFrame in place.
+
+    Args:
+        df (pd.DataFrame): Frame containing the timestamp column
+        timestamp_column (str): Name of the datetime column
+        prefix (str): Prefix for the output column names
+        fields (Optional[Iterable[str]]): Subset of TEMPORAL_FIELDS, defaults to all
+
+    Returns:
+        pd.DataFrame: The same frame with calendar feature columns assigned
+    """
+    features = extract_temporal_features(df[timestamp_column], prefix=prefix, fields=fields)
+    for column in features.columns:
+        df[column] = features[column]
+    return df
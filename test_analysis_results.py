@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for materialized analysis results
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from analysis_results import materialize_results, load_materialized_results
+from market_expansion import MarketExpansionAnalyzer
+
+
+def make_results():
+    """Result tables and objects with NumPy scalars, as produced by the analyzers"""
+    summary = pd.DataFrame({'state': ['SP', 'RJ'], 'customer_count': [100, 40],
+                            'combined_opportunity_score': [0.8, np.nan]})
+    recommendations = [{'state': 'SP', 'opportunity_score': np.float64(0.8),
+                        'key_metrics': {'customers': np.int64(100), 'avg_delivery_days': np.nan}}]
+    insights = [{'category': 'Market Penetration', 'insight': 'SP leads',
+                 'data': summary['state'].value_counts().to_dict()}]
+    return summary, recommendations, insights
+
+
+def test_round_trip():
+    """Tables and objects are restored for matching source versions"""
+    summary, recommendations, insights = make_results()
+    sources = {'features': 'abc123', 'schema': 1}
+    with tempfile.TemporaryDirectory() as results_dir:
+        materialize_results('expansion', {'state_summary': summary},
+                            {'recommendations': recommendations, 'insights': insights},
+                            sources, results_dir=results_dir)
+        results = load_materialized_results('expansion', sources, results_dir=results_dir)
+
+    pd.testing.assert_frame_equal(results['state_summary'], summary)
+    assert results['recommendations'][0]['key_metrics'] == {'customers': 100, 'avg_delivery_days': None}
+    assert results['insights'][0]['data'] == {'SP': 1, 'RJ': 1}
+
+
+def test_stale_results_are_ignored():
+    """Results computed from another feature version are stale; a re-run refreshes them"""
+    summary, recommendations, insights = make_results()
+    with tempfile.TemporaryDirectory() as results_dir:
+        assert load_materialized_results('expansion', {'features': 'v1'}, results_dir=results_dir) is None
+
+        materialize_results('expansion', {'state_summary': summary}, {'insights': insights},
+                            {'features': 'v1'}, results_dir=results_dir)
+        assert load_materialized_results('expansion', {'features': 'v2'}, results_dir=results_dir) is None
+
+        # Identical results from new inputs still publish a new snapshot with the new sources
+        materialize_results('expansion', {'state_summary': summary}, {'insights': insights},
+                            {'features': 'v2'}, results_dir=results_dir)
+        assert load_materialized_results('expansion', {'features': 'v2'}, results_dir=results_dir) is not None
+
+
+def test_expansion_sources_cover_cleaned_tables():
+    """Changing a cleaned table the analyzer reads changes the expansion source versions"""
+    with tempfile.TemporaryDirectory() as cleaned_dir:
+        orders = pd.DataFrame({'order_id': ['o1', 'o2'], 'customer_id': ['c1', 'c2']})
+        customers = pd.DataFrame({'customer_id': ['c1', 'c2'], 'customer_state': ['SP', 'RJ']})
+        orders.to_csv(os.path.join(cleaned_dir, 'cleaned_orders.csv'), index=False)
+        customers.to_csv(os.path.join(cleaned_dir, 'cleaned_customers.csv'), index=False)
+        before = MarketExpansionAnalyzer.results_source_versions(cleaned_dir)
+        assert {'features', 'cube', 'cleaned', 'reference', 'schema'} <= set(before)
+        assert MarketExpansionAnalyzer.results_source_versions(cleaned_dir) == before
+
+        customers.assign(customer_state='MG').to_csv(os.path.join(cleaned_dir, 'cleaned_customers.csv'), index=False)
+        after = MarketExpansionAnalyzer.results_source_versions(cleaned_dir)
+        assert after['cleaned'] != before['cleaned']
+        assert {key: value for key, value in after.items() if key != 'cleaned'} == \
+            {key: value for key, value in before.items() if key != 'cleaned'}
+
+
+def test_dashboard_panel_handles_missing_delivery_time():
+    """Recommendations restored from JSON (missing delivery time is None) still render"""
+    from dashboard.pages.market_expansion import create_expansion_recommendations_panel
+    summary, recommendations, insights = make_results()
+    recommendations[0].update({'priority': 'High', 'recommendations': ['Add sellers']})
+    recommendations[0]['key_metrics'].update({'sellers': 3, 'untapped_customers': 0, 'seller_gap': 2})
+    with tempfile.TemporaryDirectory() as results_dir:
+        materialize_results('expansion', {'state_summary': summary}, {'recommendations': recommendations},
+                            {'features': 'v1'}, results_dir=results_dir)
+        restored = load_materialized_results('expansion', {'features': 'v1'}, results_dir=results_dir)
+    assert restored['recommendations'][0]['key_metrics']['avg_delivery_days'] is None
+    create_expansion_recommendations_panel(restored['recommendations'])
+
+
+if __name__ == "__main__":
+    print("Testing materialized analysis results...")
+    test_round_trip()
+    test_stale_results_are_ignored()
+    test_expansion_sources_cover_cleaned_tables()
+    test_dashboard_panel_handles_missing_delivery_time()
+    print("✅ Materialized analysis results tests passed!")
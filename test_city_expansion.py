@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for city-level expansion opportunity scoring
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from market_expansion import MarketExpansionAnalyzer, select_top_cities
+
+STATES = ['SP', 'RJ', 'MG', 'BA', 'PR', 'RS', 'PE', 'CE', 'PA', 'SC', 'GO', 'MA', 'PB', 'AM']
+
+
+def make_city_features(n_cities=5000, seed=7):
+    """Create a city-level market expansion feature frame"""
+    rng = np.random.default_rng(seed)
+    customers = rng.integers(1, 500, n_cities)
+    delivery_days = rng.uniform(3, 30, n_cities)
+    delivery_days[rng.random(n_cities) < 0.05] = np.nan
+    return pd.DataFrame({
+        'state': rng.choice(STATES, n_cities),
+        'city': [f'city_{i}' for i in range(n_cities)],
+        'customer_count': customers,
+        'seller_count': rng.integers(0, 20, n_cities).astype(float),
+        'total_orders': customers + rng.integers(0, 50, n_cities),
+        'total_revenue': customers * rng.uniform(80, 250, n_cities),
+        'avg_delivery_days': delivery_days,
+        'on_time_rate': rng.uniform(0.6, 1.0, n_cities)
+    })
+
+
+def test_city_scoring_is_fast_and_complete():
+    """Thousands of cities are scored in well under a second with no missing scores"""
+    analyzer = MarketExpansionAnalyzer()
+    analyzer.market_data = make_city_features()
+
+    start = time.perf_counter()
+    cities = analyzer.score_city_opportunities()
+    elapsed = time.perf_counter() - start
+
+    assert len(cities) == 5000
+    assert elapsed < 1.0, f"City scoring took {elapsed:.2f}s"
+    assert cities['combined_opportunity_score'].notna().all()
+    assert cities['avg_delivery_days'].notna().all()
+
+    # Without municipality populations, penetration is not estimated from customer counts
+    assert (cities['population_source'] == 'unavailable').all()
+    assert cities[['population', 'penetration_rate', 'untapped_customers', 'market_size_score']].isna().all().all()
+    operations_and_competition = (
+        cities['operational_feasibility_score'] * MarketExpansionAnalyzer.OPPORTUNITY_WEIGHTS['operational_feasibility_score'] +
+        cities['competitive_score'] * MarketExpansionAnalyzer.OPPORTUNITY_WEIGHTS['competitive_score']
+    )
+    assert np.allclose(cities['combined_opportunity_score'], operations_and_competition)
+
+
+def test_municipality_population_drives_penetration():
+    """Registered municipality populations give penetration that varies within a state"""
+    features = make_city_features(n_cities=300)
+    rng = np.random.default_rng(3)
+    municipalities = pd.DataFrame({
+        'state': features['state'],
+        'city': features['city'].str.upper(),
+        'population': rng.integers(20000, 2000000, len(features)),
+        'gdp_per_capita': rng.integers(15000, 60000, len(features)),
+        'tier': rng.integers(1, 4, len(features)),
+        'urban_rate': rng.uniform(0.5, 1.0, len(features)).round(2)
+    })
+    with tempfile.TemporaryDirectory() as reference_dir:
+        municipalities.to_csv(os.path.join(reference_dir, 'municipalities.csv'), index=False)
+        with open(os.path.join(reference_dir, 'manifest.json'), 'w') as f:
+            json.dump({'municipality': {'current': '1', 'key': ['state', 'city'],
+                                        'versions': {'1': {'file': 'municipalities.csv'}}}}, f)
+        analyzer = MarketExpansionAnalyzer()
+        analyzer.market_data = features
+        cities = analyzer.score_city_opportunities(reference_dir=reference_dir)
+
+    assert (cities['population_source'] == 'municipality').all()
+    assert cities['population'].notna().all()
+    sp = cities[cities['state'] == 'SP']
+    assert sp['penetration_rate'].nunique() > 1
+    # Penetration is measured against population, not a restatement of customer counts
+    assert abs(sp['untapped_customers'].corr(sp['customer_count'], method='spearman')) < 0.9
+
+
+def test_top_cities_use_precomputed_ranks():
+    """Top-K per state and nationally matches a direct sort of the scores"""
+    analyzer = MarketExpansionAnalyzer()
+    analyzer.market_data = make_city_features(n_cities=800)
+    cities = analyzer.score_city_opportunities()
+
+    top_sp = analyzer.top_cities(3, states='SP')
+    expected = cities[cities['state'] == 'SP'].nlargest(3, 'combined_opportunity_score')
+    assert top_sp['city'].tolist() == expected['city'].tolist()
+
+    per_state = select_top_cities(cities, k=2, states=['RJ', 'MG'])
+    assert per_state.groupby('state').size().to_dict() == {'MG': 2, 'RJ': 2}
+
+    national = select_top_cities(cities, k=10, per_state=False)
+    assert national['city'].tolist() == cities.nlargest(10, 'combined_opportunity_score')['city'].tolist()
+
+
+if __name__ == "__main__":
+    print("Testing city expansion scoring...")
+    test_city_scoring_is_fast_and_complete()
+    test_municipality_population_drives_penetration()
+    test_top_cities_use_precomputed_ranks()
+    print("✅ City expansion scoring tests passed!")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for cohort retention by customer_unique_id
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from cohort_analysis import build_order_facts, compute_cohorts, analyze_cohorts
+
+
+def make_orders():
+    """Four unique customers; u1 and u3 come back under new per-order customer_ids"""
+    orders = pd.DataFrame({
+        'order_id': ['o1', 'o2', 'o3', 'o4', 'o5', 'o6', 'o7'],
+        'customer_id': ['c1', 'c2', 'c3', 'c4', 'c5', 'c6', 'c7'],
+        'order_purchase_timestamp': ['2018-01-05', '2018-01-20', '2018-02-10', '2018-02-11',
+                                     '2018-03-01', '2018-03-15', '2018-03-20']
+    })
+    customers = pd.DataFrame({
+        'customer_id': ['c1', 'c2', 'c3', 'c4', 'c5', 'c6', 'c7'],
+        'customer_unique_id': ['u1', 'u2', 'u1', 'u3', 'u3', 'u4', 'u1']
+    })
+    order_items = pd.DataFrame({
+        'order_id': ['o1', 'o1', 'o2', 'o3', 'o4', 'o5', 'o6', 'o7'],
+        'price': [10.0, 5.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0],
+        'freight_value': [1.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    })
+    return orders, customers, order_items
+
+
+def test_cohort_matrices():
+    """Customers are resolved by unique id and counted once per cohort month"""
+    cohorts = analyze_cohorts(*make_orders())
+
+    assert cohorts['cohort_sizes'].to_dict() == {pd.Period('2018-01', 'M'): 2, pd.Period('2018-02', 'M'): 1,
+                                                 pd.Period('2018-03', 'M'): 1}
+    active = cohorts['active_customers']
+    assert active.loc['2018-01'].tolist() == [2, 1, 1]
+    assert active.loc['2018-02'].tolist()[:2] == [1, 1]
+    # Cohorts too young for an age are not observed
+    assert np.isnan(cohorts['retention'].loc['2018-03', 1])
+    assert cohorts['retention'].loc['2018-01', 2] == 0.5
+
+    # Jan cohort: (15 + 2) + 22 in month 0, 33 in month 1, 77 in month 2
+    assert np.isclose(cohorts['revenue'].loc['2018-01', 0], 39.0)
+    assert np.isclose(cohorts['cumulative_revenue_per_customer'].loc['2018-01', 2], (39.0 + 33.0 + 77.0) / 2)
+
+    curve = cohorts['retention_curve'].set_index('months_since_first_order')
+    assert np.isclose(curve.loc[1, 'retention_rate'], 2 / 3)
+    assert curve.loc[1, 'cohorts_observed'] == 2
+    assert np.isclose(cohorts['summary']['repeat_customer_rate'], 50.0)
+
+
+def test_max_periods_and_large_ages():
+    """Truncating ages does not change the reported cells; the wide-age path matches"""
+    orders, customers, order_items = make_orders()
+    facts = build_order_facts(orders, customers, order_items)
+    full = compute_cohorts(facts)
+    truncated = compute_cohorts(facts, max_periods=2)
+    pd.testing.assert_frame_equal(truncated['active_customers'], full['active_customers'].iloc[:, :2])
+
+    # More than 64 months since first order uses the deduplicating unique() path
+    rng = np.random.default_rng(3)
+    wide = pd.DataFrame({'customer_unique_id': rng.integers(0, 50, 400),
+                         'order_period': rng.integers(500, 580, 400), 'revenue': 1.0})
+    wide_cohorts = compute_cohorts(wide)
+    expected = wide.assign(
+        cohort=wide.groupby('customer_unique_id')['order_period'].transform('min')
+    ).assign(age=lambda df: df['order_period'] - df['cohort'])
+    expected_active = expected.drop_duplicates(['customer_unique_id', 'age']).groupby(['cohort', 'age']).size()
+    for (cohort, age), count in expected_active.items():
+        assert wide_cohorts['active_customers'].loc[pd.Period(ordinal=cohort, freq='M'), age] == count
+
+
+def test_dashboard_cohorts_follow_cleaned_tables():
+    """The dashboard cache is keyed on the cleaned tables; no orders give no cohorts instead of an error"""
+    from dashboard.pages.customer_analytics import COHORT_TABLES, load_cohort_retention_data
+    from data_cache import cleaned_data_version
+
+    try:
+        compute_cohorts(build_order_facts(*make_orders()).head(0))
+        assert False, "Expected empty order facts to be rejected"
+    except ValueError:
+        pass
+
+    orders, customers, order_items = make_orders()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as root:
+        os.chdir(root)
+        try:
+            os.makedirs('data/cleaned')
+            customers.to_csv('data/cleaned/cleaned_customers.csv', index=False)
+            order_items.to_csv('data/cleaned/cleaned_order_items.csv', index=False)
+            orders.head(4).to_csv('data/cleaned/cleaned_orders.csv', index=False)
+            first = load_cohort_retention_data(cleaned_data_version(COHORT_TABLES))
+            assert first['summary']['total_orders'] == 4
+
+            orders.to_csv('data/cleaned/cleaned_orders.csv', index=False)
+            updated = load_cohort_retention_data(cleaned_data_version(COHORT_TABLES))
+            assert updated['summary']['total_orders'] == 7
+
+            orders.head(0).to_csv('data/cleaned/cleaned_orders.csv', index=False)
+            assert load_cohort_retention_data(cleaned_data_version(COHORT_TABLES)) is None
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    print("Testing cohort retention...")
+    test_cohort_matrices()
+    test_max_periods_and_large_ages()
+    test_dashboard_cohorts_follow_cleaned_tables()
+    print("✅ Cohort retention tests passed!")
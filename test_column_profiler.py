@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-scan column profiler
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from column_profiler import HyperLogLog, profile_column, profile_datasets
+from data_quality_check import DataQualityChecker
+
+
+def make_datasets(rows=20000, seed=11):
+    """Orders with missing values, outliers, repeated text and a date column"""
+    rng = np.random.default_rng(seed)
+    price = rng.lognormal(4.0, 0.6, rows)
+    price[rng.choice(rows, 50, replace=False)] = 5000.0
+    price[rng.choice(rows, 300, replace=False)] = np.nan
+    orders = pd.DataFrame({
+        'order_id': [f'o{i}' for i in range(rows)],
+        'order_status': rng.choice(['delivered', 'shipped', 'canceled'], rows),
+        'order_purchase_timestamp': pd.Timestamp('2018-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'price': price,
+        'items': rng.integers(1, 6, rows)
+    })
+    sellers = pd.DataFrame({
+        'seller_id': [f's{i}' for i in range(500)],
+        'seller_state': pd.Categorical(rng.choice(['SP', 'RJ', None], 500))
+    })
+    return {'orders': orders, 'sellers': sellers}
+
+
+def test_hyperloglog_accuracy_and_merge():
+    """Estimates stay within a few percent and merged counters match a single counter"""
+    for n in (50, 5000, 200000):
+        counter = HyperLogLog()
+        counter.add(pd.Series([f'value{i}' for i in range(n)] * 2))
+        assert abs(counter.count() - n) <= max(2, 0.03 * n)
+
+    left, right, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.add(pd.Series(np.arange(0, 60000)))
+    right.add(pd.Series(np.arange(40000, 100000)))
+    whole.add(pd.Series(np.arange(0, 100000)))
+    left.merge(right)
+    np.testing.assert_array_equal(left.registers, whole.registers)
+    assert abs(left.count() - 100000) <= 3000
+
+
+def test_profile_column_matches_pandas():
+    """Moments, quartiles, nulls and outliers match pandas on the same column"""
+    price = make_datasets()['orders']['price']
+    profile = profile_column(price)
+    stats = price.describe()
+    assert profile['Missing_Count'] == 300 and profile['Rows'] == len(price)
+    assert profile['Min'] == stats['min'] and profile['Max'] == stats['max']
+    assert np.isclose(profile['Mean'], stats['mean']) and np.isclose(profile['Std'], stats['std'])
+    assert np.isclose(profile['Q1'], stats['25%']) and np.isclose(profile['Q3'], stats['75%'])
+    iqr = stats['75%'] - stats['25%']
+    outliers = ((price < stats['25%'] - 1.5 * iqr) | (price > stats['75%'] + 1.5 * iqr)).sum()
+    assert profile['Outliers'] == outliers
+
+    status = profile_column(make_datasets()['orders']['order_status'])
+    assert status['Unique_Values'] == 3 and np.isnan(status['Mean'])
+    assert status['Needs_Conversion'] and status['Suggested_Type'] == 'category'
+
+
+def test_checker_uses_profiles():
+    """Parallel profiling matches in-process profiling and feeds the quality checks"""
+    datasets = make_datasets()
+    serial = profile_datasets(datasets, max_workers=1)
+    parallel = profile_datasets(datasets, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert list(serial['Dataset'].unique()) == ['orders', 'sellers']
+
+    checker = DataQualityChecker(datasets, max_workers=1)
+    missing = checker.check_missing_values().set_index('Column')
+    assert missing.loc['price', 'Missing_Count'] == 300
+    assert missing.loc['seller_state', 'Missing_Count'] == datasets['sellers']['seller_state'].isna().sum()
+
+    types = checker.check_data_types().set_index('Column')
+    assert types.loc['order_purchase_timestamp', 'Suggested_Type'] == 'datetime64'
+    assert abs(types.loc['order_id', 'Unique_Values'] - 20000) <= 600
+
+    ranges = checker.check_value_ranges().set_index('Column')
+    assert set(ranges.index) == {'price', 'items'}
+    assert ranges.loc['price', 'Max'] == 5000.0
+    assert ranges.loc['price', 'Std'] == round(datasets['orders']['price'].std(), 2)
+
+
+if __name__ == "__main__":
+    print("Testing column profiler...")
+    test_hyperloglog_accuracy_and_merge()
+    test_profile_column_matches_pandas()
+    test_checker_uses_profiles()
+    print("✅ Column profiler tests passed!")
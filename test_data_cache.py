@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the process-level table cache
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from data_cache import load_cleaned_table, cache_info, clear_cache
+
+
+def write_orders(data_dir, n=5):
+    """Write a small cleaned_orders.csv"""
+    pd.DataFrame({
+        'order_id': [f'o{i}' for i in range(n)],
+        'customer_id': [f'c{i}' for i in range(n)],
+        'order_purchase_timestamp': pd.date_range('2018-01-01', periods=n, freq='D'),
+        'delivery_days': range(n)
+    }).to_csv(os.path.join(data_dir, 'cleaned_orders.csv'), index=False)
+
+
+def test_projection_grows_incrementally():
+    """Only requested columns are read, and later requests add to the cache"""
+    clear_cache()
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_orders(data_dir)
+
+        first = load_cleaned_table('orders', ['order_id'], data_dir=data_dir)
+        assert list(first.columns) == ['order_id']
+        assert cache_info()['cached_columns'].iloc[0] == 1
+
+        second = load_cleaned_table('orders', ['order_id', 'order_purchase_timestamp'],
+                                    parse_dates=['order_purchase_timestamp'], data_dir=data_dir)
+        assert pd.api.types.is_datetime64_any_dtype(second['order_purchase_timestamp'])
+        assert cache_info()['cached_columns'].iloc[0] == 2
+
+
+def test_callers_cannot_mutate_cache():
+    """Modifying a returned frame leaves the cached data untouched"""
+    clear_cache()
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_orders(data_dir)
+
+        frame = load_cleaned_table('orders', ['order_id', 'delivery_days'], data_dir=data_dir)
+        frame['delivery_days'] = -1
+        frame['extra'] = 1
+
+        again = load_cleaned_table('orders', ['order_id', 'delivery_days'], data_dir=data_dir)
+        assert again['delivery_days'].tolist() == [0, 1, 2, 3, 4]
+        assert 'extra' not in again.columns
+
+
+def test_changed_file_is_reloaded():
+    """A rewritten file invalidates its cache entry"""
+    clear_cache()
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_orders(data_dir, n=5)
+        assert len(load_cleaned_table('orders', ['order_id'], data_dir=data_dir)) == 5
+
+        write_orders(data_dir, n=8)
+        path = os.path.join(data_dir, 'cleaned_orders.csv')
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        assert len(load_cleaned_table('orders', ['order_id'], data_dir=data_dir)) == 8
+
+        try:
+            load_cleaned_table('orders', ['not_a_column'], data_dir=data_dir)
+            assert False, "Unknown column should raise"
+        except KeyError:
+            pass
+
+
+if __name__ == "__main__":
+    print("Testing table cache...")
+    test_projection_grows_incrementally()
+    test_callers_cannot_mutate_cache()
+    test_changed_file_is_reloaded()
+    print("✅ Table cache tests passed!")
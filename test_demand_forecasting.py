@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Test script for the monthly demand forecaster and rolling-origin backtests
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from demand_forecasting import (
+    IMPACT_SCORES, MonthlyDemandForecaster, backtest_forecaster, forecast_series_batch, publish_forecasts,
+    trim_incomplete_months
+)
+from feature_store import FeatureStore
+from seasonal_analysis import SeasonalAnalysis
+
+HOLIDAY_IMPACT = {month: IMPACT_SCORES['high' if month in (11, 12) else 'low'] for month in range(1, 13)}
+
+
+def make_monthly(months=30, seed=8):
+    """Monthly totals with growth, a year-end peak and noise"""
+    rng = np.random.default_rng(seed)
+    periods = pd.period_range('2016-07', periods=months, freq='M')
+    orders = (400 + 25 * np.arange(months)) * np.where(periods.month >= 11, 1.5, 1.0) * rng.normal(1, 0.05, months)
+    return pd.DataFrame({
+        'year': periods.year,
+        'month': periods.month,
+        'orders': orders.round(),
+        'revenue': orders.round() * 150 * rng.normal(1, 0.03, months)
+    })
+
+
+def test_forecaster_rolls_calendar_and_lags():
+    """Forecasts continue the calendar after the history, across the year boundary"""
+    monthly = make_monthly()
+    forecaster = MonthlyDemandForecaster(HOLIDAY_IMPACT, n_estimators=20).fit(monthly)
+    forecast = forecaster.predict(4)
+    assert forecast[['year', 'month']].values.tolist() == [[2019, 1], [2019, 2], [2019, 3], [2019, 4]]
+    assert (forecast['predicted_revenue'] > 0).all()
+    assert list(forecaster.feature_importance()['importance']) == sorted(forecaster.feature_importance()['importance'], reverse=True)
+
+    try:
+        MonthlyDemandForecaster(HOLIDAY_IMPACT).fit(monthly.head(12))
+        assert False, "Expected too little history to be rejected"
+    except ValueError:
+        pass
+
+
+def test_backtest_folds_and_metrics():
+    """Every cutoff is scored per horizon and metrics agree with the fold errors"""
+    monthly = make_monthly()
+    result = backtest_forecaster(monthly, HOLIDAY_IMPACT, horizons=3, min_train_months=20,
+                                 max_workers=1, n_estimators=20)
+    assert result.folds == 10
+    counts = result.errors.groupby('horizon').size() // 2
+    assert counts.to_dict() == {1: 10, 2: 9, 3: 8}
+
+    metrics = result.metrics().set_index(['target', 'horizon'])
+    h1 = result.errors.query("target == 'revenue' and horizon == 1")
+    assert np.isclose(metrics.loc[('revenue', 1), 'MAE'], (h1['actual'] - h1['predicted']).abs().mean())
+    assert np.isclose(metrics.loc[('revenue', 1), 'RMSE'], np.sqrt(((h1['actual'] - h1['predicted']) ** 2).mean()))
+    assert np.isclose(metrics.loc[('revenue', 1), 'MAPE'],
+                      ((h1['actual'] - h1['predicted']).abs() / h1['actual']).mean() * 100)
+
+    # No fold may see the months it forecasts
+    first = result.errors.iloc[0]
+    train = monthly.iloc[:20]
+    assert (first['cutoff_year'], first['cutoff_month']) == (train['year'].iloc[-1], train['month'].iloc[-1])
+
+
+def test_parallel_folds_and_intervals():
+    """Process pool folds match in-process folds and intervals follow the backtest errors"""
+    monthly = make_monthly()
+    serial = backtest_forecaster(monthly, HOLIDAY_IMPACT, min_train_months=22, max_workers=1, n_estimators=10)
+    parallel = backtest_forecaster(monthly, HOLIDAY_IMPACT, min_train_months=22, max_workers=2, n_estimators=10)
+    pd.testing.assert_frame_equal(serial.errors, parallel.errors)
+
+    forecast = MonthlyDemandForecaster(HOLIDAY_IMPACT, n_estimators=10).fit(monthly).predict(3)
+    intervals = serial.prediction_intervals(forecast)
+    for target in ['revenue', 'orders']:
+        assert (intervals[f'{target}_lower'] <= intervals[f'{target}_upper']).all()
+
+    # Bounds come from the relative error quantiles of the horizon
+    bounds = serial.metrics().set_index(['target', 'horizon']).loc[('revenue', 1)]
+    assert np.isclose(intervals['revenue_upper'].iloc[0],
+                      forecast['predicted_revenue'].iloc[0] * (1 + bounds['upper_relative_error']))
+
+
+def make_category_state_totals(seed=4):
+    """Monthly item revenue for categories x states; one series starts late, one has a gap"""
+    rng = np.random.default_rng(seed)
+    periods = pd.period_range('2017-01', periods=18, freq='M')
+    rows = []
+    for category in ['bed_bath', 'toys', 'garden']:
+        for state in ['SP', 'RJ', 'MG']:
+            for period in periods:
+                if category == 'garden' and period < pd.Period('2018-02', 'M'):
+                    continue
+                if category == 'toys' and state == 'MG' and period == pd.Period('2017-09', 'M'):
+                    continue
+                rows.append({'category': category, 'state': state, 'year': period.year, 'month': period.month,
+                             'item_revenue': rng.gamma(5, 100 if state == 'SP' else 40)})
+    return pd.DataFrame(rows)
+
+
+def test_batch_smoothing_per_series():
+    """Every series gets its own smoothing fit, matching a direct exponential smoothing"""
+    totals = make_category_state_totals()
+    forecasts = forecast_series_batch(totals, ['category', 'state'], 'item_revenue', horizons=2, max_workers=1)
+    assert len(forecasts) == 9 * 2
+    assert forecasts[['year', 'month']].drop_duplicates().values.tolist() == [[2018, 7], [2018, 8]]
+
+    series = totals.query("category == 'toys' and state == 'MG'")
+    values = np.zeros(18)
+    values[(series['year'] - 2017) * 12 + series['month'] - 1] = series['item_revenue']
+    row = forecasts.query("category == 'toys' and state == 'MG' and horizon == 1").iloc[0]
+    level = values[0]
+    for value in values[1:]:
+        level += row['alpha'] * (value - level)
+    assert np.isclose(row['predicted'], level)
+    assert row['lower'] < row['predicted'] < row['upper']
+    wider = forecasts.query("category == 'toys' and state == 'MG' and horizon == 2").iloc[0]
+    assert wider['upper'] - wider['lower'] >= row['upper'] - row['lower']
+
+    garden = forecasts.query("category == 'garden'")
+    assert (garden['active_months'] == 5).all()
+
+    chunked = forecast_series_batch(totals, ['category', 'state'], 'item_revenue', horizons=2,
+                                    max_workers=2, chunk_size=4)
+    pd.testing.assert_frame_equal(forecasts, chunked)
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = FeatureStore(store_dir)
+        version = publish_forecasts({'category_state': forecasts}, store)
+        assert store.current_version() == version
+        assert len(store.load_dataset('demand_forecasts_category_state')) == len(forecasts)
+
+
+def test_inventory_recommendations_use_category_forecasts():
+    """Category recommendations carry forecast demand, trend, stock units and state split"""
+    rng = np.random.default_rng(12)
+    n_orders = 6000
+    timestamps = pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.integers(0, 540, n_orders), unit='D')
+    orders = pd.DataFrame({
+        'order_id': [f'o{i}' for i in range(n_orders)],
+        'customer_id': [f'c{i}' for i in range(n_orders)],
+        'order_purchase_timestamp': timestamps
+    })
+    products = pd.DataFrame({'product_id': ['p0', 'p1', 'p2'],
+                             'product_category_name_english': ['bed_bath', 'toys', 'garden']})
+    # Toys sales grow fast through the last months
+    product = rng.choice(['p0', 'p1', 'p2'], n_orders)
+    late = timestamps >= pd.Timestamp('2018-04-01')
+    product[late & (rng.random(n_orders) < 0.5)] = 'p1'
+    items = pd.DataFrame({'order_id': orders['order_id'], 'product_id': product,
+                          'price': 100.0, 'freight_value': 10.0})
+    customers = pd.DataFrame({'customer_id': orders['customer_id'],
+                              'customer_state': rng.choice(['SP', 'RJ'], n_orders, p=[0.7, 0.3])})
+
+    analyzer = SeasonalAnalysis(use_cube=False, max_workers=1)
+    analyzer.datasets = {'orders': orders, 'order_items': items, 'products': products, 'customers': customers}
+    analyzer.prepare_seasonal_data()
+    recommendations = analyzer.generate_inventory_optimization_recommendations()
+
+    by_category = {rec['category']: rec for rec in recommendations['category_recommendations']}
+    toys = by_category['toys']
+    assert toys['demand_trend'] == 'Rising' and 'forecast growth' in toys['inventory_strategy']
+    assert toys['recommended_stock_units'] > 0
+    assert toys['top_states'].startswith('SP')
+    assert recommendations['category_recommendations'][0]['category'] == 'toys'
+
+
+def test_model_reports_backtest_before_legacy_holdout():
+    """Backtest metrics are the model performance; the 80/20 split is only a labelled holdout"""
+    monthly = make_monthly()
+    seasonal = monthly.loc[monthly.index.repeat(2), ['year', 'month']].reset_index(drop=True)
+    seasonal['order_id'] = [f'o{i}' for i in range(len(seasonal))]
+    seasonal['customer_id'] = seasonal['order_id']
+    seasonal['total_order_value'] = monthly['revenue'].repeat(2).to_numpy() / 2
+    seasonal['item_count'] = 1
+
+    analyzer = SeasonalAnalysis(use_cube=False, max_workers=1)
+    analyzer.seasonal_data = seasonal
+    models = analyzer.build_demand_forecasting_model()
+    assert 'performance' not in models
+    assert models['backtest']['folds'] > 0
+    assert list(models).index('backtest') < list(models).index('legacy_holdout')
+    assert set(models['legacy_holdout']) >= {'revenue_r2', 'orders_r2'}
+
+
+def test_incomplete_trailing_months_are_trimmed():
+    """Trailing months far below the median month are dropped; earlier dips are kept"""
+    periods = pd.period_range('2017-01', periods=14, freq='M')
+    counts = [300] + [1000] * 11 + [8, 2]
+    monthly = pd.DataFrame({'year': periods.year, 'month': periods.month, 'orders': counts})
+    trimmed = trim_incomplete_months(monthly.sample(frac=1, random_state=3))
+    assert len(trimmed) == 12
+    assert trimmed[['year', 'month']].iloc[-1].tolist() == [2017, 12]
+    assert len(trim_incomplete_months(monthly.head(12))) == 12
+
+
+def test_category_forecasts_skip_partial_month_and_count_empty_months():
+    """Category series end at the last complete month; the baseline averages zero-sale months too"""
+    timestamps = pd.date_range('2017-01-01', '2018-06-28', freq='2h')
+    timestamps = timestamps.append(pd.DatetimeIndex(['2018-07-01', '2018-07-02']))
+    n_orders = len(timestamps)
+    orders = pd.DataFrame({
+        'order_id': [f'o{i}' for i in range(n_orders)],
+        'customer_id': [f'c{i}' for i in range(n_orders)],
+        'order_purchase_timestamp': timestamps
+    })
+    # Garden sells every month except March 2018
+    product = np.where(np.arange(n_orders) % 2 == 0, 'p0', 'p1')
+    product[(timestamps.year == 2018) & (timestamps.month == 3)] = 'p0'
+    products = pd.DataFrame({'product_id': ['p0', 'p1'], 'product_category_name_english': ['bed_bath', 'garden']})
+    items = pd.DataFrame({'order_id': orders['order_id'], 'product_id': product, 'price': 100.0, 'freight_value': 10.0})
+    customers = pd.DataFrame({'customer_id': orders['customer_id'], 'customer_state': 'SP'})
+
+    analyzer = SeasonalAnalysis(use_cube=False, max_workers=1)
+    analyzer.datasets = {'orders': orders, 'order_items': items, 'products': products, 'customers': customers}
+    analyzer.prepare_seasonal_data()
+    category = analyzer.build_category_forecasts()['category']
+    assert category.query("horizon == 1")[['year', 'month']].drop_duplicates().values.tolist() == [[2018, 7]]
+
+    garden = category.query("category == 'garden' and horizon == 1").iloc[0]
+    trailing = items[(product == 'p1') & (timestamps >= pd.Timestamp('2017-07-01')) &
+                     (timestamps < pd.Timestamp('2018-07-01'))]
+    assert np.isclose(garden['baseline_monthly_revenue'], trailing['price'].sum() / 12)
+
+
+if __name__ == "__main__":
+    print("Testing demand forecasting backtests...")
+    test_forecaster_rolls_calendar_and_lags()
+    test_backtest_folds_and_metrics()
+    test_parallel_folds_and_intervals()
+    test_batch_smoothing_per_series()
+    test_inventory_recommendations_use_category_forecasts()
+    test_model_reports_backtest_before_legacy_holdout()
+    test_incomplete_trailing_months_are_trimmed()
+    test_category_forecasts_skip_partial_month_and_count_empty_months()
+    print("✅ Demand forecasting tests passed!")
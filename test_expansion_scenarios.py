@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the expansion weight scenario engine
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from expansion_scenarios import WeightScenarioEngine
+from market_expansion import MarketExpansionAnalyzer
+
+WEIGHTS = MarketExpansionAnalyzer.OPPORTUNITY_WEIGHTS
+
+
+def make_component_scores(n_entities=27, seed=3):
+    """Create a summary with random component scores"""
+    rng = np.random.default_rng(seed)
+    summary = pd.DataFrame(rng.random((n_entities, len(WEIGHTS))), columns=list(WEIGHTS))
+    summary.insert(0, 'state', [f'S{i:02d}' for i in range(n_entities)])
+    summary['combined_opportunity_score'] = sum(summary[col] * weight for col, weight in WEIGHTS.items())
+    return summary
+
+
+def test_base_scenario_matches_combined_score():
+    """The base weighting reproduces the combined opportunity score ranking"""
+    summary = make_component_scores()
+    result = WeightScenarioEngine(summary, WEIGHTS).run(n_scenarios=2000, top_n=5)
+
+    entities = result['entities']
+    expected = summary.sort_values('combined_opportunity_score', ascending=False)['state'].tolist()
+    assert entities['state'].tolist() == expected
+    assert np.allclose(entities['base_score'], np.sort(summary['combined_opportunity_score'])[::-1])
+    assert result['scenarios'].loc[0, 'spearman_vs_base'] == 1.0
+    assert ((entities['best_rank'] <= entities['base_rank']) & (entities['base_rank'] <= entities['worst_rank'])).all()
+
+
+def test_weight_regions_and_sensitivity():
+    """An entity that only scores on one component is top only when that weight is high"""
+    summary = make_component_scores(n_entities=10)
+    summary.loc[0, list(WEIGHTS)] = [0.0, 0.0, 0.0, 1.0]
+    summary.loc[1:, 'competitive_score'] = 0.0
+
+    weights = np.array([[1.0, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0], [0.25, 0.25, 0.25, 0.25]])
+    result = WeightScenarioEngine(summary, WEIGHTS).run(weights=weights, top_n=1)
+    entity = result['entities'].set_index('state').loc['S00']
+
+    assert entity['best_rank'] == 1 and entity['top_n_share'] == 1 / 3
+    assert entity['competitive_weight_min'] == 1.0
+    assert entity['competitive_rank_corr'] < 0
+
+    never_top = result['entities'].loc[result['entities']['top_n_share'] == 0]
+    assert never_top['market_size_weight_min'].isna().all()
+
+
+def test_sampling_is_seeded_and_scales():
+    """Scenarios are reproducible and 10,000 scenarios over 2,000 cities run in one call"""
+    summary = make_component_scores(n_entities=2000)
+    engine = WeightScenarioEngine(summary, WEIGHTS)
+
+    weights = engine.sample_weights(10000, seed=11)
+    assert weights.shape == (10000, 4) and np.allclose(weights.sum(axis=1), 1)
+    assert np.array_equal(weights, engine.sample_weights(10000, seed=11))
+
+    result = engine.run(weights=weights, top_n=10)
+    assert result['summary']['n_scenarios'] == 10000
+    assert 0 < result['summary']['mean_spearman'] <= 1
+
+
+if __name__ == "__main__":
+    print("Testing weight scenario engine...")
+    test_base_scenario_matches_combined_score()
+    test_weight_regions_and_sensitivity()
+    test_sampling_is_seeded_and_scales()
+    print("✅ Weight scenario engine tests passed!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned feature store
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from feature_store import FeatureStore
+
+
+def sample_datasets(revenue_scale=1.0):
+    """Build a small set of feature datasets"""
+    return {
+        'market_expansion': pd.DataFrame({
+            'state': ['SP', 'RJ', 'MG'],
+            'total_revenue': [1000.0 * revenue_scale, 500.0, 250.0]
+        }),
+        'seasonal_intelligence': {
+            'monthly_trends': pd.DataFrame({'month': [1, 2], 'monthly_revenue': [10.0, 20.0]})
+        }
+    }
+
+
+def test_snapshot_is_content_addressed():
+    """Identical content produces the same version id"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = FeatureStore(store_dir)
+        first = store.write_snapshot(sample_datasets())
+        second = store.write_snapshot(sample_datasets())
+        changed = store.write_snapshot(sample_datasets(revenue_scale=2.0))
+
+        assert first == second
+        assert changed != first
+        assert store.current_version() == changed
+        assert len(store.list_snapshots()) == 2
+
+
+def test_load_from_current_snapshot():
+    """Readers resolve datasets through the CURRENT pointer"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = FeatureStore(store_dir)
+        version = store.write_snapshot(sample_datasets())
+
+        datasets = store.load_all()
+        assert set(datasets) == {'market_expansion', 'seasonal_intelligence_monthly_trends'}
+        assert store.read_manifest(version)['datasets']['market_expansion']['rows'] == 3
+
+        # Unpublished snapshots are invisible to readers
+        store.write_snapshot(sample_datasets(revenue_scale=3.0), publish=False)
+        assert store.current_version() == version
+
+
+def test_base_version_carries_over_datasets():
+    """Partial updates keep datasets from the base snapshot"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = FeatureStore(store_dir)
+        base = store.write_snapshot(sample_datasets())
+        update = store.write_snapshot(
+            {'seasonal_intelligence_forecasts': pd.DataFrame({'month': [11], 'predicted_revenue': [5.0]})},
+            base_version=base
+        )
+
+        datasets = store.load_all(update)
+        assert 'market_expansion' in datasets
+        assert 'seasonal_intelligence_forecasts' in datasets
+
+
+def test_garbage_collection_keeps_current():
+    """Retention removes old snapshots but never the active one"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = FeatureStore(store_dir)
+        versions = [store.write_snapshot(sample_datasets(revenue_scale=i)) for i in range(1, 5)]
+        store.publish(versions[0])
+
+        removed = store.garbage_collect(keep_last=1)
+        remaining = set(store.list_snapshots()['version'])
+
+        assert versions[0] in remaining
+        assert versions[0] not in removed
+        assert len(remaining) == 2
+
+
+if __name__ == "__main__":
+    print("Testing feature store...")
+    test_snapshot_is_content_addressed()
+    test_load_from_current_snapshot()
+    test_base_version_carries_over_datasets()
+    test_garbage_collection_keeps_current()
+    print("✅ Feature store tests passed!")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the high-value customer model lifecycle
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from high_value_model import (
+    HighValueCustomerModel, train_or_load, FEATURE_COLUMNS, MODEL_FILE, main, compute_data_version
+)
+from feature_store import FeatureStore
+from customer_analytics import CustomerAnalytics
+
+
+def make_customer_data(n_customers=600, seed=7):
+    """Synthetic customer analytics rows where revenue drives the CLV category"""
+    rng = np.random.default_rng(seed)
+    revenue = rng.gamma(2.0, 80.0, n_customers)
+    data = pd.DataFrame({
+        'customer_id': [f'c{i:05d}' for i in range(n_customers)],
+        'recency_score': rng.integers(1, 6, n_customers),
+        'frequency_score': np.ones(n_customers, dtype=int),
+        'monetary_score': np.ceil(pd.Series(revenue).rank(pct=True) * 5).astype(int),
+        'avg_delivery_experience': rng.normal(12, 4, n_customers),
+        'delivery_reliability': rng.uniform(0, 1, n_customers),
+        'days_since_last_order': rng.integers(1, 700, n_customers),
+        'total_revenue': revenue
+    })
+    data.loc[::25, 'avg_delivery_experience'] = np.nan
+    data['clv_category'] = np.where(revenue > np.quantile(revenue, 0.8), 'High Value', 'Low Value')
+    return data
+
+
+def test_training_is_skipped_for_unchanged_data():
+    """The saved model is reused until the data version changes"""
+    data = make_customer_data()
+    with tempfile.TemporaryDirectory() as model_dir:
+        first = train_or_load(data, model_dir=model_dir, n_jobs=1)
+        second = train_or_load(data, model_dir=model_dir)
+        assert second.data_version == first.data_version
+        assert second.metadata['trained_at'] == first.metadata['trained_at']
+        np.testing.assert_allclose(second.predict_proba(data), first.predict_proba(data))
+
+        changed = data.copy()
+        changed.loc[0, 'total_revenue'] += 1.0
+        retrained = train_or_load(changed, model_dir=model_dir)
+        assert retrained.data_version != first.data_version
+        assert HighValueCustomerModel.load(model_dir).data_version == retrained.data_version
+
+
+def test_corrupt_model_is_retrained():
+    """A truncated or unreadable model file is retrained instead of raising"""
+    data = make_customer_data()
+    with tempfile.TemporaryDirectory() as model_dir:
+        first = train_or_load(data, model_dir=model_dir, n_jobs=1)
+        model_path = os.path.join(model_dir, MODEL_FILE)
+        with open(model_path, 'rb') as f:
+            truncated = f.read()[:100]
+        for corrupt in (b'', b'not a pickle', truncated):
+            with open(model_path, 'wb') as f:
+                f.write(corrupt)
+            assert HighValueCustomerModel.load(model_dir) is None
+            retrained = train_or_load(data, model_dir=model_dir, n_jobs=1)
+            assert retrained.data_version == first.data_version
+            assert HighValueCustomerModel.load(model_dir) is not None
+
+
+def test_chunked_scoring_matches_in_memory():
+    """Streaming a CSV in chunks gives the same probabilities as scoring the whole frame"""
+    data = make_customer_data()
+    model = HighValueCustomerModel.train(data, n_jobs=1)
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_path = os.path.join(work_dir, 'customers.csv')
+        output_path = os.path.join(work_dir, 'scores', 'high_value.csv')
+        data[['customer_id'] + FEATURE_COLUMNS].to_csv(input_path, index=False)
+
+        assert model.score_file(input_path, output_path, chunk_size=128) == len(data)
+        scores = pd.read_csv(output_path)
+
+    assert scores['customer_id'].tolist() == data['customer_id'].tolist()
+    np.testing.assert_allclose(scores['high_value_probability'], model.predict_proba(data))
+    assert scores['is_high_value_pred'].sum() > 0
+
+
+def test_customer_data_is_read_from_feature_snapshot():
+    """Training and the analytics load read the active snapshot, not the legacy feature directory"""
+    data = make_customer_data()
+    data['first_order_date'] = '2017-01-01'
+    data['last_order_date'] = '2018-01-01'
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as root:
+        os.chdir(root)
+        try:
+            FeatureStore().write_snapshot({'customer_analytics': data})
+            os.makedirs('data/feature_engineered')
+            data.head(50).to_csv('data/feature_engineered/customer_analytics.csv', index=False)
+
+            assert main(['--model-dir', 'model', 'train']) == 0
+            trained = HighValueCustomerModel.load('model')
+            columns = FEATURE_COLUMNS + ['clv_category']
+            snapshot = pd.read_csv(FeatureStore().dataset_path('customer_analytics'), usecols=columns)
+            assert trained.data_version == compute_data_version(snapshot)
+            assert trained.data_version != compute_data_version(data.head(50)[columns])
+            assert len(CustomerAnalytics().load_data()) == len(data)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    print("Testing high-value customer model...")
+    test_training_is_skipped_for_unchanged_data()
+    test_corrupt_model_is_retrained()
+    test_chunked_scoring_matches_in_memory()
+    test_customer_data_is_read_from_feature_snapshot()
+    print("✅ High-value customer model tests passed!")
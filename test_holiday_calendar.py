@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the Brazilian holiday calendar
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from datetime import date
+from holiday_calendar import event_dates_for_year, build_holiday_calendar, event_proximity, add_event_proximity_features
+
+
+def test_movable_event_dates():
+    """Movable feasts and rule-based events land on the published dates"""
+    dates_2017 = event_dates_for_year(2017)
+    dates_2018 = event_dates_for_year(2018)
+
+    assert dates_2017['carnival'] == date(2017, 2, 28)
+    assert dates_2018['carnival'] == date(2018, 2, 13)
+    assert dates_2017['easter'] == date(2017, 4, 16)
+    assert dates_2018['easter'] == date(2018, 4, 1)
+    assert dates_2018['corpus_christi'] == date(2018, 5, 31)
+    assert dates_2017['mothers_day'] == date(2017, 5, 14)
+    assert dates_2018['fathers_day'] == date(2018, 8, 12)
+    assert dates_2017['black_friday'] == date(2017, 11, 24)
+    assert dates_2018['black_friday'] == date(2018, 11, 23)
+
+
+def test_proximity_matches_brute_force():
+    """searchsorted proximity equals a per-row scan over the calendar"""
+    calendar = build_holiday_calendar([2016, 2017, 2018, 2019])
+    rng = np.random.default_rng(7)
+    timestamps = pd.Series(pd.to_datetime('2017-01-01') + pd.to_timedelta(rng.integers(0, 700 * 24, 500), unit='h'))
+
+    result = event_proximity(timestamps, calendar['date'])
+
+    event_days = calendar['date'].dt.normalize()
+    for i, ts in enumerate(timestamps):
+        deltas = (event_days - ts.normalize()).dt.days
+        assert result['days_to_next'].iloc[i] == deltas[deltas >= 0].min()
+        assert result['days_since_prev'].iloc[i] == -deltas[deltas <= 0].max()
+
+
+def test_add_features_handles_missing_timestamps():
+    """Missing purchase dates produce missing proximity values"""
+    orders = pd.DataFrame({
+        'order_purchase_timestamp': pd.to_datetime(['2017-11-20 10:00', None, '2017-11-24 23:59'])
+    })
+    add_event_proximity_features(orders, events=['black_friday'])
+
+    assert orders['days_to_black_friday'].tolist()[0] == 4
+    assert orders['days_to_black_friday'].isna().tolist() == [False, True, False]
+    assert orders['days_since_black_friday'].iloc[2] == 0
+    assert str(orders['days_to_next_event'].dtype) == 'Int16'
+
+
+if __name__ == "__main__":
+    print("Testing holiday calendar...")
+    test_movable_event_dates()
+    test_proximity_matches_brute_force()
+    test_add_features_handles_missing_timestamps()
+    print("✅ Holiday calendar tests passed!")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for seller-customer distance and logistics features
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from logistics_features import LogisticsFeatureBuilder, haversine_km
+
+
+def make_logistics_tables():
+    """Two customers (Sao Paulo, Rio) and two sellers (Sao Paulo, Curitiba)"""
+    geolocation = pd.DataFrame({
+        'geolocation_zip_code_prefix': [1000, 1000, 20000, 80000],
+        'geolocation_lat': [-23.55, -23.55, -22.91, -25.43],
+        'geolocation_lng': [-46.63, -46.63, -43.17, -49.27]
+    })
+    customers = pd.DataFrame({'customer_id': ['c1', 'c2', 'c3'],
+                              'customer_zip_code_prefix': [1000, 20000, 99999],
+                              'customer_state': ['SP', 'RJ', 'AC']})
+    sellers = pd.DataFrame({'seller_id': ['s1', 's2'],
+                            'seller_zip_code_prefix': [1000, 80000],
+                            'seller_state': ['SP', 'PR']})
+    orders = pd.DataFrame({'order_id': ['o1', 'o2', 'o3'],
+                           'customer_id': ['c1', 'c2', 'c3'],
+                           'delivery_days': [3.0, 8.0, np.nan]})
+    items = pd.DataFrame({'order_id': ['o1', 'o1', 'o2', 'o2', 'o3'],
+                          'seller_id': ['s1', 's2', 's1', 's1', 's1'],
+                          'freight_value': [10.0, 20.0, 15.0, 15.0, 30.0]})
+    return geolocation, customers, sellers, orders, items
+
+
+def test_haversine_known_distance():
+    """Sao Paulo - Rio de Janeiro is about 360 km; missing coordinates give NaN"""
+    distance = haversine_km([-23.55, np.nan], [-46.63, 0.0], [-22.91, 1.0], [-43.17, 1.0])
+    assert 355 < distance[0] < 365
+    assert np.isnan(distance[1])
+
+
+def test_order_features_and_od_matrix():
+    """Chunked results match a single pass and route medians come from the histograms"""
+    geolocation, customers, sellers, orders, items = make_logistics_tables()
+    builder = LogisticsFeatureBuilder(geolocation, customers, sellers, orders)
+
+    single = builder.build(items)
+    chunked = builder.build(items, chunk_size=2)
+    pd.testing.assert_frame_equal(single['order_features'], chunked['order_features'])
+    pd.testing.assert_frame_equal(single['od_matrix'], chunked['od_matrix'])
+
+    features = single['order_features'].set_index('order_id')
+    sp_pr = haversine_km(-23.55, -46.63, -25.43, -49.27)
+    assert np.isclose(features.loc['o1', 'seller_distance_km'], sp_pr / 2)
+    assert np.isclose(features.loc['o1', 'max_seller_distance_km'], sp_pr)
+    assert not features.loc['o1', 'is_same_state_delivery']
+    assert np.isclose(features.loc['o1', 'freight_per_km'], 30.0 / sp_pr)
+    # Customer zip without coordinates: no distance
+    assert np.isnan(features.loc['o3', 'seller_distance_km'])
+
+    od = single['od_matrix'].set_index(['seller_state', 'customer_state'])
+    assert od.loc[('SP', 'RJ'), 'item_count'] == 2
+    assert od.loc[('SP', 'RJ'), 'median_freight_value'] == 15.25
+    assert od.loc[('SP', 'RJ'), 'median_delivery_days'] == 8.5
+    assert abs(od.loc[('SP', 'RJ'), 'median_distance_km'] - od.loc[('SP', 'RJ'), 'mean_distance_km']) <= 0.5
+    assert np.isnan(od.loc[('SP', 'AC'), 'median_distance_km'])
+
+
+def test_iterable_of_chunks():
+    """An iterator of item chunks (e.g. read_csv chunks) streams like a DataFrame"""
+    geolocation, customers, sellers, orders, items = make_logistics_tables()
+    builder = LogisticsFeatureBuilder(geolocation, customers, sellers, orders)
+    streamed = builder.build(iter([items.iloc[:3], items.iloc[3:]]))
+    assert streamed['od_matrix']['item_count'].sum() == len(items)
+    assert len(streamed['order_features']) == 3
+
+
+if __name__ == "__main__":
+    print("Testing logistics features...")
+    test_haversine_known_distance()
+    test_order_features_and_od_matrix()
+    test_iterable_of_chunks()
+    print("✅ Logistics features tests passed!")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for lookalike customer search
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from lookalike import LookalikeIndex, find_segment_lookalikes, FEATURE_COLUMNS
+
+
+def make_customer_data(n_customers=3000, seed=4):
+    """Synthetic customer analytics rows with a distinct Champions profile"""
+    rng = np.random.default_rng(seed)
+    revenue = rng.gamma(2.0, 100.0, n_customers)
+    data = pd.DataFrame({
+        'customer_id': [f'c{i:05d}' for i in range(n_customers)],
+        'recency_score': rng.integers(1, 6, n_customers),
+        'frequency_score': rng.integers(1, 6, n_customers),
+        'monetary_score': np.ceil(pd.Series(revenue).rank(pct=True) * 5).astype(int),
+        'days_since_last_order': rng.integers(1, 700, n_customers),
+        'total_revenue': revenue,
+        'avg_order_value': revenue,
+        'avg_delivery_experience': rng.normal(12, 4, n_customers),
+        'delivery_reliability': rng.uniform(0, 1, n_customers)
+    })
+    data.loc[::40, 'avg_delivery_experience'] = np.nan
+    data['customer_segment'] = np.where(
+        (data['recency_score'] >= 4) & (data['monetary_score'] >= 4), 'Champions', 'Others'
+    )
+    return data
+
+
+def test_exact_trees_match_brute_force():
+    """KD and Ball trees return the brute-force neighbors; batching does not change results"""
+    data = make_customer_data()
+    kd_index = LookalikeIndex().fit(data)
+    ball_index = LookalikeIndex(method='ball_tree').fit(data)
+
+    vectors = kd_index.transform(data.iloc[:200])
+    assert not np.isnan(vectors).any()
+    standardized = kd_index.transform(data)
+    brute = np.sqrt(((vectors[:, None, :] - standardized[None, :, :]) ** 2).sum(axis=2))
+    expected = np.sort(brute, axis=1)[:, :5]
+
+    kd_distances, kd_positions = kd_index.query(vectors, k=5, batch_size=64)
+    ball_distances, _ = ball_index.query(vectors, k=5)
+    np.testing.assert_allclose(kd_distances, expected, atol=1e-9)
+    np.testing.assert_allclose(ball_distances, expected, atol=1e-9)
+    # Every query row is its own nearest neighbor
+    assert (kd_distances[:, 0] == 0).all()
+
+    approximate = LookalikeIndex.approximate(eps=0.5).fit(data)
+    approx_distances, _ = approximate.query(vectors, k=5)
+    assert (approx_distances[:, -1] <= expected[:, -1] * 1.5 + 1e-9).all()
+
+
+def test_segment_lookalikes_exclude_seeds():
+    """Lookalikes are non-seed customers ranked by distance, and resemble the seeds"""
+    data = make_customer_data()
+    results = find_segment_lookalikes(data, segment='Champions', n_customers=1500)
+    lookalikes = results['lookalikes']
+
+    seeds = set(data.loc[data['customer_segment'] == 'Champions', 'customer_id'])
+    assert results['seed_count'] == len(seeds)
+    # More lookalikes than the initial top-K lists hold forces K to widen
+    assert len(lookalikes) == 1500 and lookalikes['customer_id'].is_unique
+    assert not set(lookalikes['customer_id']) & seeds
+    assert lookalikes['nearest_seed'].isin(seeds).all()
+    assert lookalikes['distance'].is_monotonic_increasing
+    assert (lookalikes['seed_matches'] >= 1).all()
+
+    profile = results['profile']
+    assert list(profile.index) == FEATURE_COLUMNS
+    seed_gap = abs(profile.loc['monetary_score', 'lookalike'] - profile.loc['monetary_score', 'seed'])
+    all_gap = abs(profile.loc['monetary_score', 'all_customers'] - profile.loc['monetary_score', 'seed'])
+    assert seed_gap < all_gap
+
+
+if __name__ == "__main__":
+    print("Testing lookalike customer search...")
+    test_exact_trees_match_brute_force()
+    test_segment_lookalikes_exclude_seeds()
+    print("✅ Lookalike search tests passed!")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for the OLAP cube roll-up API
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from olap_cube import OLAPCube, CUBE_DIMENSIONS, CUBE_SOURCE_TABLES, CUBE_DATASET_NAME, load_olap_cube
+from data_cache import cleaned_data_version
+from feature_store import FeatureStore
+
+
+def build_tables(n_orders=300, seed=3):
+    """Create small order, item, customer, product, payment and review tables"""
+    rng = np.random.default_rng(seed)
+    order_ids = [f'o{i}' for i in range(n_orders)]
+    delivery_days = rng.integers(2, 30, n_orders).astype(float)
+    delivery_days[:20] = np.nan
+
+    orders = pd.DataFrame({
+        'order_id': order_ids,
+        'customer_id': [f'c{i}' for i in range(n_orders)],
+        'order_year': rng.choice([2017, 2018], n_orders),
+        'order_month': rng.integers(1, 13, n_orders),
+        'delivery_accuracy': rng.choice(['On Time', 'Late'], n_orders),
+        'delivery_days': delivery_days,
+        'on_time_delivery': pd.Series(delivery_days < 20, dtype=object).where(~np.isnan(delivery_days))
+    })
+    customers = pd.DataFrame({
+        'customer_id': orders['customer_id'],
+        'customer_state': rng.choice(['SP', 'RJ', 'MG'], n_orders),
+        'customer_city': rng.choice(['a', 'b', 'c', 'd'], n_orders)
+    })
+    products = pd.DataFrame({
+        'product_id': [f'p{i}' for i in range(20)],
+        'product_category_name_english': rng.choice(['toys', 'books', 'garden'], 20)
+    })
+    n_items = rng.integers(1, 4, n_orders)
+    items = pd.DataFrame({
+        'order_id': np.repeat(order_ids, n_items),
+        'product_id': rng.choice(products['product_id'], n_items.sum()),
+        'price': rng.uniform(10, 200, n_items.sum()).round(2),
+        'freight_value': rng.uniform(5, 30, n_items.sum()).round(2)
+    })
+    payments = pd.DataFrame({
+        'order_id': order_ids,
+        'payment_type': rng.choice(['credit_card', 'boleto'], n_orders),
+        'payment_installments': rng.integers(1, 10, n_orders),
+        'payment_value': rng.uniform(20, 300, n_orders).round(2)
+    })
+    reviews = pd.DataFrame({'order_id': order_ids[::2], 'review_score': rng.integers(1, 6, len(order_ids[::2]))})
+    return orders, items, customers, products, payments, reviews
+
+
+def test_rollups_preserve_totals():
+    """Any roll-up sums to the same grand totals as the raw tables"""
+    orders, items, customers, products, payments, reviews = build_tables()
+    cube = OLAPCube.build(orders, items, customers, products, payments, reviews)
+
+    for dimensions in [[], ['customer_state'], ['order_month', 'payment_type'], CUBE_DIMENSIONS]:
+        rolled = cube.rollup(dimensions, dropna=False)
+        assert rolled['order_count'].sum() == len(orders)
+        assert np.isclose(rolled['revenue'].sum(), items['price'].sum())
+        assert rolled['item_count'].sum() == len(items)
+        assert rolled['review_count'].sum() == len(reviews)
+
+
+def test_derived_measures_match_row_level():
+    """Averages derived from additive sums equal row-level means"""
+    orders, items, customers, products, payments, reviews = build_tables()
+    cube = OLAPCube.build(orders, items, customers, products, payments, reviews)
+
+    rows = orders.merge(customers, on='customer_id').merge(payments, on='order_id')
+    expected = rows.groupby('customer_state').agg(
+        avg_delivery_days=('delivery_days', 'mean'),
+        delivery_days_std=('delivery_days', 'std'),
+        avg_payment_value=('payment_value', 'mean'),
+        orders=('order_id', 'count')
+    )
+    rolled = cube.rollup(['customer_state']).set_index('customer_state')
+
+    assert np.allclose(rolled['avg_delivery_days'], expected['avg_delivery_days'])
+    assert np.allclose(rolled['delivery_days_std'], expected['delivery_days_std'])
+    assert np.allclose(rolled['avg_payment_value'], expected['avg_payment_value'])
+    assert (rolled['order_count'] == expected['orders']).all()
+
+
+def test_filters_and_validation():
+    """Filters restrict cells and unknown dimensions are rejected"""
+    orders, items, customers, products, payments, reviews = build_tables()
+    cube = OLAPCube.build(orders, items, customers, products, payments, reviews)
+
+    sp_only = cube.rollup(['customer_state'], filters={'customer_state': 'SP'})
+    assert sp_only['customer_state'].tolist() == ['SP']
+
+    try:
+        cube.rollup(['seller_state'])
+        assert False, "Unknown dimension should raise"
+    except ValueError:
+        pass
+
+
+def test_cube_only_loads_for_matching_cleaned_data():
+    """A published cube is only used for the cleaned data it was built from"""
+    orders, items, customers, products, payments, reviews = build_tables()
+    cube = OLAPCube.build(orders, items, customers, products, payments, reviews)
+    with tempfile.TemporaryDirectory() as root:
+        cleaned_dir = os.path.join(root, 'cleaned')
+        os.makedirs(cleaned_dir)
+        for name, df in zip(CUBE_SOURCE_TABLES, [orders, items, customers, products, payments, reviews]):
+            df.to_csv(os.path.join(cleaned_dir, f'cleaned_{name}.csv'), index=False)
+        version = cleaned_data_version(CUBE_SOURCE_TABLES, cleaned_dir)
+
+        store_dir = os.path.join(root, 'store')
+        FeatureStore(store_dir).write_snapshot(
+            {CUBE_DATASET_NAME: cube.cells},
+            dataset_metadata={CUBE_DATASET_NAME: {'source_version': version}}
+        )
+        assert OLAPCube.load(version, store_dir=store_dir) is not None
+        assert OLAPCube.load(store_dir=store_dir) is not None
+
+        # Changed orders give another version, and the cube is no longer used
+        orders.head(100).to_csv(os.path.join(cleaned_dir, 'cleaned_orders.csv'), index=False)
+        changed = cleaned_data_version(CUBE_SOURCE_TABLES, cleaned_dir)
+        assert changed != version
+        assert OLAPCube.load(changed, store_dir=store_dir) is None
+        # Callers that pass no version are checked against the cleaned tables too
+        assert load_olap_cube(cleaned_dir=cleaned_dir, store_dir=store_dir) is None
+
+        # The recorded version survives snapshots published on top of the cube's
+        store = FeatureStore(store_dir)
+        store.write_snapshot({'other': pd.DataFrame({'a': [1]})}, base_version=store.current_version())
+        assert OLAPCube.load(version, store_dir=store_dir) is not None
+        orders.to_csv(os.path.join(cleaned_dir, 'cleaned_orders.csv'), index=False)
+        assert load_olap_cube(cleaned_dir=cleaned_dir, store_dir=store_dir) is not None
+
+
+if __name__ == "__main__":
+    print("Testing OLAP cube...")
+    test_rollups_preserve_totals()
+    test_derived_measures_match_row_level()
+    test_filters_and_validation()
+    test_cube_only_loads_for_matching_cleaned_data()
+    print("✅ OLAP cube tests passed!")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for partition-incremental data quality statistics
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from quality_stats import QuantileSketch, ColumnStats, QualityStatsStore
+from data_quality_check import DataQualityChecker
+
+
+def make_orders(months=6, per_month=2000, seed=5):
+    """Monthly orders; the last month has longer deliveries and missing prices"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for month in range(1, months + 1):
+        shift = 15.0 if month == months else 0.0
+        frames.append(pd.DataFrame({
+            'order_id': [f'o{month}_{i}' for i in range(per_month)],
+            'order_purchase_timestamp': pd.Timestamp(2018, month, 1) + pd.to_timedelta(rng.integers(0, 27, per_month), unit='D'),
+            'delivery_days': rng.gamma(4.0, 3.0, per_month) + shift,
+            'price': np.where(rng.random(per_month) < (0.2 if month == months else 0.01), np.nan,
+                              rng.lognormal(4.5, 0.8, per_month))
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_sketch_and_moments_merge():
+    """Merged partition statistics match statistics of the whole column"""
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.normal(-5, 2, 5000), np.zeros(100), rng.lognormal(3, 1, 5000)])
+    parts = np.array_split(rng.permutation(values), 3)
+
+    merged = ColumnStats.from_series(pd.Series(parts[0]))
+    for part in parts[1:]:
+        merged.merge(ColumnStats.from_series(pd.Series(part)))
+    whole = pd.Series(values)
+    assert merged.count == len(values) and merged.min == values.min() and merged.max == values.max()
+    assert np.isclose(merged.mean, whole.mean()) and np.isclose(merged.std, whole.std())
+
+    for q in (0.05, 0.25, 0.5, 0.9, 0.99):
+        true = np.quantile(values, q, method='lower')
+        assert abs(merged.quantile(q) - true) <= 0.011 * abs(true) + 1e-9
+    assert abs(merged.sketch.cdf(0.0) - (values <= 0).mean()) < 0.01
+
+    restored = QuantileSketch.from_dict(merged.sketch.to_dict())
+    np.testing.assert_array_equal(restored.quantile([0.1, 0.7]), merged.quantile([0.1, 0.7]))
+
+
+def test_store_profiles_new_partitions_only():
+    """Only unseen months are profiled; replacing a month rebuilds the global profile"""
+    orders = make_orders()
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = QualityStatsStore(store_dir)
+        assert store.add_table('orders', orders[orders['order_purchase_timestamp'] < '2018-06-01'],
+                               'order_purchase_timestamp') == ['2018-01', '2018-02', '2018-03', '2018-04', '2018-05']
+        assert store.add_table('orders', orders, 'order_purchase_timestamp') == ['2018-06']
+
+        profile = store.global_profile('orders')
+        assert profile.rows == len(orders) and len(profile.partitions) == 6
+        assert profile.columns['price'].nulls == orders['price'].isna().sum()
+        assert np.isclose(profile.columns['delivery_days'].mean, orders['delivery_days'].mean())
+
+        # Re-profiling a month replaces its statistics instead of counting it twice
+        june = orders[orders['order_purchase_timestamp'] >= '2018-06-01'].head(500)
+        store.add_partitions('orders', {'2018-06': june})
+        assert store.global_profile('orders').rows == len(orders) - 2000 + 500
+
+        drift = store.drift_report('orders', '2018-06').set_index('Column')
+        assert drift.loc['delivery_days', 'Status'] == 'DRIFT'
+        assert drift.loc['price', 'Status'] == 'DRIFT'
+        assert store.drift_report('orders', '2018-03').set_index('Column').loc['delivery_days', 'Status'] == 'STABLE'
+
+
+def test_changed_partitions_are_reprofiled():
+    """A month profiled while partial, or corrected later, is profiled again; unchanged months are not"""
+    orders = make_orders(months=3)
+    partial = orders[orders['order_purchase_timestamp'] < '2018-03-10']
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = QualityStatsStore(store_dir)
+        assert store.add_table('orders', partial, 'order_purchase_timestamp') == ['2018-01', '2018-02', '2018-03']
+        assert store.add_table('orders', partial, 'order_purchase_timestamp') == []
+
+        assert store.add_table('orders', orders, 'order_purchase_timestamp') == ['2018-03']
+        assert store.global_profile('orders').rows == len(orders)
+
+        corrected = orders.copy()
+        corrected.loc[corrected.index[0], 'price'] = 1.0
+        assert store.add_table('orders', corrected, 'order_purchase_timestamp') == ['2018-01']
+        assert store.global_profile('orders').columns['price'].min == 1.0
+        assert store.add_table('orders', corrected.sample(frac=1, random_state=0), 'order_purchase_timestamp') == []
+
+
+def test_report_from_stored_statistics():
+    """The comprehensive report renders from stored statistics without any rows"""
+    orders = make_orders()
+    with tempfile.TemporaryDirectory() as store_dir:
+        QualityStatsStore(store_dir).add_table('orders', orders, 'order_purchase_timestamp')
+        report, results = DataQualityChecker.from_stats(store_dir).generate_comprehensive_report()
+
+    ranges = results['ranges'].set_index('Column')
+    assert ranges.loc['delivery_days', 'Max'] == orders['delivery_days'].max()
+    assert np.isclose(ranges.loc['delivery_days', 'Std'], orders['delivery_days'].std(), atol=0.01)
+    missing = results['missing'].set_index('Column')
+    assert missing.loc['price', 'Missing_Count'] == orders['price'].isna().sum()
+    assert 'delivery_days' in set(results['drift'].query("Status == 'DRIFT'")['Column'])
+    assert "Total rows: 12,000" in report and "DRIFT" in report
+
+
+if __name__ == "__main__":
+    print("Testing quality statistics...")
+    test_sketch_and_moments_merge()
+    test_store_profiles_new_partitions_only()
+    test_changed_partitions_are_reprofiled()
+    test_report_from_stored_statistics()
+    print("✅ Quality statistics tests passed!")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for versioned geographic reference data
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from reference_data import load_reference_table, attach_reference_data
+
+REFERENCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'reference')
+
+
+def write_municipality_table(reference_dir, rows):
+    """Write a municipality reference table and its manifest entry"""
+    pd.DataFrame(rows, columns=['state', 'city', 'population', 'gdp_per_capita', 'tier', 'urban_rate']).to_csv(
+        os.path.join(reference_dir, 'municipalities_test.csv'), index=False
+    )
+    manifest = {'municipality': {'current': 'test', 'key': ['state', 'city'],
+                                 'versions': {'test': {'file': 'municipalities_test.csv'}}}}
+    with open(os.path.join(reference_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+
+
+def test_state_reference_join():
+    """Every state is matched once and values come from the shipped table"""
+    reference = load_reference_table('state', reference_dir=REFERENCE_DIR)
+    assert len(reference) == 27 and reference['state'].is_unique
+
+    summary = pd.DataFrame({'state': ['SP', 'RR', 'XX'], 'customer_count': [100, 5, 1],
+                            'population': [0, 0, 0]})
+    joined = attach_reference_data(summary, reference=reference)
+    assert len(joined) == 3
+    assert joined.loc[0, 'population'] == 46649132
+    assert joined.loc[1, 'gdp_per_capita'] == 22896
+    assert pd.isna(joined.loc[2, 'tier'])
+
+
+def test_municipality_join_normalizes_names():
+    """City names are matched regardless of accents, case and punctuation"""
+    with tempfile.TemporaryDirectory() as reference_dir:
+        write_municipality_table(reference_dir, [
+            ('SP', 'São Paulo', 12325232, 58691, 1, 0.99),
+            ('SP', 'Mogi-Guaçu', 153033, 41000, 2, 0.95),
+            ('MG', 'Belo Horizonte', 2521564, 38000, 1, 1.0)
+        ])
+        reference = load_reference_table('municipality', reference_dir=reference_dir)
+
+        summary = pd.DataFrame({'state': ['SP', 'SP', 'RJ'],
+                                'city': ['sao paulo', 'MOGI GUACU', 'sao paulo'],
+                                'customer_count': [10, 2, 1]})
+        joined = attach_reference_data(summary, level='municipality', reference=reference)
+        assert joined['population'].tolist()[:2] == [12325232, 153033]
+        assert pd.isna(joined.loc[2, 'population'])
+        assert 'city_key' not in joined.columns
+
+
+def test_duplicate_keys_rejected():
+    """A reference table with duplicate normalized keys fails to load"""
+    with tempfile.TemporaryDirectory() as reference_dir:
+        write_municipality_table(reference_dir, [
+            ('SP', 'São Paulo', 1, 1, 1, 1.0),
+            ('SP', 'SAO PAULO', 1, 1, 1, 1.0)
+        ])
+        try:
+            load_reference_table('municipality', reference_dir=reference_dir)
+            assert False, "Duplicate keys should raise"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    print("Testing reference data...")
+    test_state_reference_join()
+    test_municipality_join_normalizes_names()
+    test_duplicate_keys_rejected()
+    print("✅ Reference data tests passed!")
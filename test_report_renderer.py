@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the parallel, incremental report figure renderer
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+from report_renderer import ReportFigureRenderer
+
+
+def draw_bars(data):
+    """Simple bar chart"""
+    plt.figure(figsize=(4, 3))
+    plt.bar(data['label'], data['value'])
+
+
+def draw_palette_check(data):
+    """Fail unless the caller's colour cycle and the Agg backend are active"""
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    assert colors[0] == data['first_color'].iloc[0], colors
+    assert plt.get_backend().lower() == 'agg'
+    plt.figure(figsize=(2, 2))
+    plt.plot([1, 2])
+
+
+def draw_broken(data):
+    """Draw function that fails"""
+    raise ValueError("bad input")
+
+
+def render(output_dir, data, **kwargs):
+    """Render one bar chart and return its status"""
+    renderer = ReportFigureRenderer(output_dir, **kwargs)
+    renderer.add('bars.png', draw_bars, data)
+    return renderer.render()['bars.png']
+
+
+def test_unchanged_inputs_are_skipped():
+    """A figure is redrawn only when its data, DPI or output file changes"""
+    data = pd.DataFrame({'label': ['a', 'b'], 'value': [1, 2]})
+    with tempfile.TemporaryDirectory() as output_dir:
+        assert render(output_dir, data) == 'rendered'
+        assert render(output_dir, data) == 'skipped'
+        assert render(output_dir, data, force=True) == 'rendered'
+
+        assert render(output_dir, data.assign(value=[1, 3])) == 'rendered'
+        assert render(output_dir, data.assign(value=[1, 3])) == 'skipped'
+
+        os.remove(os.path.join(output_dir, 'bars.png'))
+        assert render(output_dir, data.assign(value=[1, 3])) == 'rendered'
+
+
+def test_draft_mode_renders_smaller_figures():
+    """Draft figures use the draft DPI and are redrawn at full resolution afterwards"""
+    data = pd.DataFrame({'label': ['a', 'b'], 'value': [1, 2]})
+    with tempfile.TemporaryDirectory() as output_dir:
+        path = os.path.join(output_dir, 'bars.png')
+        assert render(output_dir, data, draft=True) == 'rendered'
+        draft_size = os.path.getsize(path)
+
+        assert render(output_dir, data) == 'rendered'
+        assert os.path.getsize(path) > draft_size
+
+
+def test_process_pool_rendering_and_failures():
+    """Figures render in worker processes and one failure does not stop the others"""
+    data = pd.DataFrame({'label': ['a', 'b'], 'value': [1, 2]})
+    with tempfile.TemporaryDirectory() as output_dir:
+        renderer = ReportFigureRenderer(output_dir, draft=True, max_workers=2)
+        renderer.add('first.png', draw_bars, data)
+        renderer.add('broken.png', draw_broken, data)
+        renderer.add('second.png', draw_bars, data.assign(value=[5, 6]))
+        status = renderer.render()
+
+        assert status == {'first.png': 'rendered', 'broken.png': 'failed', 'second.png': 'rendered'}
+        assert os.path.exists(os.path.join(output_dir, 'second.png'))
+        assert not os.path.exists(os.path.join(output_dir, 'broken.png'))
+
+
+def test_caller_palette_is_kept():
+    """Figures use the palette set by the caller, in-process and in workers"""
+    data = pd.DataFrame({'first_color': ['#123456']})
+    with tempfile.TemporaryDirectory() as output_dir, \
+            matplotlib.rc_context({'axes.prop_cycle': matplotlib.cycler(color=['#123456', '#abcdef'])}):
+        for max_workers in (1, 2):
+            renderer = ReportFigureRenderer(output_dir, max_workers=max_workers, force=True, draft=True)
+            renderer.add('palette.png', draw_palette_check, data)
+            renderer.add('bars.png', draw_bars, pd.DataFrame({'label': ['a'], 'value': [1]}))
+            assert renderer.render()['palette.png'] == 'rendered'
+
+
+if __name__ == "__main__":
+    print("Testing report figure renderer...")
+    test_unchanged_inputs_are_skipped()
+    test_draft_mode_renders_smaller_figures()
+    test_process_pool_rendering_and_failures()
+    test_caller_palette_is_kept()
+    print("✅ Report figure renderer tests passed!")
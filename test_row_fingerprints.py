@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Test script for row fingerprints and fingerprint-based deduplication
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from row_fingerprints import FingerprintStore, row_fingerprints, duplicated_mask, drop_duplicate_rows
+from data_cleaner import DataCleaner
+from data_quality_check import DataQualityChecker
+from data_loader import DataLoader
+from save_cleaned_data import save_cleaned_datasets, load_cleaned_datasets
+
+
+def make_datasets(seed=21):
+    """Geolocation with exact and zip-code duplicates, payments with repeated rows"""
+    rng = np.random.default_rng(seed)
+    geolocation = pd.DataFrame({
+        'geolocation_zip_code_prefix': rng.integers(1000, 1400, 2000),
+        'geolocation_lat': rng.choice([-23.5, -22.9, -19.9], 2000),
+        'geolocation_lng': rng.choice([-46.6, -43.2], 2000),
+        'geolocation_city': rng.choice(['sao paulo', 'rio de janeiro', None], 2000),
+        'geolocation_state': pd.Categorical(rng.choice(['SP', 'RJ'], 2000))
+    })
+    payments = pd.DataFrame({
+        'order_id': [f'o{i}' for i in rng.integers(0, 3000, 4000)],
+        'payment_type': rng.choice(['credit_card', 'boleto'], 4000),
+        'payment_value': rng.choice([10.0, 20.0, np.nan], 4000),
+        'paid_at': pd.Timestamp('2018-01-01') + pd.to_timedelta(rng.integers(0, 3, 4000), unit='D')
+    })
+    return {'geolocation': geolocation, 'order_payments': payments}
+
+
+def test_fingerprints_match_pandas_duplicates():
+    """Fingerprint duplicates agree with DataFrame.duplicated, text dtypes hash alike"""
+    for df in make_datasets().values():
+        np.testing.assert_array_equal(duplicated_mask(row_fingerprints(df)), df.duplicated().to_numpy())
+
+    text = pd.DataFrame({'a': ['x', 'y', None], 'b': [1.0, np.nan, 2.0]})
+    as_object = text.astype({'a': object})
+    as_category = text.astype({'a': 'category'})
+    np.testing.assert_array_equal(row_fingerprints(text), row_fingerprints(as_object))
+    np.testing.assert_array_equal(row_fingerprints(text), row_fingerprints(as_category))
+
+    # Numbers hash by value, whatever dtype a batch happened to load them as
+    numbers = pd.DataFrame({'n': [1, 2, 3], 'x': [0.0, 1.5, 2.0]})
+    for dtypes in ({'n': 'float64'}, {'n': 'Int64'}, {'n': 'int32', 'x': 'Float64'}):
+        np.testing.assert_array_equal(row_fingerprints(numbers), row_fingerprints(numbers.astype(dtypes)))
+    with_null = pd.DataFrame({'n': [1, 2, np.nan], 'x': [0.0, 1.5, 2.0]})
+    np.testing.assert_array_equal(row_fingerprints(with_null)[:2], row_fingerprints(numbers)[:2])
+    assert row_fingerprints(pd.DataFrame({'x': [1.5]}))[0] != row_fingerprints(pd.DataFrame({'x': [1]}))[0]
+    timestamps = pd.DataFrame({'t': pd.to_datetime(['2018-01-01 10:00', None])})
+    np.testing.assert_array_equal(row_fingerprints(timestamps),
+                                  row_fingerprints(timestamps.astype({'t': 'datetime64[s]'})))
+
+    # Column order matters
+    swapped = pd.DataFrame({'a': [1, 2], 'b': [2, 1]})
+    assert len(set(row_fingerprints(swapped))) == 2
+
+    unique = pd.DataFrame({'a': [1, 2, 3]})
+    deduped, fingerprints = drop_duplicate_rows(unique)
+    assert deduped is unique and len(fingerprints) == 3
+
+
+def test_cleaner_removes_duplicates():
+    """The cleaner keeps the rows drop_duplicates keeps and stores their fingerprints"""
+    datasets = make_datasets()
+    expected_geo = datasets['geolocation'].drop_duplicates().drop_duplicates(
+        subset=['geolocation_zip_code_prefix'], keep='first')
+    expected_payments = datasets['order_payments'].drop_duplicates()
+
+    cleaner = DataCleaner(datasets)
+    cleaned = cleaner.remove_duplicates()
+    pd.testing.assert_frame_equal(cleaned['geolocation'], expected_geo)
+    pd.testing.assert_frame_equal(cleaned['order_payments'], expected_payments)
+    np.testing.assert_array_equal(cleaner.row_fingerprints['order_payments'], row_fingerprints(expected_payments))
+
+    checker = DataQualityChecker(make_datasets())
+    duplicates = checker.check_duplicates().set_index('Dataset')
+    assert duplicates.loc['order_payments', 'Duplicate_Rows'] == datasets['order_payments'].duplicated().sum()
+
+
+def test_store_removes_rows_of_earlier_batches():
+    """Rows already loaded in an earlier batch are dropped from later batches"""
+    payments = make_datasets()['order_payments'].drop_duplicates().reset_index(drop=True)
+    first, second = payments.iloc[:2000], payments.iloc[1500:]
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = FingerprintStore(store_dir)
+        loaded, fingerprints = store.filter_new('order_payments', first)
+        assert len(loaded) == 2000 and store.add('order_payments', fingerprints) == 2000
+
+        cleaner = DataCleaner({'order_payments': second}, fingerprint_store=store)
+        new_rows = cleaner.remove_loaded_rows()['order_payments']
+        pd.testing.assert_frame_equal(new_rows, payments.iloc[2000:])
+        assert cleaner.cleaning_log[-1]['action'] == 'REMOVE_LOADED_ROWS'
+
+        # Nothing is recorded until the batch's output is saved
+        assert len(store.load('order_payments')) == 2000
+        cleaner.commit_loaded_rows()
+        assert len(store.load('order_payments')) == len(payments)
+
+        # Rows with nulls are fingerprinted raw, before imputation fills them per batch
+        repeated = payments[payments['payment_value'].isna()].head(5)
+        cleaner = DataCleaner({'order_payments': repeated}, fingerprint_store=store)
+        assert len(cleaner.remove_loaded_rows()['order_payments']) == 0
+
+
+def write_raw_batch(data_dir, order_ids, product_ids):
+    """Raw Olist files with the given orders and products; lookup files are complete each batch"""
+    products = pd.DataFrame({
+        'product_id': product_ids,
+        'product_category_name': ['beleza_saude' if p == 'p3' else 'cama_mesa_banho' for p in product_ids],
+        'product_weight_g': 500.0, 'product_length_cm': 20.0, 'product_height_cm': 10.0, 'product_width_cm': 15.0
+    })
+    numbers = [int(o[1:]) for o in order_ids]
+    orders = pd.DataFrame({
+        'order_id': order_ids,
+        'customer_id': [f'c{n % 3}' for n in numbers],
+        'order_status': 'delivered',
+        'order_purchase_timestamp': '2018-01-02 10:00:00',
+        'order_approved_at': '2018-01-02 11:00:00',
+        'order_delivered_carrier_date': '2018-01-04 10:00:00',
+        'order_delivered_customer_date': ['2018-01-09 10:00:00' if n % 2 else None for n in numbers],
+        'order_estimated_delivery_date': '2018-01-12 00:00:00'
+    })
+    items = pd.DataFrame({
+        'order_id': order_ids, 'order_item_id': 1,
+        'product_id': ['p3' if n >= 8 else f'p{n % 2}' for n in numbers],
+        'seller_id': 's0', 'shipping_limit_date': '2018-01-03 10:00:00', 'price': 100.0, 'freight_value': 10.0
+    })
+    payments = pd.DataFrame({'order_id': order_ids, 'payment_sequential': 1, 'payment_type': 'boleto',
+                             'payment_installments': 1, 'payment_value': 110.0})
+    reviews = pd.DataFrame({'review_id': [f'r{o}' for o in order_ids], 'order_id': order_ids, 'review_score': 5,
+                            'review_comment_title': None, 'review_comment_message': None,
+                            'review_creation_date': '2018-01-10 00:00:00',
+                            'review_answer_timestamp': '2018-01-11 00:00:00'})
+    tables = {
+        'customers': pd.DataFrame({'customer_id': ['c0', 'c1', 'c2'], 'customer_unique_id': ['u0', 'u1', 'u2'],
+                                   'customer_zip_code_prefix': 1000, 'customer_city': 'sao paulo',
+                                   'customer_state': 'SP'}),
+        'geolocation': pd.DataFrame({'geolocation_zip_code_prefix': [1000], 'geolocation_lat': [-23.5],
+                                     'geolocation_lng': [-46.6], 'geolocation_city': ['sao paulo'],
+                                     'geolocation_state': ['SP']}),
+        'sellers': pd.DataFrame({'seller_id': ['s0'], 'seller_zip_code_prefix': [1000],
+                                 'seller_city': ['sao paulo'], 'seller_state': ['SP']}),
+        'product_categories': pd.DataFrame({'product_category_name': ['beleza_saude', 'cama_mesa_banho'],
+                                            'product_category_name_english': ['health_beauty', 'bed_bath_table']}),
+        'products': products, 'orders': orders, 'order_items': items,
+        'order_payments': payments, 'order_reviews': reviews
+    }
+    for name, filename in DataLoader(data_dir).file_mapping.items():
+        tables[name].to_csv(os.path.join(data_dir, filename), index=False)
+
+
+def test_incremental_batches_keep_lookups_and_union_of_facts():
+    """Two overlapping batches: lookups still join and the cleaned files hold both batches"""
+    with tempfile.TemporaryDirectory() as root:
+        raw_dir, cleaned_dir = os.path.join(root, 'raw'), os.path.join(root, 'cleaned')
+        os.makedirs(raw_dir)
+        store = FingerprintStore(os.path.join(root, 'fingerprints'))
+
+        write_raw_batch(raw_dir, [f'o{i}' for i in range(6)], ['p0', 'p1'])
+        save_cleaned_datasets(cleaned_dir, raw_dir, fingerprint_store=store)
+        write_raw_batch(raw_dir, [f'o{i}' for i in range(4, 10)], ['p0', 'p1', 'p3'])
+        second = save_cleaned_datasets(cleaned_dir, raw_dir, fingerprint_store=store)
+
+        # Only the new orders are cleaned, against complete lookup tables
+        assert sorted(second['orders']['order_id']) == [f'o{i}' for i in range(6, 10)]
+        assert len(second['product_categories']) == 2
+        products = second['products'].set_index('product_id')
+        assert products.loc['p3', 'product_category_name_english'] == 'health_beauty'
+
+        cleaned = load_cleaned_datasets(cleaned_dir)
+        for name in DataCleaner.FACT_TABLES:
+            assert sorted(cleaned[name]['order_id']) == [f'o{i}' for i in range(10)], name
+        assert len(cleaned['customers']) == 3 and len(cleaned['products']) == 3
+        assert cleaned['orders']['order_delivered_customer_date'].notna().all()
+
+        # Re-running the same batch neither loses nor duplicates rows
+        save_cleaned_datasets(cleaned_dir, raw_dir, fingerprint_store=store)
+        cleaned = load_cleaned_datasets(cleaned_dir)
+        assert sorted(cleaned['order_items']['order_id']) == [f'o{i}' for i in range(10)]
+        assert len(store.load('orders')) == 10 and len(store.load('products')) == 0
+
+
+if __name__ == "__main__":
+    print("Testing row fingerprints...")
+    test_fingerprints_match_pandas_duplicates()
+    test_cleaner_removes_duplicates()
+    test_store_removes_rows_of_earlier_batches()
+    test_incremental_batches_keep_lookups_and_union_of_facts()
+    print("✅ Row fingerprint tests passed!")
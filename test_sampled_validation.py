@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for sampled fast validation
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from sampled_validation import StratifiedSample, derive_strata, wilson_interval, _order_month
+from data_validator import DataValidator
+from data_quality_check import DataQualityChecker
+from validation_rules import RangeRule, ComparisonRule, NotNullRule
+
+
+def make_datasets(n_orders=40000, seed=3):
+    """Orders over 12 months and 4 states with payments; violations concentrate in SP"""
+    rng = np.random.default_rng(seed)
+    purchase = pd.Timestamp('2018-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, n_orders), unit='s')
+    customers = pd.DataFrame({
+        'customer_id': [f'c{i}' for i in range(n_orders)],
+        'customer_state': pd.Categorical(rng.choice(['SP', 'RJ', 'MG', 'BA'], n_orders, p=[0.4, 0.3, 0.2, 0.1]))
+    })
+    orders = pd.DataFrame({
+        'order_id': [f'o{i}' for i in range(n_orders)],
+        'customer_id': customers['customer_id'],
+        'order_purchase_timestamp': purchase,
+        'delivery_days': rng.integers(1, 30, n_orders).astype(float)
+    })
+    in_sp = (customers['customer_state'] == 'SP').to_numpy()
+    orders.loc[in_sp & (rng.random(n_orders) < 0.05), 'delivery_days'] = 500.0
+    order_payments = pd.DataFrame({
+        'order_id': orders['order_id'],
+        'payment_value': rng.gamma(2.0, 80.0, n_orders)
+    })
+    order_payments.loc[rng.choice(n_orders, 3, replace=False), 'payment_value'] = -1.0
+    return {'orders': orders, 'customers': customers, 'order_payments': order_payments}
+
+
+def test_stratified_sample_estimates():
+    """Strata follow month and state, child tables inherit them, intervals cover the true rate"""
+    datasets = make_datasets()
+    strata = derive_strata(datasets, 'orders')
+    assert len(np.unique(strata)) == 12 * 4
+    np.testing.assert_array_equal(derive_strata(datasets, 'order_payments', strata), strata)
+
+    sample = StratifiedSample(datasets['orders'], strata, sample_size=4000)
+    assert abs(len(sample.rows) - 4000) <= 48 and not sample.is_census
+    # Proportional allocation: every stratum gets its share
+    share = sample.sample_sizes[1:] / sample.population_sizes[1:]
+    assert np.allclose(share, 0.1, atol=0.02)
+
+    violations = (sample.rows['delivery_days'] > 365).to_numpy()
+    estimate = sample.estimate(violations)
+    true_rate = (datasets['orders']['delivery_days'] > 365).mean()
+    assert estimate['rate_lower'] <= true_rate <= estimate['rate_upper']
+    assert estimate['sample_rows'] == len(sample.rows)
+
+    census = StratifiedSample(datasets['orders'], strata, sample_size=10 ** 6)
+    exact = census.estimate((census.rows['delivery_days'] > 365).to_numpy())
+    assert census.is_census and exact['rate_lower'] == exact['rate_upper'] == true_rate
+
+    lower, upper = wilson_interval(0.0, 3000)
+    assert lower == 0.0 and 0.001 < upper < 0.0015
+
+
+def test_validator_escalates_uncertain_rules():
+    """Confident rules stay sampled, rules near the threshold are re-checked on the full table"""
+    datasets = make_datasets()
+    rules = [
+        NotNullRule('orders', 'order_id'),
+        RangeRule('orders', 'delivery_days', 0, 365),
+        ComparisonRule('order_payments', 'payment_value', '>', 0, name='positive_payment_value')
+    ]
+    validator = DataValidator(datasets, rules=rules, sample_size=4000, escalation_threshold=0.01)
+    passed, report = validator.validate_all_data()
+
+    assert validator.validation_results['completeness']['orders']['order_id']['mode'] == 'sampled'
+
+    # About 2% of orders are out of range, so the upper bound crosses 1% and the count is exact
+    delivery = validator.validation_results['data_ranges']['orders']['delivery_days']
+    assert delivery['mode'] == 'full'
+    assert delivery['out_of_range_count'] == int((datasets['orders']['delivery_days'] > 365).sum())
+    assert delivery['rate_lower'] <= delivery['out_of_range_count'] / len(datasets['orders']) <= delivery['rate_upper']
+
+    payments = validator.validation_results['business_rules']['order_payments']['positive_payment_value']
+    assert payments['mode'] == 'sampled' and payments['rate_upper'] < 0.01
+
+    integrity = validator.validation_results['referential_integrity']['orders_order_payments']
+    assert integrity['mode'] == 'sampled' and integrity['status'] == 'PASS'
+    assert "SAMPLED VALIDATION" in report
+
+
+def test_quality_checker_sampling():
+    """Missing values and outliers are estimated with intervals; frequent gaps are counted exactly"""
+    datasets = make_datasets()
+    orders = datasets['orders']
+    orders.loc[orders.index[::10], 'delivery_days'] = np.nan
+    checker = DataQualityChecker(datasets, sample_size=3000, escalation_threshold=0.05)
+
+    missing = checker.check_missing_values().set_index('Column')
+    assert missing.loc['delivery_days', 'Missing_Count'] == orders['delivery_days'].isna().sum()
+    assert not missing.loc['delivery_days', 'Estimated']
+    assert missing.loc['delivery_days', 'Missing_CI_Lower'] <= 10.0 <= missing.loc['delivery_days', 'Missing_CI_Upper']
+
+    ranges = checker.check_value_ranges().set_index(['Dataset', 'Column'])
+    assert ranges.loc[('orders', 'delivery_days'), 'Max'] == 500.0
+    assert 'Outlier_CI_Upper' in ranges.columns
+
+
+def test_compact_year_month_do_not_overflow():
+    """int16 years and int8 months give real yyyymm strata, with missing dates kept missing"""
+    orders = pd.DataFrame({
+        'order_year': pd.array([2017, 2018, 2018, None], dtype='Int16'),
+        'order_month': pd.array([12, 1, 1, None], dtype='Int8')
+    })
+    assert _order_month(orders).tolist()[:3] == [201712, 201801, 201801]
+    assert pd.isna(_order_month(orders).iloc[3])
+
+    compact = pd.DataFrame({'order_year': np.array([2017, 2018], dtype='int16'),
+                            'order_month': np.array([5, 5], dtype='int8')})
+    assert _order_month(compact).tolist() == [201705, 201805]
+
+
+if __name__ == "__main__":
+    print("Testing sampled validation...")
+    test_stratified_sample_estimates()
+    test_validator_escalates_uncertain_rules()
+    test_quality_checker_sampling()
+    test_compact_year_month_do_not_overflow()
+    print("✅ Sampled validation tests passed!")
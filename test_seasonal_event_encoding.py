@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact seasonal event encoding
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from seasonal_analysis import SeasonalAnalysis
+
+
+def build_analyzer():
+    """Create a SeasonalAnalysis with a small in-memory order set"""
+    timestamps = pd.to_datetime([
+        '2017-11-24 10:00', '2017-12-20 15:30', '2018-02-12 08:00',
+        '2018-05-13 20:00', '2018-07-01 12:00', None
+    ])
+    orders = pd.DataFrame({
+        'order_id': [f'o{i}' for i in range(len(timestamps))],
+        'customer_id': [f'c{i}' for i in range(len(timestamps))],
+        'order_purchase_timestamp': timestamps
+    })
+    items = pd.DataFrame({
+        'order_id': orders['order_id'],
+        'product_id': 'p1',
+        'price': 100.0,
+        'freight_value': 10.0
+    })
+
+    analyzer = SeasonalAnalysis()
+    analyzer.datasets = {'orders': orders, 'order_items': items}
+    analyzer.prepare_seasonal_data()
+    return analyzer
+
+
+def test_codes_replace_boolean_columns():
+    """Order rows carry int8 codes instead of per-event flags"""
+    analyzer = build_analyzer()
+    data = analyzer.seasonal_data
+
+    assert not [col for col in data.columns if col.startswith('is_')]
+    for col in ['season_code', 'event_code', 'event_impact_code']:
+        assert data[col].dtype == 'int8'
+
+
+def test_accessors_match_month_rules():
+    """Accessors reproduce the former month-based indicators"""
+    analyzer = build_analyzer()
+    data = analyzer.seasonal_data
+
+    assert analyzer.event_flag('black_friday').tolist() == (data['month'] == 11).fillna(False).tolist()
+    assert analyzer.event_flag('Mothers Day').tolist() == (data['month'] == 5).fillna(False).tolist()
+    assert analyzer.season_flag('summer').tolist() == data['month'].isin([12, 1, 2]).fillna(False).tolist()
+    assert analyzer.event_impact_labels().tolist() == [
+        'very_high', 'very_high', 'high', 'high', 'medium', 'none'
+    ]
+    assert analyzer.decode_events()['event_name'].iloc[0] == 'Black Friday'
+
+
+def test_proximity_computed_on_demand():
+    """Proximity columns stay off the seasonal data and are computed when asked for"""
+    analyzer = build_analyzer()
+    assert not [col for col in analyzer.seasonal_data.columns if col.startswith('days_')]
+
+    proximity = analyzer.event_proximity_features(events=['black_friday'])
+    assert proximity.index.equals(analyzer.seasonal_data.index)
+    assert proximity['days_since_black_friday'].iloc[0] == 0
+    assert proximity['days_to_black_friday'].isna().iloc[-1]
+
+
+def test_encoding_saves_memory():
+    """Compact encoding is smaller than the legacy columns"""
+    analyzer = build_analyzer()
+    analyzer.seasonal_data = pd.concat([analyzer.seasonal_data] * 1000, ignore_index=True)
+
+    report = analyzer.measure_event_encoding_memory()
+    assert report['compact_bytes'] < report['legacy_bytes']
+    assert report['reduction_pct'] > 80
+
+
+if __name__ == "__main__":
+    print("Testing seasonal event encoding...")
+    test_codes_replace_boolean_columns()
+    test_accessors_match_month_rules()
+    test_proximity_computed_on_demand()
+    test_encoding_saves_memory()
+    print("✅ Seasonal event encoding tests passed!")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for clustering-based customer segmentation
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from segmentation import (CustomerSegmenter, build_payment_features, fit_or_load_segments,
+                          FEATURE_COLUMNS, MODEL_FILE)
+
+
+def make_customer_data(n_customers=6000, seed=9):
+    """Three well separated customer groups; group 0 spends the most"""
+    rng = np.random.default_rng(seed)
+    group = rng.integers(0, 3, n_customers)
+    data = pd.DataFrame({
+        'customer_id': [f'c{i:05d}' for i in range(n_customers)],
+        'days_since_last_order': np.array([80, 350, 600])[group] + rng.normal(0, 30, n_customers),
+        'total_orders': np.array([3, 1, 1])[group],
+        'total_revenue': np.exp(np.array([6.0, 4.5, 5.0])[group] + rng.normal(0, 0.2, n_customers)),
+        'avg_delivery_experience': np.array([8, 12, 25])[group] + rng.normal(0, 1.5, n_customers),
+        'delivery_reliability': np.clip(np.array([0.95, 0.9, 0.4])[group] + rng.normal(0, 0.03, n_customers), 0, 1),
+        'avg_payment_installments': np.array([6, 2, 1])[group] + rng.integers(0, 2, n_customers),
+        'credit_card_share': np.clip(np.array([1.0, 0.6, 0.1])[group] + rng.normal(0, 0.05, n_customers), 0, 1),
+        'voucher_share': np.clip(np.array([0.0, 0.1, 0.4])[group] + rng.normal(0, 0.03, n_customers), 0, 1)
+    })
+    data['avg_order_value'] = data['total_revenue'] / data['total_orders']
+    data.loc[::50, 'avg_delivery_experience'] = np.nan
+    return data, group
+
+
+def test_payment_features():
+    """Payment shares are value weighted per customer"""
+    orders = pd.DataFrame({'order_id': ['o1', 'o2', 'o3'], 'customer_id': ['c1', 'c1', 'c2']})
+    order_payments = pd.DataFrame({
+        'order_id': ['o1', 'o1', 'o2', 'o3'],
+        'payment_type': ['credit_card', 'voucher', 'boleto', 'credit_card'],
+        'payment_installments': [4, 1, 1, 10],
+        'payment_value': [60.0, 20.0, 20.0, 50.0]
+    })
+    features = build_payment_features(orders, order_payments).set_index('customer_id')
+    assert features.loc['c1', 'credit_card_share'] == 0.6
+    assert features.loc['c1', 'voucher_share'] == 0.2
+    assert features.loc['c1', 'avg_payment_installments'] == 2.0
+    assert features.loc['c2', 'credit_card_share'] == 1.0
+
+
+def test_auto_k_recovers_groups_within_budget():
+    """Silhouette picks the true k, streaming chunks match groups, Segment 1 is the highest value"""
+    data, group = make_customer_data()
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'customers.csv')
+        data.to_csv(path, index=False)
+        # A tiny budget forces several chunks and a sample smaller than the table
+        segmenter = CustomerSegmenter(k_range=(2, 5), memory_budget_mb=0.25, sample_size=2000).fit(path)
+
+    assert segmenter.chunk_size < len(data)
+    assert segmenter.metadata['n_clusters'] == 3
+    assert segmenter.metadata['sample_rows'] <= 2000
+    labels = segmenter.assign(data)
+    assert pd.crosstab(labels, group).gt(0).sum(axis=1).eq(1).all()
+    profiles = segmenter.profiles_
+    assert profiles['total_revenue'].is_monotonic_decreasing
+    assert profiles['customers'].sum() == len(data)
+    assert (labels[group == 0] == 0).all()
+
+    gmm = CustomerSegmenter(n_clusters=3, method='gmm').fit(data)
+    assert pd.crosstab(gmm.assign(data), group).gt(0).sum(axis=1).eq(1).all()
+
+
+def test_persisted_model_assigns_and_updates():
+    """Saved centroids assign identically; updates move centroids towards new customers"""
+    data, group = make_customer_data()
+    with tempfile.TemporaryDirectory() as model_dir:
+        fitted = fit_or_load_segments(data, model_dir=model_dir, n_clusters=3)
+        reused = fit_or_load_segments(data, model_dir=model_dir, n_clusters=3)
+        assert reused.metadata['trained_at'] == fitted.metadata['trained_at']
+        np.testing.assert_array_equal(reused.assign(data), fitted.assign(data))
+        assert list(reused.assign_names(data.head(3))) == [f"Segment {i + 1}" for i in fitted.assign(data.head(3))]
+
+        gmm = CustomerSegmenter(n_clusters=3, method='gmm').fit(data)
+        gmm.save(model_dir)
+        np.testing.assert_array_equal(CustomerSegmenter.load(model_dir).assign(data), gmm.assign(data))
+
+        # Truncated or malformed state files are refitted instead of failing the caller
+        model_path = os.path.join(model_dir, MODEL_FILE)
+        with open(model_path, 'r', encoding='utf-8') as f:
+            state = f.read()
+        for corrupt in (state[:len(state) // 2], '{}', '[]', '{"centroids": [[1, 2]], "params": null}'):
+            with open(model_path, 'w', encoding='utf-8') as f:
+                f.write(corrupt)
+            assert CustomerSegmenter.load(model_dir) is None
+            refitted = fit_or_load_segments(data, model_dir=model_dir, n_clusters=3)
+            np.testing.assert_array_equal(refitted.assign(data), fitted.assign(data))
+
+    new_customers, _ = make_customer_data(n_customers=500, seed=10)
+    new_customers['days_since_last_order'] += 60
+    before = fitted.centroids_.copy()
+    labels = fitted.update(new_customers)
+    assert len(labels) == 500
+    moved = fitted.centroids_ - before
+    column = FEATURE_COLUMNS.index('days_since_last_order')
+    assert (moved[np.unique(labels), column] > 0).all()
+
+    try:
+        gmm.update(new_customers)
+        assert False, "GMM centroid updates should be rejected"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    print("Testing clustering segmentation...")
+    test_payment_features()
+    test_auto_k_recovers_groups_within_budget()
+    test_persisted_model_assigns_and_updates()
+    print("✅ Clustering segmentation tests passed!")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass temporal feature kernel
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from temporal_features import extract_temporal_features
+
+
+def test_matches_pandas_accessors():
+    """Kernel output matches the .dt accessors it replaces"""
+    rng = np.random.default_rng(42)
+    epochs = rng.integers(pd.Timestamp('2015-01-01').value, pd.Timestamp('2020-01-01').value, 50000)
+    timestamps = pd.Series(pd.to_datetime(epochs))
+
+    features = extract_temporal_features(timestamps)
+
+    expected = {
+        'order_year': timestamps.dt.year,
+        'order_month': timestamps.dt.month,
+        'order_quarter': timestamps.dt.quarter,
+        'order_day_of_month': timestamps.dt.day,
+        'order_day_of_week': timestamps.dt.dayofweek,
+        'order_hour': timestamps.dt.hour,
+        'order_week_of_year': timestamps.dt.isocalendar().week,
+        'order_day_of_year': timestamps.dt.dayofyear
+    }
+    for column, values in expected.items():
+        assert np.array_equal(features[column].to_numpy(dtype=np.int64), values.to_numpy(dtype=np.int64)), column
+
+    assert (features['order_day_name'].astype(str) == timestamps.dt.day_name()).all()
+
+
+def test_compact_dtypes_and_missing_values():
+    """Fields use int8/int16 storage and missing timestamps stay missing"""
+    timestamps = pd.Series(pd.to_datetime(['2017-11-24 10:30:00', None, '2018-01-01 00:00:00']))
+
+    features = extract_temporal_features(timestamps, prefix='', fields=['year', 'month', 'day_name'])
+
+    assert str(features['year'].dtype) == 'Int16'
+    assert str(features['month'].dtype) == 'Int8'
+    assert isinstance(features['day_name'].dtype, pd.CategoricalDtype)
+    assert features['year'].isna().tolist() == [False, True, False]
+    assert features['day_name'].iloc[0] == 'Friday'
+
+    complete = extract_temporal_features(timestamps.dropna(), prefix='', fields=['year', 'month'])
+    assert str(complete['year'].dtype) == 'int16'
+    assert str(complete['month'].dtype) == 'int8'
+
+
+if __name__ == "__main__":
+    print("Testing temporal feature kernel...")
+    test_matches_pandas_accessors()
+    test_compact_dtypes_and_missing_values()
+    print("✅ Temporal feature tests passed!")
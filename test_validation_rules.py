@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the declarative validation rule engine
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from validation_rules import (RuleEngine, NotNullRule, DtypeRule, RangeRule, ComparisonRule,
+                              load_rules, rules_from_dicts)
+from data_validator import DataValidator
+
+
+def make_orders(n_orders=1000):
+    """Orders with known violations"""
+    purchase = pd.date_range('2018-01-01', periods=n_orders, freq='h')
+    orders = pd.DataFrame({
+        'order_id': [f'o{i}' for i in range(n_orders)],
+        'order_status': pd.Categorical(['delivered'] * n_orders),
+        'order_purchase_timestamp': purchase,
+        'order_delivered_customer_date': purchase + pd.Timedelta(days=5),
+        'delivery_days': np.full(n_orders, 5.0),
+        'order_month': purchase.month
+    }, index=pd.RangeIndex(100, 100 + n_orders))
+    orders.loc[[110, 500, 900], 'order_delivered_customer_date'] -= pd.Timedelta(days=10)
+    orders.loc[[120, 130], 'delivery_days'] = -1.0
+    orders.loc[[140], 'delivery_days'] = 400.0
+    orders.loc[[150], 'order_delivered_customer_date'] = pd.NaT
+    orders.loc[[160, 170], 'order_id'] = None
+    return orders
+
+
+def test_single_pass_results():
+    """All rule kinds over one table, evaluated in small chunks"""
+    orders = make_orders()
+    rules = [
+        NotNullRule('orders', 'order_id', max_missing_percentage=0.1),
+        DtypeRule('orders', 'order_status', 'category'),
+        DtypeRule('orders', 'delivery_days', 'int64', name='delivery_days_int'),
+        RangeRule('orders', 'delivery_days', 0, 365),
+        ComparisonRule('orders', 'order_delivered_customer_date', '>=', other='order_purchase_timestamp',
+                       name='delivery_after_purchase'),
+        ComparisonRule('orders', 'order_purchase_timestamp', '>=', '2018-01-10', name='after_launch',
+                       severity='WARN'),
+        RangeRule('orders', 'missing_column', 0, 1)
+    ]
+    results = RuleEngine(rules, sample_size=2, chunk_size=128).evaluate({'orders': orders})
+
+    completeness = results['completeness']['orders']['order_id']
+    assert completeness['missing_count'] == 2 and completeness['status'] == 'FAIL'
+    assert sorted(completeness['sample_indices']) == [160, 170]
+
+    assert results['data_types']['orders']['order_status']['status'] == 'PASS'
+    assert results['data_types']['orders']['delivery_days_int']['actual_type'] == 'float64'
+
+    delivery_range = results['data_ranges']['orders']['delivery_days']
+    assert delivery_range['out_of_range_count'] == 3 and delivery_range['status'] == 'WARN'
+    assert delivery_range['actual_min'] == -1.0 and delivery_range['actual_max'] == 400.0
+    assert 'missing_column' not in results['data_ranges']['orders']
+
+    after_purchase = results['business_rules']['orders']['delivery_after_purchase']
+    assert after_purchase['invalid_count'] == 3
+    assert after_purchase['total_checked'] == len(orders) - 1
+    # Sampled labels are violating rows, capped at the sample size
+    assert len(after_purchase['sample_indices']) == 2
+    assert set(after_purchase['sample_indices']) <= {110, 500, 900}
+
+    after_launch = results['business_rules']['orders']['after_launch']
+    assert after_launch['violation_count'] == 9 * 24 and after_launch['status'] == 'WARN'
+
+    # Chunking does not change the counts
+    whole = RuleEngine(rules, chunk_size=10 ** 6).evaluate({'orders': orders})
+    assert whole['data_ranges']['orders']['delivery_days']['out_of_range_count'] == 3
+    assert whole['business_rules']['orders']['after_launch']['violation_count'] == 9 * 24
+
+
+def test_rules_from_files_and_validator():
+    """YAML and JSON definitions load into rules; DataValidator uses them"""
+    definitions = [
+        {'type': 'range', 'table': 'orders', 'column': 'order_month', 'min': 1, 'max': 12},
+        {'type': 'comparison', 'table': 'orders', 'name': 'positive_delivery_days',
+         'column': 'delivery_days', 'operator': '>=', 'value': 0}
+    ]
+    assert [rule.name for rule in rules_from_dicts(definitions)] == ['order_month', 'positive_delivery_days']
+
+    with tempfile.TemporaryDirectory() as rules_dir:
+        yaml_path = os.path.join(rules_dir, 'rules.yaml')
+        with open(yaml_path, 'w', encoding='utf-8') as f:
+            f.write("- {type: range, table: orders, column: order_month, min: 1, max: 12}\n"
+                    "- type: comparison\n"
+                    "  table: orders\n"
+                    "  name: positive_delivery_days\n"
+                    "  column: delivery_days\n"
+                    "  operator: '>='\n"
+                    "  value: 0\n")
+        assert [type(rule) for rule in load_rules(yaml_path)] == [RangeRule, ComparisonRule]
+
+        validator = DataValidator({'orders': make_orders()}, rules=yaml_path)
+        passed, report = validator.validate_all_data()
+
+    assert not passed
+    business = validator.validation_results['business_rules']['orders']['positive_delivery_days']
+    assert business['invalid_count'] == 2 and business['status'] == 'FAIL'
+    assert validator.validation_results['data_ranges']['orders']['order_month']['status'] == 'PASS'
+    assert "BUSINESS RULES" in report
+
+
+if __name__ == "__main__":
+    print("Testing validation rule engine...")
+    test_single_pass_results()
+    test_rules_from_files_and_validator()
+    print("✅ Validation rule engine tests passed!")
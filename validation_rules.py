@@ -0,0 +1,492 @@
+"""
+Declarative Validation Rule Engine for Brazilian E-commerce Dataset
+
+Validation checks are described as rule objects (or YAML/JSON documents that
+map onto them) instead of hand-written loops:
+
+- NotNullRule: share of missing values in a column stays below a threshold
+- DtypeRule: a column has one of the expected dtypes (schema only, no scan)
+- RangeRule: non-null values lie within [min, max]
+- ComparisonRule: ``column <op> value`` or ``column <op> other_column`` holds
+  wherever both sides are known
+
+RuleEngine compiles the rules of each table into a plan: the union of the
+columns they need is converted to numpy arrays once per row chunk, and every
+rule is evaluated on those arrays in the same pass. Validation therefore
+reads each table once, whatever the number of rules. Each result carries the
+violation count, the number of rows checked and a uniform sample of violating
+row labels, plus the rule-specific fields used by the validation report.
+
+YAML example (``load_rules``)::
+
+    - {type: range, table: order_reviews, column: review_score, min: 1, max: 5}
+    - type: comparison
+      table: orders
+      name: delivery_after_purchase
+      column: order_delivered_customer_date
+      operator: ">="
+      other: order_purchase_timestamp
+"""
+
+import os
+import json
+import logging
+import operator
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_SIZE = 20
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+OPERATORS = {
+    '<': operator.lt, '<=': operator.le, '>': operator.gt,
+    '>=': operator.ge, '==': operator.eq, '!=': operator.ne
+}
+
+
+class ColumnChunk:
+    """
+    One column of a row chunk, converted once and shared by every rule of the table.
+    """
+
+    def __init__(self, series: pd.Series, need_values: bool):
+        """
+        Convert a column chunk.
+
+        Args:
+            series (pd.Series): Column values of the chunk
+            need_values (bool): Convert values for comparisons (not needed for null checks)
+        """
+        self.dtype = series.dtype
+        self.isna = series.isna().to_numpy()
+        self.values = None
+        self.nulls = self.isna
+        if not need_values:
+            return
+        if isinstance(series.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+            # Datetimes are compared as epoch nanoseconds
+            self.values = series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        elif pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+            self.values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            # Non-numeric columns (e.g. numbers stored as text) are compared where they parse
+            self.values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            self.nulls = self.isna | np.isnan(self.values)
+
+
+class Rule:
+    """
+    Base class of validation rules for a single table.
+    """
+
+    type_name = None
+    default_category = None
+    requires_scan = True
+    needs_values = True
+
+    def __init__(self, table: str, name: str, category: Optional[str] = None, severity: str = 'FAIL',
+                 description: Optional[str] = None):
+        """
+        Initialize the rule.
+
+        Args:
+            table (str): Dataset the rule applies to
+            name (str): Result key, unique within the table and category
+            category (Optional[str]): Result group, e.g. 'business_rules'
+            severity (str): 'FAIL' fails validation on violations, 'WARN' only reports them
+            description (Optional[str]): Human readable statement of the rule
+        """
+        if severity not in ('FAIL', 'WARN'):
+            raise ValueError(f"Unknown severity '{severity}' for rule {table}.{name}")
+        self.table = table
+        self.name = name
+        self.category = category or self.default_category
+        self.severity = severity
+        self.description = description or name
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns the rule reads."""
+        raise NotImplementedError
+
+    def evaluate(self, arrays: Dict[str, ColumnChunk]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the rule on one chunk.
+
+        Args:
+            arrays (Dict[str, ColumnChunk]): Converted columns of the chunk
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Violation mask and checked mask
+        """
+        raise NotImplementedError
+
+    def update_stats(self, stats: Dict, arrays: Dict, checked: np.ndarray):
+        """Accumulate rule-specific statistics for one chunk (optional)."""
+
+    def summarize(self, stats: Dict, violations: int, checked: int, total_rows: int) -> Dict:
+        """Rule-specific result fields."""
+        return {}
+
+    def status(self, violations: int, checked: int, total_rows: int) -> str:
+        return 'PASS' if violations == 0 else self.severity
+
+
+class NotNullRule(Rule):
+    """
+    At most ``max_missing_percentage`` percent of the column may be missing.
+    """
+
+    type_name = 'not_null'
+    default_category = 'completeness'
+    needs_values = False
+
+    def __init__(self, table: str, column: str, max_missing_percentage: float = 1.0, name: Optional[str] = None,
+                 **kwargs):
+        super().__init__(table, name or column, **kwargs)
+        self.column = column
+        self.max_missing_percentage = max_missing_percentage
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column]
+
+    def evaluate(self, arrays):
+        nulls = arrays[self.column].isna
+        return nulls, np.ones(len(nulls), dtype=bool)
+
+    def status(self, violations, checked, total_rows):
+        missing_percentage = violations / total_rows * 100 if total_rows else 0.0
+        return 'PASS' if missing_percentage < self.max_missing_percentage else self.severity
+
+    def summarize(self, stats, violations, checked, total_rows):
+        missing_percentage = violations / total_rows * 100 if total_rows else 0.0
+        return {'missing_count': violations, 'missing_percentage': round(missing_percentage, 2)}
+
+
+class DtypeRule(Rule):
+    """
+    The column's dtype is one of the expected dtypes. Checked from the schema.
+    """
+
+    type_name = 'dtype'
+    default_category = 'data_types'
+    requires_scan = False
+    needs_values = False
+
+    def __init__(self, table: str, column: str, expected: Union[str, List[str]], name: Optional[str] = None,
+                 **kwargs):
+        super().__init__(table, name or column, **kwargs)
+        self.column = column
+        self.expected = expected
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column]
+
+    def check(self, df: pd.DataFrame) -> Dict:
+        actual_type = str(df[self.column].dtype)
+        expected = self.expected if isinstance(self.expected, list) else [self.expected]
+        matches = actual_type in expected
+        return {
+            'expected_type': self.expected,
+            'actual_type': actual_type,
+            'violation_count': 0 if matches else 1
+        }
+
+
+class RangeRule(Rule):
+    """
+    Non-null values lie within [min, max] (either bound may be omitted).
+    """
+
+    type_name = 'range'
+    default_category = 'data_ranges'
+
+    def __init__(self, table: str, column: str, min=None, max=None, name: Optional[str] = None,
+                 severity: str = 'WARN', **kwargs):
+        super().__init__(table, name or column, severity=severity, **kwargs)
+        self.column = column
+        self.min = min
+        self.max = max
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column]
+
+    def evaluate(self, arrays):
+        values, checked = arrays[self.column].values, ~arrays[self.column].nulls
+        violations = np.zeros(len(values), dtype=bool)
+        if self.min is not None:
+            violations |= values < self.min
+        if self.max is not None:
+            violations |= values > self.max
+        return violations & checked, checked
+
+    def update_stats(self, stats, arrays, checked):
+        column = arrays[self.column]
+        stats['dtype'] = column.dtype
+        if checked.any():
+            values = column.values if checked.all() else column.values[checked]
+            stats['actual_min'] = min(stats.get('actual_min', np.inf), values.min())
+            stats['actual_max'] = max(stats.get('actual_max', -np.inf), values.max())
+
+    def summarize(self, stats, violations, checked, total_rows):
+        actual = [stats.get('actual_min'), stats.get('actual_max')]
+        if actual[0] is not None and pd.api.types.is_integer_dtype(stats['dtype']):
+            # Report integer columns in their own type
+            actual = [int(value) for value in actual]
+        return {
+            'expected_min': self.min,
+            'expected_max': self.max,
+            'actual_min': actual[0],
+            'actual_max': actual[1],
+            'out_of_range_count': violations,
+            'total_values': checked
+        }
+
+
+class ComparisonRule(Rule):
+    """
+    ``column <operator> value`` or ``column <operator> other`` holds for every row
+    where both sides are known.
+    """
+
+    type_name = 'comparison'
+    default_category = 'business_rules'
+
+    def __init__(self, table: str, column: str, operator: str, value=None, other: Optional[str] = None,
+                 name: Optional[str] = None, **kwargs):
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown operator '{operator}', expected one of {list(OPERATORS)}")
+        if (value is None) == (other is None):
+            raise ValueError("A comparison rule needs exactly one of value or other")
+        super().__init__(table, name or f"{column}_{operator}_{other if other else value}", **kwargs)
+        self.column = column
+        self.operator = operator
+        self.value = value
+        self.other = other
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column] + ([self.other] if self.other else [])
+
+    def evaluate(self, arrays):
+        column = arrays[self.column]
+        values = column.values
+        if self.other:
+            other_values = arrays[self.other].values
+            checked = ~column.nulls & ~arrays[self.other].nulls
+        else:
+            other_values = _comparable_scalar(self.value, values)
+            checked = ~column.nulls
+        with np.errstate(invalid='ignore'):
+            holds = OPERATORS[self.operator](values, other_values)
+        return ~holds & checked, checked
+
+    def summarize(self, stats, violations, checked, total_rows):
+        return {'invalid_count': violations, 'total_checked': checked}
+
+
+RULE_TYPES = {rule.type_name: rule for rule in (NotNullRule, DtypeRule, RangeRule, ComparisonRule)}
+
+
+def _comparable_scalar(value, values: np.ndarray):
+    """Timestamps in rule definitions are compared as epoch nanoseconds like datetime columns."""
+    if isinstance(value, (str, pd.Timestamp)) and values.dtype == np.int64:
+        return pd.Timestamp(value).value
+    return value
+
+
+def rules_from_dicts(definitions: Iterable[Dict]) -> List[Rule]:
+    """
+    Build rule objects from plain definitions.
+
+    Args:
+        definitions (Iterable[Dict]): Each with 'type' (not_null, dtype, range, comparison)
+            and the rule's constructor arguments
+
+    Returns:
+        List[Rule]: Rule objects
+    """
+    rules = []
+    for definition in definitions:
+        definition = dict(definition)
+        rule_type = definition.pop('type', None)
+        if rule_type not in RULE_TYPES:
+            raise ValueError(f"Unknown rule type '{rule_type}', expected one of {list(RULE_TYPES)}")
+        rules.append(RULE_TYPES[rule_type](**definition))
+    return rules
+
+
+def load_rules(path: str) -> List[Rule]:
+    """
+    Load rule definitions from a YAML or JSON file (a list of rule mappings).
+
+    Args:
+        path (str): .yaml, .yml or .json file
+
+    Returns:
+        List[Rule]: Rule objects
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("Loading YAML validation rules requires PyYAML (pip install pyyaml)") from e
+            definitions = yaml.safe_load(f)
+        else:
+            definitions = json.load(f)
+    return rules_from_dicts(definitions or [])
+
+
+class RuleEngine:
+    """
+    Evaluates validation rules with one scan per table.
+    """
+
+    def __init__(self, rules: Iterable[Rule], sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, random_state: int = 0):
+        """
+        Initialize the engine and group the rules by table.
+
+        Args:
+            rules (Iterable[Rule]): Rules to evaluate
+            sample_size (int): Violating row labels kept per rule
+            chunk_size (int): Rows converted to arrays at a time
+            random_state (int): Seed for sampling violating rows
+        """
+        self.rules = list(rules)
+        self.sample_size = sample_size
+        self.chunk_size = chunk_size
+        self.random_state = random_state
+        self.table_rules = {}
+        for rule in self.rules:
+            self.table_rules.setdefault(rule.table, []).append(rule)
+
+    def plan_table(self, table: str, df: pd.DataFrame) -> Tuple[List[Rule], List[Rule], List[str], set]:
+        """
+        Compile the rules of a table against its columns.
+
+        Rules referring to columns the table does not have are skipped.
+
+        Args:
+            table (str): Dataset name
+            df (pd.DataFrame): Dataset (only its columns are used)
+
+        Returns:
+            Tuple: Schema-only rules, scanning rules, columns to convert per chunk and
+            the subset of those whose values (not just nulls) are needed
+        """
+        rules = [rule for rule in self.table_rules.get(table, []) if set(rule.columns) <= set(df.columns)]
+        scan_rules = [rule for rule in rules if rule.requires_scan]
+        # Every needed column is converted once per chunk and shared by all rules
+        columns = list(dict.fromkeys(col for rule in scan_rules for col in rule.columns))
+        value_columns = {col for rule in scan_rules if rule.needs_values for col in rule.columns}
+        return [rule for rule in rules if not rule.requires_scan], scan_rules, columns, value_columns
+
+    @staticmethod
+    def check_schema(rule: Rule, df: pd.DataFrame) -> Dict:
+        """Result of a rule that only inspects the schema."""
+        result = rule.check(df)
+        result['status'] = 'PASS' if result['violation_count'] == 0 else rule.severity
+        return result
+
+    def evaluate_table(self, table: str, df: pd.DataFrame) -> List[Tuple[Rule, Dict]]:
+        """
+        Evaluate every rule of a table in a single pass over its rows.
+
+        Args:
+            table (str): Dataset name
+            df (pd.DataFrame): Dataset
+
+        Returns:
+            List[Tuple[Rule, Dict]]: Each applicable rule with its result
+        """
+        schema_rules, scan_rules, columns, value_columns = self.plan_table(table, df)
+        results = [(rule, self.check_schema(rule, df)) for rule in schema_rules]
+        total_rows = len(df)
+        if not scan_rules:
+            return results
+
+        violations = np.zeros(len(scan_rules), dtype=np.int64)
+        checked = np.zeros(len(scan_rules), dtype=np.int64)
+        stats = [{} for _ in scan_rules]
+        samples = [np.empty(0, dtype=np.int64) for _ in scan_rules]
+        rng = np.random.default_rng(self.random_state)
+
+        for start in range(0, max(total_rows, 1), self.chunk_size):
+            chunk = df.iloc[start:start + self.chunk_size]
+            arrays = {col: ColumnChunk(chunk[col], col in value_columns) for col in columns}
+            for position, rule in enumerate(scan_rules):
+                violation_mask, checked_mask = rule.evaluate(arrays)
+                seen = int(violations[position])
+                violating_rows = np.flatnonzero(violation_mask)
+                violations[position] += len(violating_rows)
+                checked[position] += int(checked_mask.sum())
+                rule.update_stats(stats[position], arrays, checked_mask)
+                if len(violating_rows):
+                    samples[position] = self._merge_sample(rng, samples[position], seen, violating_rows + start)
+
+        for position, rule in enumerate(scan_rules):
+            count, checked_count = int(violations[position]), int(checked[position])
+            result = {
+                'violation_count': count,
+                'checked_count': checked_count,
+                'total_rows': total_rows,
+                'sample_indices': df.index[np.sort(samples[position])].tolist(),
+                'status': rule.status(count, checked_count, total_rows)
+            }
+            result.update(rule.summarize(stats[position], count, checked_count, total_rows))
+            results.append((rule, result))
+        return results
+
+    def _merge_sample(self, rng: np.random.Generator, sample: np.ndarray, seen: int,
+                      new_rows: np.ndarray) -> np.ndarray:
+        """
+        Combine a uniform sample of the violations seen so far with a chunk's violations.
+
+        The number of rows taken from the chunk is drawn from the hypergeometric
+        distribution, so the result stays a uniform sample of all violations without
+        generating a random key per violating row.
+
+        Args:
+            rng (np.random.Generator): Random generator
+            sample (np.ndarray): Uniform sample of the previous ``seen`` violations
+            seen (int): Number of violations before this chunk
+            new_rows (np.ndarray): Positions of the chunk's violating rows
+
+        Returns:
+            np.ndarray: Uniform sample of at most ``sample_size`` violating rows
+        """
+        if seen + len(new_rows) <= self.sample_size:
+            return np.concatenate([sample, new_rows])
+        from_chunk = int(rng.hypergeometric(len(new_rows), seen, self.sample_size))
+        kept = rng.choice(sample, self.sample_size - from_chunk, replace=False)
+        return np.concatenate([kept, rng.choice(new_rows, from_chunk, replace=False)])
+
+    def evaluate(self, datasets: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Dict[str, Dict]]]:
+        """
+        Evaluate all rules against the datasets they refer to.
+
+        Args:
+            datasets (Dict[str, pd.DataFrame]): Datasets by name
+
+        Returns:
+            Dict: category -> table -> rule name -> result
+        """
+        results = {}
+        for table in self.table_rules:
+            if table not in datasets:
+                continue
+            for rule, result in self.evaluate_table(table, datasets[table]):
+                result.update({'severity': rule.severity, 'description': rule.description})
+                results.setdefault(rule.category, {}).setdefault(table, {})[rule.name] = result
+        return results